@@ -0,0 +1,121 @@
+"""
+按内容寻址的持久化存储
+报告图表、转写文本等大对象按内容的SHA-256保存为文件，数据库只记录哈希；
+相同内容只存一份，文件写入后不再修改，也不会按容量淘汰（与 DiskBlobCache 的缓存语义不同），
+不再被引用的对象由调用方确认后显式删除
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ContentStore:
+    """
+    内容寻址存储
+
+    - put() 返回内容的SHA-256，文件按哈希前两位分目录存放
+    - 先写临时文件再原子替换，多个worker进程可以共用同一目录
+    - get() 读取时校验哈希，文件损坏时按不存在处理
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self.stats = {"writes": 0, "deduplicated": 0, "reads": 0, "missing": 0, "bytes_written": 0,
+                      "deleted": 0, "bytes_deleted": 0}
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self.root, content_hash[:2], content_hash)
+
+    def put(self, data: bytes) -> str:
+        """保存内容，返回内容哈希（已存在则不重复写入）"""
+        content_hash = self.content_hash(data)
+        path = self._path(content_hash)
+        if os.path.exists(path):
+            with self._lock:
+                self.stats["deduplicated"] += 1
+            return content_hash
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.stats["writes"] += 1
+            self.stats["bytes_written"] += len(data)
+        return content_hash
+
+    def get(self, content_hash: str) -> Optional[bytes]:
+        if len(content_hash) != 64 or not all(ch in "0123456789abcdef" for ch in content_hash):
+            return None
+        try:
+            with open(self._path(content_hash), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.stats["missing"] += 1
+            return None
+        if self.content_hash(data) != content_hash:
+            logger.warning(f"存储对象内容与哈希不一致: {content_hash}")
+            return None
+        with self._lock:
+            self.stats["reads"] += 1
+        return data
+
+    def exists(self, content_hash: str) -> bool:
+        return os.path.exists(self._path(content_hash))
+
+    def delete(self, content_hash: str) -> bool:
+        """删除对象，返回是否存在（由调用方保证已无引用）"""
+        path = self._path(content_hash)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            self.stats["deleted"] += 1
+            self.stats["bytes_deleted"] += size
+        return True
+
+    def iter_objects(self) -> Iterator[Tuple[str, float]]:
+        """遍历已保存的对象，产出 (内容哈希, 写入时间)，跳过未完成的临时文件"""
+        if not os.path.isdir(self.root):
+            return
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if len(prefix) != 2 or not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if len(name) != 64 or not name.startswith(prefix):
+                    continue
+                try:
+                    yield name, os.path.getmtime(os.path.join(directory, name))
+                except FileNotFoundError:
+                    continue
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"root": self.root, **self.stats}
+
+
+blob_store = ContentStore(getattr(settings, 'blob_store_dir', './data/blobs'))
+
+
+def get_blob_store() -> ContentStore:
+    """获取共享的内容寻址存储"""
+    return blob_store
+
+
+__all__ = ["ContentStore", "blob_store", "get_blob_store"]
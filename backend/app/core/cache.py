@@ -0,0 +1,588 @@
+"""
+通用LRU + TTL缓存
+按条目数和字节预算双重限制，读写均为O(1)
+
+提供可插拔的缓存后端：
+- LRUCache: 进程内缓存
+- SQLiteCache: 基于SQLite WAL的跨进程共享缓存，多个uvicorn worker共用同一份缓存
+- DiskBlobCache: 按内容寻址的磁盘二进制缓存（如合成音频）
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """估算缓存值占用的字节数（按JSON序列化后的UTF-8长度）"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(repr(value).encode("utf-8"))
+
+
+class CacheBackend:
+    """缓存后端接口，所有调用方只依赖这些方法"""
+
+    # 读写是否会阻塞（磁盘I/O、锁等待），异步调用方应通过 aget/aset 访问
+    blocking = False
+
+    def get(self, key: str, default: Any = None, record: bool = True) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def purge_expired(self) -> int:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING, record=False) is not _MISSING
+
+    @property
+    def size_bytes(self) -> int:
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """异步读取，阻塞型后端在线程池中执行，不占用事件循环"""
+        if self.blocking:
+            return await asyncio.to_thread(self.get, key, default)
+        return self.get(key, default)
+
+    async def aset(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """异步写入，阻塞型后端在线程池中执行，不占用事件循环"""
+        if self.blocking:
+            return await asyncio.to_thread(self.set, key, value, ttl_seconds)
+        return self.set(key, value, ttl_seconds)
+
+
+class LRUCache(CacheBackend):
+    """
+    LRU + TTL 缓存
+
+    - OrderedDict 维护访问顺序，命中时移到队尾，淘汰时从队首弹出
+    - 过期条目在访问或淘汰时惰性删除
+    - 同时受 max_entries 和 max_bytes 限制，超出时淘汰最久未使用的条目
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: Optional[float] = 300,
+                 max_bytes: Optional[int] = None):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        # key -> (value, 过期时间戳, 字节数)
+        self._data: "OrderedDict[str, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _remove(self, key: str):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    def get(self, key: str, default: Any = None, record: bool = True) -> Any:
+        """获取缓存值，未命中或已过期返回 default"""
+        entry = self._data.get(key)
+        if entry is None:
+            if record:
+                self.misses += 1
+            return default
+
+        value, expires_at, _ = entry
+        if expires_at is not None and time.time() >= expires_at:
+            self._remove(key)
+            self.expirations += 1
+            if record:
+                self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        if record:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """写入缓存，必要时淘汰最久未使用的条目"""
+        size = estimate_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"缓存值过大，跳过缓存: {key} ({size} bytes)")
+            return
+
+        if key in self._data:
+            self._remove(key)
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.time() + ttl if ttl else None
+        self._data[key] = (value, expires_at, size)
+        self._bytes += size
+
+        while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes):
+            oldest_key, (_, oldest_expires, _) = next(iter(self._data.items()))
+            self._remove(oldest_key)
+            if oldest_expires is not None and time.time() >= oldest_expires:
+                self.expirations += 1
+            else:
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        if key in self._data:
+            self._remove(key)
+            return True
+        return False
+
+    def purge_expired(self) -> int:
+        """主动清理所有过期条目，返回清理数量"""
+        now = time.time()
+        expired = [k for k, (_, expires_at, _) in self._data.items()
+                   if expires_at is not None and now >= expires_at]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self):
+        self._data.clear()
+        self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "size_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups * 100 if lookups else 0.0
+        }
+
+
+def _encode_value(value: Any) -> str:
+    """
+    序列化为JSON文本，bytes 以 base64 包装（共享缓存不使用pickle）
+    其他不可JSON序列化的值（datetime、自定义对象等）抛出 TypeError，不静默转换为字符串
+    """
+    def default(obj):
+        if isinstance(obj, (bytes, bytearray)):
+            return {"__bytes__": base64.b64encode(bytes(obj)).decode("ascii")}
+        raise TypeError(f"共享缓存只接受可JSON序列化的值: {type(obj).__name__}")
+
+    return json.dumps(value, ensure_ascii=False, default=default)
+
+
+def _decode_value(text: str) -> Any:
+    def object_hook(obj):
+        if len(obj) == 1 and "__bytes__" in obj:
+            return base64.b64decode(obj["__bytes__"])
+        return obj
+
+    return json.loads(text, object_hook=object_hook)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    基于SQLite WAL的跨进程共享缓存
+
+    - 同一数据库文件可被同一节点上的多个worker进程同时读写
+    - 按 namespace 隔离不同调用方，淘汰按 last_access 近似LRU
+    - 值以JSON存储（bytes 除外），写入不可JSON序列化的值时抛出 TypeError
+    - 命中时只在内存中记录访问时间，累计 trim_interval 个后批量写回 last_access，读路径不逐次写库
+    - 条目数和字节预算每隔 trim_interval 次写入检查一次，属于软限制
+    - 读写可能等待数据库锁（busy_timeout 5秒），异步代码中应使用 aget/aset
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, namespace: str = "default", max_entries: int = 1000,
+                 ttl_seconds: Optional[float] = 300, max_bytes: Optional[int] = None,
+                 trim_interval: int = 32):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.trim_interval = max(1, trim_interval)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL,"
+            " last_access REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key)"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_entries_lru ON cache_entries (namespace, last_access)"
+        )
+
+        self._writes_since_trim = 0
+        # key -> 最近一次命中时间，尚未写回 last_access
+        self._pending_access: Dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        return row[0]
+
+    def get(self, key: str, default: Any = None, record: bool = True) -> Any:
+        """获取缓存值，未命中或已过期返回 default"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                if record:
+                    self.misses += 1
+                return default
+
+            value, expires_at = row
+            if expires_at is not None and now >= expires_at:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+                )
+                self._pending_access.pop(key, None)
+                self.expirations += 1
+                if record:
+                    self.misses += 1
+                return default
+
+            if record:
+                self._pending_access[key] = now
+                if len(self._pending_access) >= self.trim_interval:
+                    self._flush_access()
+                self.hits += 1
+
+        return _decode_value(value)
+
+    def _flush_access(self):
+        """把累计的命中时间批量写回 last_access（调用方持有锁）"""
+        if not self._pending_access:
+            return
+        self._conn.executemany(
+            "UPDATE cache_entries SET last_access = MAX(last_access, ?) WHERE namespace = ? AND key = ?",
+            [(accessed, self.namespace, key) for key, accessed in self._pending_access.items()]
+        )
+        self._pending_access.clear()
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """写入缓存，定期按条目数和字节预算淘汰；值不可JSON序列化时抛出 TypeError"""
+        encoded = _encode_value(value)
+        size = len(encoded.encode("utf-8"))
+        if self.max_bytes is not None and size > self.max_bytes:
+            logger.debug(f"缓存值过大，跳过缓存: {key} ({size} bytes)")
+            return
+
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, encoded, size, expires_at, now)
+            )
+            self._pending_access.pop(key, None)
+            self._writes_since_trim += 1
+            if self._writes_since_trim >= self.trim_interval:
+                self._writes_since_trim = 0
+                self._trim(now)
+
+    def _trim(self, now: float):
+        """删除过期条目，并按 last_access 淘汰超出预算的条目（调用方持有锁）"""
+        self._flush_access()
+        cursor = self._conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+            (self.namespace, now)
+        )
+        self.expirations += max(cursor.rowcount, 0)
+
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?",
+            (self.namespace,)
+        ).fetchone()
+        excess_entries = count - self.max_entries
+        excess_bytes = total - self.max_bytes if self.max_bytes is not None else 0
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return
+
+        victims = []
+        rows = self._conn.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY last_access",
+            (self.namespace,)
+        )
+        for victim_key, victim_size in rows:
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            victims.append((self.namespace, victim_key))
+            excess_entries -= 1
+            excess_bytes -= victim_size
+
+        self._conn.executemany("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", victims)
+        self.evictions += len(victims)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            self._pending_access.pop(key, None)
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+            )
+        return cursor.rowcount > 0
+
+    def purge_expired(self) -> int:
+        """主动清理所有过期条目，返回清理数量"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                (self.namespace, time.time())
+            )
+        removed = max(cursor.rowcount, 0)
+        self.expirations += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._pending_access.clear()
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        return row[0]
+
+    def close(self):
+        with self._lock:
+            self._flush_access()
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计（命中率为本进程视角）"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": "sqlite",
+            "namespace": self.namespace,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups * 100 if lookups else 0.0
+        }
+
+
+class DiskBlobCache:
+    """
+    按内容寻址的磁盘二进制缓存
+
+    - 键为内容描述（如文本+发音人）的SHA-256，文件按前两位分目录存放
+    - 写入先写临时文件再原子替换，多个worker进程可以共用同一目录
+    - 总大小超过 max_bytes 时按最近访问时间淘汰到预算的90%
+    """
+
+    def __init__(self, root: str, max_bytes: int = 200 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._bytes = self._scan_size()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """由内容描述生成键"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def _files(self):
+        for entry in os.scandir(self.root):
+            if entry.is_dir():
+                for item in os.scandir(entry.path):
+                    if item.is_file() and not item.name.endswith(".tmp"):
+                        yield item
+
+    def _scan_size(self) -> int:
+        total = 0
+        for item in self._files():
+            try:
+                total += item.stat().st_size
+            except OSError:
+                continue
+        return total
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # 记录最近访问时间，供LRU淘汰使用
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def set(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        existed = os.path.exists(path)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if not existed:
+                self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """按修改（访问）时间从旧到新删除文件，直到低于预算的90%（调用方持有锁）"""
+        files = []
+        for item in self._files():
+            try:
+                stat = item.stat()
+            except OSError:
+                # 其他进程已删除（或正在替换）该文件
+                continue
+            files.append((stat.st_mtime, stat.st_size, item.path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= size
+        self._bytes = total
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "disk",
+            "root": self.root,
+            "size_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups * 100 if lookups else 0.0
+        }
+
+
+def create_cache(namespace: str, max_entries: int = 1000, ttl_seconds: Optional[float] = 300,
+                 max_bytes: Optional[int] = None) -> CacheBackend:
+    """
+    按配置创建缓存后端
+
+    cache_backend=sqlite 时使用共享缓存，打开失败则回退到进程内缓存
+    """
+    backend = getattr(settings, 'cache_backend', 'memory')
+    if backend == "sqlite":
+        path = getattr(settings, 'cache_sqlite_path', './cache/shared_cache.db')
+        try:
+            return SQLiteCache(path, namespace=namespace, max_entries=max_entries,
+                               ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"共享缓存不可用，回退到进程内缓存: {e}")
+    elif backend != "memory":
+        logger.warning(f"未知的缓存后端 {backend}，使用进程内缓存")
+
+    return LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds, max_bytes=max_bytes)
+
+
+__all__ = ["CacheBackend", "LRUCache", "SQLiteCache", "DiskBlobCache", "create_cache", "estimate_size"]
@@ -70,7 +70,12 @@ class Settings(BaseSettings):
     debug: bool = Field(default=False, env="DEBUG")
     
     # 数据库配置
-    database_url: str = Field(default="sqlite:///./interview_system.db", env="DATABASE_URL")
+    database_url: str = Field(default="sqlite:///./interview_system.db", env="DATABASE_URL")  # 生产环境可用 postgresql://，异步引擎自动换用 asyncpg
+    db_pool_size: int = Field(default=5, env="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, env="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, env="DB_POOL_TIMEOUT")  # 等待空闲连接的超时秒数
+    db_pool_recycle: int = Field(default=1800, env="DB_POOL_RECYCLE")  # 连接最长复用秒数
+    sqlite_busy_timeout_ms: int = Field(default=5000, env="SQLITE_BUSY_TIMEOUT_MS")  # 写锁冲突时的等待时间
     
     # iFlytek Spark 配置 - 增强版
     iflytek_app_id: str = Field(default=os.getenv("SPARK_APPID", ""), env="SPARK_APPID")
@@ -91,16 +96,60 @@ class Settings(BaseSettings):
     iflytek_max_connections: int = Field(default=10, env="IFLYTEK_MAX_CONNECTIONS")
     iflytek_connection_timeout: int = Field(default=60, env="IFLYTEK_CONNECTION_TIMEOUT")
     iflytek_heartbeat_interval: int = Field(default=30, env="IFLYTEK_HEARTBEAT_INTERVAL")
+    iflytek_pool_min_idle: int = Field(default=2, env="IFLYTEK_POOL_MIN_IDLE")  # 预热连接数
+    iflytek_pool_max_age: int = Field(default=240, env="IFLYTEK_POOL_MAX_AGE")  # 连接最长存活秒数，需小于鉴权date的300秒窗口
+    iflytek_pool_requests_per_connection: int = Field(default=1, env="IFLYTEK_POOL_REQUESTS_PER_CONNECTION")  # 每个连接服务的请求数，Spark在最后一帧后关闭连接；0 表示不限
+
+    # 限流配置（与Spark配额保持一致）
+    iflytek_qps: float = Field(default=2.0, env="IFLYTEK_QPS")
+    iflytek_burst: int = Field(default=4, env="IFLYTEK_BURST")
+    iflytek_max_concurrent_streams: int = Field(default=5, env="IFLYTEK_MAX_CONCURRENT_STREAMS")
+    iflytek_queue_timeout: float = Field(default=30.0, env="IFLYTEK_QUEUE_TIMEOUT")  # 排队超时秒数
 
     # 性能优化配置
     iflytek_enable_cache: bool = Field(default=True, env="IFLYTEK_ENABLE_CACHE")
     iflytek_cache_ttl: int = Field(default=300, env="IFLYTEK_CACHE_TTL")  # 5分钟
+    iflytek_cache_max_bytes: int = Field(default=32 * 1024 * 1024, env="IFLYTEK_CACHE_MAX_BYTES")  # 每个缓存的字节预算
     iflytek_enable_compression: bool = Field(default=True, env="IFLYTEK_ENABLE_COMPRESSION")
     
     # 语音识别配置
     asr_max_audio_size: int = Field(default=10 * 1024 * 1024, env="ASR_MAX_AUDIO_SIZE")  # 10MB
     asr_supported_formats: list = Field(default=["wav", "mp3", "flac", "m4a"], env="ASR_SUPPORTED_FORMATS")
     asr_sample_rate: int = Field(default=16000, env="ASR_SAMPLE_RATE")
+    asr_max_concurrent_sessions: int = Field(default=10, env="ASR_MAX_CONCURRENT_SESSIONS")  # 同时进行的流式识别会话数
+    asr_frame_bytes: int = Field(default=8000, env="ASR_FRAME_BYTES")  # 单帧上传的音频字节数
+    asr_upload_interval: float = Field(default=0.04, env="ASR_UPLOAD_INTERVAL")  # 整段音频上传的帧间隔（秒），讯飞听写接口按约40毫秒一帧发送；0 表示不限速
+    asr_result_timeout: float = Field(default=30.0, env="ASR_RESULT_TIMEOUT")  # 发送结束帧后等待最终结果的超时
+
+    # 语音合成配置
+    tts_cache_dir: str = Field(default="./cache/tts", env="TTS_CACHE_DIR")  # 句级合成音频缓存目录
+    tts_cache_max_bytes: int = Field(default=200 * 1024 * 1024, env="TTS_CACHE_MAX_BYTES")  # 缓存目录容量上限，超出按最近访问淘汰
+    tts_prefetch_sentences: int = Field(default=2, env="TTS_PREFETCH_SENTENCES")  # 播放当前句时提前合成的句数
+
+    # 能力评分进程池配置
+    scoring_process_pool_enabled: bool = Field(default=True, env="SCORING_PROCESS_POOL_ENABLED")
+    scoring_max_workers: int = Field(default=0, env="SCORING_MAX_WORKERS")  # 0 表示按CPU核数自动确定
+    scoring_max_pending: int = Field(default=0, env="SCORING_MAX_PENDING")  # 同时提交到进程池的任务上限，0 表示工作进程数的4倍
+    scoring_inline_threshold: int = Field(default=200, env="SCORING_INLINE_THRESHOLD")  # 短于此长度的文本直接在当前进程评分
+
+    # 启动配置
+    lazy_imports: bool = Field(default=True, env="LAZY_IMPORTS")  # 非核心服务在第一次使用时再导入
+
+    # 中文分词配置
+    segmentation_preload: bool = Field(default=True, env="SEGMENTATION_PRELOAD")  # 启动时在后台线程加载分词词典
+    segmentation_cache_dir: str = Field(default="./cache/jieba", env="SEGMENTATION_CACHE_DIR")  # 序列化后的词典缓存目录
+    search_index_preload: bool = Field(default=True, env="SEARCH_INDEX_PRELOAD")  # 启动时在后台线程建立题库检索索引
+
+    # 面试会话存储配置
+    session_store_path: str = Field(default="./cache/interview_sessions.db", env="SESSION_STORE_PATH")  # 会话持久化文件，多worker共享；为空时只保存在内存
+    session_store_max_sessions: int = Field(default=1000, env="SESSION_STORE_MAX_SESSIONS")  # 内存中保留的会话数，超出按LRU淘汰（已落盘的会话可重新读取）
+    session_store_memory_ttl: int = Field(default=600, env="SESSION_STORE_MEMORY_TTL")  # 内存副本有效期（秒）；每次读取仍会比对持久层版本号
+    session_store_ttl: int = Field(default=86400, env="SESSION_STORE_TTL")  # 会话闲置多久后从持久层删除（秒）
+    session_history_limit: int = Field(default=100, env="SESSION_HISTORY_LIMIT")  # 每个会话保留的消息数
+    session_prompt_window: int = Field(default=20, env="SESSION_PROMPT_WINDOW")  # 生成下一题时带入的最近消息数
+
+    # 大对象存储配置
+    blob_store_dir: str = Field(default="./data/blobs", env="BLOB_STORE_DIR")  # 报告图表、转写文本等按内容哈希存放的目录
     
     # 视频分析配置
     video_max_size: int = Field(default=50 * 1024 * 1024, env="VIDEO_MAX_SIZE")  # 50MB
@@ -110,6 +159,16 @@ class Settings(BaseSettings):
     # 缓存配置
     redis_url: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
     cache_ttl: int = Field(default=3600, env="CACHE_TTL")  # 1小时
+    cache_backend: str = Field(default="memory", env="CACHE_BACKEND")  # memory | sqlite（多worker共享）
+    cache_sqlite_path: str = Field(default="./cache/shared_cache.db", env="CACHE_SQLITE_PATH")
+    prompt_cache_pool_size: int = Field(default=3, env="PROMPT_CACHE_POOL_SIZE")  # 每个规范提示词保留的回答数
+    prompt_cache_ttl: int = Field(default=86400, env="PROMPT_CACHE_TTL")  # 1天
+    prompt_cache_near_duplicate: bool = Field(default=True, env="PROMPT_CACHE_NEAR_DUPLICATE")
+    prompt_cache_similarity: float = Field(default=0.85, env="PROMPT_CACHE_SIMILARITY")  # MinHash相似度阈值
+    opening_pool_enabled: bool = Field(default=True, env="OPENING_POOL_ENABLED")  # 开场问题预生成池
+    opening_pool_size: int = Field(default=3, env="OPENING_POOL_SIZE")  # 每个(领域, 岗位)预生成数量
+    opening_pool_max_age: int = Field(default=3600, env="OPENING_POOL_MAX_AGE")  # 预生成结果有效期（秒）
+    opening_pool_refill_concurrency: int = Field(default=2, env="OPENING_POOL_REFILL_CONCURRENCY")
     
     # 日志配置
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
@@ -0,0 +1,127 @@
+"""
+CPU密集任务执行器
+把分词、正则评分等纯计算函数放到进程池执行，避免阻塞事件循环；
+等待中的任务数有上限（超出时调用方排队等待），小输入直接在当前进程计算
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CPUBoundExecutor:
+    """
+    进程池执行器
+
+    - 进程池在第一次需要时创建，每个工作进程启动时执行 initializer（如预加载分词词典）；
+      before_start 在创建进程池之前于线程中执行，用于先在主进程准备好工作进程要读取的数据（如词典缓存文件）
+    - 工作进程默认以 spawn 方式启动：服务进程中有后台加载线程、to_thread 线程池和SQLite锁，
+      fork 可能把其他线程持有的锁复制到子进程中造成死锁，工作进程不与主进程共享内存
+    - 已提交未完成的任务不超过 max_pending，超出的调用在事件循环上排队，形成背压
+    - size 小于 inline_threshold 的输入直接同步计算，省去进程间序列化开销
+    - 进程池异常退出时重建，并在当前进程完成本次计算
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 inline_threshold: int = 200, initializer: Optional[Callable[[], None]] = None,
+                 before_start: Optional[Callable[[], Any]] = None, enabled: bool = True,
+                 start_method: str = "spawn"):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.max_pending = max_pending or self.max_workers * 4
+        self.inline_threshold = inline_threshold
+        self.initializer = initializer
+        self.before_start = before_start
+        self.enabled = enabled
+        self.start_method = start_method
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Dict[int, asyncio.Semaphore] = {}
+        self._pending = 0
+
+        self.stats = {
+            "inline": 0,
+            "offloaded": 0,
+            "fallbacks": 0,
+            "max_pending": 0,
+            "total_queue_wait": 0.0
+        }
+
+    def _slot(self) -> asyncio.Semaphore:
+        """每个事件循环一个排队信号量"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._slots.get(id(loop))
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_pending)
+            self._slots.clear()
+            self._slots[id(loop)] = semaphore
+        return semaphore
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=get_context(self.start_method), initializer=self.initializer
+            )
+            logger.info(f"CPU任务进程池已启动: {self.max_workers} 个工作进程")
+        return self._pool
+
+    async def run(self, func: Callable[..., Any], *args, size: Optional[int] = None, **kwargs) -> Any:
+        """
+        执行纯函数 func(*args, **kwargs)，func 和参数必须可序列化
+        :param size: 输入规模（如文本长度），小于 inline_threshold 时直接同步计算
+        """
+        call = functools.partial(func, *args, **kwargs)
+        if not self.enabled or (size is not None and size < self.inline_threshold):
+            self.stats["inline"] += 1
+            return call()
+
+        slot = self._slot()
+        wait_start = time.perf_counter()
+        async with slot:
+            self.stats["total_queue_wait"] += time.perf_counter() - wait_start
+            self._pending += 1
+            self.stats["max_pending"] = max(self.stats["max_pending"], self._pending)
+            try:
+                if self._pool is None and self.before_start is not None:
+                    await asyncio.to_thread(self.before_start)
+                result = await asyncio.get_running_loop().run_in_executor(self._get_pool(), call)
+                self.stats["offloaded"] += 1
+                return result
+            except BrokenProcessPool as e:
+                logger.error(f"CPU任务进程池异常，改为当前进程计算: {e}")
+                self._reset_pool()
+                self.stats["fallbacks"] += 1
+                return call()
+            finally:
+                self._pending -= 1
+
+    def _reset_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def shutdown(self):
+        """关闭进程池（应用退出时调用）"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        offloaded = self.stats["offloaded"]
+        return {
+            **self.stats,
+            "total_queue_wait": round(self.stats["total_queue_wait"], 3),
+            "average_queue_wait": round(self.stats["total_queue_wait"] / offloaded, 4) if offloaded else 0.0,
+            "pending": self._pending,
+            "max_workers": self.max_workers,
+            "pool_started": self._pool is not None,
+            "start_method": self.start_method,
+            "enabled": self.enabled
+        }
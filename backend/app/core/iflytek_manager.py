@@ -7,6 +7,7 @@ import asyncio
 import json
 import logging
 import time
+from collections import deque
 from typing import Dict, Any, Optional, Callable
 from contextlib import asynccontextmanager
 import websockets
@@ -15,6 +16,7 @@ import ssl
 import certifi
 
 from .config import iflytek_config, settings
+from .cache import create_cache
 
 logger = logging.getLogger(__name__)
 
@@ -37,8 +39,12 @@ class IFlytekConnectionManager:
         }
         self.response_times = []
         self.max_response_times = 100  # 保留最近100次响应时间
-        self.request_cache = {}  # 请求缓存
-        self.cache_timestamps = {}  # 缓存时间戳
+        self.request_cache = create_cache(  # 请求缓存
+            "iflytek_request",
+            max_entries=1000,
+            ttl_seconds=getattr(settings, 'iflytek_cache_ttl', 300),
+            max_bytes=getattr(settings, 'iflytek_cache_max_bytes', None)
+        )
         self.heartbeat_tasks = {}  # 心跳任务
     
     async def create_connection(self, connection_id: str = None) -> Optional[websockets.WebSocketServerProtocol]:
@@ -286,7 +292,8 @@ class IFlytekConnectionManager:
             "cache_hit_rate": (
                 self.connection_stats["cache_hits"] /
                 max(1, self.connection_stats["cache_hits"] + self.connection_stats["cache_misses"])
-            ) * 100 if hasattr(self, 'request_cache') else 0
+            ) * 100 if hasattr(self, 'request_cache') else 0,
+            "request_cache": self.request_cache.get_stats()
         }
 
     async def _heartbeat_monitor(self, connection_id: str):
@@ -337,50 +344,275 @@ class IFlytekConnectionManager:
         cache_str = json.dumps(cache_data, sort_keys=True)
         return hashlib.md5(cache_str.encode()).hexdigest()
 
-    def _is_cache_valid(self, cache_key: str) -> bool:
-        """检查缓存是否有效"""
-        if not hasattr(self.config.settings, 'iflytek_enable_cache') or not self.config.settings.iflytek_enable_cache:
-            return False
+    def _cache_enabled(self) -> bool:
+        return getattr(self.config.settings, 'iflytek_enable_cache', False)
 
-        if cache_key not in self.cache_timestamps:
-            return False
-
-        cache_time = self.cache_timestamps[cache_key]
-        ttl = getattr(self.config.settings, 'iflytek_cache_ttl', 300)
-
-        return time.time() - cache_time < ttl
-
-    def get_cached_response(self, request_data: dict) -> Optional[dict]:
+    async def get_cached_response(self, request_data: dict) -> Optional[dict]:
         """获取缓存响应"""
-        cache_key = self._get_cache_key(request_data)
+        if not self._cache_enabled():
+            return None
 
-        if self._is_cache_valid(cache_key):
+        cache_key = self._get_cache_key(request_data)
+        cached = await self.request_cache.aget(cache_key)
+        if cached is not None:
             self.connection_stats["cache_hits"] += 1
             logger.debug(f"缓存命中: {cache_key}")
-            return self.request_cache[cache_key]
+            return cached
 
         self.connection_stats["cache_misses"] += 1
         return None
 
-    def cache_response(self, request_data: dict, response_data: dict):
-        """缓存响应"""
-        if not hasattr(self.config.settings, 'iflytek_enable_cache') or not self.config.settings.iflytek_enable_cache:
+    async def cache_response(self, request_data: dict, response_data: dict):
+        """缓存响应（超出条目数或字节预算时淘汰最久未使用的条目）"""
+        if not self._cache_enabled():
             return
 
-        cache_key = self._get_cache_key(request_data)
-        self.request_cache[cache_key] = response_data
-        self.cache_timestamps[cache_key] = time.time()
+        await self.request_cache.aset(self._get_cache_key(request_data), response_data)
+
+
+def _is_connection_open(websocket) -> bool:
+    """兼容新旧版本websockets的连接状态检查"""
+    closed = getattr(websocket, "closed", None)
+    if closed is not None:
+        return not closed
+    state = getattr(websocket, "state", None)
+    return getattr(state, "name", "") == "OPEN"
+
+
+class PooledSparkConnection:
+    """连接池中的单个WebSocket连接"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.request_count = 0
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created_at
+
+    @property
+    def idle_time(self) -> float:
+        return time.time() - self.last_used
+
+
+class SparkConnectionPool:
+    """
+    Spark WebSocket 有界连接池
+
+    - 最多 max_size 个连接，借出期间独占，同一连接上的请求天然串行
+    - 启动时预热 min_idle 个连接，归还后在后台补足，握手不在请求关键路径上
+    - Spark 服务端在发送 status=2 的最后一帧后关闭连接，每个预热连接只服务一个请求
+      （requests_per_connection=1）：收益来自握手提前完成，而不是连接复用；
+      服务端关闭的连接归还时丢弃并计入 server_closed，不计入复用
+    - 后台定期 ping 空闲连接，失效连接直接丢弃
+    - 连接存活超过 max_age 后回收，新连接使用 url_factory 重新签名的URL，
+      避免鉴权 date 超出服务端允许的时间窗口
+    """
+
+    def __init__(self, url_factory: Callable[[], str], max_size: int = 10, min_idle: int = 2,
+                 max_age: float = 240, idle_timeout: float = 120, probe_interval: float = 30,
+                 connect_timeout: float = 15, requests_per_connection: Optional[int] = 1):
+        self.url_factory = url_factory
+        self.max_size = max(1, max_size)
+        self.min_idle = min(max(0, min_idle), self.max_size)
+        self.max_age = max_age
+        self.idle_timeout = idle_timeout
+        self.probe_interval = probe_interval
+        self.connect_timeout = connect_timeout
+        # 每个连接最多服务的请求数，None 表示不限（连接保持打开时可复用）
+        self.requests_per_connection = requests_per_connection or None
+
+        self._idle = deque()
+        self._in_use = 0
+        self._opening = 0
+        self._semaphore = asyncio.Semaphore(self.max_size)
+        self._maintenance_task = None
+        self._refill_task = None
+        self._closed = False
+
+        self.stats = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "connect_failures": 0,
+            "acquired": 0,
+            "warm_hits": 0,       # 借到的是预先建立好的连接（握手不在请求路径上）
+            "reused": 0,          # 借到的连接此前已服务过请求
+            "server_closed": 0,   # 服务端已关闭、归还或取出时丢弃的连接
+            "probe_failures": 0,
+            "recycled": 0
+        }
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + self._in_use + self._opening
+
+    async def start(self):
+        """预热连接并启动后台健康检查"""
+        self._closed = False
+        await self._refill()
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+        logger.info(f"Spark连接池已启动: 预热连接 {len(self._idle)}/{self.min_idle}")
+
+    async def _open(self) -> PooledSparkConnection:
+        """建立新连接（每次都重新签名URL）"""
+        self._opening += 1
+        try:
+            websocket = await asyncio.wait_for(
+                websockets.connect(
+                    self.url_factory(),
+                    ping_interval=None,
+                    close_timeout=10
+                ),
+                timeout=self.connect_timeout
+            )
+            self.stats["connections_opened"] += 1
+            return PooledSparkConnection(websocket)
+        except Exception:
+            self.stats["connect_failures"] += 1
+            raise
+        finally:
+            self._opening -= 1
+
+    async def _discard(self, conn: PooledSparkConnection):
+        """关闭并丢弃连接"""
+        self.stats["connections_closed"] += 1
+        try:
+            await conn.websocket.close()
+        except Exception as e:
+            logger.debug(f"关闭Spark连接时出错: {e}")
+
+    def _is_reusable(self, conn: PooledSparkConnection) -> bool:
+        return (
+            _is_connection_open(conn.websocket)
+            and conn.age < self.max_age
+            and conn.idle_time < self.idle_timeout
+            and (self.requests_per_connection is None or conn.request_count < self.requests_per_connection)
+        )
+
+    async def _drop(self, conn: PooledSparkConnection):
+        """丢弃不可再用的连接，按原因计数"""
+        if not _is_connection_open(conn.websocket):
+            self.stats["server_closed"] += 1
+        elif self.requests_per_connection is None or conn.request_count < self.requests_per_connection:
+            self.stats["recycled"] += 1
+        await self._discard(conn)
+
+    async def _take_idle(self) -> Optional[PooledSparkConnection]:
+        """取出一个可复用的空闲连接，顺带清理失效连接"""
+        while self._idle:
+            conn = self._idle.pop()
+            if self._is_reusable(conn):
+                return conn
+            await self._drop(conn)
+        return None
+
+    @asynccontextmanager
+    async def acquire(self):
+        """借出一个连接，使用期间独占；异常或提前中断时连接被丢弃"""
+        await self._semaphore.acquire()
+        conn = None
+        try:
+            conn = await self._take_idle()
+            if conn is None:
+                conn = await self._open()
+            else:
+                self.stats["warm_hits"] += 1
+                if conn.request_count:
+                    self.stats["reused"] += 1
+            self._in_use += 1
+            self.stats["acquired"] += 1
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+        try:
+            yield conn.websocket
+        except BaseException:
+            await self._discard(conn)
+            raise
+        else:
+            conn.last_used = time.time()
+            conn.request_count += 1
+            if not self._closed and self._is_reusable(conn):
+                self._idle.append(conn)
+            else:
+                await self._drop(conn)
+        finally:
+            self._in_use -= 1
+            self._semaphore.release()
+            self._schedule_refill()
+
+    def _schedule_refill(self):
+        if self._closed or len(self._idle) >= self.min_idle:
+            return
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def _refill(self):
+        """补足空闲连接到 min_idle"""
+        while (not self._closed and len(self._idle) < self.min_idle
+               and self.size < self.max_size):
+            try:
+                self._idle.append(await self._open())
+            except Exception as e:
+                logger.warning(f"Spark连接池预热失败: {e}")
+                break
+
+    async def _probe_idle(self):
+        """检查空闲连接：过期回收，其余发送ping"""
+        for conn in list(self._idle):
+            if conn not in self._idle:
+                continue
+            if not self._is_reusable(conn):
+                self._idle.remove(conn)
+                await self._drop(conn)
+                continue
+            try:
+                pong_waiter = await conn.websocket.ping()
+                await asyncio.wait_for(pong_waiter, timeout=10)
+            except Exception as e:
+                logger.debug(f"Spark空闲连接探测失败: {e}")
+                self.stats["probe_failures"] += 1
+                if conn in self._idle:
+                    self._idle.remove(conn)
+                await self._discard(conn)
+
+    async def _maintenance_loop(self):
+        while not self._closed:
+            await asyncio.sleep(self.probe_interval)
+            try:
+                await self._probe_idle()
+                await self._refill()
+            except Exception as e:
+                logger.error(f"Spark连接池维护异常: {e}")
+
+    async def close(self):
+        """关闭连接池"""
+        self._closed = True
+        for task in (self._maintenance_task, self._refill_task):
+            if task and not task.done():
+                task.cancel()
+        while self._idle:
+            await self._discard(self._idle.pop())
+        logger.info("Spark连接池已关闭")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "max_size": self.max_size,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            "requests_per_connection": self.requests_per_connection,
+            "warm_hit_rate": self.stats["warm_hits"] / max(1, self.stats["acquired"]) * 100,
+            "reuse_rate": self.stats["reused"] / max(1, self.stats["acquired"]) * 100
+        }
 
-        # 限制缓存大小
-        if len(self.request_cache) > 1000:
-            # 删除最旧的缓存项
-            oldest_key = min(self.cache_timestamps.keys(),
-                           key=lambda k: self.cache_timestamps[k])
-            del self.request_cache[oldest_key]
-            del self.cache_timestamps[oldest_key]
 
 # 全局连接管理器实例
 connection_manager = IFlytekConnectionManager()
 
 # 导出
-__all__ = ["IFlytekConnectionManager", "connection_manager"]
+__all__ = ["IFlytekConnectionManager", "SparkConnectionPool", "connection_manager"]
@@ -0,0 +1,102 @@
+"""
+延迟导入
+matplotlib、pandas 等重量级模块以及只在个别接口里用到的服务单例，在第一次被访问时才导入，
+缩短进程启动时间；每个延迟对象的加载耗时会被记录下来，供启动分析报告和监控接口使用
+"""
+
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_registry: List["LazyProxy"] = []
+_registry_lock = threading.Lock()
+
+
+class LazyProxy:
+    """
+    延迟加载代理
+
+    第一次访问属性（或调用）时执行 loader，之后所有操作转发给加载出的对象
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_loader", loader)
+        object.__setattr__(self, "_target", None)
+        object.__setattr__(self, "_loaded", False)
+        object.__setattr__(self, "_load_seconds", 0.0)
+        object.__setattr__(self, "_lock", threading.Lock())
+        with _registry_lock:
+            _registry.append(self)
+
+    def _resolve(self) -> Any:
+        if self._loaded:
+            return self._target
+        with self._lock:
+            if not self._loaded:
+                start = time.perf_counter()
+                target = self._loader()
+                object.__setattr__(self, "_target", target)
+                object.__setattr__(self, "_load_seconds", time.perf_counter() - start)
+                object.__setattr__(self, "_loaded", True)
+                logger.info(f"延迟加载 {self._name} 完成，用时 {self._load_seconds:.3f} 秒")
+        return self._target
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._resolve(), item)
+
+    def __setattr__(self, key: str, value: Any):
+        setattr(self._resolve(), key, value)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._loaded else "pending"
+        return f"<LazyProxy {self._name} ({state})>"
+
+
+def lazy_module(name: str, loader: Optional[Callable[[], Any]] = None) -> LazyProxy:
+    """延迟导入模块，loader 可在导入前后做额外配置（须返回模块对象）"""
+    return LazyProxy(name, loader or (lambda: importlib.import_module(name)))
+
+
+def lazy_attribute(module: str, attribute: str, package: Optional[str] = None) -> LazyProxy:
+    """
+    延迟导入模块中的对象（如服务单例）
+    多个模块延迟引用同一对象时共用一个代理，加载状态和耗时只记录一份
+    """
+    name = f"{module}.{attribute}" if not package else importlib.util.resolve_name(module, package) + f".{attribute}"
+    with _registry_lock:
+        for proxy in _registry:
+            if proxy._name == name:
+                return proxy
+    return LazyProxy(name, lambda: getattr(importlib.import_module(module, package), attribute))
+
+
+def resolve(obj: Any) -> Any:
+    """取得延迟代理背后的真实对象，非代理对象原样返回"""
+    return obj._resolve() if isinstance(obj, LazyProxy) else obj
+
+
+def load_all() -> None:
+    """立即加载全部已登记的延迟对象（关闭延迟导入时使用）"""
+    with _registry_lock:
+        proxies = list(_registry)
+    for proxy in proxies:
+        proxy._resolve()
+
+
+def get_lazy_stats() -> Dict[str, Dict[str, Any]]:
+    """各延迟对象的加载状态和耗时"""
+    with _registry_lock:
+        proxies = list(_registry)
+    return {
+        proxy._name: {"loaded": proxy._loaded, "load_seconds": round(proxy._load_seconds, 4)}
+        for proxy in proxies
+    }
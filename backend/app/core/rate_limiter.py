@@ -0,0 +1,177 @@
+"""
+iFlytek Spark 调用限流器
+令牌桶 + 优先级等待队列，控制QPS和并发流数量
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# 优先级通道：数值越小越先放行
+PRIORITY_INTERACTIVE = "interactive"  # 面试对话等实时请求
+PRIORITY_BATCH = "batch"              # 报告生成、能力评估等后台请求
+
+PRIORITY_LANES = {
+    PRIORITY_INTERACTIVE: 0,
+    PRIORITY_BATCH: 1
+}
+
+
+class SparkRateLimiter:
+    """
+    全局Spark调用准入控制
+
+    - 令牌桶：以 rate 个/秒补充令牌，最多积累 burst 个
+    - 并发上限：同时进行中的请求/流式响应不超过 max_concurrent
+    - 等待队列按优先级通道排队，同一通道内先进先出
+    - 上游返回429时调用 backoff()，在指定时间内暂停放行
+    """
+
+    def __init__(self, rate: float = 2.0, burst: int = 4, max_concurrent: int = 5,
+                 queue_timeout: Optional[float] = 30.0):
+        self.rate = max(rate, 0.001)
+        self.burst = max(1, burst)
+        self.max_concurrent = max(1, max_concurrent)
+        self.queue_timeout = queue_timeout
+
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._active = 0
+        self._waiters = {lane: deque() for lane in PRIORITY_LANES}
+        self._wakeup_handle = None
+
+        self.stats = {
+            lane: {
+                "admitted": 0,
+                "timeouts": 0,
+                "total_wait_time": 0.0,
+                "max_wait_time": 0.0
+            }
+            for lane in PRIORITY_LANES
+        }
+        self.backoff_count = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        """按优先级取出下一个仍在等待的请求"""
+        for lane in sorted(self._waiters, key=PRIORITY_LANES.get):
+            queue = self._waiters[lane]
+            while queue:
+                future = queue[0]
+                if future.done():
+                    queue.popleft()
+                    continue
+                return future
+        return None
+
+    def _dispatch(self):
+        """尽可能多地放行等待中的请求，令牌不足时安排下一次唤醒"""
+        if self._wakeup_handle is not None:
+            self._wakeup_handle.cancel()
+            self._wakeup_handle = None
+        self._refill()
+        now = time.monotonic()
+
+        while self._active < self.max_concurrent and now >= self._blocked_until:
+            future = self._next_waiter()
+            if future is None or self._tokens < 1:
+                break
+            for queue in self._waiters.values():
+                if queue and queue[0] is future:
+                    queue.popleft()
+                    break
+            self._tokens -= 1
+            self._active += 1
+            future.set_result(None)
+
+        # 仅在被令牌或退避阻塞时定时唤醒；被并发上限阻塞时由 release() 唤醒
+        if self._active < self.max_concurrent and self._next_waiter() is not None:
+            delay = max(self._blocked_until - now, (1 - self._tokens) / self.rate, 0.001)
+            self._wakeup_handle = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def acquire(self, priority: str = PRIORITY_INTERACTIVE):
+        """排队等待放行，超时抛出 asyncio.TimeoutError"""
+        lane = priority if priority in PRIORITY_LANES else PRIORITY_INTERACTIVE
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(future)
+        enqueued_at = time.monotonic()
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(future, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.stats[lane]["timeouts"] += 1
+            logger.warning(f"Spark限流排队超时: 通道={lane}, 队列深度={self.queue_depth}")
+            raise
+        except BaseException:
+            # 已被放行但调用方被取消，归还名额
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+        wait_time = time.monotonic() - enqueued_at
+        lane_stats = self.stats[lane]
+        lane_stats["admitted"] += 1
+        lane_stats["total_wait_time"] += wait_time
+        lane_stats["max_wait_time"] = max(lane_stats["max_wait_time"], wait_time)
+
+    def release(self):
+        """请求结束，释放并发名额"""
+        self._active = max(0, self._active - 1)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: str = PRIORITY_INTERACTIVE):
+        """在整个请求（含流式响应）期间占用一个名额"""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def backoff(self, seconds: float):
+        """上游限流时暂停放行，清空已积累的令牌"""
+        self.backoff_count += 1
+        self._tokens = 0.0
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        logger.warning(f"Spark限流退避 {seconds}s")
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for queue in self._waiters.values() for future in queue if not future.done())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取限流统计：队列深度、等待时间、放行数量"""
+        self._refill()
+        lanes = {}
+        for lane, lane_stats in self.stats.items():
+            lanes[lane] = {
+                **lane_stats,
+                "queue_depth": sum(1 for future in self._waiters[lane] if not future.done()),
+                "average_wait_time": lane_stats["total_wait_time"] / max(1, lane_stats["admitted"])
+            }
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "max_concurrent": self.max_concurrent,
+            "active": self._active,
+            "available_tokens": round(self._tokens, 2),
+            "queue_depth": self.queue_depth,
+            "backoff_count": self.backoff_count,
+            "lanes": lanes
+        }
+
+
+__all__ = [
+    "SparkRateLimiter", "PRIORITY_INTERACTIVE", "PRIORITY_BATCH", "PRIORITY_LANES"
+]
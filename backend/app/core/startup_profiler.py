@@ -0,0 +1,112 @@
+"""
+启动耗时分析
+在独立的子进程中以 `python -X importtime` 导入应用入口，统计每个模块的导入耗时，
+按累计耗时、自身耗时和顶层包汇总输出，用于定位拖慢启动的依赖
+
+用法：
+    python run_server.py --profile-startup
+    python -m app.core.startup_profiler --module app.main --top 20
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """解析 -X importtime 的输出，耗时单位为毫秒"""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].rstrip()
+        entries.append({
+            "module": name.strip(),
+            "self_ms": int(parts[0]) / 1000,
+            "cumulative_ms": int(parts[1]) / 1000,
+            "depth": (len(name) - len(name.lstrip())) // 2
+        })
+    return entries
+
+
+def profile_startup(module: str = "app.main", top: int = 25,
+                    env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """在子进程中导入 module 并汇总各模块导入耗时"""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True
+    )
+    wall_seconds = time.perf_counter() - start
+    entries = parse_importtime(completed.stderr)
+
+    packages = defaultdict(float)
+    for entry in entries:
+        packages[entry["module"].split(".")[0]] += entry["self_ms"]
+
+    target = next((entry for entry in entries if entry["module"] == module), None)
+    return {
+        "module": module,
+        "success": completed.returncode == 0,
+        "error": completed.stderr.strip().splitlines()[-1] if completed.returncode != 0 and completed.stderr else None,
+        "wall_seconds": round(wall_seconds, 3),
+        "import_ms": target["cumulative_ms"] if target else round(sum(e["self_ms"] for e in entries), 1),
+        "module_count": len(entries),
+        "by_cumulative": sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)[:top],
+        "by_self": sorted(entries, key=lambda e: e["self_ms"], reverse=True)[:top],
+        "by_package": [
+            {"package": name, "self_ms": round(ms, 1)}
+            for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+        ]
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """把分析结果格式化为文本表格"""
+    lines = [
+        f"启动分析: import {report['module']}",
+        f"进程总耗时 {report['wall_seconds']:.3f} 秒，导入耗时 {report['import_ms']:.1f} 毫秒，共 {report['module_count']} 个模块"
+    ]
+    if not report["success"]:
+        lines.append(f"导入失败: {report['error']}")
+
+    lines.append("\n按累计耗时（含子模块）:")
+    for entry in report["by_cumulative"]:
+        lines.append(f"  {entry['cumulative_ms']:>9.1f} ms  {'  ' * entry['depth']}{entry['module']}")
+    lines.append("\n按自身耗时:")
+    for entry in report["by_self"]:
+        lines.append(f"  {entry['self_ms']:>9.1f} ms  {entry['module']}")
+    lines.append("\n按顶层包汇总:")
+    for entry in report["by_package"]:
+        lines.append(f"  {entry['self_ms']:>9.1f} ms  {entry['package']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="统计应用启动时各模块的导入耗时")
+    parser.add_argument("--module", default="app.main", help="要分析的入口模块")
+    parser.add_argument("--top", type=int, default=25, help="每个列表显示的条目数")
+    parser.add_argument("--eager", action="store_true", help="关闭延迟导入（LAZY_IMPORTS=false）后分析")
+    parser.add_argument("--json", action="store_true", help="以JSON输出")
+    args = parser.parse_args(argv)
+
+    report = profile_startup(args.module, args.top, env={"LAZY_IMPORTS": "false"} if args.eager else None)
+    print(json.dumps(report, ensure_ascii=False, indent=2) if args.json else format_report(report))
+    return 0 if report["success"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
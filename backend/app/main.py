@@ -5,11 +5,12 @@
 
 import os
 import asyncio
+import importlib
 import logging
 import traceback
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Awaitable, Callable
+from datetime import datetime, timedelta
 import json
 import numpy as np
 import hmac
@@ -18,11 +19,12 @@ import base64
 import time
 import urllib.parse
 
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from dotenv import load_dotenv
 
 # 配置日志
@@ -46,43 +48,45 @@ if not os.getenv("SPARK_APPID"):
 
 # 导入数据库模型和服务
 try:
-    from .models import get_db, create_tables, InterviewSession, InterviewResponse, MultimodalAnalysis, EvaluationReport
+    from .models import get_db, get_async_db, dispose_engines, create_tables
     from .data.question_bank import get_questions_by_domain_position, get_all_domains, get_positions_by_domain
     from .services.iflytek_service import multimodal_service
     from .services.enhanced_multimodal_service import enhanced_multimodal_service
     from .services.learning_path_service import LearningPathService
-    from .services.evaluation_service import evaluation_service
-    from .services.enhanced_ai_capability_service import EnhancedAICapabilityService
 except ImportError as e:
     logger.warning(f"相对导入失败: {e}")
     # 如果相对导入失败，尝试绝对导入
     try:
-        from app.models import get_db, create_tables, InterviewSession, InterviewResponse, MultimodalAnalysis, EvaluationReport
+        from app.models import get_db, get_async_db, dispose_engines, create_tables
         from app.data.question_bank import get_questions_by_domain_position, get_all_domains, get_positions_by_domain
         from app.services.iflytek_service import multimodal_service
         from app.services.enhanced_multimodal_service import enhanced_multimodal_service
         from app.services.learning_path_service import LearningPathService
-        from app.services.evaluation_service import evaluation_service
-        from app.services.enhanced_ai_capability_service import EnhancedAICapabilityService
     except ImportError as e2:
         logger.error(f"绝对导入也失败: {e2}")
         # 最后尝试直接导入
         import sys
         import os
         sys.path.append(os.path.dirname(__file__))
-        from models import get_db, create_tables, InterviewSession, InterviewResponse, MultimodalAnalysis, EvaluationReport
+        from models import get_db, get_async_db, dispose_engines, create_tables
         from data.question_bank import get_questions_by_domain_position, get_all_domains, get_positions_by_domain
         from services.iflytek_service import multimodal_service
         from services.enhanced_multimodal_service import enhanced_multimodal_service
         from services.learning_path_service import LearningPathService
-        from services.evaluation_service import evaluation_service
-        from services.enhanced_ai_capability_service import EnhancedAICapabilityService
-from .services.enhanced_question_service import enhanced_question_service
-from .services.advanced_interviewer_service import advanced_interviewer_service
-from .services.report_generation_service import enhanced_report_service
 from .services.enhanced_iflytek_service import get_enhanced_iflytek_service
 from .services.system_monitor_service import get_system_monitor
 from .services.localization_service import get_localization_service
+from .services.prompt_cache_service import get_prompt_cache_service
+from .services.opening_question_pool_service import get_opening_question_pool
+from .services.live_audio_service import LiveAudioSession
+from .services.scoring_tasks import get_scoring_executor
+from .services.batch_rescoring_service import RescoreJobRunningError, get_batch_rescoring_service
+from .services.segmentation_service import get_segmentation_service
+from .services.analysis_storage_service import get_analysis_storage_service
+from .services.interview_session_store import get_interview_session_store
+from .core.rate_limiter import PRIORITY_BATCH
+from .models import repositories
+from .core.lazy_import import LazyProxy, lazy_attribute, load_all, get_lazy_stats
 from .middleware.performance_middleware import (
     PerformanceMiddleware, CompressionMiddleware,
     CacheMiddleware, SecurityMiddleware
@@ -95,6 +99,22 @@ from .core.config import Settings, IFlytekConfig
 settings = Settings()
 iflytek_config = IFlytekConfig(settings)
 
+# 只在个别接口中用到的服务（报告绘图、问题生成、能力评估等）延迟到第一次请求时再导入，
+# 缩短进程启动时间；LAZY_IMPORTS=false 时在启动阶段全部加载
+evaluation_service = lazy_attribute(".services.evaluation_service", "evaluation_service", __package__)
+enhanced_question_service = lazy_attribute(".services.enhanced_question_service", "enhanced_question_service", __package__)
+advanced_interviewer_service = lazy_attribute(".services.advanced_interviewer_service", "advanced_interviewer_service", __package__)
+enhanced_report_service = lazy_attribute(".services.report_generation_service", "enhanced_report_service", __package__)
+interview_question_service = lazy_attribute(".services.interview_service", "interview_question_service", __package__)
+question_search_index = lazy_attribute(".services.interview_service", "question_search_index", __package__)
+enhanced_case_library_service = lazy_attribute(".services.enhanced_case_library_service", "enhanced_case_library_service", __package__)
+enhanced_ai_capability_service = LazyProxy(
+    "enhanced_ai_capability_service",
+    lambda: importlib.import_module(".services.enhanced_ai_capability_service", __package__).EnhancedAICapabilityService()
+)
+if not settings.lazy_imports:
+    load_all()
+
 # 初始化增强的iFlytek服务
 enhanced_iflytek_service = get_enhanced_iflytek_service(settings)
 
@@ -104,6 +124,27 @@ system_monitor = get_system_monitor()
 # 初始化本地化服务
 localization_service = get_localization_service()
 
+# 初始化提示词归一化缓存
+prompt_cache_service = get_prompt_cache_service()
+
+# 初始化开场问题预生成池
+opening_question_pool = get_opening_question_pool()
+
+# 初始化能力评分进程池执行器
+scoring_executor = get_scoring_executor()
+
+# 初始化批量重新评分服务
+batch_rescoring_service = get_batch_rescoring_service()
+
+# 初始化共享分词服务
+segmentation_service = get_segmentation_service()
+
+# 初始化分析结果存储服务
+analysis_storage_service = get_analysis_storage_service()
+
+# 初始化面试会话存储
+interview_session_store = get_interview_session_store()
+
 # 创建FastAPI应用
 app = FastAPI(
     title="多模态智能面试评测系统",
@@ -231,25 +272,43 @@ async def get_spark_response(messages):
         logger.error(f"Spark API调用失败: {e}")
         return "AI服务暂时不可用，请稍后重试。"
 
-# 删除了旧的API调用函数，现在使用增强的iFlytek服务
+async def get_spark_response_stream(messages):
+    """
+    流式调用iFlytek Spark大模型API
+    逐片段产出文本；流式响应中断时抛出异常，由调用方输出 error 事件，
+    不把提示语拼接到已输出的部分回答后面当作正常内容
+    """
+    async for chunk in enhanced_iflytek_service.chat_with_spark_stream(messages):
+        yield chunk
 
 # 删除了旧的API调用函数，现在使用增强的iFlytek服务
 
-# 初始化服务
-enhanced_ai_capability_service = EnhancedAICapabilityService()
+# 删除了旧的API调用函数，现在使用增强的iFlytek服务
 
 # 初始化数据库和服务
 @app.on_event("startup")
 async def startup_event():
     """应用启动时的初始化"""
     try:
+        # 分词词典在后台线程加载，不阻塞启动
+        if settings.segmentation_preload:
+            segmentation_service.start_background_load()
+
         create_tables()
         logger.info("数据库初始化完成")
 
+        # 题库检索索引在后台线程建立，冷启动的worker首次检索无需全量建索引
+        if settings.search_index_preload:
+            question_search_index.start_background_warm_up()
+
         # 初始化增强的iFlytek服务
         await enhanced_iflytek_service.initialize()
         logger.info("iFlytek服务初始化完成")
 
+        # 启动开场问题池的后台补齐
+        if settings.opening_pool_enabled:
+            opening_question_pool.start()
+
         # 启动系统监控
         await system_monitor.start_monitoring(interval_seconds=30)
         logger.info("系统监控已启动")
@@ -267,6 +326,10 @@ async def startup_event():
 async def shutdown_event():
     """应用关闭时的清理"""
     try:
+        await opening_question_pool.stop()
+        interview_session_store.close()
+        scoring_executor.shutdown()
+        await dispose_engines()
         await enhanced_iflytek_service.cleanup()
         await system_monitor.stop_monitoring()
         logger.info("系统清理完成")
@@ -284,6 +347,14 @@ async def health_check():
     """健康检查"""
     return system_monitor.get_system_health()
 
+@app.get("/ready")
+async def readiness_check():
+    """就绪检查：分词词典加载完成前返回503"""
+    segmentation_stats = segmentation_service.get_stats()
+    if not segmentation_stats["ready"]:
+        return JSONResponse(status_code=503, content={"ready": False, "segmentation": segmentation_stats})
+    return {"ready": True, "segmentation": segmentation_stats}
+
 @app.get("/api/v1/system/status")
 async def get_system_status():
     """获取系统状态"""
@@ -299,7 +370,11 @@ async def get_system_metrics():
     return {
         "api_statistics": system_monitor.get_api_statistics(hours=24),
         "error_summary": system_monitor.get_error_summary(hours=24),
-        "health": system_monitor.get_system_health()
+        "health": system_monitor.get_system_health(),
+        "scoring_executor": scoring_executor.get_stats(),
+        "segmentation": segmentation_service.get_stats(),
+        "session_store": interview_session_store.get_stats(),
+        "lazy_imports": get_lazy_stats()
     }
 
 @app.get("/api/v1/iflytek/health")
@@ -334,6 +409,8 @@ async def get_iflytek_stats():
     """获取iFlytek服务统计信息"""
     try:
         stats = enhanced_iflytek_service.get_stats()
+        stats["prompt_cache"] = prompt_cache_service.get_stats()
+        stats["opening_question_pool"] = opening_question_pool.get_stats()
         return {
             "status": "success",
             "data": stats,
@@ -360,9 +437,10 @@ class InterviewStartRequest(BaseModel):
     candidate_name: Optional[str] = "候选人"
 
 class InterviewNextRequest(BaseModel):
-    messages: List[Dict[str, str]]
+    messages: List[Dict[str, str]] = []  # 不带会话ID时为完整对话历史；带会话ID时只需本轮的新消息
     domain: Optional[str] = None
     position: Optional[str] = None
+    session_id: Optional[str] = None  # 开始面试接口返回的服务端会话ID
 
 class DomainPositionRequest(BaseModel):
     domain: str
@@ -446,6 +524,31 @@ async def get_questions(request: DomainPositionRequest):
         logger.error(f"获取面试题目失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取面试题目失败: {str(e)}")
 
+@app.get("/api/v1/questions/search")
+async def search_questions(q: str, domain: Optional[str] = None, position: Optional[str] = None,
+                           page: int = 1, page_size: int = 20, db: Session = Depends(get_db)):
+    """全文检索题库（题目、关键词、期望要点），按相关度分页返回"""
+    try:
+        result = await asyncio.to_thread(
+            interview_question_service.search_questions_page, q, domain, position, db, page, min(page_size, 100)
+        )
+        return {"success": True, "data": result, "message": "搜索题目成功"}
+    except Exception as e:
+        logger.error(f"搜索题目失败: {e}")
+        raise HTTPException(status_code=500, detail=f"搜索题目失败: {str(e)}")
+
+@app.get("/api/v1/cases/search")
+async def search_cases(q: str, domain: Optional[str] = None, page: int = 1, page_size: int = 20):
+    """全文检索案例库（标题、标签、问题、要点、参考答案），按相关度分页返回"""
+    try:
+        result = await asyncio.to_thread(
+            enhanced_case_library_service.search_cases_page, q, domain, page, min(page_size, 100)
+        )
+        return {"success": True, "data": result, "message": "搜索案例成功"}
+    except Exception as e:
+        logger.error(f"搜索案例失败: {e}")
+        raise HTTPException(status_code=500, detail=f"搜索案例失败: {str(e)}")
+
 # ==================== 面试会话管理API ====================
 
 class InterviewSessionRequest(BaseModel):
@@ -456,15 +559,14 @@ class InterviewSessionRequest(BaseModel):
     analysis_types: List[str] = ["text"]  # text, audio, video
 
 @app.post("/api/v1/interview/session")
-async def create_interview_session(request: InterviewSessionRequest, db: Session = Depends(get_db)):
+async def create_interview_session(request: InterviewSessionRequest, db: AsyncSession = Depends(get_async_db)):
     """创建面试会话"""
     try:
         # 创建新的面试会话
-        session = InterviewSession(
+        session = await repositories.create_session(
+            db,
             domain=request.domain,
             position=request.position,
-            status="active",
-            start_time=datetime.now(),
             session_data={
                 "candidate_name": request.candidate_name,
                 "mode": request.mode,
@@ -474,10 +576,6 @@ async def create_interview_session(request: InterviewSessionRequest, db: Session
             }
         )
 
-        db.add(session)
-        db.commit()
-        db.refresh(session)
-
         logger.info(f"创建面试会话成功: {session.id}")
 
         return {
@@ -499,10 +597,10 @@ async def create_interview_session(request: InterviewSessionRequest, db: Session
         raise HTTPException(status_code=500, detail=f"创建面试会话失败: {str(e)}")
 
 @app.get("/api/v1/interview/session/{session_id}")
-async def get_interview_session(session_id: int, db: Session = Depends(get_db)):
+async def get_interview_session(session_id: int, db: AsyncSession = Depends(get_async_db)):
     """获取面试会话信息"""
     try:
-        session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+        session = await repositories.get_session(db, session_id)
         if not session:
             raise HTTPException(status_code=404, detail="面试会话不存在")
 
@@ -530,9 +628,166 @@ async def get_interview_session(session_id: int, db: Session = Depends(get_db)):
 # 面试相关API
 DELIMITER = "|||DELIMITER|||"
 
-@app.post("/api/v1/interview/start")
-async def start_interview(request: InterviewStartRequest):
-    """开始面试"""
+class DelimiterStreamSplitter:
+    """
+    流式思考/问题拆分器
+    在文本片段到达时按DELIMITER实时切分，分隔符跨片段时暂存尾部避免误输出
+    """
+
+    def __init__(self, delimiter: str = DELIMITER):
+        self.delimiter = delimiter
+        self.section = "thinking"
+        self.pending = ""
+        self.text = ""
+
+    def feed(self, chunk: str) -> List[tuple]:
+        """输入一个文本片段，返回可以立即输出的 (section, delta) 列表"""
+        self.text += chunk
+        if self.section == "question":
+            return [("question", chunk)] if chunk else []
+
+        self.pending += chunk
+        if self.delimiter in self.pending:
+            before, after = self.pending.split(self.delimiter, 1)
+            self.pending = ""
+            self.section = "question"
+            return [(name, delta) for name, delta in (("thinking", before), ("question", after)) if delta]
+
+        # 保留可能是分隔符前缀的尾部
+        keep = len(self.delimiter) - 1
+        ready, self.pending = self.pending[:-keep], self.pending[-keep:]
+        return [("thinking", ready)] if ready else []
+
+    def flush(self) -> List[tuple]:
+        """流结束时输出剩余内容"""
+        pending, self.pending = self.pending, ""
+        return [(self.section, pending)] if pending else []
+
+
+def _split_thinking_question(response_text: str, fallback_thinking: str, fallback_question: Optional[str] = None) -> Dict[str, str]:
+    """按DELIMITER拆分完整响应，没有分隔符时使用备用思考内容"""
+    thinking = ""
+    question = response_text if fallback_question is None else fallback_question
+
+    if DELIMITER in response_text:
+        parts = response_text.split(DELIMITER, 1)
+        if len(parts) == 2:
+            thinking = parts[0].strip()
+            question = parts[1].strip()
+    else:
+        thinking = fallback_thinking
+
+    return {"thinking": thinking, "question": question}
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """格式化一条SSE事件"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_interview_reply(messages: List[Dict[str, str]], fallback_thinking: str,
+                                  extra: Optional[Dict[str, Any]] = None,
+                                  on_complete: Optional[Callable[[str], Awaitable[Any]]] = None):
+    """
+    以SSE形式转发Spark的流式响应
+    thinking/question事件携带增量文本，done事件携带与非流式接口一致的完整结果
+    on_complete 在流正常结束后接收完整文本（用于写入回答池、记录会话）；
+    流式响应中断时只输出 error 事件，不调用 on_complete，也不输出 done
+    """
+    splitter = DelimiterStreamSplitter()
+    try:
+        async for chunk in get_spark_response_stream(messages):
+            for section, delta in splitter.feed(chunk):
+                yield _sse_event(section, {"delta": delta})
+        for section, delta in splitter.flush():
+            yield _sse_event(section, {"delta": delta})
+
+        if on_complete is not None:
+            await on_complete(splitter.text)
+        result = _split_thinking_question(splitter.text, fallback_thinking)
+        yield _sse_event("done", {**result, **(extra or {})})
+    except Exception as e:
+        logger.error(f"流式面试响应失败: {e}")
+        yield _sse_event("error", {"message": f"流式面试响应失败: {str(e)}"})
+
+
+async def _cached_interview_reply(response_text: str, fallback_thinking: str,
+                                  extra: Optional[Dict[str, Any]] = None):
+    """以与流式接口相同的SSE事件输出回答池中的完整回复"""
+    result = _split_thinking_question(response_text, fallback_thinking)
+    async for event in _result_events({**result, **(extra or {})}):
+        yield event
+
+
+async def _result_events(result: Dict[str, Any]):
+    """将已完成的结果一次性输出为thinking/question/done事件"""
+    for section in ("thinking", "question"):
+        if result.get(section):
+            yield _sse_event(section, {"delta": result[section]})
+    yield _sse_event("done", {**result, "cached": True})
+
+
+def _is_complete_reply(response_text: str) -> bool:
+    """只有包含分隔符的完整回复才进入回答池，服务不可用的提示语不缓存"""
+    return DELIMITER in response_text
+
+
+def _sse_response(events) -> StreamingResponse:
+    """构建SSE流式响应"""
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _open_conversation(request: InterviewStartRequest, question: Optional[str] = None) -> str:
+    """
+    在服务端创建面试会话并记录开场问题，返回会话ID
+    会话存储的SQLite读写（多worker写入冲突时可能等待锁）都在线程中执行，不阻塞事件循环
+    """
+    messages = [{"role": "assistant", "content": question}] if question else []
+    state = await asyncio.to_thread(
+        interview_session_store.create,
+        request.domain, request.position, candidate_name=request.candidate_name, messages=messages
+    )
+    return state["session_id"]
+
+
+async def _record_reply(session_id: Optional[str], question: str, turn: List[Dict[str, str]] = ()):
+    """
+    把本轮客户端提交的消息和面试官的问题一起追加到服务端会话
+    只在生成成功后调用，失败重试时不会重复记录用户回答
+    """
+    if session_id and question:
+        await asyncio.to_thread(
+            interview_session_store.append_messages, session_id, [*turn, {"role": "assistant", "content": question}]
+        )
+
+
+async def _resume_conversation(request: InterviewNextRequest) -> InterviewNextRequest:
+    """
+    带会话ID的请求：用服务端会话最近的对话窗口加上本轮新消息构建提示词
+    本轮消息此时不写入会话，生成成功后由 _record_reply 与问题一起记录
+    不带会话ID时按客户端提交的完整历史处理（兼容旧客户端）
+    """
+    if not request.session_id:
+        return request
+    state = await asyncio.to_thread(interview_session_store.get, request.session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="面试会话不存在或已过期")
+    turn = [message for message in request.messages if message.get("role") in ("user", "assistant")]
+    window = interview_session_store.recent_messages(state) + turn
+    return InterviewNextRequest(
+        session_id=request.session_id,
+        messages=window[-settings.session_prompt_window:] if settings.session_prompt_window else window,
+        domain=request.domain or state.get("domain"),
+        position=request.position or state.get("position")
+    )
+
+
+def _build_start_messages(request: InterviewStartRequest) -> List[Dict[str, str]]:
+    """构建开始面试的Spark消息"""
     prompt = f"""
 你是一位资深的{request.domain}领域技术面试官，拥有10年以上的行业经验，正在为{request.position}职位进行专业面试。
 
@@ -562,47 +817,78 @@ async def start_interview(request: InterviewStartRequest):
 {DELIMITER}
 [具体的面试问题]
 """
-    messages = [{"role": "user", "content": prompt}]
+    return [{"role": "user", "content": prompt}]
+
+def _start_prompt_slots(request: InterviewStartRequest) -> Dict[str, str]:
+    """开场提示词的槽位，提示词中不包含候选人姓名，因此不参与缓存键"""
+    return {"domain": request.domain, "position": request.position}
+
+@app.post("/api/v1/interview/start")
+async def start_interview(request: InterviewStartRequest):
+    """开始面试"""
+    pooled = opening_question_pool.take("start", request.domain, request.position)
+    if pooled is not None:
+        return {**pooled, "session_id": await _open_conversation(request, pooled["question"])}
+
+    messages = _build_start_messages(request)
     try:
-        response_text = await get_spark_response(messages)
-        
-        thinking = ""
-        question = response_text
-
-        if DELIMITER in response_text:
-            parts = response_text.split(DELIMITER, 1)
-            if len(parts) == 2:
-                thinking = parts[0].strip()
-                question = parts[1].strip()
-        else:
-            # 如果没有分隔符，将整个响应作为问题
-            thinking = "AI 分析思路"
-            question = response_text
+        response_text = await prompt_cache_service.get_or_generate(
+            "interview_start", _start_prompt_slots(request), messages,
+            get_spark_response, validate=_is_complete_reply
+        )
 
-        return {"thinking": thinking, "question": question}
+        # 如果没有分隔符，将整个响应作为问题
+        result = _split_thinking_question(response_text, "AI 分析思路")
+        return {**result, "session_id": await _open_conversation(request, result["question"])}
     except Exception as e:
         logger.error(f"开始面试失败: {e}")
         raise HTTPException(status_code=500, detail=f"开始面试失败: {str(e)}")
 
-@app.post("/api/v1/interview/next")
-async def next_question(request: InterviewNextRequest):
-    """获取下一个问题"""
-    try:
-        # 分析候选人的最后一次回答
-        last_user_message = None
-        for msg in reversed(request.messages):
-            if msg.get("role") == "user":
-                last_user_message = msg.get("content", "")
-                break
-
-        # 检测是否需要引导
-        needs_guidance = any(phrase in (last_user_message or "").lower() for phrase in [
-            "不知道", "不清楚", "没有经验", "不了解", "不会", "没做过", "不太懂"
-        ])
-
-        system_prompt = {
-            "role": "system",
-            "content": f"""
+@app.post("/api/v1/interview/start/stream")
+async def start_interview_stream(request: InterviewStartRequest):
+    """开始面试 - SSE流式版本"""
+    pooled = opening_question_pool.take("start", request.domain, request.position)
+    if pooled is not None:
+        session_id = await _open_conversation(request, pooled["question"])
+        return _sse_response(_result_events({**pooled, "session_id": session_id}))
+
+    messages = _build_start_messages(request)
+    slots = _start_prompt_slots(request)
+    cached = prompt_cache_service.lookup("interview_start", slots, messages)
+    if cached is not None:
+        question = _split_thinking_question(cached, "AI 分析思路")["question"]
+        return _sse_response(_cached_interview_reply(
+            cached, "AI 分析思路", extra={"session_id": await _open_conversation(request, question)}
+        ))
+
+    session_id = await _open_conversation(request)
+
+    async def remember(response_text: str):
+        prompt_cache_service.remember("interview_start", slots, response_text, messages,
+                                      validate=_is_complete_reply)
+        await _record_reply(session_id, _split_thinking_question(response_text, "AI 分析思路")["question"])
+
+    return _sse_response(_stream_interview_reply(
+        messages, "AI 分析思路", extra={"session_id": session_id}, on_complete=remember
+    ))
+
+def _build_next_messages(request: InterviewNextRequest) -> List[Dict[str, str]]:
+    """构建下一个问题的Spark消息"""
+    # 分析候选人的最后一次回答
+    last_user_message = None
+    for msg in reversed(request.messages):
+        if msg.get("role") == "user":
+            last_user_message = msg.get("content", "")
+            break
+
+    # 检测是否需要引导
+    needs_guidance = any(phrase in (last_user_message or "").lower() for phrase in [
+        "不知道", "不清楚", "没有经验", "不了解", "不会", "没做过", "不太懂"
+    ])
+
+    system_prompt = {
+        "role": "system",
+        "content": f"""
 你是一位资深的技术面试官，正在进行深度面试对话。
 
 【当前情况分析】
@@ -631,46 +917,59 @@ async def next_question(request: InterviewNextRequest):
 {DELIMITER}
 [你的回应或下一个问题]
 """
-        }
-        
-        history = [system_prompt]
-        for msg in request.messages:
-            if msg.get("role") in ["user", "assistant"]:
-                history.append({"role": msg["role"], "content": msg["content"]})
+    }
+
+    history = [system_prompt]
+    for msg in request.messages:
+        if msg.get("role") in ["user", "assistant"]:
+            history.append({"role": msg["role"], "content": msg["content"]})
 
+    return history
+
+@app.post("/api/v1/interview/next")
+async def next_question(request: InterviewNextRequest):
+    """获取下一个问题"""
+    conversation = await _resume_conversation(request)
+    try:
+        history = _build_next_messages(conversation)
         response_text = await get_spark_response(history)
-        
-        thinking = ""
-        question = response_text
-
-        if DELIMITER in response_text:
-            parts = response_text.split(DELIMITER, 1)
-            if len(parts) == 2:
-                thinking = parts[0].strip()
-                question = parts[1].strip()
-        else:
-            # 如果没有分隔符，将整个响应作为问题
-            thinking = "AI 分析思路"
-            question = response_text
 
-        return {"thinking": thinking, "question": question}
+        # 如果没有分隔符，将整个响应作为问题
+        result = _split_thinking_question(response_text, "AI 分析思路")
+        if conversation.session_id:
+            await _record_reply(conversation.session_id, result["question"], request.messages)
+            result["session_id"] = conversation.session_id
+        return result
     except Exception as e:
         logger.error(f"获取下一个问题失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取下一个问题失败: {str(e)}")
 
+@app.post("/api/v1/interview/next/stream")
+async def next_question_stream(request: InterviewNextRequest):
+    """获取下一个问题 - SSE流式版本"""
+    conversation = await _resume_conversation(request)
+    history = _build_next_messages(conversation)
+    if not conversation.session_id:
+        return _sse_response(_stream_interview_reply(history, "AI 分析思路"))
+
+    async def record(response_text: str):
+        await _record_reply(conversation.session_id, _split_thinking_question(response_text, "AI 分析思路")["question"],
+                      request.messages)
+
+    return _sse_response(_stream_interview_reply(
+        history, "AI 分析思路", extra={"session_id": conversation.session_id}, on_complete=record
+    ))
+
 # ==================== 增强的智能面试API ====================
 
-@app.post("/api/v1/interview/enhanced-start")
-async def enhanced_start_interview(request: InterviewStartRequest):
-    """增强版开始面试 - 使用专业问题库和智能分析"""
-    try:
-        # 生成专业技术问题
-        question_data = enhanced_question_service.generate_professional_question(
-            request.domain, request.position, difficulty="medium"
-        )
+def _build_enhanced_start(request: InterviewStartRequest) -> tuple:
+    """生成专业技术问题并构建增强版开场的Spark消息，返回 (question_data, messages, slots)"""
+    question_data = enhanced_question_service.generate_professional_question(
+        request.domain, request.position, difficulty="medium"
+    )
 
-        # 构建增强的prompt
-        enhanced_prompt = f"""
+    # 构建增强的prompt
+    enhanced_prompt = f"""
 你是一位资深的{request.domain}领域技术专家和面试官，拥有15年以上的行业经验。
 
 【面试背景】
@@ -701,58 +1000,103 @@ async def enhanced_start_interview(request: InterviewStartRequest):
 {question_data['question']}
 """
 
-        messages = [{"role": "user", "content": enhanced_prompt}]
-        response_text = await get_spark_response(messages)
+    messages = [{"role": "user", "content": enhanced_prompt}]
+    slots = {
+        "domain": request.domain,
+        "position": request.position,
+        "question": question_data['question'],
+        "category": question_data['category'],
+        "difficulty": question_data['difficulty']
+    }
+    return question_data, messages, slots
+
+def _enhanced_start_result(request: InterviewStartRequest, question_data: Dict[str, Any],
+                           response_text: str) -> Dict[str, Any]:
+    """由Spark回复组装增强版开场结果"""
+    thinking = ""
+    question = question_data['question']  # 使用专业问题作为备用
+
+    if DELIMITER in response_text:
+        parts = response_text.split(DELIMITER, 1)
+        if len(parts) == 2:
+            thinking = parts[0].strip()
+            question = parts[1].strip()
+    else:
+        thinking = f"基于{request.domain}领域{request.position}岗位的专业要求，我为您准备了一个{question_data['category']}类型的问题。这个问题旨在评估您的{', '.join(question_data['evaluation_criteria'][:2])}。"
 
-        thinking = ""
-        question = question_data['question']  # 使用专业问题作为备用
+    return {
+        "thinking": thinking,
+        "question": question,
+        "question_metadata": {
+            "category": question_data['category'],
+            "difficulty": question_data['difficulty'],
+            "evaluation_criteria": question_data['evaluation_criteria'],
+            "expected_keywords": question_data['expected_keywords'],
+            "follow_up_questions": question_data['follow_up_questions']
+        }
+    }
 
-        if DELIMITER in response_text:
-            parts = response_text.split(DELIMITER, 1)
-            if len(parts) == 2:
-                thinking = parts[0].strip()
-                question = parts[1].strip()
-        else:
-            thinking = f"基于{request.domain}领域{request.position}岗位的专业要求，我为您准备了一个{question_data['category']}类型的问题。这个问题旨在评估您的{', '.join(question_data['evaluation_criteria'][:2])}。"
+@app.post("/api/v1/interview/enhanced-start")
+async def enhanced_start_interview(request: InterviewStartRequest):
+    """增强版开始面试 - 使用专业问题库和智能分析"""
+    pooled = opening_question_pool.take("enhanced_start", request.domain, request.position)
+    if pooled is not None:
+        return {**pooled, "session_id": await _open_conversation(request, pooled["question"])}
 
-        return {
-            "thinking": thinking,
-            "question": question,
-            "question_metadata": {
-                "category": question_data['category'],
-                "difficulty": question_data['difficulty'],
-                "evaluation_criteria": question_data['evaluation_criteria'],
-                "expected_keywords": question_data['expected_keywords'],
-                "follow_up_questions": question_data['follow_up_questions']
-            }
-        }
+    try:
+        question_data, messages, slots = _build_enhanced_start(request)
+        response_text = await prompt_cache_service.get_or_generate(
+            "enhanced_start", slots, messages, get_spark_response, validate=_is_complete_reply
+        )
+        result = _enhanced_start_result(request, question_data, response_text)
+        return {**result, "session_id": await _open_conversation(request, result["question"])}
     except Exception as e:
         logger.error(f"增强版开始面试失败: {e}")
         raise HTTPException(status_code=500, detail=f"增强版开始面试失败: {str(e)}")
 
-@app.post("/api/v1/interview/enhanced-next")
-async def enhanced_next_question(request: InterviewNextRequest):
-    """增强版下一个问题 - 智能引导和专业追问"""
-    try:
-        # 分析候选人的最后一次回答
-        last_user_message = None
-        for msg in reversed(request.messages):
-            if msg.get("role") == "user":
-                last_user_message = msg.get("content", "")
-                break
-
-        # 检测是否需要引导
-        needs_guidance = any(phrase in (last_user_message or "").lower() for phrase in [
-            "不知道", "不清楚", "没有经验", "不了解", "不会", "没做过", "不太懂", "不确定"
-        ])
-
-        if needs_guidance:
-            # 生成引导性回应
-            guidance_data = enhanced_question_service.generate_guidance_response(
-                last_user_message or "", request.domain, request.position
-            )
+async def _generate_pooled_start(domain: str, position: str) -> Optional[Dict[str, Any]]:
+    """后台预生成普通开场问题，回复不完整时返回None"""
+    messages = _build_start_messages(InterviewStartRequest(domain=domain, position=position))
+    response = await enhanced_iflytek_service.chat_with_spark(messages, use_cache=False, priority=PRIORITY_BATCH)
+    response_text = response.get("content", "")
+    if not _is_complete_reply(response_text):
+        return None
+    return _split_thinking_question(response_text, "AI 分析思路")
+
+async def _generate_pooled_enhanced_start(domain: str, position: str) -> Optional[Dict[str, Any]]:
+    """后台预生成增强版开场问题，回复不完整时返回None"""
+    request = InterviewStartRequest(domain=domain, position=position)
+    question_data, messages, _ = _build_enhanced_start(request)
+    response = await enhanced_iflytek_service.chat_with_spark(messages, use_cache=False, priority=PRIORITY_BATCH)
+    response_text = response.get("content", "")
+    if not _is_complete_reply(response_text):
+        return None
+    return _enhanced_start_result(request, question_data, response_text)
+
+opening_question_pool.register("start", _generate_pooled_start)
+opening_question_pool.register("enhanced_start", _generate_pooled_enhanced_start)
+
+def _build_enhanced_next_messages(request: InterviewNextRequest) -> tuple:
+    """构建增强版下一个问题的Spark消息，返回 (messages, needs_guidance)"""
+    # 分析候选人的最后一次回答
+    last_user_message = None
+    for msg in reversed(request.messages):
+        if msg.get("role") == "user":
+            last_user_message = msg.get("content", "")
+            break
+
+    # 检测是否需要引导
+    needs_guidance = any(phrase in (last_user_message or "").lower() for phrase in [
+        "不知道", "不清楚", "没有经验", "不了解", "不会", "没做过", "不太懂", "不确定"
+    ])
+
+    if needs_guidance:
+        # 生成引导性回应
+        guidance_data = enhanced_question_service.generate_guidance_response(
+            last_user_message or "", request.domain, request.position
+        )
 
-            enhanced_prompt = f"""
+        enhanced_prompt = f"""
 你是一位经验丰富的{request.domain}领域技术面试官，擅长引导和启发候选人。
 
 【当前情况】
@@ -781,9 +1125,9 @@ async def enhanced_next_question(request: InterviewNextRequest):
 {DELIMITER}
 [引导性回应或简化问题]
 """
-        else:
-            # 生成深度追问
-            enhanced_prompt = f"""
+    else:
+        # 生成深度追问
+        enhanced_prompt = f"""
 你是一位资深的{request.domain}领域技术面试官，正在进行深度技术面试。
 
 【对话历史分析】
@@ -810,26 +1154,29 @@ async def enhanced_next_question(request: InterviewNextRequest):
 [深度追问问题]
 """
 
-        messages = [{"role": "user", "content": enhanced_prompt}]
-        response_text = await get_spark_response(messages)
+    return [{"role": "user", "content": enhanced_prompt}], needs_guidance
 
-        thinking = ""
-        question = response_text
+def _enhanced_next_fallback_thinking(needs_guidance: bool) -> str:
+    """增强版追问在响应缺少分隔符时的思考内容"""
+    if needs_guidance:
+        return "我注意到您在这个问题上可能需要一些引导。让我换个角度来帮助您思考这个问题。"
+    return "基于您的回答，我想进一步了解您的技术深度和实践经验。"
 
-        if DELIMITER in response_text:
-            parts = response_text.split(DELIMITER, 1)
-            if len(parts) == 2:
-                thinking = parts[0].strip()
-                question = parts[1].strip()
-        else:
-            if needs_guidance:
-                thinking = "我注意到您在这个问题上可能需要一些引导。让我换个角度来帮助您思考这个问题。"
-            else:
-                thinking = "基于您的回答，我想进一步了解您的技术深度和实践经验。"
+@app.post("/api/v1/interview/enhanced-next")
+async def enhanced_next_question(request: InterviewNextRequest):
+    """增强版下一个问题 - 智能引导和专业追问"""
+    conversation = await _resume_conversation(request)
+    try:
+        messages, needs_guidance = _build_enhanced_next_messages(conversation)
+        response_text = await get_spark_response(messages)
+
+        result = _split_thinking_question(response_text, _enhanced_next_fallback_thinking(needs_guidance))
+        if conversation.session_id:
+            await _record_reply(conversation.session_id, result["question"], request.messages)
+            result["session_id"] = conversation.session_id
 
         return {
-            "thinking": thinking,
-            "question": question,
+            **result,
             "guidance_provided": needs_guidance,
             "response_type": "guidance" if needs_guidance else "follow_up"
         }
@@ -837,6 +1184,28 @@ async def enhanced_next_question(request: InterviewNextRequest):
         logger.error(f"增强版获取下一个问题失败: {e}")
         raise HTTPException(status_code=500, detail=f"增强版获取下一个问题失败: {str(e)}")
 
+@app.post("/api/v1/interview/enhanced-next/stream")
+async def enhanced_next_question_stream(request: InterviewNextRequest):
+    """增强版下一个问题 - SSE流式版本"""
+    conversation = await _resume_conversation(request)
+    messages, needs_guidance = _build_enhanced_next_messages(conversation)
+    fallback_thinking = _enhanced_next_fallback_thinking(needs_guidance)
+    extra = {
+        "guidance_provided": needs_guidance,
+        "response_type": "guidance" if needs_guidance else "follow_up"
+    }
+    on_complete = None
+    if conversation.session_id:
+        extra["session_id"] = conversation.session_id
+
+        async def record(response_text: str):
+            await _record_reply(conversation.session_id, _split_thinking_question(response_text, fallback_thinking)["question"],
+                          request.messages)
+
+        on_complete = record
+
+    return _sse_response(_stream_interview_reply(messages, fallback_thinking, extra=extra, on_complete=on_complete))
+
 # ==================== 高级AI面试官API ====================
 
 @app.post("/api/v1/interview/advanced-start")
@@ -872,51 +1241,49 @@ async def advanced_start_interview(request: InterviewStartRequest):
         logger.error(f"高级面试开始失败: {e}")
         raise HTTPException(status_code=500, detail=f"高级面试开始失败: {str(e)}")
 
-@app.post("/api/v1/interview/advanced-next")
-async def advanced_next_question(request: InterviewNextRequest):
-    """高级AI面试官 - 智能分析和针对性引导"""
-    try:
-        # 获取最后的AI问题和用户回答
-        last_ai_question = None
-        last_user_message = None
-
-        for msg in reversed(request.messages):
-            if msg.get("role") == "user" and not last_user_message:
-                last_user_message = msg.get("content", "")
-            elif msg.get("role") == "assistant" and not last_ai_question:
-                last_ai_question = msg.get("content", "")
-
-            if last_user_message and last_ai_question:
-                break
-
-        # 分析候选人回答
-        response_analysis = advanced_interviewer_service.analyze_candidate_response(
-            last_user_message or "",
-            last_ai_question or "",
-            request.domain or "人工智能",
-            request.position or "技术岗"
-        )
+def _build_advanced_next_result(request: InterviewNextRequest) -> Dict[str, Any]:
+    """生成高级AI面试官的分析思路和引导内容"""
+    # 获取最后的AI问题和用户回答
+    last_ai_question = None
+    last_user_message = None
+
+    for msg in reversed(request.messages):
+        if msg.get("role") == "user" and not last_user_message:
+            last_user_message = msg.get("content", "")
+        elif msg.get("role") == "assistant" and not last_ai_question:
+            last_ai_question = msg.get("content", "")
+
+        if last_user_message and last_ai_question:
+            break
+
+    # 分析候选人回答
+    response_analysis = advanced_interviewer_service.analyze_candidate_response(
+        last_user_message or "",
+        last_ai_question or "",
+        request.domain or "人工智能",
+        request.position or "技术岗"
+    )
 
-        # 验证分类准确性，防止误判
-        validation_result = advanced_interviewer_service.validate_response_classification(
-            last_user_message or "", response_analysis['response_type'],
-            request.domain or "人工智能"
-        )
+    # 验证分类准确性，防止误判
+    validation_result = advanced_interviewer_service.validate_response_classification(
+        last_user_message or "", response_analysis['response_type'],
+        request.domain or "人工智能"
+    )
 
-        # 如果检测到误判，使用修正后的分类
-        if validation_result['potential_misjudgment']:
-            response_analysis['response_type'] = validation_result['final_classification']
-            response_analysis['validation_info'] = validation_result
+    # 如果检测到误判，使用修正后的分类
+    if validation_result['potential_misjudgment']:
+        response_analysis['response_type'] = validation_result['final_classification']
+        response_analysis['validation_info'] = validation_result
 
-        # 生成智能的分析思路 - 基于验证结果
-        final_response_type = response_analysis['response_type']
-        key_concepts_text = ', '.join(response_analysis['key_concepts']) if response_analysis['key_concepts'] else "相关技术概念"
+    # 生成智能的分析思路 - 基于验证结果
+    final_response_type = response_analysis['response_type']
+    key_concepts_text = ', '.join(response_analysis['key_concepts']) if response_analysis['key_concepts'] else "相关技术概念"
 
-        # 如果有验证信息，使用验证结果
-        validation_info = response_analysis.get('validation_info', {})
-        if validation_info and validation_info.get('potential_misjudgment'):
-            validation_reason = validation_info.get('validation_reason', '')
-            analysis_thinking = f"""让我仔细分析一下您刚才的回答。
+    # 如果有验证信息，使用验证结果
+    validation_info = response_analysis.get('validation_info', {})
+    if validation_info and validation_info.get('potential_misjudgment'):
+        validation_reason = validation_info.get('validation_reason', '')
+        analysis_thinking = f"""让我仔细分析一下您刚才的回答。
 
 {validation_reason}
 
@@ -925,9 +1292,9 @@ async def advanced_next_question(request: InterviewNextRequest):
 {_evaluate_response_quality_enhanced(last_user_message, last_ai_question, final_response_type, validation_info.get('quality_analysis', {}))}
 
 基于这样的分析，我认为最合适的方式是{_get_natural_strategy_description(response_analysis['guidance_strategy'])}。"""
-        else:
-            # 使用原有逻辑但改进描述
-            analysis_thinking = f"""让我分析一下您刚才的回答。
+    else:
+        # 使用原有逻辑但改进描述
+        analysis_thinking = f"""让我分析一下您刚才的回答。
 
 从您的回答中，我识别出这是一个{_get_response_type_description(final_response_type)}的情况。我注意到这个问题涉及到{key_concepts_text}等技术要点。
 
@@ -935,44 +1302,65 @@ async def advanced_next_question(request: InterviewNextRequest):
 
 考虑到您的情况，我觉得最好的方式是{_get_natural_strategy_description(response_analysis['guidance_strategy'])}。我会确保我们的讨论紧密围绕原问题展开，这样既能帮助您理解相关技术，也能让我更好地了解您的技术思维和学习能力。"""
 
-        # 根据分析结果生成相应的引导内容
-        if response_analysis['needs_technical_guidance']:
-            # 候选人明确要求答案，提供技术指导
-            guidance_content = advanced_interviewer_service.generate_technical_guidance(
-                last_ai_question or "",
-                response_analysis['key_concepts'],
-                response_analysis['technical_context'],
-                request.domain or "人工智能"
-            )
-        elif response_analysis['needs_hints']:
-            # 候选人表示不知道，提供提示和引导
-            guidance_content = advanced_interviewer_service.generate_hint_based_guidance(
-                last_ai_question or "",
-                response_analysis['key_concepts'],
-                response_analysis['technical_context'],
-                request.domain or "人工智能"
-            )
-        else:
-            # 其他情况，进行深度追问
-            guidance_content = f"""基于您的回答，我想进一步了解您的技术深度。
+    # 根据分析结果生成相应的引导内容
+    if response_analysis['needs_technical_guidance']:
+        # 候选人明确要求答案，提供技术指导
+        guidance_content = advanced_interviewer_service.generate_technical_guidance(
+            last_ai_question or "",
+            response_analysis['key_concepts'],
+            response_analysis['technical_context'],
+            request.domain or "人工智能"
+        )
+    elif response_analysis['needs_hints']:
+        # 候选人表示不知道，提供提示和引导
+        guidance_content = advanced_interviewer_service.generate_hint_based_guidance(
+            last_ai_question or "",
+            response_analysis['key_concepts'],
+            response_analysis['technical_context'],
+            request.domain or "人工智能"
+        )
+    else:
+        # 其他情况，进行深度追问
+        guidance_content = f"""基于您的回答，我想进一步了解您的技术深度。
 
 让我们深入探讨一下：您能详细说明其中的技术实现细节吗？"""
 
-        return {
-            "thinking": analysis_thinking,
-            "question": guidance_content,
-            "response_analysis": {
-                "response_type": response_analysis['response_type'],
-                "key_concepts": response_analysis['key_concepts'],
-                "guidance_strategy": response_analysis['guidance_strategy']['approach']
-            },
-            "guidance_provided": response_analysis['needs_technical_guidance'] or response_analysis['needs_hints'],
-            "analysis_type": "deep_response_analysis"
-        }
+    return {
+        "thinking": analysis_thinking,
+        "question": guidance_content,
+        "response_analysis": {
+            "response_type": response_analysis['response_type'],
+            "key_concepts": response_analysis['key_concepts'],
+            "guidance_strategy": response_analysis['guidance_strategy']['approach']
+        },
+        "guidance_provided": response_analysis['needs_technical_guidance'] or response_analysis['needs_hints'],
+        "analysis_type": "deep_response_analysis"
+    }
+
+@app.post("/api/v1/interview/advanced-next")
+async def advanced_next_question(request: InterviewNextRequest):
+    """高级AI面试官 - 智能分析和针对性引导"""
+    try:
+        return _build_advanced_next_result(request)
     except Exception as e:
         logger.error(f"高级面试下一个问题失败: {e}")
         raise HTTPException(status_code=500, detail=f"高级面试下一个问题失败: {str(e)}")
 
+@app.post("/api/v1/interview/advanced-next/stream")
+async def advanced_next_question_stream(request: InterviewNextRequest):
+    """高级AI面试官 - SSE流式版本（本地分析，结果生成后立即推送）"""
+    async def events():
+        try:
+            result = _build_advanced_next_result(request)
+            yield _sse_event("thinking", {"delta": result["thinking"]})
+            yield _sse_event("question", {"delta": result["question"]})
+            yield _sse_event("done", result)
+        except Exception as e:
+            logger.error(f"高级面试下一个问题失败: {e}")
+            yield _sse_event("error", {"message": f"高级面试下一个问题失败: {str(e)}"})
+
+    return _sse_response(events())
+
 def _get_response_type_description(response_type: str) -> str:
     """获取回答类型的自然描述 - 增强版本"""
     type_descriptions = {
@@ -1060,6 +1448,96 @@ async def end_interview(request: InterviewNextRequest):
         logger.error(f"结束面试失败: {e}")
         raise HTTPException(status_code=500, detail=f"结束面试失败: {str(e)}")
 
+# 语音合成API
+class SpeechSynthesisRequest(BaseModel):
+    text: str
+    voice_name: Optional[str] = "xiaoyan"
+
+@app.post("/api/v1/speech/synthesize/stream")
+async def synthesize_speech_stream(request: SpeechSynthesisRequest):
+    """按句流式合成语音，首句合成完成即开始返回PCM（16kHz/16bit/单声道）"""
+    if not request.text.strip():
+        raise HTTPException(status_code=400, detail="合成文本不能为空")
+
+    chunks = multimodal_service.tts_service.synthesize_speech_stream(request.text, request.voice_name)
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+    except Exception as e:
+        logger.error(f"语音合成失败: {e}")
+        raise HTTPException(status_code=500, detail=f"语音合成失败: {str(e)}")
+
+    async def audio():
+        try:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+        except Exception as e:
+            logger.error(f"语音合成中断: {e}")
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(audio(), media_type="audio/L16;rate=16000")
+
+# 实时音频API
+@app.websocket("/ws/interview/{session_id}/audio")
+async def live_audio_analysis(websocket: WebSocket, session_id: str):
+    """
+    实时音频分析
+    客户端以二进制消息发送16kHz/16bit/单声道PCM，发送 {"type": "end"} 结束；
+    服务端推送 ready、partial_transcript、metrics、final 和 error 消息
+    """
+    await websocket.accept()
+    live = LiveAudioSession(session_id)
+    send_lock = asyncio.Lock()
+
+    async def send(message: Dict[str, Any]):
+        async with send_lock:
+            await websocket.send_json(message)
+
+    async def forward_transcripts():
+        async for partial in live.transcripts():
+            await send(partial)
+
+    forwarder = None
+    try:
+        await live.start()
+        await send({"type": "ready", "session_id": session_id, "asr_enabled": live.asr_enabled,
+                    "asr_error": live.asr_error, "sample_rate": 16000})
+        forwarder = asyncio.create_task(forward_transcripts())
+
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                for metrics in await live.push_audio(message["bytes"]):
+                    await send(metrics)
+            elif message.get("text"):
+                control = json.loads(message["text"])
+                if control.get("type") == "end":
+                    result = await live.finish()
+                    await forwarder
+                    await send(result)
+                    break
+    except WebSocketDisconnect:
+        logger.info(f"实时音频会话断开: {session_id}")
+    except Exception as e:
+        logger.error(f"实时音频分析失败: {e}")
+        try:
+            await send({"type": "error", "message": f"实时音频分析失败: {str(e)}"})
+        except Exception:
+            pass
+    finally:
+        if forwarder is not None and not forwarder.done():
+            forwarder.cancel()
+        await live.close()
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
 # 多模态分析API
 @app.post("/api/v1/analysis/multimodal")
 async def analyze_multimodal(request: MultimodalAnalysisRequest):
@@ -1264,6 +1742,87 @@ async def get_system_status():
         logger.error(f"获取系统状态失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取系统状态失败: {str(e)}")
 
+class RescoreRequest(BaseModel):
+    page_size: int = Field(default=500, ge=1)
+    workers: Optional[int] = Field(default=None, ge=0)
+    limit: Optional[int] = Field(default=None, ge=1)
+    session_ids: Optional[List[int]] = None
+    dry_run: bool = False
+    reports: bool = True
+
+@app.post("/api/v1/admin/rescore")
+async def start_rescore(request: RescoreRequest):
+    """启动后台批量重新评分任务"""
+    try:
+        job = batch_rescoring_service.start_job(
+            page_size=request.page_size,
+            workers=request.workers,
+            limit=request.limit,
+            session_ids=request.session_ids,
+            dry_run=request.dry_run,
+            reports=request.reports
+        )
+        return {"success": True, "data": job}
+    except RescoreJobRunningError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"启动批量重新评分失败: {e}")
+        raise HTTPException(status_code=500, detail=f"启动批量重新评分失败: {str(e)}")
+
+@app.get("/api/v1/admin/rescore/{job_id}")
+async def get_rescore_job(job_id: str):
+    """查询批量重新评分任务进度和吞吐量"""
+    job = batch_rescoring_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="重新评分任务不存在")
+    return {"success": True, "data": job}
+
+# ==================== 评测统计API ====================
+
+@app.get("/api/v1/analytics/metrics")
+async def get_metric_statistics(names: Optional[str] = None, domain: Optional[str] = None,
+                                position: Optional[str] = None, days: Optional[int] = None,
+                                db: Session = Depends(get_db)):
+    """按指标聚合评测报告（names 为逗号分隔的指标名，如 overall_score,capability.专业技能）"""
+    try:
+        since = datetime.utcnow() - timedelta(days=days) if days else None
+        metric_names = [name.strip() for name in names.split(",") if name.strip()] if names else None
+        metrics = await asyncio.to_thread(
+            analysis_storage_service.aggregate_metrics, db, metric_names, domain, position, since
+        )
+        return {"success": True, "data": metrics}
+    except Exception as e:
+        logger.error(f"获取指标统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取指标统计失败: {str(e)}")
+
+@app.get("/api/v1/analytics/answer-scores")
+async def get_answer_score_statistics(columns: Optional[str] = None, domain: Optional[str] = None,
+                                      days: Optional[int] = None, db: Session = Depends(get_db)):
+    """按回答得分列求平均（columns 为逗号分隔的列名，默认全部得分列）"""
+    try:
+        since = datetime.utcnow() - timedelta(days=days) if days else None
+        column_names = [name.strip() for name in columns.split(",") if name.strip()] if columns else None
+        scores = await asyncio.to_thread(
+            analysis_storage_service.aggregate_answer_scores, db, column_names, domain, since
+        )
+        return {"success": True, "data": scores}
+    except Exception as e:
+        logger.error(f"获取回答得分统计失败: {e}")
+        raise HTTPException(status_code=500, detail=f"获取回答得分统计失败: {str(e)}")
+
+@app.get("/api/v1/artifacts/{content_hash}")
+async def get_artifact(content_hash: str, db: Session = Depends(get_db)):
+    """按内容哈希读取报告图表、转写文本等大对象"""
+    record = await asyncio.to_thread(analysis_storage_service.get_artifact_record, db, content_hash)
+    content = analysis_storage_service.load_artifact(content_hash) if record else None
+    if content is None:
+        raise HTTPException(status_code=404, detail="对象不存在")
+    return Response(
+        content=content,
+        media_type=record.content_type,
+        headers={"Cache-Control": "public, max-age=31536000, immutable", "ETag": f'"{content_hash}"'}
+    )
+
 # ==================== 学习路径相关API ====================
 
 class LearningPathRequest(BaseModel):
@@ -1282,8 +1841,9 @@ class PersonalizedPathRequest(BaseModel):
 async def get_learning_paths_by_domain(domain: str, position: Optional[str] = None, db: Session = Depends(get_db)):
     """根据技术领域获取学习路径列表"""
     try:
+        # 学习路径服务仍是同步查询，放到线程中执行，避免阻塞事件循环
         learning_service = LearningPathService(db)
-        paths = learning_service.get_learning_paths_by_domain(domain, position)
+        paths = await asyncio.to_thread(learning_service.get_learning_paths_by_domain, domain, position)
         return {
             "success": True,
             "data": paths,
@@ -1297,7 +1857,7 @@ async def get_learning_path_detail(path_id: int, db: Session = Depends(get_db)):
     """获取学习路径详情"""
     try:
         learning_service = LearningPathService(db)
-        path_detail = learning_service.get_learning_path_detail(path_id)
+        path_detail = await asyncio.to_thread(learning_service.get_learning_path_detail, path_id)
 
         if not path_detail:
             raise HTTPException(status_code=404, detail="学习路径不存在")
@@ -1313,7 +1873,8 @@ async def get_learning_path_detail(path_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"获取学习路径详情失败: {str(e)}")
 
 @app.post("/api/v1/learning-paths/personalized")
-async def generate_personalized_learning_path(request: PersonalizedPathRequest, db: Session = Depends(get_db)):
+async def generate_personalized_learning_path(request: PersonalizedPathRequest, db: Session = Depends(get_db),
+                                             async_db: AsyncSession = Depends(get_async_db)):
     """生成个性化学习路径"""
     try:
         learning_service = LearningPathService(db)
@@ -1323,9 +1884,7 @@ async def generate_personalized_learning_path(request: PersonalizedPathRequest,
         if request.session_id and not evaluation_scores:
             try:
                 # 获取评估报告
-                report = db.query(EvaluationReport).filter(
-                    EvaluationReport.session_id == request.session_id
-                ).first()
+                report = await repositories.get_latest_report(async_db, request.session_id)
 
                 if report:
                     evaluation_scores = {
@@ -1351,7 +1910,8 @@ async def generate_personalized_learning_path(request: PersonalizedPathRequest,
             }
 
         # 生成个性化学习路径
-        personalized_path = learning_service.generate_personalized_path(
+        personalized_path = await asyncio.to_thread(
+            learning_service.generate_personalized_path,
             request.domain,
             request.position,
             request.skill_level,
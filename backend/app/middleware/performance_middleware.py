@@ -14,6 +14,7 @@ from fastapi import Request, Response, HTTPException
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from ..core.cache import create_cache
 from ..services.system_monitor_service import get_system_monitor
 
 logger = logging.getLogger(__name__)
@@ -208,37 +209,43 @@ class CompressionMiddleware(BaseHTTPMiddleware):
         return any(ct in content_type for ct in compressible_types)
 
 class CacheMiddleware(BaseHTTPMiddleware):
-    """缓存中间件"""
+    """缓存中间件，缓存响应体、状态码和响应头，后端可在多个worker间共享"""
     
-    def __init__(self, app, cache_ttl: int = 300):
+    def __init__(self, app, cache_ttl: int = 300, max_entries: int = 500):
         super().__init__(app)
         self.cache_ttl = cache_ttl
-        self.cache = {}
-        self.cache_times = {}
+        self.cache = create_cache("http_response", max_entries=max_entries, ttl_seconds=cache_ttl)
     
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """处理请求"""
         # 只缓存GET请求
-        if request.method != "GET":
+        if request.method != "GET" or not self._should_cache(request):
             return await call_next(request)
         
         # 生成缓存键
         cache_key = self._generate_cache_key(request)
         
         # 检查缓存
-        if self._is_cached(cache_key):
-            cached_response = self.cache[cache_key]
-            cached_response.headers["X-Cache"] = "HIT"
-            return cached_response
+        cached = await self.cache.aget(cache_key)
+        if cached is not None:
+            headers = dict(cached["headers"])
+            headers["X-Cache"] = "HIT"
+            return Response(content=cached["body"], status_code=cached["status_code"], headers=headers)
         
         # 处理请求
         response = await call_next(request)
         
         # 缓存响应（仅缓存成功响应）
-        if response.status_code == 200 and self._should_cache(request):
-            self.cache[cache_key] = response
-            self.cache_times[cache_key] = time.time()
-            response.headers["X-Cache"] = "MISS"
+        if response.status_code == 200:
+            body = b"".join([chunk async for chunk in response.body_iterator])
+            headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+            await self.cache.aset(cache_key, {
+                "status_code": response.status_code,
+                "headers": headers,
+                "body": body
+            })
+            headers["X-Cache"] = "MISS"
+            return Response(content=body, status_code=response.status_code, headers=headers)
         
         return response
     
@@ -246,14 +253,6 @@ class CacheMiddleware(BaseHTTPMiddleware):
         """生成缓存键"""
         return f"{request.method}:{request.url.path}:{request.url.query}"
     
-    def _is_cached(self, cache_key: str) -> bool:
-        """检查是否已缓存且未过期"""
-        if cache_key not in self.cache:
-            return False
-        
-        cache_time = self.cache_times.get(cache_key, 0)
-        return time.time() - cache_time < self.cache_ttl
-    
     def _should_cache(self, request: Request) -> bool:
         """判断是否应该缓存"""
         # 不缓存包含认证信息的请求
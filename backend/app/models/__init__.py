@@ -3,6 +3,9 @@ from .database import (
     engine,
     SessionLocal,
     get_db,
+    get_async_db,
+    get_async_engine,
+    dispose_engines,
     create_tables,
     User,
     InterviewSession,
@@ -10,6 +13,8 @@ from .database import (
     InterviewResponse,
     MultimodalAnalysis,
     EvaluationReport,
+    AnalysisMetric,
+    StoredArtifact,
     ResumeAnalysis,
     LearningPath,
     LearningModule,
@@ -21,6 +26,9 @@ __all__ = [
     "engine",
     "SessionLocal",
     "get_db",
+    "get_async_db",
+    "get_async_engine",
+    "dispose_engines",
     "create_tables",
     "User",
     "InterviewSession",
@@ -28,6 +36,8 @@ __all__ = [
     "InterviewResponse",
     "MultimodalAnalysis",
     "EvaluationReport",
+    "AnalysisMetric",
+    "StoredArtifact",
     "ResumeAnalysis",
     "LearningPath",
     "LearningModule",
@@ -1,15 +1,110 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, JSON, Boolean, ForeignKey
+from sqlalchemy import create_engine, event, inspect, text, Index, Column, Integer, String, Float, DateTime, Text, JSON, Boolean, ForeignKey
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+from typing import Any, Dict
 import os
 
-# 数据库配置
-DATABASE_URL = "sqlite:///./interview_system.db"
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+from ..core.config import settings
+
+# 数据库配置（本地默认SQLite，生产环境通过 DATABASE_URL 指向PostgreSQL）
+DATABASE_URL = settings.database_url
+
+# 同步驱动 -> 异步驱动
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql"
+}
+
+
+def to_async_url(url: str) -> str:
+    """把同步连接串转换为对应异步驱动的连接串，已是异步驱动的原样返回"""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False) if driver else url
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    """按数据库类型生成引擎参数：连接池大小/溢出/超时，SQLite允许跨线程使用连接"""
+    options: Dict[str, Any] = {"pool_pre_ping": not _is_sqlite(url)}
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}
+        database = make_url(url).database
+        if not database or database == ":memory:":
+            # 内存库只能用单连接池，不接受连接池大小参数
+            return options
+    options.update(
+        pool_size=getattr(settings, 'db_pool_size', 5),
+        max_overflow=getattr(settings, 'db_max_overflow', 10),
+        pool_timeout=getattr(settings, 'db_pool_timeout', 30.0),
+        pool_recycle=getattr(settings, 'db_pool_recycle', 1800)
+    )
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    SQLite连接参数：WAL模式下读写互不阻塞，synchronous=NORMAL 在WAL下只在检查点刷盘，
+    busy_timeout 让并发写入排队等待而不是立即报 database is locked
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(getattr(settings, 'sqlite_busy_timeout_ms', 5000))}")
+    cursor.close()
+
+
+def create_db_engine(url: str = DATABASE_URL):
+    """创建同步引擎（脚本、后台线程和尚未迁移的同步服务使用）"""
+    db_engine = create_engine(url, **_engine_options(url))
+    if _is_sqlite(url):
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+def create_async_db_engine(url: str = DATABASE_URL):
+    """创建异步引擎（aiosqlite / asyncpg）"""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_url = to_async_url(url)
+    db_engine = create_async_engine(async_url, **_engine_options(async_url))
+    if _is_sqlite(async_url):
+        event.listen(db_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return db_engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# 异步引擎在第一次使用时创建，未安装异步驱动时不影响同步代码
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_db_engine()
+    return _async_engine
+
+
+def get_async_session_factory():
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        _async_session_factory = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _async_session_factory
+
 class User(Base):
     """用户表"""
     __tablename__ = "users"
@@ -24,7 +119,7 @@ class InterviewSession(Base):
     __tablename__ = "interview_sessions"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, index=True)
+    user_id = Column(Integer)
     domain = Column(String(50))  # 技术领域：AI、大数据、物联网
     position = Column(String(50))  # 岗位类型：技术岗、运维测试岗、产品岗
     status = Column(String(20), default="active")  # active, completed, cancelled
@@ -33,6 +128,11 @@ class InterviewSession(Base):
     total_questions = Column(Integer, default=0)
     session_data = Column(JSON)  # 存储会话的详细数据
 
+    __table_args__ = (
+        # 按用户列出会话（按开始时间排序）
+        Index("ix_interview_sessions_user_start", "user_id", "start_time"),
+    )
+
 class InterviewQuestion(Base):
     """面试问题表"""
     __tablename__ = "interview_questions"
@@ -45,13 +145,20 @@ class InterviewQuestion(Base):
     question_type = Column(String(30))  # technical, behavioral, scenario
     keywords = Column(JSON)  # 关键词列表
     expected_points = Column(JSON)  # 期望回答要点
+    # 最近修改时间，题库检索索引据此增量重建被编辑的题目
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        # 选题、按条件取题、随机取题都按 领域+岗位(+类型+难度) 过滤
+        Index("ix_interview_questions_lookup", "domain", "position", "question_type", "difficulty_level"),
+    )
 
 class InterviewResponse(Base):
     """面试回答表"""
     __tablename__ = "interview_responses"
     
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, index=True)
+    session_id = Column(Integer)
     question_id = Column(Integer, index=True)
     question_text = Column(Text)
     response_text = Column(Text)
@@ -60,12 +167,17 @@ class InterviewResponse(Base):
     video_file_path = Column(String(255))  # 视频文件路径
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # 会话内的回答（及某道题的回答）
+        Index("ix_interview_responses_session_question", "session_id", "question_id"),
+    )
+
 class MultimodalAnalysis(Base):
     """多模态分析结果表"""
     __tablename__ = "multimodal_analysis"
     
     id = Column(Integer, primary_key=True, index=True)
-    response_id = Column(Integer, index=True)
+    response_id = Column(Integer)
     
     # 语音分析结果
     speech_clarity = Column(Float)  # 语音清晰度 0-100
@@ -87,12 +199,17 @@ class MultimodalAnalysis(Base):
     
     analysis_timestamp = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # 按回答取分析结果（最新一条）
+        Index("ix_multimodal_analysis_response_time", "response_id", "analysis_timestamp"),
+    )
+
 class EvaluationReport(Base):
     """评测报告表"""
     __tablename__ = "evaluation_reports"
     
     id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(Integer, index=True)
+    session_id = Column(Integer)
     
     # 六项核心能力指标
     professional_knowledge = Column(Float)  # 专业知识水平 0-100
@@ -107,9 +224,52 @@ class EvaluationReport(Base):
     weaknesses = Column(JSON)  # 不足点列表
     improvement_suggestions = Column(JSON)  # 改进建议列表
     
-    report_data = Column(JSON)  # 完整报告数据（包含图表数据）
+    report_data = Column(JSON)  # 完整报告数据（图表等大对象只保存哈希，见 StoredArtifact）
     generated_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # 按会话取最新报告
+        Index("ix_evaluation_reports_session_generated", "session_id", "generated_at"),
+    )
+
+class AnalysisMetric(Base):
+    """分析指标表（每行一个指标值，统计查询只读取需要的指标）"""
+    __tablename__ = "analysis_metrics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, nullable=False)
+    report_id = Column(Integer)  # 来自评测报告的指标
+    response_id = Column(Integer)  # 来自单条回答的指标
+    name = Column(String(100), nullable=False)  # 指标名，如 overall_score、capability.专业技能
+    value = Column(Float, nullable=False)
+    recorded_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # 按指标聚合（看板）和按会话/报告取指标
+        Index("ix_analysis_metrics_name_recorded", "name", "recorded_at"),
+        Index("ix_analysis_metrics_session_name", "session_id", "name"),
+        Index("ix_analysis_metrics_report", "report_id"),
+    )
+
+class StoredArtifact(Base):
+    """大对象引用表（图表、转写文本等，内容按SHA-256保存在 blob_store_dir）"""
+    __tablename__ = "stored_artifacts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, nullable=False)
+    report_id = Column(Integer)
+    kind = Column(String(50), nullable=False)  # radar_chart, transcript ...
+    content_hash = Column(String(64), nullable=False)
+    content_type = Column(String(100), default="application/octet-stream")
+    size_bytes = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_stored_artifacts_session_kind", "session_id", "kind"),
+        Index("ix_stored_artifacts_report", "report_id"),
+        Index("ix_stored_artifacts_hash", "content_hash"),
+    )
+
 class ResumeAnalysis(Base):
     """简历分析表"""
     __tablename__ = "resume_analysis"
@@ -193,9 +353,49 @@ class UserLearningProgress(Base):
     learning_module = relationship("LearningModule")
 
 
+# 已被复合索引的前缀覆盖、不再需要单独维护的单列索引
+_SUPERSEDED_INDEXES = [
+    "ix_interview_sessions_user_id",
+    "ix_interview_responses_session_id",
+    "ix_multimodal_analysis_response_id",
+    "ix_evaluation_reports_session_id"
+]
+
+# 后来新增的列：(表名, 列名)，已有数据库由 upgrade_columns 补建
+_ADDED_COLUMNS = [
+    ("interview_questions", "updated_at")
+]
+
 # 创建所有表
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    upgrade_columns()
+    upgrade_indexes()
+
+# 列迁移：为已有数据库补建新增的可空列（可重复执行），须在补建索引之前执行
+def upgrade_columns(bind=None):
+    bind = bind or engine
+    with bind.begin() as conn:
+        for table_name, column_name in _ADDED_COLUMNS:
+            existing = {column["name"] for column in inspect(conn).get_columns(table_name)}
+            if column_name in existing:
+                continue
+            column = Base.metadata.tables[table_name].c[column_name]
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}"))
+
+# 索引迁移：为已有数据库补建复合索引，删除被覆盖的单列索引（可重复执行）
+def upgrade_indexes(bind=None):
+    bind = bind or engine
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        for name in _SUPERSEDED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        if conn.dialect.name == "sqlite":
+            # 更新统计信息，让查询规划器选用新索引
+            conn.execute(text("PRAGMA optimize"))
 
 # 获取数据库会话
 def get_db():
@@ -204,3 +404,17 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# 获取异步数据库会话（async def 接口使用，查询不阻塞事件循环）
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
+
+# 释放连接池（应用关闭时调用）
+async def dispose_engines():
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+    engine.dispose()
@@ -0,0 +1,60 @@
+"""
+异步数据访问
+面试会话、回答和评测报告的常用读写，供 async def 接口通过 AsyncSession 调用，查询期间不阻塞事件循环；
+评测报告的写入统一走 analysis_storage_service.save_report（同时保存图表等产物），这里只提供读取
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import EvaluationReport, InterviewResponse, InterviewSession
+
+
+# ==================== 面试会话 ====================
+
+async def create_session(db: AsyncSession, domain: str, position: str, session_data: Optional[Dict[str, Any]] = None,
+                         user_id: Optional[int] = None, status: str = "active") -> InterviewSession:
+    """创建面试会话"""
+    session = InterviewSession(
+        user_id=user_id,
+        domain=domain,
+        position=position,
+        status=status,
+        start_time=datetime.now(),
+        session_data=session_data or {}
+    )
+    db.add(session)
+    await db.commit()
+    await db.refresh(session)
+    return session
+
+
+async def get_session(db: AsyncSession, session_id: int) -> Optional[InterviewSession]:
+    """按主键获取面试会话"""
+    return await db.get(InterviewSession, session_id)
+
+
+# ==================== 回答 ====================
+
+async def list_responses(db: AsyncSession, session_id: int) -> List[InterviewResponse]:
+    """会话内的全部回答（按提交顺序）"""
+    result = await db.execute(
+        select(InterviewResponse).where(InterviewResponse.session_id == session_id).order_by(InterviewResponse.id)
+    )
+    return list(result.scalars())
+
+
+# ==================== 评测报告 ====================
+
+async def get_latest_report(db: AsyncSession, session_id: int) -> Optional[EvaluationReport]:
+    """会话最新的一份评测报告"""
+    result = await db.execute(
+        select(EvaluationReport)
+        .where(EvaluationReport.session_id == session_id)
+        .order_by(EvaluationReport.generated_at.desc(), EvaluationReport.id.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
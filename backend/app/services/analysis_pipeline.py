@@ -0,0 +1,150 @@
+"""
+分析流水线调度
+把一次回答分析拆成有依赖关系的阶段：依赖满足的阶段立即并发执行，
+下游阶段可以先基于部分输入（已说完整的句子）提前计算，并记录每个阶段的耗时
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+_SENTENCE_END_RE = re.compile(r"[。！？!?]")
+
+
+def complete_sentences(text: str) -> str:
+    """截取文本中已经说完整的句子（到最后一个句末标点为止）"""
+    matches = list(_SENTENCE_END_RE.finditer(text or ""))
+    return text[:matches[-1].end()] if matches else ""
+
+
+class StageGraph:
+    """
+    阶段依赖图
+
+    每个阶段是接收上游结果字典的协程函数，run() 时依赖全部完成的阶段立即启动，
+    关键路径的耗时约等于依赖链上各阶段耗时之和，而不是所有阶段之和
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, StageFunc] = {}
+        self._depends: Dict[str, tuple] = {}
+
+    def add_stage(self, name: str, func: StageFunc, depends_on: Iterable[str] = ()) -> "StageGraph":
+        depends_on = tuple(depends_on)
+        for dependency in depends_on:
+            if dependency not in self._stages:
+                raise ValueError(f"阶段 {name} 依赖的阶段 {dependency} 尚未定义")
+        self._stages[name] = func
+        self._depends[name] = depends_on
+        return self
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._stages
+
+    async def run(self, inputs: Optional[Dict[str, Any]] = None) -> "PipelineRun":
+        """执行全部阶段；任一阶段抛出异常时取消其余阶段并向上抛出"""
+        pipeline = PipelineRun(inputs)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def execute(name: str):
+            if self._depends[name]:
+                await asyncio.gather(*(tasks[dependency] for dependency in self._depends[name]))
+            start = time.perf_counter()
+            try:
+                pipeline.results[name] = await self._stages[name](pipeline.results)
+            finally:
+                pipeline.record(name, start, time.perf_counter())
+
+        # 阶段按定义顺序创建，依赖一定先于下游创建
+        for name in self._stages:
+            tasks[name] = asyncio.create_task(execute(name))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        pipeline.finish()
+        return pipeline
+
+
+class PipelineRun:
+    """一次流水线执行的结果和各阶段耗时"""
+
+    def __init__(self, inputs: Optional[Dict[str, Any]] = None):
+        self.results: Dict[str, Any] = dict(inputs or {})
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self._started = time.perf_counter()
+        self.total_time = 0.0
+
+    def record(self, name: str, start: float, end: float):
+        self.timings[name] = {
+            "start": round(start - self._started, 3),
+            "end": round(end - self._started, 3),
+            "duration": round(end - start, 3)
+        }
+
+    def finish(self):
+        self.total_time = round(time.perf_counter() - self._started, 3)
+
+    def durations(self) -> Dict[str, float]:
+        return {name: timing["duration"] for name, timing in self.timings.items()}
+
+    def metadata(self) -> Dict[str, Any]:
+        """用于写入分析结果的耗时信息"""
+        serial_time = sum(self.durations().values())
+        return {
+            "stages": self.timings,
+            "total_time": self.total_time,
+            "serial_time": round(serial_time, 3)
+        }
+
+
+class PartialInputStage:
+    """
+    基于部分输入提前执行的阶段
+
+    offer() 接收不断增长的部分结果（如流式识别文本），每出现新的完整句子就对已完整的部分提前计算，
+    旧的计算随之取消；resolve() 拿到最终输入后，若与最近一次提前计算的输入相同则直接复用结果
+    """
+
+    def __init__(self, func: Callable[[str], Awaitable[Any]],
+                 prefix: Callable[[str], str] = complete_sentences):
+        self.func = func
+        self.prefix = prefix
+        self._input: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self.started = 0
+        self.reused = False
+
+    def offer(self, partial: str):
+        candidate = self.prefix(partial)
+        if not candidate or candidate == self._input:
+            return
+        self._cancel()
+        self._input = candidate
+        self._task = asyncio.create_task(self.func(candidate))
+        self.started += 1
+
+    async def resolve(self, final: str) -> Any:
+        if self._task is not None and final == self._input:
+            self.reused = True
+            return await self._task
+        self._cancel()
+        return await self.func(final)
+
+    def _cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def close(self):
+        self._cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"speculative_runs": self.started, "reused": self.reused}
@@ -0,0 +1,332 @@
+"""
+分析结果存储服务
+评测指标按行写入 analysis_metrics 表，报告图表等大对象按内容哈希写入 blob 存储，
+evaluation_reports.report_data 只保留报告结构和对象哈希；看板统计直接在数据库里按指标聚合，
+不需要反序列化整份报告
+"""
+
+import base64
+import binascii
+import copy
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..core.blob_store import ContentStore, blob_store
+from ..models.database import (
+    AnalysisMetric,
+    EvaluationReport,
+    InterviewResponse,
+    InterviewSession,
+    MultimodalAnalysis,
+    StoredArtifact
+)
+
+logger = logging.getLogger(__name__)
+
+# multimodal_analysis 表中的得分列
+ANSWER_SCORE_COLUMNS = (
+    "speech_clarity", "speech_speed", "emotion_score", "pause_frequency",
+    "eye_contact_score", "facial_expression_score", "posture_score", "gesture_appropriateness",
+    "content_relevance", "logical_structure", "keyword_coverage", "innovation_score"
+)
+
+
+def analysis_from_record(record: MultimodalAnalysis) -> Dict[str, Any]:
+    """把 multimodal_analysis 的得分列还原为评估器使用的分析结果结构，空列不输出"""
+    def present(pairs):
+        return {key: value for key, value in pairs if value is not None}
+
+    text_analysis = present([
+        ("content_relevance", present([("overall_relevance", record.content_relevance)]) or None),
+        ("logical_structure", present([("structure_score", record.logical_structure)]) or None),
+        ("keyword_coverage", present([("coverage_rate", record.keyword_coverage)]) or None),
+        ("innovation_analysis", present([("innovation_score", record.innovation_score)]) or None)
+    ])
+    audio_analysis = present([
+        ("speech_clarity", record.speech_clarity),
+        ("speech_speed", record.speech_speed),
+        ("emotion_score", record.emotion_score),
+        ("pause_frequency", record.pause_frequency)
+    ])
+    video_analysis = present([
+        ("eye_contact_score", record.eye_contact_score),
+        ("facial_expression_score", record.facial_expression_score),
+        ("posture_score", record.posture_score),
+        ("gesture_appropriateness", record.gesture_appropriateness)
+    ])
+    return {
+        "response_id": record.response_id,
+        "text_analysis": text_analysis,
+        "audio_analysis": audio_analysis,
+        "video_analysis": video_analysis
+    }
+
+
+def flatten_metrics(values: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """把嵌套字典中的数值展开为 a.b.c 形式的指标名"""
+    metrics = {}
+    for key, value in values.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            metrics.update(flatten_metrics(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = float(value)
+    return metrics
+
+
+class AnalysisStorageService:
+    """评测指标和大对象的读写"""
+
+    def __init__(self, store: ContentStore):
+        self.store = store
+
+    # ==================== 大对象 ====================
+
+    def store_artifact(self, db: Session, session_id: int, kind: str, data: bytes,
+                       content_type: str = "application/octet-stream",
+                       report_id: Optional[int] = None) -> StoredArtifact:
+        """保存大对象并登记引用（由调用方提交事务）"""
+        artifact = StoredArtifact(
+            session_id=session_id,
+            report_id=report_id,
+            kind=kind,
+            content_hash=self.store.put(data),
+            content_type=content_type,
+            size_bytes=len(data)
+        )
+        db.add(artifact)
+        return artifact
+
+    def load_artifact(self, content_hash: str) -> Optional[bytes]:
+        return self.store.get(content_hash)
+
+    def get_artifact_record(self, db: Session, content_hash: str) -> Optional[StoredArtifact]:
+        return db.execute(
+            select(StoredArtifact).where(StoredArtifact.content_hash == content_hash).limit(1)
+        ).scalars().first()
+
+    # ==================== 指标 ====================
+
+    def record_metrics(self, db: Session, session_id: int, metrics: Dict[str, float],
+                       report_id: Optional[int] = None, response_id: Optional[int] = None) -> int:
+        """批量写入指标（由调用方提交事务），返回写入条数"""
+        recorded_at = datetime.utcnow()
+        db.add_all([
+            AnalysisMetric(session_id=session_id, report_id=report_id, response_id=response_id,
+                           name=name, value=value, recorded_at=recorded_at)
+            for name, value in metrics.items()
+        ])
+        return len(metrics)
+
+    def report_metrics(self, report: Dict[str, Any]) -> Dict[str, float]:
+        """报告中需要统计的指标：总分、各项能力得分、详细分析中的数值"""
+        metrics = {}
+        if isinstance(report.get("overall_score"), (int, float)):
+            metrics["overall_score"] = float(report["overall_score"])
+        metrics.update(flatten_metrics(report.get("capability_scores") or {}, "capability."))
+        metrics.update(flatten_metrics(report.get("detailed_analysis") or {}, "detail."))
+        return metrics
+
+    # ==================== 报告 ====================
+
+    def _split_charts(self, report: Dict[str, Any]):
+        """从报告中取出base64编码的图表，返回（不含图表的报告副本，{图表名: PNG字节}）"""
+        slim = {key: value for key, value in report.items() if key != "visualizations"}
+        visualizations = {}
+        charts = {}
+        for name, value in (report.get("visualizations") or {}).items():
+            if name.endswith("_chart") and isinstance(value, str) and value:
+                try:
+                    charts[name] = base64.b64decode(value, validate=True)
+                    continue
+                except (binascii.Error, ValueError):
+                    pass
+            visualizations[name] = copy.deepcopy(value)
+        if "visualizations" in report:
+            slim["visualizations"] = visualizations
+        return slim, charts
+
+    def save_report(self, db: Session, session_id: int, report: Dict[str, Any], **columns) -> EvaluationReport:
+        """保存评测报告：图表写入blob存储，指标写入指标表，columns 为 evaluation_reports 的得分列"""
+        evaluation_report = EvaluationReport(session_id=session_id, **columns)
+        db.add(evaluation_report)
+        db.flush()
+        self._attach_report_data(db, evaluation_report, report)
+        db.commit()
+        db.refresh(evaluation_report)
+        return evaluation_report
+
+    def update_report(self, db: Session, evaluation_report: EvaluationReport, report: Dict[str, Any],
+                      **columns) -> EvaluationReport:
+        """
+        用重新计算的内容替换已有报告（批量重新评分用），由调用方提交事务
+        内容未变的图表沿用原引用，变化的图表替换引用；指标行整体替换。
+        被替换的旧图表不再有引用，由 sweep_orphans 清理
+        """
+        for column, value in columns.items():
+            setattr(evaluation_report, column, value)
+        existing = {
+            artifact.kind: artifact
+            for artifact in db.query(StoredArtifact).filter(StoredArtifact.report_id == evaluation_report.id)
+        }
+        db.query(AnalysisMetric).filter(AnalysisMetric.report_id == evaluation_report.id).delete(synchronize_session=False)
+        self._attach_report_data(db, evaluation_report, report, existing)
+        return evaluation_report
+
+    def _attach_report_data(self, db: Session, evaluation_report: EvaluationReport, report: Dict[str, Any],
+                            existing: Optional[Dict[str, StoredArtifact]] = None):
+        """图表写入blob存储，report_data 只保留图表哈希，并写入报告指标；existing 为报告已有的图表引用"""
+        existing = dict(existing or {})
+        slim, charts = self._split_charts(report)
+        artifacts = {}
+        for name, data in charts.items():
+            previous = existing.pop(name, None)
+            if previous is not None and previous.content_hash == self.store.content_hash(data):
+                artifacts[name] = previous.content_hash
+                continue
+            if previous is not None:
+                db.delete(previous)
+            artifact = self.store_artifact(db, evaluation_report.session_id, name, data, "image/png",
+                                           report_id=evaluation_report.id)
+            artifacts[name] = artifact.content_hash
+        for artifact in existing.values():
+            db.delete(artifact)
+        slim["artifacts"] = artifacts
+        evaluation_report.report_data = slim
+        self.record_metrics(db, evaluation_report.session_id, self.report_metrics(report), report_id=evaluation_report.id)
+
+    def sweep_orphans(self, db: Session, min_age_seconds: float = 3600) -> Dict[str, int]:
+        """
+        删除没有任何 stored_artifacts 引用的存储对象
+        只处理写入超过 min_age_seconds 的对象：其他worker可能已写入对象、尚未提交引用行
+        """
+        referenced = set(db.execute(select(StoredArtifact.content_hash).distinct()).scalars())
+        cutoff = time.time() - min_age_seconds
+        stats = {"scanned": 0, "removed": 0}
+        for content_hash, written_at in self.store.iter_objects():
+            stats["scanned"] += 1
+            if content_hash in referenced or written_at > cutoff:
+                continue
+            if self.store.delete(content_hash):
+                stats["removed"] += 1
+        if stats["removed"]:
+            logger.info(f"已清理无引用的存储对象: {stats}")
+        return stats
+
+    def load_report_data(self, report: EvaluationReport, include_charts: bool = True) -> Dict[str, Any]:
+        """读取完整报告，include_charts 时把图表按base64放回 visualizations"""
+        data = copy.deepcopy(report.report_data or {})
+        if include_charts:
+            visualizations = data.setdefault("visualizations", {})
+            for name, content_hash in (data.get("artifacts") or {}).items():
+                content = self.store.get(content_hash)
+                if content is not None:
+                    visualizations[name] = base64.b64encode(content).decode()
+        return data
+
+    def migrate_legacy_reports(self, db: Session, batch_size: int = 200) -> Dict[str, int]:
+        """
+        迁移旧报告：report_data 中内嵌的图表移到blob存储，补写指标行
+        已迁移的报告（report_data 含 artifacts）跳过，可重复执行
+        """
+        stats = {"scanned": 0, "migrated": 0, "charts": 0, "metrics": 0, "bytes_moved": 0}
+        last_id = 0
+        while True:
+            reports = db.execute(
+                select(EvaluationReport).where(EvaluationReport.id > last_id).order_by(EvaluationReport.id).limit(batch_size)
+            ).scalars().all()
+            if not reports:
+                break
+            for report in reports:
+                last_id = report.id
+                stats["scanned"] += 1
+                data = report.report_data
+                if not isinstance(data, dict) or "artifacts" in data:
+                    continue
+                slim, charts = self._split_charts(data)
+                artifacts = {}
+                for name, content in charts.items():
+                    artifact = self.store_artifact(db, report.session_id, name, content, "image/png", report_id=report.id)
+                    artifacts[name] = artifact.content_hash
+                    stats["bytes_moved"] += len(content)
+                slim["artifacts"] = artifacts
+                report.report_data = slim
+
+                db.query(AnalysisMetric).filter(AnalysisMetric.report_id == report.id).delete(synchronize_session=False)
+                stats["metrics"] += self.record_metrics(db, report.session_id, self.report_metrics(data), report_id=report.id)
+                stats["charts"] += len(charts)
+                stats["migrated"] += 1
+            db.commit()
+            db.expunge_all()
+        logger.info(f"旧报告迁移完成: {stats}")
+        return stats
+
+    # ==================== 统计 ====================
+
+    def aggregate_metrics(self, db: Session, names: Optional[Iterable[str]] = None,
+                          domain: Optional[str] = None, position: Optional[str] = None,
+                          since: Optional[datetime] = None) -> Dict[str, Dict[str, float]]:
+        """按指标名聚合报告指标（次数、均值、最小值、最大值）"""
+        query = select(
+            AnalysisMetric.name,
+            func.count(AnalysisMetric.value),
+            func.avg(AnalysisMetric.value),
+            func.min(AnalysisMetric.value),
+            func.max(AnalysisMetric.value)
+        ).where(AnalysisMetric.report_id.is_not(None))
+        names = list(names or [])
+        if names:
+            query = query.where(AnalysisMetric.name.in_(names))
+        if since is not None:
+            query = query.where(AnalysisMetric.recorded_at >= since)
+        if domain or position:
+            query = query.join(InterviewSession, InterviewSession.id == AnalysisMetric.session_id)
+            if domain:
+                query = query.where(InterviewSession.domain == domain)
+            if position:
+                query = query.where(InterviewSession.position == position)
+
+        return {
+            name: {"count": count, "avg": round(avg, 2), "min": minimum, "max": maximum}
+            for name, count, avg, minimum, maximum in db.execute(query.group_by(AnalysisMetric.name))
+        }
+
+    def aggregate_answer_scores(self, db: Session, columns: Optional[List[str]] = None,
+                                domain: Optional[str] = None, since: Optional[datetime] = None) -> Dict[str, Any]:
+        """按回答得分列求平均，只读取请求的列"""
+        columns = [column for column in (columns or ANSWER_SCORE_COLUMNS) if column in ANSWER_SCORE_COLUMNS]
+        if not columns:
+            return {"count": 0, "averages": {}}
+        query = select(
+            func.count(MultimodalAnalysis.id),
+            *[func.avg(getattr(MultimodalAnalysis, column)) for column in columns]
+        )
+        if since is not None:
+            query = query.where(MultimodalAnalysis.analysis_timestamp >= since)
+        if domain:
+            query = (query
+                     .join(InterviewResponse, InterviewResponse.id == MultimodalAnalysis.response_id)
+                     .join(InterviewSession, InterviewSession.id == InterviewResponse.session_id)
+                     .where(InterviewSession.domain == domain))
+
+        count, *averages = db.execute(query).one()
+        return {
+            "count": count,
+            "averages": {
+                column: round(value, 2) if value is not None else None
+                for column, value in zip(columns, averages)
+            }
+        }
+
+
+analysis_storage_service = AnalysisStorageService(blob_store)
+
+
+def get_analysis_storage_service() -> AnalysisStorageService:
+    """获取分析结果存储服务"""
+    return analysis_storage_service
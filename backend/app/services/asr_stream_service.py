@@ -0,0 +1,242 @@
+"""
+讯飞流式语音识别（原生asyncio）
+直接在事件循环上收发WebSocket帧，边上传音频边产出部分识别结果，
+全局信号量限制同时进行的识别会话数
+"""
+
+import asyncio
+import base64
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import websockets
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+AUDIO_FORMAT = "audio/L16;rate=16000"
+
+STATUS_FIRST = 0
+STATUS_CONTINUE = 1
+STATUS_LAST = 2
+
+_session_limits: Dict[int, asyncio.Semaphore] = {}
+
+
+def _session_limit() -> asyncio.Semaphore:
+    """每个事件循环一个会话信号量"""
+    loop = asyncio.get_running_loop()
+    semaphore = _session_limits.get(id(loop))
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(getattr(settings, 'asr_max_concurrent_sessions', 10))
+        _session_limits.clear()
+        _session_limits[id(loop)] = semaphore
+    return semaphore
+
+
+class TranscriptAssembler:
+    """
+    识别结果拼接
+
+    开启动态修正（dwa=wpgs）时，rpl 结果会替换 rg 范围内已返回的片段，
+    因此按片段序号 sn 保存，每次重新拼接完整文本
+    """
+
+    def __init__(self):
+        self.segments: Dict[int, str] = {}
+        self.confidences: List[float] = []
+
+    def apply(self, result: Dict[str, Any]) -> str:
+        """应用一条识别结果，返回当前完整文本"""
+        words = []
+        for ws_item in result.get("ws", []):
+            candidates = ws_item.get("cw", [])
+            if candidates:
+                words.append(candidates[0].get("w", ""))
+                score = candidates[0].get("sc")
+                if isinstance(score, (int, float)) and score > 0:
+                    self.confidences.append(float(score))
+
+        if result.get("pgs") == "rpl" and result.get("rg"):
+            start, end = result["rg"][0], result["rg"][-1]
+            for sn in range(start, end + 1):
+                self.segments.pop(sn, None)
+
+        self.segments[result.get("sn", len(self.segments) + 1)] = "".join(words)
+        return self.text
+
+    @property
+    def text(self) -> str:
+        return "".join(self.segments[sn] for sn in sorted(self.segments))
+
+    @property
+    def confidence(self) -> float:
+        return round(sum(self.confidences) / len(self.confidences), 3) if self.confidences else 0.0
+
+
+class ASRStreamSession:
+    """
+    单次流式识别会话
+
+    用法：
+        async with asr_service.open_stream() as session:
+            await session.send(chunk)      # 音频到达时随时发送
+            async for partial in session.partials():
+                ...
+            await session.end()
+            result = await session.result()
+    """
+
+    def __init__(self, url: str, app_id: str, frame_bytes: Optional[int] = None,
+                 business: Optional[Dict[str, Any]] = None):
+        self.url = url
+        self.app_id = app_id
+        self.frame_bytes = frame_bytes or getattr(settings, 'asr_frame_bytes', 8000)
+        self.business = {
+            "language": "zh_cn",
+            "domain": "iat",
+            "accent": "mandarin",
+            "vinfo": 1,
+            "dwa": "wpgs",
+            "vad_eos": 10000,
+            **(business or {})
+        }
+
+        self.transcript = TranscriptAssembler()
+        self.error: Optional[str] = None
+        self.bytes_sent = 0
+
+        self._websocket = None
+        self._receiver: Optional[asyncio.Task] = None
+        self._partials: asyncio.Queue = asyncio.Queue()
+        self._done = asyncio.Event()
+        self._first_frame = True
+        self._ended = False
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def closed_by_server(self) -> bool:
+        """服务端已结束会话（静音超过 vad_eos 或达到单次识别时长上限），客户端尚未发送结束帧"""
+        return self._done.is_set() and not self._ended
+
+    async def __aenter__(self) -> "ASRStreamSession":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """占用会话名额并建立连接"""
+        self._semaphore = _session_limit()
+        await self._semaphore.acquire()
+        try:
+            self._websocket = await websockets.connect(
+                self.url, open_timeout=getattr(settings, 'iflytek_connection_timeout', 10),
+                max_size=None
+            )
+        except BaseException:
+            self._semaphore.release()
+            self._semaphore = None
+            raise
+        self._receiver = asyncio.create_task(self._receive())
+
+    async def send(self, audio: bytes):
+        """发送一段音频，超过单帧大小时自动切分"""
+        if self._ended:
+            raise RuntimeError("识别会话已结束，不能继续发送音频")
+        for offset in range(0, len(audio), self.frame_bytes):
+            await self._send_frame(audio[offset:offset + self.frame_bytes], STATUS_CONTINUE)
+
+    async def end(self):
+        """发送结束帧，之后等待服务端返回最终结果"""
+        if not self._ended:
+            await self._send_frame(b"", STATUS_LAST)
+            self._ended = True
+
+    async def _send_frame(self, audio: bytes, status: int):
+        if self._done.is_set():
+            return
+        frame: Dict[str, Any] = {
+            "data": {
+                "status": STATUS_FIRST if self._first_frame and status != STATUS_LAST else status,
+                "format": AUDIO_FORMAT,
+                "audio": base64.b64encode(audio).decode(),
+                "encoding": "raw"
+            }
+        }
+        if self._first_frame:
+            frame["common"] = {"app_id": self.app_id}
+            frame["business"] = self.business
+            self._first_frame = False
+        await self._websocket.send(json.dumps(frame))
+        self.bytes_sent += len(audio)
+
+    async def _receive(self):
+        try:
+            async for message in self._websocket:
+                data = json.loads(message)
+                if data.get("code", 0) != 0:
+                    self.error = f"识别错误: {data.get('code')}, {data.get('message', '')}"
+                    logger.error(self.error)
+                    break
+
+                payload = data.get("data") or {}
+                if payload.get("result"):
+                    text = self.transcript.apply(payload["result"])
+                    self._partials.put_nowait({"text": text, "is_final": payload.get("status") == STATUS_LAST})
+                if payload.get("status") == STATUS_LAST:
+                    break
+        except websockets.exceptions.ConnectionClosed as e:
+            if not self._ended:
+                self.error = f"识别连接意外关闭: {e}"
+        except Exception as e:
+            self.error = f"解析识别结果失败: {e}"
+            logger.error(self.error)
+        finally:
+            self._done.set()
+            self._partials.put_nowait(None)
+
+    async def partials(self) -> AsyncIterator[Dict[str, Any]]:
+        """逐条产出部分识别结果（text 为截至当前的完整文本），会话结束时停止"""
+        while True:
+            item = await self._partials.get()
+            if item is None:
+                return
+            yield item
+
+    async def result(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """等待最终识别结果，超时后停止接收，partials() 随之结束"""
+        timeout = timeout or getattr(settings, 'asr_result_timeout', 30.0)
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("语音识别超时")
+            self.error = self.error or "语音识别超时"
+            await self._stop_receiver()
+
+        result = {"text": self.transcript.text, "confidence": self.transcript.confidence}
+        if self.error:
+            result["error"] = self.error
+        return result
+
+    async def _stop_receiver(self):
+        """取消接收任务（其 finally 会标记会话结束并结束 partials()）"""
+        if self._receiver is not None and not self._receiver.done():
+            self._receiver.cancel()
+            try:
+                await self._receiver
+            except asyncio.CancelledError:
+                pass
+
+    async def close(self):
+        """关闭连接并释放会话名额"""
+        await self._stop_receiver()
+        if self._websocket is not None:
+            await self._websocket.close()
+            self._websocket = None
+        if self._semaphore is not None:
+            self._semaphore.release()
+            self._semaphore = None
@@ -0,0 +1,183 @@
+"""
+音频特征提取
+一次解码PCM（np.frombuffer零拷贝），向量化计算分帧音量、静音段、自相关基频和语音活动（VAD），
+结果按音频内容哈希缓存，同一段音频的多个特征共用一次计算
+"""
+
+import hashlib
+import logging
+import struct
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from ..core.cache import LRUCache
+from .voice_activity_detector import detect_voice_activity
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_RATE = 16000
+VOLUME_FRAME_SECONDS = 0.1   # 音量统计的帧长
+PITCH_FRAME_SECONDS = 0.04   # 基频估计的帧长
+PITCH_MIN_HZ = 60
+PITCH_MAX_HZ = 400
+PITCH_MAX_FRAMES = 200       # 参与基频估计的最大帧数
+VOICING_THRESHOLD = 0.3      # 归一化自相关峰值低于此值视为清音/噪声
+SILENCE_RATIO = 0.1          # 低于平均音量10%视为静音
+
+_feature_cache = LRUCache(max_entries=64, ttl_seconds=600)
+
+
+def decode_pcm(audio_data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    将音频字节解码为int16采样（只读视图，不复制）
+
+    WAV文件按头部信息定位data块并取第一声道，其余按16kHz/16bit/单声道PCM处理
+    """
+    sample_rate, channels, offset, length = DEFAULT_SAMPLE_RATE, 1, 0, len(audio_data)
+
+    if len(audio_data) >= 12 and audio_data[:4] == b"RIFF" and audio_data[8:12] == b"WAVE":
+        position = 12
+        bits = 16
+        while position + 8 <= len(audio_data):
+            chunk_id = audio_data[position:position + 4]
+            chunk_size = struct.unpack_from("<I", audio_data, position + 4)[0]
+            body = position + 8
+            if chunk_id == b"fmt " and chunk_size >= 16:
+                channels, sample_rate = struct.unpack_from("<HI", audio_data, body + 2)
+                bits = struct.unpack_from("<H", audio_data, body + 14)[0]
+            elif chunk_id == b"data":
+                offset, length = body, min(chunk_size, len(audio_data) - body)
+                break
+            position = body + chunk_size + (chunk_size & 1)
+        if bits != 16:
+            logger.warning(f"不支持的WAV位深 {bits}，按16位PCM处理")
+        channels = max(1, channels)
+
+    samples = np.frombuffer(audio_data, dtype="<i2", count=length // 2, offset=offset)
+    if channels > 1:
+        samples = samples[::channels]
+    return samples, sample_rate or DEFAULT_SAMPLE_RATE
+
+
+def frame_rms(samples: np.ndarray, frame_size: int) -> np.ndarray:
+    """按固定帧长计算RMS，最后一帧不足帧长时按实际长度计算"""
+    if samples.size == 0:
+        return np.zeros(0)
+    starts = np.arange(0, samples.size, frame_size)
+    sums = np.add.reduceat(np.square(samples, dtype=np.float64), starts)
+    lengths = np.diff(np.append(starts, samples.size))
+    return np.sqrt(sums / lengths)
+
+
+def silence_runs(silent: np.ndarray) -> np.ndarray:
+    """返回连续静音帧段的长度（帧数）"""
+    if silent.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    edges = np.diff(np.concatenate(([0], silent.astype(np.int8), [0])))
+    return np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+
+def estimate_pitch(samples: np.ndarray, sample_rate: int, silence_threshold: float) -> Dict[str, float]:
+    """
+    自相关法估计基频
+
+    取非静音帧（最多 PITCH_MAX_FRAMES 帧，均匀抽样），用FFT批量计算自相关，
+    在 60-400Hz 对应的时延范围内找峰值，峰值强度不足的帧视为清音
+    """
+    frame_size = int(sample_rate * PITCH_FRAME_SECONDS)
+    min_lag = max(1, sample_rate // PITCH_MAX_HZ)
+    max_lag = min(frame_size - 2, sample_rate // PITCH_MIN_HZ)
+    n_frames = samples.size // frame_size
+    empty = {"average": 0.0, "variance": 0.0, "range": 0.0, "voiced_ratio": 0.0}
+    if n_frames == 0 or max_lag <= min_lag:
+        return empty
+
+    frames = samples[:n_frames * frame_size].reshape(n_frames, frame_size)
+    energy = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    candidates = np.flatnonzero(energy > max(silence_threshold, 1.0))
+    if candidates.size == 0:
+        return empty
+    candidate_ratio = candidates.size / n_frames
+    if candidates.size > PITCH_MAX_FRAMES:
+        candidates = candidates[np.linspace(0, candidates.size - 1, PITCH_MAX_FRAMES).astype(int)]
+
+    selected = frames[candidates].astype(np.float32)
+    selected -= selected.mean(axis=1, keepdims=True)
+    spectrum = np.fft.rfft(selected, n=2 * frame_size, axis=1)
+    autocorr = np.fft.irfft(spectrum * np.conj(spectrum), axis=1)[:, :frame_size]
+    zero_lag = autocorr[:, 0]
+    valid = zero_lag > 0
+    if not np.any(valid):
+        return empty
+    autocorr = autocorr[valid] / zero_lag[valid, None]
+
+    window = autocorr[:, min_lag:max_lag + 1]
+    peak = np.argmax(window, axis=1)
+    strength = window[np.arange(window.shape[0]), peak]
+    voiced = strength >= VOICING_THRESHOLD
+    if not np.any(voiced):
+        return empty
+
+    # 抛物线插值细化峰值位置
+    lag = peak[voiced] + min_lag
+    rows = np.flatnonzero(voiced)
+    left = autocorr[rows, lag - 1]
+    center = autocorr[rows, lag]
+    right = autocorr[rows, lag + 1]
+    denominator = left - 2 * center + right
+    shift = np.where(np.abs(denominator) > 1e-12, 0.5 * (left - right) / denominator, 0.0)
+    f0 = sample_rate / (lag + np.clip(shift, -0.5, 0.5))
+
+    return {
+        "average": round(float(np.mean(f0)), 1),
+        "variance": round(float(np.var(f0)), 1),
+        "range": round(float(np.ptp(f0)), 1),
+        "voiced_ratio": round(float(voiced.mean()) * candidate_ratio, 3)
+    }
+
+
+def _compute_features(audio_data: bytes) -> Dict[str, Any]:
+    samples, sample_rate = decode_pcm(audio_data)
+    duration = samples.size / sample_rate if sample_rate else 0.0
+
+    rms = frame_rms(samples, max(1, int(sample_rate * VOLUME_FRAME_SECONDS)))
+    if rms.size:
+        average = float(rms.mean())
+        volume = {
+            "average": round(average, 2),
+            "variance": round(float(rms.var()), 2),
+            "max": round(float(rms.max()), 2),
+            "min": round(float(rms.min()), 2)
+        }
+    else:
+        average = 0.0
+        volume = {"average": 0, "variance": 0, "max": 0, "min": 0}
+
+    silence_threshold = average * SILENCE_RATIO
+    silent = rms < silence_threshold
+    runs = silence_runs(silent)
+
+    return {
+        "duration": duration,
+        "sample_rate": sample_rate,
+        "volume": volume,
+        "silence": {
+            "threshold": round(silence_threshold, 2),
+            "silent_ratio": round(float(silent.mean()), 3) if silent.size else 0.0,
+            "runs": int(runs.size),
+            "longest_run": round(float(runs.max()) * VOLUME_FRAME_SECONDS, 2) if runs.size else 0.0
+        },
+        "pitch": estimate_pitch(samples, sample_rate, silence_threshold),
+        "vad": detect_voice_activity(samples, sample_rate)
+    }
+
+
+def extract_audio_features(audio_data: bytes) -> Dict[str, Any]:
+    """提取音频特征，同一段音频只计算一次"""
+    key = hashlib.blake2b(audio_data, digest_size=16).hexdigest()
+    features = _feature_cache.get(key)
+    if features is None:
+        features = _compute_features(audio_data)
+        _feature_cache.set(key, features)
+    return features
@@ -0,0 +1,405 @@
+"""
+批量重新评分服务
+调整评分权重后对历史数据重新打分，分两个阶段，每个阶段都按主键分页读取、分批分发到工作进程评分、
+每页的结果在一个事务里批量写回，并统计吞吐量：
+1. 回答：TextAnalysisService 的文本维度得分写回 multimodal_analysis 表
+2. 报告：用第1阶段的得分和回答文本重新计算 CapabilityEvaluator 的六项能力得分，
+   和详细分析，更新每个会话最新的 evaluation_reports 记录（得分列、建议、详细分析、雷达图和指标行）
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..core.lazy_import import lazy_attribute
+from ..models.database import (
+    EvaluationReport,
+    InterviewQuestion,
+    InterviewResponse,
+    InterviewSession,
+    MultimodalAnalysis,
+    SessionLocal
+)
+from .analysis_storage_service import analysis_from_record, analysis_storage_service
+from .scoring_tasks import warm_up_worker
+from .text_analysis_service import text_analysis_service
+
+logger = logging.getLogger(__name__)
+
+# 评估服务（连同报告绘图）只在报告阶段用到，与 main 共用同一个延迟代理，导入本模块时不加载
+evaluation_service = lazy_attribute(".evaluation_service", "evaluation_service", __package__)
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_CHUNK_SIZE = 50   # 每个进程任务包含的回答数，摊薄进程间通信开销
+REPORT_CHUNK_SIZE = 5     # 每个进程任务包含的会话数（每个会话包含全部回答并生成雷达图）
+
+
+class RescoreJobRunningError(RuntimeError):
+    """已有重新评分任务在运行"""
+
+
+def score_response(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """对单条回答重新计算文本维度得分，空回答或分析失败返回 None"""
+    result = text_analysis_service.analyze_response(
+        row["response_text"] or "", row["domain"] or "", row["position"] or "", row["keywords"] or None
+    )
+    if "error" in result:
+        return None
+    return {
+        "response_id": row["response_id"],
+        "content_relevance": round(result["content_relevance"]["overall_relevance"], 2),
+        "logical_structure": round(result["logical_structure"]["structure_score"], 2),
+        "keyword_coverage": round(result["keyword_coverage"].get("coverage_rate", 0.0), 2),
+        "innovation_score": round(result["innovation_analysis"]["innovation_score"], 2)
+    }
+
+
+def score_chunk(rows: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """工作进程任务：对一批回答评分"""
+    return [score_response(row) for row in rows]
+
+
+def score_session(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    对一个会话重新计算六项能力得分和详细分析，返回报告中由回答得分决定的部分
+    （详细分析的平均值同样来自第1阶段刚写回的得分，不重新计算会以 detail.* 指标写回旧值）
+    """
+    session = SimpleNamespace(domain=payload["domain"] or "", position=payload["position"] or "")
+    capability_scores = evaluation_service.evaluator.calculate_capability_scores(payload["results"], session)
+    return {
+        "report_id": payload["report_id"],
+        **evaluation_service.build_score_sections(capability_scores, session.domain),
+        "detailed_analysis": evaluation_service._generate_detailed_analysis(payload["results"])
+    }
+
+
+def score_session_chunk(payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """工作进程任务：对一批会话重新计算能力得分"""
+    return [score_session(payload) for payload in payloads]
+
+
+def iter_response_pages(db: Session, page_size: int = DEFAULT_PAGE_SIZE, after_id: int = 0,
+                        session_ids: Optional[List[int]] = None,
+                        limit: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """按主键游标分页读取回答及其会话领域、问题关键词（不使用OFFSET，翻页代价恒定）"""
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        query = (
+            db.query(
+                InterviewResponse.id,
+                InterviewResponse.response_text,
+                InterviewSession.domain,
+                InterviewSession.position,
+                InterviewQuestion.keywords
+            )
+            .outerjoin(InterviewSession, InterviewSession.id == InterviewResponse.session_id)
+            .outerjoin(InterviewQuestion, InterviewQuestion.id == InterviewResponse.question_id)
+            .filter(InterviewResponse.id > after_id)
+        )
+        if session_ids:
+            query = query.filter(InterviewResponse.session_id.in_(session_ids))
+        rows = query.order_by(InterviewResponse.id).limit(size).all()
+        if not rows:
+            return
+        after_id = rows[-1][0]
+        if remaining is not None:
+            remaining -= len(rows)
+        yield [
+            {
+                "response_id": response_id,
+                "response_text": response_text,
+                "domain": domain,
+                "position": position,
+                "keywords": keywords
+            }
+            for response_id, response_text, domain, position, keywords in rows
+        ]
+
+
+def iter_report_pages(db: Session, page_size: int = DEFAULT_PAGE_SIZE, after_session_id: int = 0,
+                      session_ids: Optional[List[int]] = None,
+                      limit: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """
+    按会话ID游标分页读取每个会话的最新报告，以及评估器需要的输入：
+    回答文本（text_data）和每条回答最新的分析得分
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        query = (
+            db.query(EvaluationReport.session_id, func.max(EvaluationReport.id))
+            .filter(EvaluationReport.session_id > after_session_id)
+        )
+        if session_ids:
+            query = query.filter(EvaluationReport.session_id.in_(session_ids))
+        latest = query.group_by(EvaluationReport.session_id).order_by(EvaluationReport.session_id).limit(size).all()
+        if not latest:
+            return
+        after_session_id = latest[-1][0]
+        if remaining is not None:
+            remaining -= len(latest)
+
+        page_session_ids = [session_id for session_id, _ in latest]
+        sessions = {
+            session_id: (domain, position)
+            for session_id, domain, position in db.query(
+                InterviewSession.id, InterviewSession.domain, InterviewSession.position
+            ).filter(InterviewSession.id.in_(page_session_ids))
+        }
+        responses = db.query(InterviewResponse.id, InterviewResponse.session_id, InterviewResponse.response_text).filter(
+            InterviewResponse.session_id.in_(page_session_ids)
+        ).order_by(InterviewResponse.id).all()
+        analyses = {}
+        if responses:
+            for record in db.query(MultimodalAnalysis).filter(
+                MultimodalAnalysis.response_id.in_([response_id for response_id, _, _ in responses])
+            ).order_by(MultimodalAnalysis.id):
+                analyses[record.response_id] = record
+
+        results = {session_id: [] for session_id in page_session_ids}
+        for response_id, session_id, response_text in responses:
+            record = analyses.get(response_id)
+            result = analysis_from_record(record) if record is not None else {"response_id": response_id}
+            result["text_data"] = response_text or ""
+            results[session_id].append(result)
+
+        yield [
+            {
+                "report_id": report_id,
+                "session_id": session_id,
+                "domain": sessions.get(session_id, (None, None))[0],
+                "position": sessions.get(session_id, (None, None))[1],
+                "results": results[session_id]
+            }
+            for session_id, report_id in latest
+        ]
+
+
+def write_scores(db: Session, scores: List[Dict[str, Any]]) -> Dict[str, int]:
+    """在一个事务里批量写回得分：已有分析记录的更新，没有的新建"""
+    if not scores:
+        return {"updated": 0, "inserted": 0}
+    by_response = {score["response_id"]: score for score in scores}
+    existing = db.query(MultimodalAnalysis.id, MultimodalAnalysis.response_id).filter(
+        MultimodalAnalysis.response_id.in_(list(by_response))
+    ).all()
+
+    now = datetime.utcnow()
+    updates = []
+    for analysis_id, response_id in existing:
+        score = by_response.pop(response_id, None)
+        if score is not None:
+            updates.append({**score, "id": analysis_id, "analysis_timestamp": now})
+    inserts = [{**score, "analysis_timestamp": now} for score in by_response.values()]
+
+    try:
+        db.bulk_update_mappings(MultimodalAnalysis, updates)
+        db.bulk_insert_mappings(MultimodalAnalysis, inserts)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return {"updated": len(updates), "inserted": len(inserts)}
+
+
+def write_reports(db: Session, sections: List[Dict[str, Any]]) -> int:
+    """在一个事务里更新报告：得分列、优劣势、建议、等级、详细分析、雷达图和指标行，返回更新的报告数"""
+    if not sections:
+        return 0
+    reports = {
+        report.id: report
+        for report in db.query(EvaluationReport).filter(
+            EvaluationReport.id.in_([section["report_id"] for section in sections])
+        )
+    }
+    rescored_at = datetime.now().isoformat()
+    try:
+        for section in sections:
+            report = reports.get(section["report_id"])
+            if report is None:
+                continue
+            data = analysis_storage_service.load_report_data(report, include_charts=False)
+            data.pop("artifacts", None)
+            data.update({key: value for key, value in section.items() if key != "report_id"})
+            data["rescored_at"] = rescored_at
+            analysis_storage_service.update_report(db, report, data, **evaluation_service.report_columns(data))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(reports)
+
+
+class BatchRescoringService:
+    """批量重新评分（命令行和后台任务共用）"""
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def rescore(self, page_size: int = DEFAULT_PAGE_SIZE, workers: Optional[int] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE, session_ids: Optional[List[int]] = None,
+                limit: Optional[int] = None, dry_run: bool = False, reports: bool = True,
+                progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        重新评分全部（或指定会话的）回答，再重新计算这些会话的能力评估报告
+        :param workers: 工作进程数，0 表示在当前进程计算，None 表示按CPU核数（不超过CPU核数）
+        :param limit: 每个阶段最多处理的回答数 / 报告数
+        :param dry_run: 只评分不写库
+        :param reports: 是否重新计算能力评估报告
+        :param progress: 每写完一页回调一次，参数为当前统计
+        """
+        stats = {
+            "rows_read": 0,
+            "scored": 0,
+            "skipped": 0,
+            "updated": 0,
+            "inserted": 0,
+            "reports_read": 0,
+            "reports_updated": 0,
+            "orphans_removed": 0,
+            "pages": 0,
+            "elapsed": 0.0,
+            "rows_per_second": 0.0
+        }
+        start = time.perf_counter()
+        cpu_count = os.cpu_count() or 1
+        workers = cpu_count if workers is None else min(workers, cpu_count)
+        db = self.session_factory()
+        # 使用spawn启动工作进程：后台任务运行在多线程的服务进程中，fork可能复制其他线程持有的锁
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=get_context("spawn"), initializer=warm_up_worker
+        ) if workers > 0 else None
+
+        def page_done():
+            stats["pages"] += 1
+            stats["elapsed"] = round(time.perf_counter() - start, 3)
+            stats["rows_per_second"] = round(stats["rows_read"] / stats["elapsed"], 1) if stats["elapsed"] else 0.0
+            if progress:
+                progress(dict(stats))
+
+        def finish_responses(page_rows, results):
+            scores = [score for score in results if score is not None]
+            stats["scored"] += len(scores)
+            stats["skipped"] += page_rows - len(scores)
+            if not dry_run:
+                written = write_scores(db, scores)
+                stats["updated"] += written["updated"]
+                stats["inserted"] += written["inserted"]
+            page_done()
+
+        def finish_reports(page_rows, sections):
+            if not dry_run:
+                stats["reports_updated"] += write_reports(db, sections)
+            page_done()
+
+        try:
+            for page in self._run_pages(pool, workers, iter_response_pages(db, page_size, session_ids=session_ids, limit=limit),
+                                        score_chunk, chunk_size, finish_responses):
+                stats["rows_read"] += len(page)
+            if reports:
+                # 每个会话带有全部回答，报告阶段的页按会话数缩小
+                report_pages = iter_report_pages(db, max(1, page_size // 10), session_ids=session_ids, limit=limit)
+                for page in self._run_pages(pool, workers, report_pages, score_session_chunk, REPORT_CHUNK_SIZE,
+                                            finish_reports):
+                    stats["reports_read"] += len(page)
+                if stats["reports_updated"]:
+                    # 重新生成的雷达图替换了旧图表，清理不再被引用的旧对象
+                    stats["orphans_removed"] = analysis_storage_service.sweep_orphans(db)["removed"]
+        finally:
+            if pool:
+                pool.shutdown(wait=True, cancel_futures=True)
+            db.close()
+
+        stats["elapsed"] = round(time.perf_counter() - start, 3)
+        stats["rows_per_second"] = round(stats["rows_read"] / stats["elapsed"], 1) if stats["elapsed"] else 0.0
+        logger.info(f"批量重新评分完成: {stats}")
+        return stats
+
+    @staticmethod
+    def _run_pages(pool: Optional[ProcessPoolExecutor], workers: int, pages: Iterator[List[Dict[str, Any]]],
+                   task: Callable[[List[Dict[str, Any]]], List[Any]], chunk_size: int,
+                   finish: Callable[[int, List[Any]], None]) -> Iterator[List[Dict[str, Any]]]:
+        """
+        读下一页、工作进程评分、写回上一页三者重叠进行，每读入一页 yield 一次
+        在途任务数上限至少容纳两页，写回一页时后面的页仍在评分；同时有上限，避免一次读入全表
+        """
+        in_flight = deque()
+        pending_chunks = 0
+        max_in_flight = None
+
+        def finish_oldest():
+            page_rows, futures = in_flight.popleft()
+            results = []
+            for future in futures:
+                results.extend(future.result() if pool else future)
+            finish(page_rows, results)
+            return len(futures)
+
+        for page in pages:
+            yield page
+            chunks = [page[i:i + chunk_size] for i in range(0, len(page), chunk_size)]
+            if max_in_flight is None:
+                max_in_flight = max(workers * 2, len(chunks) * 2)
+            if pool:
+                futures = [pool.submit(task, chunk) for chunk in chunks]
+            else:
+                futures = [task(chunk) for chunk in chunks]
+            in_flight.append((len(page), futures))
+            pending_chunks += len(futures)
+            while in_flight and pending_chunks > max_in_flight:
+                pending_chunks -= finish_oldest()
+        while in_flight:
+            finish_oldest()
+
+    def start_job(self, **options) -> Dict[str, Any]:
+        """在后台线程中执行重新评分，返回任务信息；已有任务在运行时抛出 RescoreJobRunningError"""
+        job_id = uuid.uuid4().hex[:12]
+        job = {"job_id": job_id, "status": "running", "options": options,
+               "started_at": datetime.now().isoformat(), "stats": {}}
+        with self._lock:
+            running = [existing["job_id"] for existing in self.jobs.values() if existing["status"] == "running"]
+            if running:
+                raise RescoreJobRunningError(f"重新评分任务 {running[0]} 正在运行")
+            self.jobs[job_id] = job
+
+        def update(stats):
+            job["stats"] = stats
+
+        def run():
+            try:
+                job["stats"] = self.rescore(progress=update, **options)
+                job["status"] = "completed"
+            except Exception as e:
+                logger.error(f"批量重新评分任务 {job_id} 失败: {e}")
+                job["status"] = "failed"
+                job["error"] = str(e)
+            job["finished_at"] = datetime.now().isoformat()
+
+        threading.Thread(target=run, name=f"rescore-{job_id}", daemon=True).start()
+        return dict(job)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+
+batch_rescoring_service = BatchRescoringService()
+
+
+def get_batch_rescoring_service() -> BatchRescoringService:
+    """获取批量重新评分服务"""
+    return batch_rescoring_service
@@ -3,12 +3,15 @@
 实现六大核心能力指标的详细评估算法
 """
 import re
-import jieba
 import numpy as np
 from typing import Dict, List, Any, Optional
 from collections import Counter
 import math
 
+from ..utils.keyword_matcher import KeywordMatcher, keyword_index
+from .segmentation_service import segmentation_service
+from .text_features import get_text_features
+
 class ProfessionalSkillAssessor:
     """专业技能评估器"""
     
@@ -106,14 +109,22 @@ class ProfessionalSkillAssessor:
                 "基础知识": ["电子电路", "通信原理", "网络协议", "操作系统", "数字信号处理"]
             }
         }
+
+        # 每个领域的分类词表编译为一个自动机，评分时对回答只扫描一遍
+        self.domain_matchers = {
+            domain: KeywordMatcher(categories) for domain, categories in self.domain_keywords.items()
+        }
+        for categories in self.domain_keywords.values():
+            for keywords in categories.values():
+                segmentation_service.add_words(keywords)
     
     def assess_professional_skill(self, text: str, domain: str, position: str) -> Dict[str, Any]:
         """评估专业技能水平 - 增强版本"""
         if domain not in self.domain_keywords:
             return {"error": "不支持的技术领域"}
 
-        # 分词处理
-        words = list(jieba.cut(text))
+        # 分词处理（与其他评估器共用同一次分词结果）
+        words = list(get_text_features(text).tokens)
         word_count = len(words)
 
         # 计算专业词汇覆盖率
@@ -123,18 +134,14 @@ class ProfessionalSkillAssessor:
         total_keywords = 0
         difficulty_weighted_score = 0.0
 
+        found_by_category = self.domain_matchers[domain].found_by_category(text)
         for category, keywords in domain_words.items():
-            found_keywords = []
-            for keyword in keywords:
-                if keyword in text:
-                    found_keywords.append(keyword)
-                    total_keywords_found += 1
+            found_keywords = found_by_category[category]
+            total_keywords_found += len(found_keywords)
+            total_keywords += len(keywords)
 
-                    # 根据难度等级加权
-                    difficulty_weight = self._get_difficulty_weight(category)
-                    difficulty_weighted_score += difficulty_weight
-
-                total_keywords += 1
+            # 根据难度等级加权
+            difficulty_weighted_score += self._get_difficulty_weight(category) * len(found_keywords)
 
             coverage_scores[category] = {
                 "found_keywords": found_keywords,
@@ -172,8 +179,10 @@ class ProfessionalSkillAssessor:
             difficulty_bonus * 10              # 难度加成
         )
 
+        professional_score = min(100, max(0, professional_score))
         return {
-            "overall_score": min(100, max(0, professional_score)),
+            "overall_score": professional_score,
+            "professional_score": professional_score,
             "coverage_scores": coverage_scores,
             "detailed_scores": {
                 "vocabulary_coverage": overall_coverage,
@@ -207,6 +216,68 @@ class ProfessionalSkillAssessor:
                 return level
         return "基础"
 
+    def _calculate_enhanced_professional_accuracy(self, text: str, words: List[str], domain: str) -> float:
+        """计算专业表达准确性（表述准确性 + 领域核心术语使用）"""
+        accuracy_score = self._calculate_professional_accuracy(text, words)
+        core_terms = self.domain_keywords.get(domain, {}).get("核心技术", [])
+        core_found = keyword_index.count(text, core_terms) if core_terms else 0
+        return min(100, accuracy_score + core_found * 5)
+
+    def _calculate_enhanced_innovation_thinking(self, text: str, domain: str) -> float:
+        """计算创新思维体现（创新表述 + 高级概念的使用）"""
+        innovation_score = self._calculate_innovation_thinking(text)
+        advanced_terms = self.domain_keywords.get(domain, {}).get("高级概念", [])
+        advanced_found = keyword_index.count(text, advanced_terms) if advanced_terms else 0
+        return min(100, innovation_score + advanced_found * 5)
+
+    def _get_position_requirements(self, position: str, domain: str) -> Dict[str, List[str]]:
+        """获取职位技能要求，未配置的职位按领域对应的工程师岗位处理"""
+        if position in self.position_requirements:
+            return self.position_requirements[position]
+        domain_positions = {"人工智能": "AI工程师", "大数据": "大数据工程师", "物联网": "物联网工程师"}
+        return self.position_requirements.get(domain_positions.get(domain, ""), {})
+
+    def _calculate_position_match_score(self, text: str, position: str, domain: str) -> float:
+        """计算职位匹配度：必备技能权重最高，其次是加分技能和基础知识"""
+        requirements = self._get_position_requirements(position, domain)
+        if not requirements:
+            return 0.0
+
+        lowered = text.lower()
+        weights = {"必备技能": 0.5, "加分技能": 0.3, "基础知识": 0.2}
+        match_score = 0.0
+        for level, skills in requirements.items():
+            found = sum(1 for skill in skills if skill.lower() in lowered)
+            match_score += weights.get(level, 0.2) * (found / len(skills) * 100 if skills else 0)
+        return min(100, match_score)
+
+    def _calculate_practical_experience_score(self, text: str, domain: str) -> float:
+        """计算实践经验体现"""
+        experience_keywords = [
+            "项目", "负责", "实现", "开发", "部署", "上线", "实践", "落地",
+            "生产环境", "优化", "调优", "排查", "解决", "经验"
+        ]
+        experience_count = keyword_index.count(text, experience_keywords)
+
+        # 量化成果（数字、百分比）说明经验更具体
+        quantified = len(re.findall(r'\d+(?:\.\d+)?\s*(?:%|倍|万|千|个|ms|秒)', text))
+
+        return min(100, experience_count * 10 + quantified * 10)
+
+    def _generate_skill_recommendations(self, coverage_scores: Dict[str, Dict[str, Any]], position: str,
+                                        domain: str) -> List[str]:
+        """根据各分类的关键词覆盖率和职位要求生成专业技能提升建议"""
+        recommendations = []
+        for category, scores in coverage_scores.items():
+            if scores["coverage_rate"] < 20:
+                recommendations.append(f"加强{category}方面的知识储备（{scores['difficulty_level']}难度）")
+
+        requirements = self._get_position_requirements(position, domain)
+        required_skills = requirements.get("必备技能", [])
+        if required_skills:
+            recommendations.append(f"重点掌握岗位必备技能：{'、'.join(required_skills[:3])}")
+        return recommendations[:5]
+
     def _calculate_enhanced_technical_depth(self, text: str, domain_words: Dict, domain: str) -> float:
         """计算增强的技术深度分数"""
         try:
@@ -218,9 +289,7 @@ class ProfessionalSkillAssessor:
                 "算法复杂度", "系统设计", "技术选型", "方案对比"
             ]
 
-            for indicator in depth_indicators:
-                if indicator in text:
-                    depth_score += 10
+            depth_score += 10 * keyword_index.count(text, depth_indicators)
 
             # 检查技术细节描述
             detail_indicators = [
@@ -228,9 +297,7 @@ class ProfessionalSkillAssessor:
                 "版本差异", "兼容性", "扩展性", "可维护性"
             ]
 
-            for indicator in detail_indicators:
-                if indicator in text:
-                    depth_score += 8
+            depth_score += 8 * keyword_index.count(text, detail_indicators)
 
             # 检查实际应用场景
             application_indicators = [
@@ -238,9 +305,7 @@ class ProfessionalSkillAssessor:
                 "案例分析", "效果评估", "经验总结"
             ]
 
-            for indicator in application_indicators:
-                if indicator in text:
-                    depth_score += 12
+            depth_score += 12 * keyword_index.count(text, application_indicators)
 
             return min(100, depth_score)
 
@@ -266,7 +331,7 @@ class ProfessionalSkillAssessor:
             "源码", "底层", "核心", "关键", "技术栈", "解决方案"
         ]
         
-        depth_count = sum(1 for indicator in depth_indicators if indicator in text)
+        depth_count = keyword_index.count(text, depth_indicators)
         
         # 检查是否有具体的技术细节描述
         detail_patterns = [
@@ -283,7 +348,7 @@ class ProfessionalSkillAssessor:
         advanced_score = 0
         if "高级概念" in domain_words:
             advanced_keywords = domain_words["高级概念"]
-            advanced_score = sum(1 for keyword in advanced_keywords if keyword in text)
+            advanced_score = keyword_index.count(text, advanced_keywords)
         
         total_depth = depth_count + detail_score + advanced_score
         return min(100, total_depth * 10)  # 每个深度指标10分
@@ -299,12 +364,12 @@ class ProfessionalSkillAssessor:
         
         total_score = 0
         for category, indicators in accuracy_indicators.items():
-            found_count = sum(1 for indicator in indicators if indicator in text)
+            found_count = keyword_index.count(text, indicators)
             total_score += found_count
         
         # 检查是否有错误的技术表述（简单的否定词检查）
         error_indicators = ["不对", "错误", "不行", "不可能", "不会"]
-        error_count = sum(1 for error in error_indicators if error in text)
+        error_count = keyword_index.count(text, error_indicators)
         
         # 计算准确性得分
         accuracy_score = max(0, total_score * 5 - error_count * 10)
@@ -322,8 +387,8 @@ class ProfessionalSkillAssessor:
             "展望", "方向", "演进", "进化", "下一代"
         ]
         
-        innovation_count = sum(1 for keyword in innovation_keywords if keyword in text)
-        future_count = sum(1 for keyword in future_keywords if keyword in text)
+        innovation_count = keyword_index.count(text, innovation_keywords)
+        future_count = keyword_index.count(text, future_keywords)
         
         # 检查是否提出了具体的改进建议或新想法
         suggestion_patterns = [
@@ -396,8 +461,7 @@ class CommunicationAssessor:
     
     def _calculate_fluency(self, text: str) -> float:
         """计算语言流畅性"""
-        sentences = re.split(r'[。！？]', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        sentences = get_text_features(text).sentences("。！？")
         
         if not sentences:
             return 0
@@ -425,7 +489,7 @@ class CommunicationAssessor:
         
         structure_score = 0
         for category, indicators in structure_indicators.items():
-            if any(indicator in text for indicator in indicators):
+            if keyword_index.contains_any(text, indicators):
                 structure_score += 33.33
         
         return min(100, structure_score)
@@ -434,11 +498,11 @@ class CommunicationAssessor:
         """计算表达清晰度"""
         # 检查是否有明确的主题
         topic_indicators = ["主要", "核心", "关键", "重点", "重要", "主题"]
-        topic_score = 20 if any(indicator in text for indicator in topic_indicators) else 0
+        topic_score = 20 if keyword_index.contains_any(text, topic_indicators) else 0
         
         # 检查是否有具体例子
         example_indicators = ["例如", "比如", "举例", "具体", "实际", "案例"]
-        example_score = 30 if any(indicator in text for indicator in example_indicators) else 0
+        example_score = 30 if keyword_index.contains_any(text, example_indicators) else 0
         
         # 检查是否有数据支撑
         data_patterns = [r'\d+%', r'\d+倍', r'\d+个', r'\d+项', r'\d+年']
@@ -451,8 +515,7 @@ class CommunicationAssessor:
     
     def _calculate_vocabulary_richness(self, text: str) -> float:
         """计算词汇丰富度"""
-        words = list(jieba.cut(text))
-        words = [w for w in words if len(w) > 1]  # 过滤单字词
+        words = get_text_features(text).content_words  # 过滤单字词
         
         if not words:
             return 0
@@ -507,7 +570,7 @@ class CommunicationAssessor:
             "问题", "思考", "探讨", "分析", "深入"
         ]
         
-        engagement_count = sum(1 for indicator in engagement_indicators if indicator in text)
+        engagement_count = keyword_index.count(text, engagement_indicators)
         return min(100, engagement_count * 15)
 
 class LogicalThinkingAssessor:
@@ -560,12 +623,12 @@ class LogicalThinkingAssessor:
         
         star_score = 0
         for category, indicators in star_indicators.items():
-            if any(indicator in text for indicator in indicators):
+            if keyword_index.contains_any(text, indicators):
                 star_score += 25
         
         # 总分结构检测
         summary_indicators = ["总的来说", "综合", "整体", "全面", "总结"]
-        summary_score = 20 if any(indicator in text for indicator in summary_indicators) else 0
+        summary_score = 20 if keyword_index.contains_any(text, summary_indicators) else 0
         
         return min(100, star_score + summary_score)
     
@@ -576,22 +639,22 @@ class LogicalThinkingAssessor:
             "结果", "影响", "带来", "产生", "形成", "促使"
         ]
         
-        causality_count = sum(1 for indicator in causality_indicators if indicator in text)
+        causality_count = keyword_index.count(text, causality_indicators)
         return min(100, causality_count * 15)
     
     def _analyze_argumentation(self, text: str) -> float:
         """分析论证完整性"""
         # 论点
         viewpoint_indicators = ["认为", "观点", "看法", "主张", "立场"]
-        viewpoint_score = 30 if any(indicator in text for indicator in viewpoint_indicators) else 0
+        viewpoint_score = 30 if keyword_index.contains_any(text, viewpoint_indicators) else 0
         
         # 论据
         evidence_indicators = ["数据", "事实", "证据", "研究", "调查", "统计", "报告"]
-        evidence_score = 40 if any(indicator in text for indicator in evidence_indicators) else 0
+        evidence_score = 40 if keyword_index.contains_any(text, evidence_indicators) else 0
         
         # 论证过程
         reasoning_indicators = ["分析", "推理", "证明", "说明", "解释", "阐述"]
-        reasoning_score = 30 if any(indicator in text for indicator in reasoning_indicators) else 0
+        reasoning_score = 30 if keyword_index.contains_any(text, reasoning_indicators) else 0
         
         return viewpoint_score + evidence_score + reasoning_score
     
@@ -599,19 +662,19 @@ class LogicalThinkingAssessor:
         """分析问题解决思路"""
         # 问题识别
         problem_indicators = ["问题", "挑战", "困难", "障碍", "瓶颈"]
-        problem_score = 25 if any(indicator in text for indicator in problem_indicators) else 0
+        problem_score = 25 if keyword_index.contains_any(text, problem_indicators) else 0
         
         # 解决方案
         solution_indicators = ["解决", "方案", "办法", "策略", "措施", "方法"]
-        solution_score = 35 if any(indicator in text for indicator in solution_indicators) else 0
+        solution_score = 35 if keyword_index.contains_any(text, solution_indicators) else 0
         
         # 实施步骤
         step_indicators = ["步骤", "阶段", "过程", "流程", "计划", "安排"]
-        step_score = 25 if any(indicator in text for indicator in step_indicators) else 0
+        step_score = 25 if keyword_index.contains_any(text, step_indicators) else 0
         
         # 效果评估
         evaluation_indicators = ["评估", "检验", "验证", "测试", "效果", "结果"]
-        evaluation_score = 15 if any(indicator in text for indicator in evaluation_indicators) else 0
+        evaluation_score = 15 if keyword_index.contains_any(text, evaluation_indicators) else 0
         
         return problem_score + solution_score + step_score + evaluation_score
     
@@ -623,7 +686,7 @@ class LogicalThinkingAssessor:
             "因此", "所以", "由此", "综上", "总之"
         ]
         
-        return sum(1 for connector in connectors if connector in text)
+        return keyword_index.count(text, connectors)
     
     def _assess_reasoning_depth(self, text: str) -> float:
         """评估推理深度"""
@@ -632,20 +695,20 @@ class LogicalThinkingAssessor:
             "进一步", "更深", "详细", "具体", "全面"
         ]
         
-        depth_count = sum(1 for indicator in depth_indicators if indicator in text)
+        depth_count = keyword_index.count(text, depth_indicators)
         return min(100, depth_count * 12)
     
     def _assess_conclusion_validity(self, text: str) -> float:
         """评估结论有效性"""
         conclusion_indicators = ["结论", "总结", "综上", "因此", "最终", "总的来说"]
         
-        has_conclusion = any(indicator in text for indicator in conclusion_indicators)
+        has_conclusion = keyword_index.contains_any(text, conclusion_indicators)
         if not has_conclusion:
             return 0
         
         # 检查结论是否有支撑
         support_indicators = ["基于", "根据", "通过", "经过", "证明", "表明"]
-        has_support = any(indicator in text for indicator in support_indicators)
+        has_support = keyword_index.contains_any(text, support_indicators)
         
         return 100 if has_support else 60
 
@@ -699,8 +762,8 @@ class LearningAbilityAssessor:
             "2023", "2024", "新版本", "最新版"
         ]
 
-        update_count = sum(1 for indicator in update_indicators if indicator in text)
-        time_count = sum(1 for indicator in time_indicators if indicator in text)
+        update_count = keyword_index.count(text, update_indicators)
+        time_count = keyword_index.count(text, time_indicators)
 
         return min(100, (update_count * 12 + time_count * 8))
 
@@ -716,8 +779,8 @@ class LearningAbilityAssessor:
             "理论", "实践", "结合", "循序渐进", "由浅入深"
         ]
 
-        method_count = sum(1 for indicator in method_indicators if indicator in text)
-        systematic_count = sum(1 for indicator in systematic_indicators if indicator in text)
+        method_count = keyword_index.count(text, method_indicators)
+        systematic_count = keyword_index.count(text, systematic_indicators)
 
         return min(100, (method_count * 8 + systematic_count * 12))
 
@@ -735,8 +798,8 @@ class LearningAbilityAssessor:
             "通用", "普遍", "一般", "共同", "基础", "底层"
         ]
 
-        cross_count = sum(1 for indicator in cross_domain_indicators if indicator in text)
-        abstract_count = sum(1 for indicator in abstract_indicators if indicator in text)
+        cross_count = keyword_index.count(text, cross_domain_indicators)
+        abstract_count = keyword_index.count(text, abstract_indicators)
 
         return min(100, (cross_count * 15 + abstract_count * 10))
 
@@ -752,8 +815,8 @@ class LearningAbilityAssessor:
             "我的理解", "我的看法", "我的经验", "我需要", "我应该"
         ]
 
-        reflection_count = sum(1 for indicator in reflection_indicators if indicator in text)
-        awareness_count = sum(1 for indicator in self_awareness_indicators if indicator in text)
+        reflection_count = keyword_index.count(text, reflection_indicators)
+        awareness_count = keyword_index.count(text, self_awareness_indicators)
 
         return min(100, (reflection_count * 12 + awareness_count * 8))
 
@@ -766,7 +829,7 @@ class LearningAbilityAssessor:
 
         question_patterns = [r'\?', r'？', r'疑问', r'困惑', r'想知道']
 
-        curiosity_count = sum(1 for indicator in curiosity_indicators if indicator in text)
+        curiosity_count = keyword_index.count(text, curiosity_indicators)
         question_count = sum(1 for pattern in question_patterns if re.search(pattern, text))
 
         return min(100, (curiosity_count * 10 + question_count * 15))
@@ -778,7 +841,7 @@ class LearningAbilityAssessor:
             "面对", "应变", "转换", "切换", "多样", "不同", "各种"
         ]
 
-        adaptability_count = sum(1 for indicator in adaptability_indicators if indicator in text)
+        adaptability_count = keyword_index.count(text, adaptability_indicators)
         return min(100, adaptability_count * 12)
 
     def _assess_growth_mindset(self, text: str) -> float:
@@ -792,8 +855,8 @@ class LearningAbilityAssessor:
             "不可能", "做不到", "太难", "不会", "不行", "没办法"
         ]
 
-        growth_count = sum(1 for indicator in growth_indicators if indicator in text)
-        fixed_count = sum(1 for indicator in fixed_mindset_indicators if indicator in text)
+        growth_count = keyword_index.count(text, growth_indicators)
+        fixed_count = keyword_index.count(text, fixed_mindset_indicators)
 
         return min(100, max(0, growth_count * 10 - fixed_count * 15))
 
@@ -863,9 +926,9 @@ class StressResistanceAssessor:
             "控制", "管理", "处理", "应对", "解决", "面对", "接受"
         ]
 
-        positive_count = sum(1 for emotion in positive_emotions if emotion in text)
-        negative_count = sum(1 for emotion in negative_emotions if emotion in text)
-        stable_count = sum(1 for emotion in stable_emotions if emotion in text)
+        positive_count = keyword_index.count(text, positive_emotions)
+        negative_count = keyword_index.count(text, negative_emotions)
+        stable_count = keyword_index.count(text, stable_emotions)
 
         # 情绪稳定性得分
         stability_score = (positive_count * 8 + stable_count * 10 - negative_count * 5)
@@ -918,8 +981,8 @@ class StressResistanceAssessor:
             "计划", "准备", "预案", "备选", "替代", "应急"
         ]
 
-        coping_count = sum(1 for indicator in coping_indicators if indicator in text)
-        strategy_count = sum(1 for indicator in strategy_indicators if indicator in text)
+        coping_count = keyword_index.count(text, coping_indicators)
+        strategy_count = keyword_index.count(text, strategy_indicators)
 
         return min(100, (coping_count * 12 + strategy_count * 8))
 
@@ -935,8 +998,8 @@ class StressResistanceAssessor:
             "不太", "不是很", "不够", "缺乏", "不足", "有限"
         ]
 
-        confidence_count = sum(1 for indicator in confidence_indicators if indicator in text)
-        uncertainty_count = sum(1 for indicator in uncertainty_indicators if indicator in text)
+        confidence_count = keyword_index.count(text, confidence_indicators)
+        uncertainty_count = keyword_index.count(text, uncertainty_indicators)
 
         return min(100, max(0, confidence_count * 10 - uncertainty_count * 5))
 
@@ -947,7 +1010,7 @@ class StressResistanceAssessor:
             "客观", "分析", "思考", "考虑", "评估", "判断", "决策"
         ]
 
-        composure_count = sum(1 for indicator in composure_indicators if indicator in text)
+        composure_count = keyword_index.count(text, composure_indicators)
         return min(100, composure_count * 15)
 
     def _assess_resilience(self, text: str) -> float:
@@ -957,7 +1020,7 @@ class StressResistanceAssessor:
             "重新", "再次", "重来", "恢复", "反弹", "振作", "重振"
         ]
 
-        resilience_count = sum(1 for indicator in resilience_indicators if indicator in text)
+        resilience_count = keyword_index.count(text, resilience_indicators)
         return min(100, resilience_count * 12)
 
 class TeamworkAssessor:
@@ -1018,8 +1081,8 @@ class TeamworkAssessor:
             "我", "自己", "个人", "独自", "单独", "独立", "私人"
         ]
 
-        collaboration_count = sum(1 for indicator in collaboration_indicators if indicator in text)
-        individual_count = sum(1 for indicator in individual_indicators if indicator in text)
+        collaboration_count = keyword_index.count(text, collaboration_indicators)
+        individual_count = keyword_index.count(text, individual_indicators)
 
         # 协作意识得分（协作词汇加分，个人词汇适度减分）
         awareness_score = collaboration_count * 8 - individual_count * 2
@@ -1032,7 +1095,7 @@ class TeamworkAssessor:
             "反馈", "汇报", "通知", "告知", "分享", "传达", "表达"
         ]
 
-        coordination_count = sum(1 for indicator in coordination_indicators if indicator in text)
+        coordination_count = keyword_index.count(text, coordination_indicators)
         return min(100, coordination_count * 12)
 
     def _assess_role_adaptability(self, text: str) -> float:
@@ -1047,8 +1110,8 @@ class TeamworkAssessor:
             "根据", "按照", "依据", "结合", "考虑", "兼顾"
         ]
 
-        role_count = sum(1 for indicator in role_indicators if indicator in text)
-        adaptability_count = sum(1 for indicator in adaptability_indicators if indicator in text)
+        role_count = keyword_index.count(text, role_indicators)
+        adaptability_count = keyword_index.count(text, adaptability_indicators)
 
         return min(100, (role_count * 8 + adaptability_count * 10))
 
@@ -1063,8 +1126,8 @@ class TeamworkAssessor:
             "理解", "包容", "接受", "尊重", "倾听", "考虑"
         ]
 
-        conflict_count = sum(1 for indicator in conflict_indicators if indicator in text)
-        resolution_count = sum(1 for indicator in resolution_indicators if indicator in text)
+        conflict_count = keyword_index.count(text, conflict_indicators)
+        resolution_count = keyword_index.count(text, resolution_indicators)
 
         # 如果提到冲突但没有解决方案，得分较低
         if conflict_count > 0 and resolution_count == 0:
@@ -1097,7 +1160,7 @@ class TeamworkAssessor:
             "换位", "站在", "角度", "立场", "感受", "想法", "需要"
         ]
 
-        empathy_count = sum(1 for indicator in empathy_indicators if indicator in text)
+        empathy_count = keyword_index.count(text, empathy_indicators)
         return min(100, empathy_count * 12)
 
     def _assess_leadership_potential(self, text: str) -> float:
@@ -1107,7 +1170,7 @@ class TeamworkAssessor:
             "决策", "决定", "负责", "承担", "推动", "促进", "激励"
         ]
 
-        leadership_count = sum(1 for indicator in leadership_indicators if indicator in text)
+        leadership_count = keyword_index.count(text, leadership_indicators)
         return min(100, leadership_count * 10)
 
     def _assess_support_behavior(self, text: str) -> float:
@@ -1117,7 +1180,7 @@ class TeamworkAssessor:
             "鼓励", "激励", "赞同", "认同", "肯定", "赞赏", "表扬"
         ]
 
-        support_count = sum(1 for indicator in support_indicators if indicator in text)
+        support_count = keyword_index.count(text, support_indicators)
         return min(100, support_count * 10)
 
 # 全局服务实例
@@ -12,8 +12,10 @@ import numpy as np
 from dataclasses import dataclass
 
 from ..core.config import settings
+from ..utils.keyword_matcher import keyword_index
 from .iflytek_service import MultimodalAnalysisService
 from .enhanced_iflytek_service import get_enhanced_iflytek_service
+from ..core.rate_limiter import PRIORITY_BATCH
 
 logger = logging.getLogger(__name__)
 
@@ -180,7 +182,7 @@ class EnhancedAICapabilityService:
             
             # 关键词匹配分析
             domain_keywords = self.domain_keywords.get(domain, [])
-            keyword_matches = sum(1 for keyword in domain_keywords if keyword in text_data)
+            keyword_matches = keyword_index.count(text_data, domain_keywords)
             keyword_score = min(keyword_matches / max(len(domain_keywords) * 0.3, 1), 1.0)
             
             # 使用iFlytek Spark进行深度分析 - 增强版本
@@ -213,7 +215,9 @@ class EnhancedAICapabilityService:
             请返回JSON格式：{{"scores": {{"accuracy": 0.8, "depth": 0.7, "experience": 0.6, "frontier": 0.5, "relevance": 0.8, "logic": 0.7}}, "analysis": "详细分析", "quality_level": "high/medium/low"}}
             """
             
-            ai_analysis = await self.enhanced_iflytek_service.chat_with_spark([{"role": "user", "content": prompt}])
+            ai_analysis = await self.enhanced_iflytek_service.chat_with_spark(
+                [{"role": "user", "content": prompt}], priority=PRIORITY_BATCH
+            )
             
             # 解析AI分析结果 - 增强版本
             try:
@@ -296,7 +300,7 @@ class EnhancedAICapabilityService:
             }
 
             required_skills = position_skills.get(position, [])
-            skill_matches = sum(1 for skill in required_skills if skill in text_data)
+            skill_matches = keyword_index.count(text_data, required_skills)
             skill_score = skill_matches / max(len(required_skills), 1) if required_skills else 0.5
 
             # AI深度分析
@@ -315,7 +319,9 @@ class EnhancedAICapabilityService:
             返回JSON：{{"scores": {{"coverage": 0.8, "relevance": 0.7, "understanding": 0.6, "potential": 0.9}}, "analysis": "分析"}}
             """
 
-            ai_analysis = await self.enhanced_iflytek_service.chat_with_spark([{"role": "user", "content": prompt}])
+            ai_analysis = await self.enhanced_iflytek_service.chat_with_spark(
+                [{"role": "user", "content": prompt}], priority=PRIORITY_BATCH
+            )
 
             try:
                 ai_result = json.loads(ai_analysis.get("content", "{}"))
@@ -403,7 +409,7 @@ class EnhancedAICapabilityService:
 
             # 逻辑结构分析
             logical_words = ["首先", "其次", "然后", "最后", "因此", "所以", "由于", "因为"]
-            logical_count = sum(1 for word in logical_words if word in text_data)
+            logical_count = keyword_index.count(text_data, logical_words)
             structure_score = min(logical_count / 3, 1.0)  # 3个逻辑词为满分
 
             # AI逻辑分析
@@ -422,7 +428,9 @@ class EnhancedAICapabilityService:
             返回JSON：{{"scores": {{"structure": 0.8, "evidence": 0.7, "causality": 0.6, "conclusion": 0.9}}, "analysis": "分析"}}
             """
 
-            ai_analysis = await self.enhanced_iflytek_service.chat_with_spark([{"role": "user", "content": prompt}])
+            ai_analysis = await self.enhanced_iflytek_service.chat_with_spark(
+                [{"role": "user", "content": prompt}], priority=PRIORITY_BATCH
+            )
 
             try:
                 ai_result = json.loads(ai_analysis.get("content", "{}"))
@@ -459,7 +467,7 @@ class EnhancedAICapabilityService:
 
             # 创新关键词分析
             innovation_words = ["创新", "改进", "优化", "新方法", "突破", "创造", "发明", "独特", "原创"]
-            innovation_count = sum(1 for word in innovation_words if word in text_data)
+            innovation_count = keyword_index.count(text_data, innovation_words)
             keyword_score = min(innovation_count / 2, 1.0)  # 2个创新词为满分
 
             # AI创新分析
@@ -478,7 +486,9 @@ class EnhancedAICapabilityService:
             返回JSON：{{"scores": {{"uniqueness": 0.8, "innovation": 0.7, "foresight": 0.6, "practicality": 0.9}}, "analysis": "分析"}}
             """
 
-            ai_analysis = await self.enhanced_iflytek_service.chat_with_spark([{"role": "user", "content": prompt}])
+            ai_analysis = await self.enhanced_iflytek_service.chat_with_spark(
+                [{"role": "user", "content": prompt}], priority=PRIORITY_BATCH
+            )
 
             try:
                 ai_result = json.loads(ai_analysis.get("content", "{}"))
@@ -531,7 +541,7 @@ class EnhancedAICapabilityService:
             if text_data:
                 # 检查消极词汇
                 negative_words = ["紧张", "困难", "不会", "不懂", "害怕", "担心"]
-                negative_count = sum(1 for word in negative_words if word in text_data)
+                negative_count = keyword_index.count(text_data, negative_words)
                 text_score = max(1.0 - negative_count * 0.2, 0.0)
 
             final_score = (audio_score * 0.4 + video_score * 0.4 + text_score * 0.2)
@@ -10,6 +10,8 @@ from datetime import datetime
 import math
 
 from ..core.config import settings
+from ..utils.keyword_matcher import keyword_index
+from .text_features import get_text_features
 
 logger = logging.getLogger(__name__)
 
@@ -1424,15 +1426,15 @@ class EnhancedCapabilityEvaluator:
         total_score = 0.0
 
         # 基础术语 (权重0.3)
-        basic_found = sum(1 for kw in keywords["基础"] if kw in text)
+        basic_found = keyword_index.count(text, keywords["基础"])
         basic_score = min(1.0, basic_found / len(keywords["基础"])) * 0.3
 
         # 进阶术语 (权重0.4)
-        advanced_found = sum(1 for kw in keywords["进阶"] if kw in text)
+        advanced_found = keyword_index.count(text, keywords["进阶"])
         advanced_score = min(1.0, advanced_found / len(keywords["进阶"])) * 0.4
 
         # 高级术语 (权重0.3)
-        expert_found = sum(1 for kw in keywords["高级"] if kw in text)
+        expert_found = keyword_index.count(text, keywords["高级"])
         expert_score = min(1.0, expert_found / len(keywords["高级"])) * 0.3
 
         total_score = basic_score + advanced_score + expert_score
@@ -1446,11 +1448,11 @@ class EnhancedCapabilityEvaluator:
             "性能", "效率", "扩展", "可靠性", "安全性"
         ]
 
-        found_indicators = sum(1 for indicator in depth_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, depth_indicators)
         depth_score = min(1.0, found_indicators / len(depth_indicators))
 
         # 结合句子复杂度
-        sentences = [s.strip() for s in text.split('。') if s.strip()]
+        sentences = get_text_features(text).sentences("。")
         avg_sentence_length = sum(len(s) for s in sentences) / max(1, len(sentences))
         complexity_score = min(1.0, avg_sentence_length / 50)  # 50字为基准
 
@@ -1466,7 +1468,7 @@ class EnhancedCapabilityEvaluator:
             "不确定", "可能", "大概", "应该是", "估计", "猜测"
         ]
 
-        error_count = sum(1 for pattern in error_patterns if pattern in text)
+        error_count = keyword_index.count(text, error_patterns)
         confidence_score = max(0.0, 1.0 - error_count * 0.2)
 
         return confidence_score
@@ -1478,7 +1480,7 @@ class EnhancedCapabilityEvaluator:
             "维护", "调试", "问题", "解决", "优化", "改进"
         ]
 
-        found_indicators = sum(1 for indicator in experience_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, experience_indicators)
         return min(1.0, found_indicators / len(experience_indicators))
 
     def _calculate_clarity_score(self, text_analysis: Dict, audio_analysis: Dict) -> float:
@@ -1555,7 +1557,7 @@ class EnhancedCapabilityEvaluator:
 
         for category, indicators in self.logic_indicators.items():
             total_indicators += len(indicators)
-            found_indicators += sum(1 for indicator in indicators if indicator in text)
+            found_indicators += keyword_index.count(text, indicators)
 
         return min(1.0, found_indicators / max(1, total_indicators))
 
@@ -1567,30 +1569,30 @@ class EnhancedCapabilityEvaluator:
             "一方面", "另一方面", "例如", "比如", "具体来说"
         ]
 
-        found_words = sum(1 for word in structure_words if word in text)
+        found_words = keyword_index.count(text, structure_words)
         return min(1.0, found_words / len(structure_words))
 
     def _calculate_causality_score(self, text: str) -> float:
         """计算因果关系分析得分"""
         causality_words = self.logic_indicators["因果关系"]
-        found_words = sum(1 for word in causality_words if word in text)
+        found_words = keyword_index.count(text, causality_words)
         return min(1.0, found_words / len(causality_words))
 
     def _calculate_coherence_score(self, text: str) -> float:
         """计算思维连贯性得分"""
-        sentences = [s.strip() for s in text.split('。') if s.strip()]
+        sentences = get_text_features(text).sentences("。")
         if len(sentences) < 2:
             return 0.5
 
         # 简单的连贯性评估：检查句子间的连接
         coherence_indicators = ["这", "那", "此", "该", "上述", "以上", "如前所述"]
-        coherence_count = sum(1 for indicator in coherence_indicators if indicator in text)
+        coherence_count = keyword_index.count(text, coherence_indicators)
 
         return min(1.0, coherence_count / max(1, len(sentences) - 1))
 
     def _calculate_innovation_words_score(self, text: str) -> float:
         """计算创新词汇得分"""
-        found_words = sum(1 for word in self.innovation_indicators if word in text)
+        found_words = keyword_index.count(text, self.innovation_indicators)
         return min(1.0, found_words / len(self.innovation_indicators))
 
     def _calculate_solution_innovation_score(self, text: str) -> float:
@@ -1600,7 +1602,7 @@ class EnhancedCapabilityEvaluator:
             "突破性", "革命性", "颠覆性", "前沿技术", "新兴技术"
         ]
 
-        found_phrases = sum(1 for phrase in innovation_phrases if phrase in text)
+        found_phrases = keyword_index.count(text, innovation_phrases)
         return min(1.0, found_phrases / len(innovation_phrases))
 
     def _calculate_divergent_thinking_score(self, text: str) -> float:
@@ -1610,7 +1612,7 @@ class EnhancedCapabilityEvaluator:
             "多角度", "多方面", "综合考虑", "全面分析"
         ]
 
-        found_indicators = sum(1 for indicator in divergent_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, divergent_indicators)
         return min(1.0, found_indicators / len(divergent_indicators))
 
     def _calculate_forward_thinking_score(self, text: str) -> float:
@@ -1620,12 +1622,12 @@ class EnhancedCapabilityEvaluator:
             "长远", "可持续", "演进", "变化", "潜力"
         ]
 
-        found_indicators = sum(1 for indicator in forward_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, forward_indicators)
         return min(1.0, found_indicators / len(forward_indicators))
 
     def _calculate_learning_attitude_score(self, text: str) -> float:
         """计算学习态度得分"""
-        found_indicators = sum(1 for indicator in self.learning_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, self.learning_indicators)
         return min(1.0, found_indicators / len(self.learning_indicators))
 
     def _calculate_knowledge_integration_score(self, text: str) -> float:
@@ -1635,7 +1637,7 @@ class EnhancedCapabilityEvaluator:
             "统一", "协调", "平衡", "兼顾"
         ]
 
-        found_indicators = sum(1 for indicator in integration_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, integration_indicators)
         return min(1.0, found_indicators / len(integration_indicators))
 
     def _calculate_self_reflection_score(self, text: str) -> float:
@@ -1645,7 +1647,7 @@ class EnhancedCapabilityEvaluator:
             "认识到", "意识到", "发现", "不足", "改进"
         ]
 
-        found_indicators = sum(1 for indicator in reflection_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, reflection_indicators)
         return min(1.0, found_indicators / len(reflection_indicators))
 
     def _calculate_improvement_awareness_score(self, text: str) -> float:
@@ -1655,12 +1657,12 @@ class EnhancedCapabilityEvaluator:
             "持续", "不断", "继续", "进一步", "更好"
         ]
 
-        found_indicators = sum(1 for indicator in improvement_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, improvement_indicators)
         return min(1.0, found_indicators / len(improvement_indicators))
 
     def _calculate_teamwork_words_score(self, text: str) -> float:
         """计算团队协作词汇得分"""
-        found_indicators = sum(1 for indicator in self.teamwork_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, self.teamwork_indicators)
         return min(1.0, found_indicators / len(self.teamwork_indicators))
 
     def _calculate_coordination_score(self, text: str) -> float:
@@ -1670,7 +1672,7 @@ class EnhancedCapabilityEvaluator:
             "配合", "合作", "同步", "对接"
         ]
 
-        found_indicators = sum(1 for indicator in coordination_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, coordination_indicators)
         return min(1.0, found_indicators / len(coordination_indicators))
 
     def _calculate_leadership_score(self, text: str) -> float:
@@ -1680,7 +1682,7 @@ class EnhancedCapabilityEvaluator:
             "决策", "规划", "统筹", "协调", "推动"
         ]
 
-        found_indicators = sum(1 for indicator in leadership_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, leadership_indicators)
         return min(1.0, found_indicators / len(leadership_indicators))
 
     def _calculate_contribution_score(self, text: str) -> float:
@@ -1690,7 +1692,7 @@ class EnhancedCapabilityEvaluator:
             "奉献", "付出", "责任", "担当", "承担"
         ]
 
-        found_indicators = sum(1 for indicator in contribution_indicators if indicator in text)
+        found_indicators = keyword_index.count(text, contribution_indicators)
         return min(1.0, found_indicators / len(contribution_indicators))
 
     def _generate_evaluation_details(self, capabilities: Dict[str, float], domain: str) -> Dict[str, Any]:
@@ -1801,7 +1803,7 @@ class EnhancedCapabilityEvaluator:
 
             for level, keywords in self.domain_keywords[domain].items():
                 weight = self.technical_difficulty_weights.get(level, 1.0)
-                found_count = sum(1 for keyword in keywords if keyword in text)
+                found_count = keyword_index.count(text, keywords)
                 coverage = found_count / len(keywords) if keywords else 0
                 total_score += coverage * weight
                 total_weight += weight
@@ -1821,7 +1823,7 @@ class EnhancedCapabilityEvaluator:
             max_level_score = 0.0
 
             for level, keywords in self.domain_keywords[domain].items():
-                found_count = sum(1 for keyword in keywords if keyword in text)
+                found_count = keyword_index.count(text, keywords)
                 if found_count > 0:
                     level_weight = self.technical_difficulty_weights.get(level, 1.0)
                     coverage = found_count / len(keywords)
@@ -1838,7 +1840,7 @@ class EnhancedCapabilityEvaluator:
         """计算压力应对得分"""
         try:
             stress_indicators = self.stress_resistance_indicators["压力应对"]
-            found_count = sum(1 for indicator in stress_indicators if indicator in text)
+            found_count = keyword_index.count(text, stress_indicators)
             return found_count / len(stress_indicators)
         except Exception as e:
             logger.error(f"压力应对得分计算失败: {e}")
@@ -1848,7 +1850,7 @@ class EnhancedCapabilityEvaluator:
         """计算适应能力得分"""
         try:
             adaptability_indicators = self.stress_resistance_indicators["适应能力"]
-            found_count = sum(1 for indicator in adaptability_indicators if indicator in text)
+            found_count = keyword_index.count(text, adaptability_indicators)
             return found_count / len(adaptability_indicators)
         except Exception as e:
             logger.error(f"适应能力得分计算失败: {e}")
@@ -1859,7 +1861,7 @@ class EnhancedCapabilityEvaluator:
         try:
             # 文本情绪指标
             emotion_indicators = self.stress_resistance_indicators["情绪管理"]
-            text_score = sum(1 for indicator in emotion_indicators if indicator in text) / len(emotion_indicators)
+            text_score = keyword_index.count(text, emotion_indicators) / len(emotion_indicators)
 
             # 音频情绪分析（如果有）
             audio_score = 0.5
@@ -1877,7 +1879,7 @@ class EnhancedCapabilityEvaluator:
         """计算抗挫折能力得分"""
         try:
             resilience_indicators = self.stress_resistance_indicators["抗挫折"]
-            found_count = sum(1 for indicator in resilience_indicators if indicator in text)
+            found_count = keyword_index.count(text, resilience_indicators)
             return found_count / len(resilience_indicators)
         except Exception as e:
             logger.error(f"抗挫折能力得分计算失败: {e}")
@@ -10,6 +10,9 @@ from dataclasses import dataclass, asdict
 from datetime import datetime
 from enum import Enum
 
+from .segmentation_service import search_tokens
+from ..utils.search_index import FullTextIndex
+
 logger = logging.getLogger(__name__)
 
 class DifficultyLevel(Enum):
@@ -46,10 +49,15 @@ class TechnicalCase:
 class EnhancedCaseLibraryService:
     """增强的案例库服务"""
     
+    # 全文索引字段权重：标题和标签命中比正文命中更相关
+    SEARCH_FIELD_WEIGHTS = {"title": 2.0, "tags": 1.5, "question": 1.0, "key_points": 1.0, "expected_answer": 0.5}
+
     def __init__(self):
         self.case_library = {}
         self.domain_stats = {}
         self.difficulty_distribution = {}
+        self._cases_by_id: Dict[str, TechnicalCase] = {}
+        self._search_index: Optional[FullTextIndex] = None
         self._initialize_enhanced_cases()
         
     def _initialize_enhanced_cases(self):
@@ -325,26 +333,49 @@ class MultiHeadAttention(nn.Module):
     
     def get_case_by_id(self, case_id: str) -> Optional[TechnicalCase]:
         """根据ID获取案例"""
-        for domain_cases in self.case_library.values():
-            for case in domain_cases:
-                if case.id == case_id:
-                    return case
-        return None
+        return self._cases_by_id.get(case_id)
     
-    def search_cases(self, query: str, domain: str = None) -> List[TechnicalCase]:
-        """搜索案例"""
-        results = []
-        search_domains = [domain] if domain else self.case_library.keys()
-        
-        for search_domain in search_domains:
-            domain_cases = self.case_library.get(search_domain, [])
-            for case in domain_cases:
-                if (query.lower() in case.title.lower() or 
-                    query.lower() in case.question.lower() or
-                    any(query.lower() in tag.lower() for tag in case.tags or [])):
-                    results.append(case)
-        
-        return results
+    def _get_search_index(self) -> FullTextIndex:
+        """案例全文索引（第一次检索时建立，案例库变化后重建）"""
+        if self._search_index is None:
+            index = FullTextIndex(self.SEARCH_FIELD_WEIGHTS, search_tokens)
+            for domain, cases in self.case_library.items():
+                for case in cases:
+                    index.add(case.id, {
+                        "title": case.title,
+                        "tags": case.tags,
+                        "question": case.question,
+                        "key_points": case.key_points,
+                        "expected_answer": case.expected_answer
+                    }, domain=domain)
+            self._search_index = index
+        return self._search_index
+
+    def search_cases(self, query: str, domain: str = None, limit: int = 50) -> List[TechnicalCase]:
+        """搜索案例（标题、标签、问题、要点和参考答案的全文检索，按相关度排序）"""
+        result = self._get_search_index().search(query, {"domain": domain}, limit=limit)
+        return [self.get_case_by_id(hit.doc_id) for hit in result.hits]
+
+    def search_cases_page(self, query: str, domain: str = None, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+        """分页搜索案例，返回命中总数和带相关度得分的案例摘要"""
+        page = max(1, page)
+        result = self._get_search_index().search(query, {"domain": domain},
+                                                  offset=(page - 1) * page_size, limit=page_size)
+        items = []
+        for hit in result.hits:
+            case = self.get_case_by_id(hit.doc_id)
+            items.append({
+                "id": case.id,
+                "score": hit.score,
+                "title": case.title,
+                "domain": case.domain,
+                "difficulty": case.difficulty.value,
+                "question_type": case.question_type.value,
+                "question": case.question,
+                "key_points": case.key_points,
+                "tags": case.tags or []
+            })
+        return {"total": result.total, "page": page, "page_size": page_size, "items": items}
     
     def get_total_cases_count(self) -> int:
         """获取案例总数"""
@@ -352,6 +383,8 @@ class MultiHeadAttention(nn.Module):
     
     def _update_statistics(self):
         """更新统计信息"""
+        self._search_index = None
+        self._cases_by_id = {case.id: case for cases in self.case_library.values() for case in cases}
         self.domain_stats = {}
         self.difficulty_distribution = {}
         
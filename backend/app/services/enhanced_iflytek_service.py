@@ -11,7 +11,7 @@ import hmac
 import hashlib
 import base64
 import urllib.parse
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator
 from datetime import datetime, timedelta
 from functools import lru_cache
 import weakref
@@ -20,6 +20,9 @@ import aiohttp
 import websockets
 
 from ..core.config import Settings, IFlytekConfig
+from ..core.iflytek_manager import SparkConnectionPool
+from ..core.rate_limiter import SparkRateLimiter, PRIORITY_INTERACTIVE
+from ..core.cache import create_cache
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +31,10 @@ _connection_pools = weakref.WeakValueDictionary()
 
 # 响应缓存
 class ResponseCache:
-    """简单的响应缓存机制"""
-    def __init__(self, max_size: int = 100, ttl_seconds: int = 300):
-        self.cache = {}
+    """Spark响应缓存，按消息内容哈希，底层后端由 cache_backend 配置决定（进程内或多worker共享）"""
+    def __init__(self, max_size: int = 100, ttl_seconds: int = 300, max_bytes: Optional[int] = None):
+        self.cache = create_cache("spark_response", max_entries=max_size, ttl_seconds=ttl_seconds,
+                                  max_bytes=max_bytes)
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
 
@@ -42,29 +46,69 @@ class ResponseCache:
 
     def get(self, messages: List[Dict], **kwargs) -> Optional[Dict]:
         """获取缓存"""
-        key = self._generate_key(messages, **kwargs)
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if time.time() - timestamp < self.ttl_seconds:
-                return data
-            else:
-                del self.cache[key]
-        return None
+        return self.cache.get(self._generate_key(messages, **kwargs))
 
     def set(self, messages: List[Dict], response: Dict, **kwargs):
         """设置缓存"""
-        if len(self.cache) >= self.max_size:
-            # 删除最旧的缓存项
-            oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k][1])
-            del self.cache[oldest_key]
+        self.cache.set(self._generate_key(messages, **kwargs), response)
+
+    async def aget(self, messages: List[Dict], **kwargs) -> Optional[Dict]:
+        """异步获取缓存，共享缓存后端的读库不阻塞事件循环"""
+        return await self.cache.aget(self._generate_key(messages, **kwargs))
 
-        key = self._generate_key(messages, **kwargs)
-        self.cache[key] = (response, time.time())
+    async def aset(self, messages: List[Dict], response: Dict, **kwargs):
+        """异步设置缓存"""
+        await self.cache.aset(self._generate_key(messages, **kwargs), response)
 
     def clear(self):
         """清空缓存"""
         self.cache.clear()
 
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        return self.cache.get_stats()
+
+class SharedSparkStream:
+    """单次上游流式响应的多订阅者广播，后加入的订阅者会先补齐已到达的片段"""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def publish(self, chunk: str):
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None):
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        index = 0
+        while True:
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                if self.error:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+    async def wait_text(self) -> str:
+        """等待流式响应结束并返回完整文本"""
+        async for _ in self.subscribe():
+            pass
+        return "".join(self.chunks)
+
 class EnhancedIFlytekService:
     """增强的iFlytek Spark服务"""
 
@@ -73,12 +117,29 @@ class EnhancedIFlytekService:
         self.config = IFlytekConfig(settings)
         self.session_pool = {}
 
-        # 初始化缓存
-        self.response_cache = ResponseCache(max_size=200, ttl_seconds=600)  # 10分钟缓存
+        # 初始化缓存（按条目数和字节预算双重限制）
+        self.response_cache = ResponseCache(
+            max_size=200,
+            ttl_seconds=600,  # 10分钟缓存
+            max_bytes=getattr(settings, 'iflytek_cache_max_bytes', None)
+        )
+
+        # 在途请求合并（single-flight）：相同消息只向上游发起一次调用
+        self._inflight_calls: Dict[str, asyncio.Task] = {}
+        self._inflight_streams: Dict[str, SharedSparkStream] = {}
+
+        # 全局限流：令牌桶 + 优先级排队
+        self.rate_limiter = SparkRateLimiter(
+            rate=getattr(settings, 'iflytek_qps', 2.0),
+            burst=getattr(settings, 'iflytek_burst', 4),
+            max_concurrent=getattr(settings, 'iflytek_max_concurrent_streams', 5),
+            queue_timeout=getattr(settings, 'iflytek_queue_timeout', 30.0)
+        )
 
         # 连接池配置
         self.connector = None
         self.session = None
+        self.ws_pool = None
 
         # 健康检查
         self.health_status = {
@@ -95,6 +156,7 @@ class EnhancedIFlytekService:
             'successful_requests': 0,
             'failed_requests': 0,
             'cache_hits': 0,
+            'coalesced_requests': 0,
             'average_response_time': 0.0,
             'last_request_time': None,
             'connection_errors': 0,
@@ -147,6 +209,20 @@ class EnhancedIFlytekService:
 
         return self.session
 
+    def _get_ws_pool(self) -> SparkConnectionPool:
+        """获取或创建Spark WebSocket连接池"""
+        if self.ws_pool is None:
+            self.ws_pool = SparkConnectionPool(
+                self._build_websocket_url,
+                max_size=self.settings.iflytek_max_connections,
+                min_idle=getattr(self.settings, 'iflytek_pool_min_idle', 2),
+                max_age=getattr(self.settings, 'iflytek_pool_max_age', 240),
+                idle_timeout=self.settings.iflytek_connection_timeout,
+                probe_interval=self.settings.iflytek_heartbeat_interval,
+                requests_per_connection=getattr(self.settings, 'iflytek_pool_requests_per_connection', 1)
+            )
+        return self.ws_pool
+
     async def _ensure_session_health(self):
         """确保会话健康"""
         try:
@@ -190,6 +266,10 @@ class EnhancedIFlytekService:
             await self.connector.close()
             logger.info("iFlytek连接器已关闭")
 
+        if self.ws_pool:
+            await self.ws_pool.close()
+            self.ws_pool = None
+
         self.response_cache.clear()
         logger.info("iFlytek服务资源已清理")
 
@@ -198,6 +278,11 @@ class EnhancedIFlytekService:
         stats = self.stats.copy()
         stats['health_status'] = self.health_status.copy()
         stats['cache_size'] = len(self.response_cache.cache)
+        stats['response_cache'] = self.response_cache.get_stats()
+        if self.ws_pool:
+            stats['ws_pool'] = self.ws_pool.get_stats()
+        stats['rate_limiter'] = self.rate_limiter.get_stats()
+        stats['inflight_requests'] = len(self._inflight_calls) + len(self._inflight_streams)
         stats['success_rate'] = (
             self.stats['successful_requests'] / max(self.stats['total_requests'], 1) * 100
         )
@@ -210,6 +295,7 @@ class EnhancedIFlytekService:
             'successful_requests': 0,
             'failed_requests': 0,
             'cache_hits': 0,
+            'coalesced_requests': 0,
             'average_response_time': 0.0,
             'last_request_time': None,
             'connection_errors': 0,
@@ -271,7 +357,8 @@ class EnhancedIFlytekService:
             },
             "connection_info": {
                 "session_active": self.session is not None and not self.session.closed,
-                "connector_active": self.connector is not None and not self.connector.closed
+                "connector_active": self.connector is not None and not self.connector.closed,
+                "ws_pool": self.ws_pool.get_stats() if self.ws_pool else None
             }
         }
         
@@ -279,6 +366,8 @@ class EnhancedIFlytekService:
         """初始化服务"""
         if self.config.is_configured:
             logger.info("iFlytek Spark服务初始化成功")
+            if not self.settings.iflytek_spark_http_url:
+                await self._get_ws_pool().start()
             await self._test_connection()
         else:
             logger.warning("iFlytek配置不完整，将使用模拟模式")
@@ -352,8 +441,8 @@ class EnhancedIFlytekService:
         self.stats['rate_limit_errors'] += 1
         logger.warning(f"触发速率限制: {error}")
 
-        # 增加延迟时间
-        await asyncio.sleep(5)
+        # 暂停全局放行，所有排队请求一起退避，而不是各自重试
+        self.rate_limiter.backoff(5)
 
         return {
             "status": "error",
@@ -378,12 +467,73 @@ class EnhancedIFlytekService:
         """
         与iFlytek Spark大模型对话 - 增强版本
         支持重试机制、缓存、错误处理和性能统计
+        priority: 限流通道，interactive（默认）优先于 batch
         """
         start_time = time.time()
         self.stats['total_requests'] += 1
 
+        priority = kwargs.pop('priority', PRIORITY_INTERACTIVE)
+
+        # 检查增强缓存（命中时不占用限流名额）
+        use_cache = kwargs.get('use_cache', True)
+        if use_cache:
+            cached_response = await self.response_cache.aget(messages, **kwargs)
+            if cached_response:
+                self.stats['cache_hits'] += 1
+                logger.info("使用增强缓存响应")
+                return {
+                    **cached_response,
+                    "from_cache": True,
+                    "timestamp": datetime.now().isoformat()
+                }
+
+        # 合并相同的在途请求
+        key = self._coalesce_key(messages, kwargs)
+        shared_stream = self._inflight_streams.get(key)
+        if shared_stream is not None:
+            try:
+                content = await shared_stream.wait_text()
+                self.stats['coalesced_requests'] += 1
+                return {
+                    "content": content,
+                    "status": "success",
+                    "timestamp": datetime.now().isoformat(),
+                    "model": "spark-stream",
+                    "coalesced": True
+                }
+            except Exception as e:
+                logger.warning(f"共享流式响应失败，改为独立请求: {e}")
+
+        task = self._inflight_calls.get(key)
+        if task is not None:
+            self.stats['coalesced_requests'] += 1
+            response = await asyncio.shield(task)
+            return {**response, "coalesced": True}
+
+        # 上游调用放在独立任务中，发起方被取消时不影响等待同一结果的其他请求
+        task = asyncio.ensure_future(self._request_spark(messages, start_time, priority, **kwargs))
+        self._inflight_calls[key] = task
+        task.add_done_callback(lambda done: self._forget_inflight(self._inflight_calls, key, done))
+        return await asyncio.shield(task)
+
+    def _coalesce_key(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> str:
+        """在途请求合并键：消息哈希 + 影响生成结果的参数"""
+        generation_params = {
+            k: kwargs[k] for k in ('model', 'temperature', 'max_tokens', 'top_p') if k in kwargs
+        }
+        return self.response_cache._generate_key(messages, **generation_params)
+
+    @staticmethod
+    def _forget_inflight(registry: Dict[str, Any], key: str, value: Any):
+        if registry.get(key) is value:
+            del registry[key]
+
+    async def _request_spark(self, messages: List[Dict[str, str]], start_time: float,
+                             priority: str, **kwargs) -> Dict[str, Any]:
+        """向上游发起一次调用（含重试、统计和缓存写入）"""
         max_retries = kwargs.get('max_retries', 3)
         retry_delay = kwargs.get('retry_delay', 1)
+        use_cache = kwargs.get('use_cache', True)
 
         for attempt in range(max_retries):
             try:
@@ -392,27 +542,12 @@ class EnhancedIFlytekService:
                     logger.warning("iFlytek配置不完整，但仍尝试调用真实API")
                     # 不直接返回模拟响应，继续尝试API调用
 
-                # 速率限制
-                await self._rate_limit()
-
-                # 检查增强缓存
-                use_cache = kwargs.get('use_cache', True)
-                if use_cache:
-                    cached_response = self.response_cache.get(messages, **kwargs)
-                    if cached_response:
-                        self.stats['cache_hits'] += 1
-                        logger.info("使用增强缓存响应")
-                        return {
-                            **cached_response,
-                            "from_cache": True,
-                            "timestamp": datetime.now().isoformat()
-                        }
-
-                # 调用API
-                if self.settings.iflytek_spark_http_url:
-                    response = await self._call_http_api(messages, **kwargs)
-                else:
-                    response = await self._call_websocket_api(messages, **kwargs)
+                # 全局限流，排队等待放行
+                async with self.rate_limiter.slot(priority):
+                    if self.settings.iflytek_spark_http_url:
+                        response = await self._call_http_api(messages, **kwargs)
+                    else:
+                        response = await self._call_websocket_api(messages, **kwargs)
 
                 # 更新统计信息
                 response_time = time.time() - start_time
@@ -428,15 +563,7 @@ class EnhancedIFlytekService:
 
                 # 缓存响应到增强缓存
                 if use_cache and response.get('status') == 'success':
-                    self.response_cache.set(messages, response, **kwargs)
-
-                # 兼容旧缓存
-                if hasattr(self.settings, 'iflytek_enable_cache') and self.settings.iflytek_enable_cache:
-                    cache_key = self._generate_cache_key(messages)
-                    self.request_cache[cache_key] = {
-                        "data": response,
-                        "timestamp": time.time()
-                    }
+                    await self.response_cache.aset(messages, response, **kwargs)
 
                 return response
 
@@ -594,12 +721,14 @@ class EnhancedIFlytekService:
                         error_text = await response.text()
                         logger.warning(f"iFlytek API调用失败 (尝试 {attempt + 1}/{max_retries}): {response.status} - {error_text}")
 
-                        # 如果是最后一次尝试，抛出异常
-                        if attempt == max_retries - 1:
-                            raise aiohttp.ClientError(f"HTTP {response.status}: {error_text}")
-
-                        # 等待后重试
-                        await asyncio.sleep(retry_delay * (attempt + 1))
+                        # 抛出带状态码的异常，由调用方按状态码处理（429 交给限流器退避）
+                        raise aiohttp.ClientResponseError(
+                            response.request_info,
+                            response.history,
+                            status=response.status,
+                            message=error_text[:200],
+                            headers=response.headers
+                        )
 
             except asyncio.TimeoutError:
                 logger.warning(f"iFlytek API超时 (尝试 {attempt + 1}/{max_retries})")
@@ -607,6 +736,12 @@ class EnhancedIFlytekService:
                     raise
                 await asyncio.sleep(retry_delay * (attempt + 1))
 
+            except aiohttp.ClientResponseError as e:
+                # 429 不在这里重试：由外层触发全局退避，排队请求统一等待
+                if e.status == 429 or attempt == max_retries - 1:
+                    raise
+                await asyncio.sleep(retry_delay * (attempt + 1))
+
             except aiohttp.ClientError as e:
                 logger.warning(f"iFlytek API网络错误 (尝试 {attempt + 1}/{max_retries}): {e}")
                 if attempt == max_retries - 1:
@@ -621,55 +756,235 @@ class EnhancedIFlytekService:
     
     async def _call_websocket_api(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
         """WebSocket API调用"""
+        response_text = ""
+        async for chunk in self._stream_websocket_api(messages, **kwargs):
+            response_text += chunk
+
+        return {
+            "content": response_text,
+            "status": "success",
+            "timestamp": datetime.now().isoformat(),
+            "model": "spark-websocket"
+        }
+
+    async def _stream_websocket_api(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """WebSocket流式调用 - 逐帧返回文本片段"""
         try:
-            # 构建WebSocket URL
-            ws_url = self._build_websocket_url()
-            
             # 构建请求参数
             params = self._gen_params(messages, **kwargs)
-            
-            # 连接WebSocket
-            async with websockets.connect(
-                ws_url,
-                ping_interval=self.settings.iflytek_heartbeat_interval,
-                ping_timeout=10,
-                close_timeout=10
-            ) as websocket:
+
+            # 从连接池借出预热好的连接（URL签名由连接池在建连时完成）
+            async with self._get_ws_pool().acquire() as websocket:
                 # 发送请求
                 await websocket.send(json.dumps(params))
-                
+
                 # 接收响应
-                response_text = ""
                 async for message in websocket:
                     data = json.loads(message)
                     code = data.get('header', {}).get('code', -1)
-                    
+
                     if code != 0:
                         error_msg = data.get('header', {}).get('message', '未知错误')
                         logger.error(f"WebSocket API错误: {code} - {error_msg}")
                         raise websockets.exceptions.ConnectionClosedError(None, None)
-                    
+
                     # 提取文本内容
                     choices = data.get('payload', {}).get('choices', {}).get('text', [])
                     for choice in choices:
-                        response_text += choice.get('content', '')
-                    
+                        content = choice.get('content', '')
+                        if content:
+                            yield content
+
                     # 检查是否结束
                     status = data.get('header', {}).get('status', 0)
                     if status == 2:  # 结束
                         break
-                
-                return {
-                    "content": response_text,
-                    "status": "success",
-                    "timestamp": datetime.now().isoformat(),
-                    "model": "spark-websocket"
-                }
-                
+
         except Exception as e:
             logger.error(f"WebSocket API调用异常: {e}")
             raise
-    
+
+    async def _stream_http_api(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """HTTP流式调用 - 解析SSE数据行并返回增量文本"""
+        timestamp = str(int(time.time()))
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.settings.iflytek_api_key}',
+            'X-Spark-Appid': self.settings.iflytek_app_id,
+            'X-Timestamp': timestamp,
+            'X-Signature': self._generate_signature(timestamp),
+            'User-Agent': 'iFlytek-Interview-System/2.0',
+            'Accept': 'text/event-stream',
+            'Connection': 'keep-alive'
+        }
+        payload = {
+            'model': kwargs.get('model', 'spark-3.5'),
+            'messages': messages,
+            'max_tokens': kwargs.get('max_tokens', self.settings.iflytek_max_tokens),
+            'temperature': kwargs.get('temperature', self.settings.iflytek_temperature),
+            'stream': True,
+            'top_p': kwargs.get('top_p', 0.9)
+        }
+
+        await self._ensure_session_health()
+        session = await self._get_session()
+
+        async with session.post(
+            self.settings.iflytek_spark_http_url,
+            headers=headers,
+            json=payload,
+            ssl=False
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise aiohttp.ClientResponseError(
+                    response.request_info,
+                    response.history,
+                    status=response.status,
+                    message=error_text
+                )
+
+            async for raw_line in response.content:
+                line = raw_line.decode('utf-8').strip()
+                if not line.startswith('data:'):
+                    continue
+
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+
+                try:
+                    chunk = json.loads(data)
+                except json.JSONDecodeError:
+                    logger.warning(f"无法解析的流式数据: {data[:100]}")
+                    continue
+
+                choices = chunk.get('choices') or [{}]
+                content = choices[0].get('delta', {}).get('content', '')
+                if content:
+                    yield content
+
+    async def chat_with_spark_stream(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """
+        与iFlytek Spark大模型流式对话
+        上游每返回一个片段就立即产出，首个片段到达前的失败按指数退避重试，
+        完整响应结束后写入缓存并更新统计；整个流式响应期间占用一个限流名额。
+        相同消息的并发流式请求共享同一个上游流
+        """
+        start_time = time.time()
+        self.stats['total_requests'] += 1
+
+        priority = kwargs.pop('priority', PRIORITY_INTERACTIVE)
+        use_cache = kwargs.get('use_cache', True)
+
+        if use_cache:
+            cached_response = await self.response_cache.aget(messages, **kwargs)
+            if cached_response:
+                self.stats['cache_hits'] += 1
+                logger.info("流式请求命中增强缓存")
+                yield cached_response.get('content', '')
+                return
+
+        # 合并相同的在途请求
+        key = self._coalesce_key(messages, kwargs)
+        task = self._inflight_calls.get(key)
+        if task is not None:
+            self.stats['coalesced_requests'] += 1
+            response = await asyncio.shield(task)
+            yield response.get('content', '')
+            return
+
+        shared = self._inflight_streams.get(key)
+        if shared is None:
+            shared = SharedSparkStream()
+            self._inflight_streams[key] = shared
+            shared.task = asyncio.ensure_future(
+                self._pump_stream(key, shared, messages, start_time, priority, **kwargs)
+            )
+        else:
+            self.stats['coalesced_requests'] += 1
+
+        async for chunk in shared.subscribe():
+            yield chunk
+
+    async def _pump_stream(self, key: str, shared: SharedSparkStream, messages: List[Dict[str, str]],
+                           start_time: float, priority: str, **kwargs):
+        """驱动一次上游流式调用，把片段广播给所有订阅者"""
+        try:
+            async for chunk in self._stream_spark(messages, start_time, priority, **kwargs):
+                shared.publish(chunk)
+            shared.finish()
+        except asyncio.CancelledError:
+            shared.finish(RuntimeError("流式响应已取消"))
+            raise
+        except Exception as e:
+            shared.finish(e)
+        finally:
+            self._forget_inflight(self._inflight_streams, key, shared)
+
+    async def _stream_spark(self, messages: List[Dict[str, str]], start_time: float,
+                            priority: str, **kwargs) -> AsyncIterator[str]:
+        """向上游发起一次流式调用（含重试、统计和缓存写入）"""
+        max_retries = kwargs.get('max_retries', 3)
+        retry_delay = kwargs.get('retry_delay', 1)
+        use_cache = kwargs.get('use_cache', True)
+
+        for attempt in range(max_retries):
+            chunks = []
+            try:
+                async with self.rate_limiter.slot(priority):
+                    if self.settings.iflytek_spark_http_url:
+                        stream = self._stream_http_api(messages, **kwargs)
+                    else:
+                        stream = self._stream_websocket_api(messages, **kwargs)
+
+                    async for chunk in stream:
+                        chunks.append(chunk)
+                        yield chunk
+
+            except Exception as e:
+                self.stats['failed_requests'] += 1
+
+                if isinstance(e, aiohttp.ClientResponseError) and e.status == 429:
+                    self.stats['rate_limit_errors'] += 1
+                    self.rate_limiter.backoff(5)
+
+                # 已经向调用方输出了内容，无法透明重试
+                if chunks:
+                    logger.error(f"iFlytek Spark流式响应中断: {e}")
+                    self._update_health_status(False, f"流式响应中断: {e}")
+                    raise
+
+                logger.warning(f"iFlytek Spark流式调用失败 (尝试 {attempt + 1}/{max_retries}): {e}")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay * (2 ** attempt))
+                    continue
+
+                self._update_health_status(False, f"流式调用失败: {e}")
+                break
+
+            # 更新统计信息
+            response_time = time.time() - start_time
+            self.stats['successful_requests'] += 1
+            self.stats['last_request_time'] = datetime.now().isoformat()
+            self.stats['average_response_time'] = (
+                (self.stats['average_response_time'] * (self.stats['successful_requests'] - 1) + response_time) /
+                self.stats['successful_requests']
+            )
+
+            if use_cache and chunks:
+                await self.response_cache.aset(messages, {
+                    "content": "".join(chunks),
+                    "status": "success",
+                    "timestamp": datetime.now().isoformat(),
+                    "model": "spark-stream"
+                }, **kwargs)
+            return
+
+        # 所有重试都失败，输出模拟响应
+        mock_response = await self._get_mock_response(messages)
+        yield mock_response.get('content', '')
+
     def _generate_signature(self, timestamp: str) -> str:
         """生成API签名"""
         try:
@@ -740,28 +1055,6 @@ class EnhancedIFlytekService:
             }
         }
     
-    async def _rate_limit(self):
-        """速率限制"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
-    
-    def _generate_cache_key(self, messages: List[Dict[str, str]]) -> str:
-        """生成缓存键"""
-        content = json.dumps(messages, sort_keys=True, ensure_ascii=False)
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
-    
-    def _is_cache_valid(self, cached_response: Dict[str, Any]) -> bool:
-        """检查缓存是否有效"""
-        if not self.settings.iflytek_enable_cache:
-            return False
-        
-        cache_time = cached_response.get("timestamp", 0)
-        current_time = time.time()
-        return (current_time - cache_time) < self.settings.iflytek_cache_ttl
-    
     async def _get_mock_response(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
         """生成基于竞品分析的智能模拟响应"""
         try:
@@ -848,9 +1141,14 @@ class EnhancedIFlytekService:
             if not session.closed:
                 await session.close()
         self.session_pool.clear()
+
+        # 关闭WebSocket连接池
+        if self.ws_pool:
+            await self.ws_pool.close()
+            self.ws_pool = None
         
         # 清理缓存
-        self.request_cache.clear()
+        self.response_cache.clear()
         
         logger.info("iFlytek服务资源清理完成")
 
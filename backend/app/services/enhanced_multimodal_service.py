@@ -14,7 +14,7 @@ import base64
 from ..core.config import settings
 from ..core.iflytek_manager import connection_manager
 from .iflytek_service import MultimodalAnalysisService
-from .enhanced_capability_evaluator import enhanced_capability_evaluator
+from .scoring_tasks import evaluate_comprehensive
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +57,7 @@ class EnhancedMultimodalService:
             
             # 检查缓存
             cache_key = self._generate_cache_key(text_data, audio_data, video_data, question_context, domain)
-            cached_result = self.connection_manager.get_cached_response({"cache_key": cache_key})
+            cached_result = await self.connection_manager.get_cached_response({"cache_key": cache_key})
             
             if cached_result:
                 logger.info(f"使用缓存结果: {analysis_id}")
@@ -102,8 +102,8 @@ class EnhancedMultimodalService:
             fusion_result = await self._intelligent_fusion(processed_results, question_context, domain)
             
             # 计算6核心能力指标 - 使用增强评估器
-            capability_scores = enhanced_capability_evaluator.evaluate_comprehensive(
-                processed_results, domain
+            capability_scores = await evaluate_comprehensive(
+                processed_results, domain, text_length=len(text_data or "")
             )
             
             # 生成智能建议 - 使用评估器的建议
@@ -134,7 +134,7 @@ class EnhancedMultimodalService:
             }
             
             # 缓存结果
-            self.connection_manager.cache_response({"cache_key": cache_key}, final_result)
+            await self.connection_manager.cache_response({"cache_key": cache_key}, final_result)
             
             # 更新性能指标
             self._update_performance_metrics(start_time, True, modalities_processed)
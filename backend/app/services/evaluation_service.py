@@ -8,7 +8,7 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 import numpy as np
 
-from app.models import InterviewSession, InterviewResponse, MultimodalAnalysis, EvaluationReport
+from app.models import InterviewSession, InterviewResponse, MultimodalAnalysis
 from app.services.capability_assessment_service import (
     professional_skill_assessor,
     communication_assessor,
@@ -21,6 +21,7 @@ from app.services.report_generation_service import (
     visualization_service,
     suggestion_service
 )
+from app.services.analysis_storage_service import analysis_storage_service, analysis_from_record
 
 class CapabilityEvaluator:
     """能力评估器"""
@@ -274,11 +275,8 @@ class ReportGenerator:
             MultimodalAnalysis.response_id.in_(response_ids)
         ).all() if response_ids else []
         
-        # 整理分析结果
-        analysis_results = []
-        for record in analysis_records:
-            if record.analysis_result:
-                analysis_results.append(record.analysis_result)
+        # 整理分析结果（由得分列还原为评估器使用的结构）
+        analysis_results = [analysis_from_record(record) for record in analysis_records]
         
         # 计算能力得分
         capability_scores = self.evaluator.calculate_capability_scores(analysis_results, session)
@@ -286,16 +284,6 @@ class ReportGenerator:
         # 生成详细分析
         detailed_analysis = self._generate_detailed_analysis(analysis_results)
         
-        # 生成改进建议
-        improvement_suggestions = suggestion_service.generate_improvement_suggestions(capability_scores, session.domain)
-        priority_recommendations = suggestion_service.generate_priority_recommendations(capability_scores)
-
-        # 生成可视化图表
-        radar_chart = visualization_service.generate_radar_chart(capability_scores)
-
-        # 计算总体得分
-        overall_score = np.mean(list(capability_scores.values()))
-        
         # 生成报告
         report = {
             "session_info": {
@@ -307,16 +295,8 @@ class ReportGenerator:
                 "total_questions": session.total_questions,
                 "completed_questions": len(responses)
             },
-            "overall_score": round(overall_score, 1),
-            "capability_scores": {k: round(v, 1) for k, v in capability_scores.items()},
+            **self.build_score_sections(capability_scores, session.domain),
             "detailed_analysis": detailed_analysis,
-            "improvement_suggestions": improvement_suggestions,
-            "priority_recommendations": priority_recommendations,
-            "performance_level": self._get_performance_level(overall_score),
-            "visualizations": {
-                "radar_chart": radar_chart,
-                "radar_chart_data": self._prepare_radar_chart_data(capability_scores)
-            },
             "generated_at": datetime.now().isoformat()
         }
         
@@ -325,6 +305,21 @@ class ReportGenerator:
         
         return report
     
+    def build_score_sections(self, capability_scores: Dict[str, float], domain: str) -> Dict[str, Any]:
+        """由能力得分生成报告中的总分、等级、改进建议和雷达图（生成报告和批量重新评分共用）"""
+        overall_score = np.mean(list(capability_scores.values()))
+        return {
+            "overall_score": round(overall_score, 1),
+            "capability_scores": {k: round(v, 1) for k, v in capability_scores.items()},
+            "improvement_suggestions": suggestion_service.generate_improvement_suggestions(capability_scores, domain),
+            "priority_recommendations": suggestion_service.generate_priority_recommendations(capability_scores),
+            "performance_level": self._get_performance_level(overall_score),
+            "visualizations": {
+                "radar_chart": visualization_service.generate_radar_chart(capability_scores),
+                "radar_chart_data": self._prepare_radar_chart_data(capability_scores)
+            }
+        }
+
     def _generate_detailed_analysis(self, analysis_results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """生成详细分析"""
         if not analysis_results:
@@ -448,27 +443,32 @@ class ReportGenerator:
         }
     
     def _save_report_to_db(self, session_id: int, report: Dict[str, Any], db: Session):
-        """保存报告到数据库"""
-        capability_scores = report["capability_scores"]
+        """保存报告到数据库（图表写入blob存储，指标写入指标表）"""
+        analysis_storage_service.save_report(
+            db,
+            session_id,
+            report,
+            **self.report_columns(report)
+        )
 
-        evaluation_report = EvaluationReport(
-            session_id=session_id,
-            overall_score=report["overall_score"],
+    @staticmethod
+    def report_columns(report: Dict[str, Any]) -> Dict[str, Any]:
+        """报告得分和详细分析对应的 evaluation_reports 列"""
+        capability_scores = report["capability_scores"]
+        detailed_analysis = report.get("detailed_analysis") or {}
+        return {
+            "overall_score": report["overall_score"],
             # 映射六项核心能力到数据库字段
-            professional_knowledge=capability_scores.get("专业技能", 0),
-            skill_matching=capability_scores.get("沟通表达", 0),
-            language_expression=capability_scores.get("逻辑思维", 0),
-            logical_thinking=capability_scores.get("学习能力", 0),
-            innovation_ability=capability_scores.get("抗压能力", 0),
-            stress_resistance=capability_scores.get("团队协作", 0),
-            strengths=report.get("detailed_analysis", {}).get("strengths", []),
-            weaknesses=report.get("detailed_analysis", {}).get("weaknesses", []),
-            improvement_suggestions=report["improvement_suggestions"],
-            report_data=report
-        )
-        
-        db.add(evaluation_report)
-        db.commit()
+            "professional_knowledge": capability_scores.get("专业技能", 0),
+            "skill_matching": capability_scores.get("沟通表达", 0),
+            "language_expression": capability_scores.get("逻辑思维", 0),
+            "logical_thinking": capability_scores.get("学习能力", 0),
+            "innovation_ability": capability_scores.get("抗压能力", 0),
+            "stress_resistance": capability_scores.get("团队协作", 0),
+            "strengths": detailed_analysis.get("strengths", []),
+            "weaknesses": detailed_analysis.get("weaknesses", []),
+            "improvement_suggestions": report["improvement_suggestions"]
+        }
 
 # 全局服务实例
 evaluation_service = ReportGenerator()
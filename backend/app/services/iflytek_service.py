@@ -9,20 +9,28 @@ import hashlib
 import hmac
 import time
 import requests
-import websocket
 import asyncio
-import threading
 import logging
 from datetime import datetime
 from urllib.parse import urlencode, urlparse
 from wsgiref.handlers import format_date_time
 from time import mktime
-import ssl
 import functools
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Callable
 from dotenv import load_dotenv
 import wave
-import struct
+import re
+from collections import deque
+
+import websockets
+
+from .audio_feature_extractor import extract_audio_features
+from .voice_activity_detector import count_spoken_words, speech_rate
+from .asr_stream_service import ASRStreamSession
+from .analysis_pipeline import PartialInputStage, PipelineRun, StageGraph
+from ..core.cache import DiskBlobCache
+from ..utils.keyword_matcher import keyword_index
+from .text_features import get_text_features
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -109,10 +117,12 @@ class IFlytekASRService:
 
         return self.base_url + '?' + urlencode(v)
 
-    async def recognize_audio(self, audio_data: bytes) -> Dict[str, Any]:
+    async def recognize_audio(self, audio_data: bytes,
+                              on_partial: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         语音识别
         :param audio_data: 音频数据（PCM格式或base64编码）
+        :param on_partial: 部分识别结果回调（参数为截至当前的完整文本），供下游阶段提前开始
         :return: 识别结果
         """
         try:
@@ -132,7 +142,7 @@ class IFlytekASRService:
                 return {"error": "音频数据无效"}
 
             # 使用WebSocket进行实时语音识别
-            result = await self._websocket_recognize(audio_data)
+            result = await self._websocket_recognize(audio_data, on_partial)
 
             # 计算额外的语音特征
             duration = self._calculate_audio_duration(audio_data)
@@ -152,119 +162,37 @@ class IFlytekASRService:
             logger.error(f"语音识别失败: {e}")
             return {"error": f"语音识别失败: {str(e)}"}
 
-    async def _websocket_recognize(self, audio_data: bytes) -> Dict[str, Any]:
-        """使用WebSocket进行语音识别"""
-        try:
-            # 创建认证URL
-            ws_url = self.create_auth_url()
-
-            # 识别结果存储
-            recognition_result = {"text": "", "confidence": 0.0}
-            recognition_complete = asyncio.Event()
+    def open_stream(self, **business) -> ASRStreamSession:
+        """创建流式识别会话（async with 使用），可边采集边发送音频"""
+        return ASRStreamSession(self.create_auth_url(), self.app_id, business=business or None)
 
-            def on_message(ws, message):
+    async def _websocket_recognize(self, audio_data: bytes,
+                                   on_partial: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """使用WebSocket进行语音识别（整段音频连续上传，不占用线程）"""
+        try:
+            async with self.open_stream() as session:
+                partials_task = None
+                if on_partial is not None:
+                    async def forward_partials():
+                        async for partial in session.partials():
+                            on_partial(partial["text"])
+                    partials_task = asyncio.create_task(forward_partials())
+
+                # 已录制的整段音频每帧间隔 asr_upload_interval 上传（每帧0.25秒音频，仍快于实时），
+                # 避免服务端判定发送过快；设为0时不限速，只由 send 等待写缓冲排空。
+                # 实时采集的音频由 LiveAudioSession 随到随发，速度自然与实时一致
+                interval = getattr(settings, 'asr_upload_interval', 0.04) if CONFIG_AVAILABLE else 0.04
+                frame_bytes = session.frame_bytes
                 try:
-                    data = json.loads(message)
-                    code = data.get('code', 0)
-
-                    if code != 0:
-                        logger.error(f"识别错误: {code}, {data}")
-                        recognition_complete.set()
-                        return
-
-                    # 解析识别结果
-                    if 'data' in data:
-                        result = data['data']['result']
-                        if result:
-                            ws_list = result.get('ws', [])
-                            for ws_item in ws_list:
-                                for cw in ws_item.get('cw', []):
-                                    recognition_result["text"] += cw.get('w', '')
-
-                            # 获取置信度
-                            if ws_list and ws_list[0].get('cw'):
-                                recognition_result["confidence"] = ws_list[0]['cw'][0].get('wp', 0) / 100.0
-
-                    # 检查是否结束
-                    if data.get('data', {}).get('status') == 2:
-                        recognition_complete.set()
-
-                except Exception as e:
-                    logger.error(f"解析识别结果失败: {e}")
-                    recognition_complete.set()
-
-            def on_error(ws, error):
-                logger.error(f"WebSocket错误: {error}")
-                recognition_complete.set()
-
-            def on_close(ws, close_status_code, close_msg):
-                logger.info("WebSocket连接关闭")
-                recognition_complete.set()
-
-            def on_open(ws):
-                logger.info("WebSocket连接建立")
-
-                # 发送音频配置
-                config = {
-                    "common": {"app_id": self.app_id},
-                    "business": {
-                        "language": "zh_cn",
-                        "domain": "iat",
-                        "accent": "mandarin",
-                        "vinfo": 1,
-                        "vad_eos": 10000
-                    },
-                    "data": {
-                        "status": 0,
-                        "format": "audio/L16;rate=16000",
-                        "audio": base64.b64encode(audio_data[:8000]).decode(),
-                        "encoding": "raw"
-                    }
-                }
-                ws.send(json.dumps(config))
-
-                # 分块发送剩余音频数据
-                chunk_size = 8000
-                for i in range(8000, len(audio_data), chunk_size):
-                    chunk = audio_data[i:i + chunk_size]
-                    status = 1 if i + chunk_size < len(audio_data) else 2
-
-                    frame = {
-                        "data": {
-                            "status": status,
-                            "format": "audio/L16;rate=16000",
-                            "audio": base64.b64encode(chunk).decode(),
-                            "encoding": "raw"
-                        }
-                    }
-                    ws.send(json.dumps(frame))
-                    time.sleep(0.04)  # 40ms间隔
-
-            # 创建WebSocket连接
-            ws = websocket.WebSocketApp(
-                ws_url,
-                on_message=on_message,
-                on_error=on_error,
-                on_close=on_close,
-                on_open=on_open
-            )
-
-            # 在线程中运行WebSocket
-            def run_ws():
-                ws.run_forever(sslopt={"cert_reqs": ssl.CERT_NONE})
-
-            ws_thread = threading.Thread(target=run_ws)
-            ws_thread.daemon = True
-            ws_thread.start()
-
-            # 等待识别完成（最多30秒）
-            try:
-                await asyncio.wait_for(recognition_complete.wait(), timeout=30.0)
-            except asyncio.TimeoutError:
-                logger.warning("语音识别超时")
-                ws.close()
-
-            return recognition_result
+                    for offset in range(0, len(audio_data), frame_bytes):
+                        await session.send(audio_data[offset:offset + frame_bytes])
+                        if interval > 0:
+                            await asyncio.sleep(interval)
+                    await session.end()
+                    return await session.result()
+                finally:
+                    if partials_task is not None:
+                        partials_task.cancel()
 
         except Exception as e:
             logger.error(f"WebSocket识别失败: {e}")
@@ -281,8 +209,28 @@ class IFlytekASRService:
         except:
             return 0.0
 
+_SENTENCE_RE = re.compile(r"[^。！？!?；;\n]+[。！？!?；;]*")
+
+
+def split_sentences(text: str, min_chars: int = 4) -> List[str]:
+    """按句末标点切分文本，过短的片段并入下一句，避免合成时语调断裂"""
+    sentences = []
+    pending = ""
+    for piece in _SENTENCE_RE.findall(text or ""):
+        pending += piece.strip()
+        if len(pending) >= min_chars:
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        if sentences:
+            sentences[-1] += pending
+        else:
+            sentences.append(pending)
+    return sentences
+
+
 class IFlytekTTSService:
-    """讯飞语音合成服务"""
+    """讯飞语音合成服务（按句合成，句级磁盘缓存）"""
 
     def __init__(self):
         self.app_id = os.getenv("IFLYTEK_TTS_APPID")
@@ -290,6 +238,15 @@ class IFlytekTTSService:
         self.api_secret = os.getenv("IFLYTEK_TTS_API_SECRET")
         self.base_url = os.getenv("IFLYTEK_TTS_URL", "wss://tts-api.xfyun.cn/v2/tts")
 
+        cache_dir = getattr(settings, 'tts_cache_dir', './cache/tts') if CONFIG_AVAILABLE else './cache/tts'
+        cache_max_bytes = getattr(settings, 'tts_cache_max_bytes', 200 * 1024 * 1024) if CONFIG_AVAILABLE else 200 * 1024 * 1024
+        self.prefetch = getattr(settings, 'tts_prefetch_sentences', 2) if CONFIG_AVAILABLE else 2
+        try:
+            self.audio_cache = DiskBlobCache(cache_dir, max_bytes=cache_max_bytes)
+        except OSError as e:
+            logger.warning(f"语音合成缓存目录不可用，不使用缓存: {e}")
+            self.audio_cache = None
+
     def create_auth_url(self):
         """创建认证URL"""
         host = urlparse(self.base_url).netloc
@@ -317,107 +274,100 @@ class IFlytekTTSService:
 
         return self.base_url + '?' + urlencode(v)
 
+    async def synthesize_speech(self, text: str, voice_name: str = "xiaoyan") -> bytes:
+        """
+        合成完整语音（16kHz/16bit PCM）
+        :param text: 合成文本
+        :param voice_name: 发音人名称
+        :return: 音频数据
+        """
+        return b"".join([chunk async for chunk in self.synthesize_speech_stream(text, voice_name)])
 
+    async def synthesize_speech_stream(self, text: str, voice_name: str = "xiaoyan") -> AsyncIterator[bytes]:
+        """
+        按句流式合成，每句合成完成即产出该句音频
+
+        当前句播放期间只提前合成之后的 prefetch 句，任务按需创建（长文本不会一次创建全部任务），
+        命中缓存的句子直接读文件
+        """
+        remaining = iter(split_sentences(text))
+        pending: deque = deque()
+        try:
+            while True:
+                while len(pending) <= max(0, self.prefetch):
+                    sentence = next(remaining, None)
+                    if sentence is None:
+                        break
+                    pending.append(asyncio.create_task(self._synthesize_sentence(sentence, voice_name)))
+                if not pending:
+                    return
+                audio = await pending[0]
+                pending.popleft()
+                yield audio
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _synthesize_sentence(self, sentence: str, voice_name: str) -> bytes:
+        """合成单句，先查磁盘缓存"""
+        key = DiskBlobCache.make_key(voice_name, sentence)
+        if self.audio_cache is not None:
+            cached = await asyncio.to_thread(self.audio_cache.get, key)
+            if cached is not None:
+                return cached
+
+        audio = await self._websocket_synthesize(sentence, voice_name)
+        if self.audio_cache is not None and audio:
+            await asyncio.to_thread(self.audio_cache.set, key, audio)
+        return audio
 
     async def _websocket_synthesize(self, text: str, voice_name: str) -> bytes:
         """使用WebSocket进行语音合成"""
         try:
-            # 创建认证URL
-            ws_url = self.create_auth_url()
-
-            # 音频数据存储
+            config = {
+                "common": {"app_id": self.app_id},
+                "business": {
+                    "aue": "raw",
+                    "auf": "audio/L16;rate=16000",
+                    "vcn": voice_name,
+                    "speed": 50,
+                    "volume": 50,
+                    "pitch": 50,
+                    "bgs": 1,
+                    "tte": "UTF8"
+                },
+                "data": {
+                    "status": 2,
+                    "text": base64.b64encode(text.encode('utf-8')).decode()
+                }
+            }
             audio_chunks = []
-            synthesis_complete = asyncio.Event()
-            synthesis_error = None
 
-            def on_message(ws, message):
-                nonlocal synthesis_error
-                try:
-                    data = json.loads(message)
-                    code = data.get('code', 0)
-
-                    if code != 0:
-                        synthesis_error = f"合成错误: {code}, {data}"
-                        logger.error(synthesis_error)
-                        synthesis_complete.set()
-                        return
-
-                    # 获取音频数据
-                    if 'data' in data and 'audio' in data['data']:
-                        audio_base64 = data['data']['audio']
+            async with websockets.connect(self.create_auth_url(), open_timeout=10, max_size=None) as ws:
+                await ws.send(json.dumps(config))
+
+                async def receive():
+                    async for message in ws:
+                        data = json.loads(message)
+                        code = data.get('code', 0)
+                        if code != 0:
+                            raise Exception(f"合成错误: {code}, {data}")
+
+                        # 获取音频数据
+                        audio_base64 = data.get('data', {}).get('audio')
                         if audio_base64:
-                            audio_chunk = base64.b64decode(audio_base64)
-                            audio_chunks.append(audio_chunk)
+                            audio_chunks.append(base64.b64decode(audio_base64))
 
-                    # 检查是否结束
-                    if data.get('data', {}).get('status') == 2:
-                        synthesis_complete.set()
+                        # 检查是否结束
+                        if data.get('data', {}).get('status') == 2:
+                            return
 
-                except Exception as e:
-                    synthesis_error = f"解析合成结果失败: {e}"
-                    logger.error(synthesis_error)
-                    synthesis_complete.set()
-
-            def on_error(ws, error):
-                nonlocal synthesis_error
-                synthesis_error = f"WebSocket错误: {error}"
-                logger.error(synthesis_error)
-                synthesis_complete.set()
-
-            def on_close(ws, close_status_code, close_msg):
-                logger.info("TTS WebSocket连接关闭")
-                synthesis_complete.set()
-
-            def on_open(ws):
-                logger.info("TTS WebSocket连接建立")
-
-                # 发送合成请求
-                config = {
-                    "common": {"app_id": self.app_id},
-                    "business": {
-                        "aue": "raw",
-                        "auf": "audio/L16;rate=16000",
-                        "vcn": voice_name,
-                        "speed": 50,
-                        "volume": 50,
-                        "pitch": 50,
-                        "bgs": 1,
-                        "tte": "UTF8"
-                    },
-                    "data": {
-                        "status": 2,
-                        "text": base64.b64encode(text.encode('utf-8')).decode()
-                    }
-                }
-                ws.send(json.dumps(config))
-
-            # 创建WebSocket连接
-            ws = websocket.WebSocketApp(
-                ws_url,
-                on_message=on_message,
-                on_error=on_error,
-                on_close=on_close,
-                on_open=on_open
-            )
-
-            # 在线程中运行WebSocket
-            def run_ws():
-                ws.run_forever(sslopt={"cert_reqs": ssl.CERT_NONE})
-
-            ws_thread = threading.Thread(target=run_ws)
-            ws_thread.daemon = True
-            ws_thread.start()
-
-            # 等待合成完成（最多30秒）
-            try:
-                await asyncio.wait_for(synthesis_complete.wait(), timeout=30.0)
-            except asyncio.TimeoutError:
-                logger.warning("语音合成超时")
-                ws.close()
-                raise Exception("语音合成超时")
-
-            if synthesis_error:
-                raise Exception(synthesis_error)
+                # 等待合成完成（最多30秒）
+                try:
+                    await asyncio.wait_for(receive(), timeout=30.0)
+                except asyncio.TimeoutError:
+                    logger.warning("语音合成超时")
+                    raise Exception("语音合成超时")
 
             # 合并音频数据
             return b''.join(audio_chunks)
@@ -579,10 +529,11 @@ class IFlytekSpeechAnalysisService:
         self.api_secret = os.getenv("IFLYTEK_SPEECH_ANALYSIS_API_SECRET")
         self.base_url = os.getenv("IFLYTEK_SPEECH_ANALYSIS_URL", "https://api.xf-yun.com/v1/private/speech_analysis")
 
-    async def analyze_speech_features(self, audio_data: bytes) -> Dict[str, Any]:
+    async def analyze_speech_features(self, audio_data: bytes, transcript: Optional[str] = None) -> Dict[str, Any]:
         """
         语音特征分析
         :param audio_data: 音频数据
+        :param transcript: 语音识别文本（有则按实际字数计算语速）
         :return: 语音特征分析结果
         """
         try:
@@ -600,7 +551,7 @@ class IFlytekSpeechAnalysisService:
                     return {"error": "音频数据格式错误"}
 
             # 基础音频特征分析
-            basic_features = self._analyze_basic_features(audio_data)
+            basic_features = self._analyze_basic_features(audio_data, transcript)
 
             # 高级特征分析（使用iFlytek API或本地算法）
             advanced_features = await self._analyze_advanced_features(audio_data)
@@ -616,7 +567,7 @@ class IFlytekSpeechAnalysisService:
             logger.error(f"语音特征分析失败: {e}")
             return {"error": f"语音特征分析失败: {str(e)}"}
 
-    def _analyze_basic_features(self, audio_data: bytes) -> Dict[str, Any]:
+    def _analyze_basic_features(self, audio_data: bytes, transcript: Optional[str] = None) -> Dict[str, Any]:
         """分析基础音频特征"""
         try:
             # 计算音频时长
@@ -625,19 +576,24 @@ class IFlytekSpeechAnalysisService:
             # 计算音量特征
             volume_features = self._calculate_volume_features(audio_data)
 
-            # 计算语速（基于音频长度的估算）
-            estimated_words = max(1, int(duration * 3))  # 假设每秒3个字
-            speech_rate = (estimated_words / duration * 60) if duration > 0 else 0
+            # 语音活动检测：停顿和有声时长
+            vad = self._features(audio_data)["vad"]
 
-            # 计算停顿频率（基于音量变化）
+            # 计算停顿频率（每秒停顿次数）
             pause_frequency = self._calculate_pause_frequency(audio_data)
 
             return {
                 "duration": round(duration, 2),
-                "speech_rate": round(speech_rate, 1),
                 "pause_frequency": round(pause_frequency, 3),
                 "volume": volume_features,
-                "estimated_words": estimated_words
+                "voiced_time": vad["voiced_time"],
+                "pauses": {
+                    "count": vad["pause_count"],
+                    "mean": vad["mean_pause"],
+                    "longest": vad["longest_pause"],
+                    "histogram": dict(vad["pause_histogram"])
+                },
+                **self._speech_rate_features(vad, transcript)
             }
 
         except Exception as e:
@@ -678,47 +634,22 @@ class IFlytekSpeechAnalysisService:
             logger.error(f"高级特征分析失败: {e}")
             return {}
 
+    def _features(self, audio_data: bytes) -> Dict[str, Any]:
+        """一次性提取并缓存该段音频的全部特征"""
+        return extract_audio_features(audio_data)
+
     def _calculate_duration(self, audio_data: bytes) -> float:
         """计算音频时长"""
         try:
-            # 假设PCM格式：16kHz采样率，16位深度，单声道
-            sample_rate = 16000
-            bytes_per_sample = 2
-            return len(audio_data) / (sample_rate * bytes_per_sample)
-        except:
+            # WAV按头部信息计算，其余按PCM格式：16kHz采样率，16位深度，单声道
+            return self._features(audio_data)["duration"]
+        except Exception:
             return 0.0
 
     def _calculate_volume_features(self, audio_data: bytes) -> Dict[str, float]:
-        """计算音量特征"""
+        """计算音量特征（每0.1秒一帧的RMS统计）"""
         try:
-            # 将字节数据转换为16位整数
-            samples = struct.unpack('<' + 'h' * (len(audio_data) // 2), audio_data)
-
-            # 计算RMS音量
-            rms_values = []
-            chunk_size = 1600  # 0.1秒的数据量
-
-            for i in range(0, len(samples), chunk_size):
-                chunk = samples[i:i + chunk_size]
-                if chunk:
-                    rms = (sum(x * x for x in chunk) / len(chunk)) ** 0.5
-                    rms_values.append(rms)
-
-            if not rms_values:
-                return {"average": 0, "variance": 0, "max": 0, "min": 0}
-
-            avg_volume = sum(rms_values) / len(rms_values)
-            max_volume = max(rms_values)
-            min_volume = min(rms_values)
-            variance = sum((x - avg_volume) ** 2 for x in rms_values) / len(rms_values)
-
-            return {
-                "average": round(avg_volume, 2),
-                "variance": round(variance, 2),
-                "max": round(max_volume, 2),
-                "min": round(min_volume, 2)
-            }
-
+            return dict(self._features(audio_data)["volume"])
         except Exception as e:
             logger.error(f"音量特征计算失败: {e}")
             return {"average": 0, "variance": 0, "max": 0, "min": 0}
@@ -731,19 +662,26 @@ class IFlytekSpeechAnalysisService:
         except:
             return 0.0
 
-    def _calculate_pause_frequency(self, audio_data: bytes) -> float:
-        """计算停顿频率"""
-        try:
-            volume_features = self._calculate_volume_features(audio_data)
-            duration = self._calculate_duration(audio_data)
+    def _speech_rate_features(self, vad: Dict[str, Any], transcript: Optional[str] = None) -> Dict[str, Any]:
+        """计算语速，有识别文本时按实际字数，否则按VAD估计的音节数"""
+        rate = speech_rate(vad, count_spoken_words(transcript or ""))
+        return {
+            "speech_rate": rate["speech_rate"],
+            "articulation_rate": rate["articulation_rate"],
+            "estimated_words": rate["words"],
+            "word_count_source": rate["source"]
+        }
 
-            # 基于音量变化推断停顿
-            avg_volume = volume_features.get("average", 0)
-            silence_threshold = avg_volume * 0.1  # 10%的平均音量作为静音阈值
+    def apply_transcript(self, speech_features: Dict[str, Any], audio_data: bytes, transcript: str) -> Dict[str, Any]:
+        """语音识别与特征分析并行完成后，用识别文本的字数修正语速"""
+        if transcript and "error" not in speech_features:
+            speech_features.update(self._speech_rate_features(self._features(audio_data)["vad"], transcript))
+        return speech_features
 
-            # 简化的停顿检测
-            estimated_pauses = max(0, int(duration * 0.1))  # 假设每10秒有1次停顿
-            return estimated_pauses / duration if duration > 0 else 0
+    def _calculate_pause_frequency(self, audio_data: bytes) -> float:
+        """计算停顿频率（VAD检测到的语音段之间的停顿，次/秒）"""
+        try:
+            return self._features(audio_data)["vad"]["pause_frequency"]
 
         except Exception as e:
             logger.error(f"停顿频率计算失败: {e}")
@@ -788,22 +726,9 @@ class IFlytekSpeechAnalysisService:
             return 50.0
 
     def _analyze_pitch_features(self, audio_data: bytes) -> Dict[str, float]:
-        """分析音调特征"""
+        """分析音调特征（自相关法估计基频，单位Hz）"""
         try:
-            # 简化的音调分析
-            duration = self._calculate_duration(audio_data)
-            volume_features = self._calculate_volume_features(audio_data)
-
-            # 基于音频长度和音量特征估算音调
-            estimated_pitch = 150 + (volume_features.get("average", 0) / 100)
-            pitch_variance = volume_features.get("variance", 0) / 10
-
-            return {
-                "average": round(estimated_pitch, 1),
-                "variance": round(pitch_variance, 1),
-                "range": round(pitch_variance * 2, 1)
-            }
-
+            return dict(self._features(audio_data)["pitch"])
         except Exception as e:
             logger.error(f"音调分析失败: {e}")
             return {"average": 150.0, "variance": 25.0, "range": 50.0}
@@ -888,17 +813,11 @@ class MultimodalAnalysisService:
         try:
             logger.info("开始音频综合分析")
 
-            # 并行执行语音识别和特征分析
-            asr_task = asyncio.create_task(self.asr_service.recognize_audio(audio_data))
-            features_task = asyncio.create_task(self.speech_analysis_service.analyze_speech_features(audio_data))
-
-            # 等待语音识别和特征分析完成
-            asr_result, speech_features = await asyncio.gather(asr_task, features_task)
-
-            # 基于识别文本进行情感分析
-            emotion_result = {}
-            if "text" in asr_result and asr_result["text"]:
-                emotion_result = await self.emotion_service.analyze_emotion(asr_result["text"])
+            # 语音识别、特征分析并发执行，情感分析在识别出完整句子时提前开始
+            pipeline = await self._run_audio_stages(audio_data)
+            asr_result = pipeline.results["transcription"]
+            speech_features = pipeline.results["speech_features"]
+            emotion_result = pipeline.results["emotion_analysis"]
 
             # 计算综合评分
             comprehensive_scores = self._calculate_comprehensive_scores(asr_result, speech_features, emotion_result)
@@ -910,6 +829,7 @@ class MultimodalAnalysisService:
                 "emotion_analysis": emotion_result,
                 "comprehensive_scores": comprehensive_scores,
                 "analysis_summary": self._generate_analysis_summary(asr_result, speech_features, emotion_result),
+                "stage_timings": pipeline.metadata(),
                 "timestamp": datetime.now().isoformat(),
                 "processing_time": time.time()
             }
@@ -937,45 +857,48 @@ class MultimodalAnalysisService:
         try:
             logger.info("开始增强版多模态综合分析")
 
-            analysis_results = {}
             processing_metadata = {
                 "start_time": datetime.now().isoformat(),
                 "modalities_processed": [],
                 "processing_duration": {}
             }
 
-            # 文本分析 - 增强版
+            # 各模态分析互不依赖，并发执行；融合、能力评分和建议依次依赖上游结果
+            graph = StageGraph()
             if text_data:
-                start_time = time.time()
-                text_analysis = await self._enhanced_text_analysis(text_data, question_context, domain)
-                analysis_results["text_analysis"] = text_analysis
-                processing_metadata["modalities_processed"].append("text")
-                processing_metadata["processing_duration"]["text"] = round(time.time() - start_time, 3)
-
-            # 音频分析 - 真实iFlytek集成
+                graph.add_stage("text", lambda results: self._enhanced_text_analysis(text_data, question_context, domain))
             if audio_data:
-                start_time = time.time()
-                audio_analysis = await self._enhanced_audio_analysis(audio_data)
-                analysis_results["audio_analysis"] = audio_analysis
-                processing_metadata["modalities_processed"].append("audio")
-                processing_metadata["processing_duration"]["audio"] = round(time.time() - start_time, 3)
-
-            # 视频分析 - 增强版
+                graph.add_stage("audio", lambda results: self._enhanced_audio_analysis(audio_data))
             if video_data:
-                start_time = time.time()
-                video_analysis = await self._enhanced_video_analysis(video_data)
-                analysis_results["video_analysis"] = video_analysis
-                processing_metadata["modalities_processed"].append("video")
-                processing_metadata["processing_duration"]["video"] = round(time.time() - start_time, 3)
+                graph.add_stage("video", lambda results: self._analyze_video_content(video_data))
+            modalities = [modality for modality in ("text", "audio", "video") if modality in graph]
+
+            def collect(results):
+                return {f"{modality}_analysis": results[modality] for modality in modalities}
 
-            # 智能多模态融合分析
-            fusion_result = await self._intelligent_multimodal_fusion(analysis_results, question_context, domain)
+            async def fusion(results):
+                return await self._intelligent_multimodal_fusion(collect(results), question_context, domain)
 
-            # 计算6个核心能力指标
-            capability_scores = self._calculate_six_core_capabilities(analysis_results, fusion_result, domain)
+            async def capabilities(results):
+                return self._calculate_six_core_capabilities(collect(results), results["fusion"], domain)
 
-            # 生成智能建议
-            intelligent_recommendations = await self._generate_intelligent_recommendations(analysis_results, capability_scores, domain)
+            async def recommendations(results):
+                return await self._generate_intelligent_recommendations(collect(results), results["capabilities"], domain)
+
+            graph.add_stage("fusion", fusion, depends_on=modalities)
+            graph.add_stage("capabilities", capabilities, depends_on=["fusion"])
+            graph.add_stage("recommendations", recommendations, depends_on=["capabilities"])
+            pipeline = await graph.run()
+
+            analysis_results = collect(pipeline.results)
+            fusion_result = pipeline.results["fusion"]
+            capability_scores = pipeline.results["capabilities"]
+            intelligent_recommendations = pipeline.results["recommendations"]
+
+            durations = pipeline.durations()
+            processing_metadata["modalities_processed"] = modalities
+            processing_metadata["processing_duration"] = {modality: durations[modality] for modality in modalities}
+            processing_metadata["stage_timings"] = pipeline.metadata()
 
             final_result = {
                 "individual_analyses": analysis_results,
@@ -994,6 +917,43 @@ class MultimodalAnalysisService:
             logger.error(f"多模态分析失败: {e}")
             return {"error": f"多模态分析失败: {str(e)}", "timestamp": datetime.now().isoformat()}
 
+    async def _run_audio_stages(self, audio_data: bytes) -> PipelineRun:
+        """
+        音频分析流水线
+
+        语音识别和语音特征分析并发执行；情感分析不等识别结束，
+        每识别出新的完整句子就对已完整的部分提前分析，最终文本相同时直接复用
+        """
+        emotion = PartialInputStage(self.emotion_service.analyze_emotion)
+
+        async def transcription(results):
+            return await self.asr_service.recognize_audio(audio_data, on_partial=emotion.offer)
+
+        async def speech_features(results):
+            return await self.speech_analysis_service.analyze_speech_features(audio_data)
+
+        async def emotion_analysis(results):
+            text = results["transcription"].get("text", "")
+            if not text:
+                emotion.close()
+                return {}
+            return await emotion.resolve(text)
+
+        graph = StageGraph()
+        graph.add_stage("transcription", transcription)
+        graph.add_stage("speech_features", speech_features)
+        graph.add_stage("emotion_analysis", emotion_analysis, depends_on=["transcription"])
+        try:
+            pipeline = await graph.run()
+        finally:
+            emotion.close()
+
+        # 识别和特征分析都完成后，用识别文本的字数修正语速
+        self.speech_analysis_service.apply_transcript(
+            pipeline.results["speech_features"], audio_data, pipeline.results["transcription"].get("text", "")
+        )
+        return pipeline
+
     async def _analyze_text_content(self, text: str) -> Dict[str, Any]:
         """分析文本内容"""
         try:
@@ -1227,7 +1187,7 @@ class MultimodalAnalysisService:
         try:
             # 基础文本统计
             word_count = len(text_data.replace(" ", ""))
-            sentence_count = len([s for s in text_data.split("。") if s.strip()])
+            sentence_count = len(get_text_features(text_data).sentences("。"))
 
             # 内容相关性分析
             relevance_score = self._calculate_content_relevance(text_data, question_context, domain)
@@ -1260,16 +1220,11 @@ class MultimodalAnalysisService:
     async def _enhanced_audio_analysis(self, audio_data: bytes) -> Dict[str, Any]:
         """增强版音频分析 - 集成真实iFlytek服务"""
         try:
-            # 使用iFlytek ASR进行语音识别
-            asr_result = await self.asr_service.recognize_audio(audio_data)
-
-            # 语音特征分析
-            speech_features = await self.speech_analysis_service.analyze_speech_features(audio_data)
-
-            # 情感分析（基于识别文本）
-            emotion_analysis = {}
-            if asr_result.get("text"):
-                emotion_analysis = await self.emotion_service.analyze_emotion(asr_result["text"])
+            # 语音识别、特征分析和情感分析按流水线执行
+            pipeline = await self._run_audio_stages(audio_data)
+            asr_result = pipeline.results["transcription"]
+            speech_features = pipeline.results["speech_features"]
+            emotion_analysis = pipeline.results["emotion_analysis"]
 
             # 语音质量评估
             quality_assessment = self._assess_speech_quality(speech_features)
@@ -1347,7 +1302,7 @@ class MultimodalAnalysisService:
         """识别专业术语"""
         try:
             domain_terms = self._get_domain_keywords(domain) if domain else set()
-            found_terms = [term for term in domain_terms if term in text]
+            found_terms = keyword_index.found(text, sorted(domain_terms))
 
             return {
                 "found_terms": found_terms,
@@ -9,10 +9,12 @@ import json
 import logging
 import time
 from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime, timedelta
-from dataclasses import dataclass
+from datetime import datetime
+from dataclasses import asdict, dataclass
 from enum import Enum
 
+from .interview_session_store import InterviewSessionStore, SessionConflictError, get_interview_session_store
+
 logger = logging.getLogger(__name__)
 
 class ConversationState(Enum):
@@ -44,11 +46,28 @@ class ConversationContext:
     last_interaction_time: datetime
     total_interaction_count: int
 
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可JSON序列化的字典（保存到会话存储）"""
+        data = asdict(self)
+        data["current_state"] = self.current_state.value
+        data["last_interaction_time"] = self.last_interaction_time.isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ConversationContext":
+        return cls(**{
+            **data,
+            "current_state": ConversationState(data["current_state"]),
+            "last_interaction_time": datetime.fromisoformat(data["last_interaction_time"])
+        })
+
 class IntelligentConversationManager:
     """智能对话管理器 - 基于竞品分析的优化版本"""
     
-    def __init__(self):
-        self.active_sessions = {}
+    def __init__(self, session_store: Optional[InterviewSessionStore] = None):
+        # 对话上下文保存在会话存储中（内存LRU + 持久化），重启和多worker下都可以继续会话；
+        # 会话存储的SQLite读写在线程中执行，不阻塞事件循环
+        self.session_store = session_store or get_interview_session_store()
         self.conversation_analytics = {}
         
         # 基于竞品分析的对话策略
@@ -119,7 +138,7 @@ class IntelligentConversationManager:
                 total_interaction_count=0
             )
             
-            self.active_sessions[session_id] = context
+            await asyncio.to_thread(self._save_context, context)
             
             # 生成开场白
             opening_message = self._generate_opening_message(domain, position)
@@ -142,39 +161,51 @@ class IntelligentConversationManager:
 
     async def process_user_response(self, session_id: str, user_response: str, 
                                   question_context: Dict = None) -> Dict[str, Any]:
-        """处理用户回答 - 核心智能对话处理"""
+        """
+        处理用户回答 - 核心智能对话处理
+        上下文按读取时的版本写回；其他worker在此期间写入了同一会话时，在最新上下文上重新处理本轮回答
+        """
         try:
-            if session_id not in self.active_sessions:
-                return {"status": "error", "message": "会话不存在"}
-            
-            context = self.active_sessions[session_id]
-            context.total_interaction_count += 1
-            context.last_interaction_time = datetime.now()
-            
-            # 1. 分析用户回答质量
-            response_analysis = await self._analyze_response_quality(
-                user_response, context.domain, question_context
-            )
-            
-            # 2. 更新评估分数
-            self._update_assessment_scores(context, response_analysis)
-            
-            # 3. 确定对话策略
-            conversation_strategy = self._determine_conversation_strategy(
-                response_analysis, context
-            )
-            
-            # 4. 生成智能回复
-            ai_response = await self._generate_intelligent_response(
-                user_response, response_analysis, conversation_strategy, context
-            )
-            
-            # 5. 更新对话状态
-            self._update_conversation_state(context, response_analysis)
-            
-            # 6. 记录对话历史
-            self._record_conversation_history(context, user_response, ai_response, response_analysis)
-            
+            for _ in range(self.session_store.max_retries):
+                loaded = await asyncio.to_thread(self._load_context, session_id)
+                if loaded is None:
+                    return {"status": "error", "message": "会话不存在"}
+                version, context = loaded
+
+                context.total_interaction_count += 1
+                context.last_interaction_time = datetime.now()
+
+                # 1. 分析用户回答质量
+                response_analysis = await self._analyze_response_quality(
+                    user_response, context.domain, question_context
+                )
+
+                # 2. 更新评估分数
+                self._update_assessment_scores(context, response_analysis)
+
+                # 3. 确定对话策略
+                conversation_strategy = self._determine_conversation_strategy(
+                    response_analysis, context
+                )
+
+                # 4. 生成智能回复
+                ai_response = await self._generate_intelligent_response(
+                    user_response, response_analysis, conversation_strategy, context
+                )
+
+                # 5. 更新对话状态
+                self._update_conversation_state(context, response_analysis)
+
+                # 6. 记录对话历史
+                self._record_conversation_history(context, user_response, ai_response, response_analysis)
+                try:
+                    await asyncio.to_thread(self._save_context, context, version)
+                    break
+                except SessionConflictError:
+                    logger.info(f"会话 {session_id} 已被其他worker更新，在最新上下文上重新处理")
+            else:
+                raise SessionConflictError(session_id)
+
             return {
                 "status": "success",
                 "ai_response": ai_response,
@@ -183,7 +214,7 @@ class IntelligentConversationManager:
                 "assessment_scores": context.assessment_scores,
                 "strategy_applied": conversation_strategy,
                 "interaction_count": context.total_interaction_count,
-                "session_analytics": self._get_session_analytics(session_id)
+                "session_analytics": self._get_session_analytics(context)
             }
             
         except Exception as e:
@@ -584,15 +615,41 @@ class IntelligentConversationManager:
         }
         context.conversation_history.append(history_entry)
 
-    def _get_session_analytics(self, session_id: str) -> Dict[str, Any]:
+    def _load_context(self, session_id: str) -> Optional[Tuple[int, ConversationContext]]:
+        """从会话存储读取 (版本号, 对话上下文)"""
+        entry = self.session_store.get_versioned(session_id)
+        if entry is None or not entry[1].get("context"):
+            return None
+        return entry[0], ConversationContext.from_dict(entry[1]["context"])
+
+    def _save_context(self, context: ConversationContext, version: Optional[int] = None):
+        """
+        把对话上下文和评分写回会话存储
+        version 为读取上下文时的版本号，会话在此之后被其他worker更新过则抛出 SessionConflictError；
+        不指定时（开始会话）直接覆盖上下文
+        """
+        data = context.to_dict()
+        scores = dict(context.assessment_scores)
+
+        def apply(state: Dict[str, Any]):
+            state["context"] = data
+            state["scores"] = scores
+
+        if self.session_store.update(context.session_id, apply, expected_version=version) is not None:
+            return
+        if version is not None:
+            # 会话在处理期间已被结束
+            raise SessionConflictError(context.session_id)
+        self.session_store.create(context.domain, context.position, session_id=context.session_id,
+                                  context=data, scores=scores)
+
+    def _get_session_analytics(self, context: ConversationContext) -> Dict[str, Any]:
         """获取会话分析"""
-        if session_id not in self.active_sessions:
-            return {}
-
-        context = self.active_sessions[session_id]
+        started_at = (datetime.fromisoformat(context.conversation_history[0]["timestamp"])
+                      if context.conversation_history else datetime.now())
 
         return {
-            "session_duration": (datetime.now() - context.conversation_history[0]["timestamp"] if context.conversation_history else timedelta()).total_seconds(),
+            "session_duration": (datetime.now() - started_at).total_seconds(),
             "total_interactions": context.total_interaction_count,
             "current_state": context.current_state.value,
             "average_scores": {
@@ -630,21 +687,22 @@ class IntelligentConversationManager:
     async def end_conversation_session(self, session_id: str) -> Dict[str, Any]:
         """结束对话会话"""
         try:
-            if session_id not in self.active_sessions:
+            loaded = await asyncio.to_thread(self._load_context, session_id)
+            if loaded is None:
                 return {"status": "error", "message": "会话不存在"}
-
-            context = self.active_sessions[session_id]
+            context = loaded[1]
 
             # 生成最终评估报告
             final_report = self._generate_final_assessment_report(context)
+            session_summary = self._get_session_analytics(context)
 
             # 清理会话
-            del self.active_sessions[session_id]
+            await asyncio.to_thread(self.session_store.delete, session_id)
 
             return {
                 "status": "success",
                 "final_report": final_report,
-                "session_summary": self._get_session_analytics(session_id)
+                "session_summary": session_summary
             }
 
         except Exception as e:
@@ -2,13 +2,21 @@
 面试服务模块
 管理面试流程、题目选择、会话状态等
 """
+import logging
 import random
+import threading
+import time
 from typing import Dict, Any, List, Optional
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from datetime import datetime
 
-from app.models import InterviewSession, InterviewQuestion, InterviewResponse
+from app.models import SessionLocal, InterviewSession, InterviewQuestion, InterviewResponse
 from app.data.question_bank import get_questions_by_domain_position
+from app.services.segmentation_service import search_tokens
+from app.utils.search_index import FullTextIndex, SearchPage
+
+logger = logging.getLogger(__name__)
 
 class InterviewScenarioService:
     """面试场景服务"""
@@ -239,30 +247,159 @@ class InterviewQuestionService:
     
     @staticmethod
     def get_random_question(domain: str, position: str, db: Session) -> Optional[InterviewQuestion]:
-        """随机获取题目"""
-        questions = db.query(InterviewQuestion).filter(
+        """随机获取题目（只在索引上计数和定位，不加载全部候选题）"""
+        ids = db.query(InterviewQuestion.id).filter(
             InterviewQuestion.domain == domain,
             InterviewQuestion.position == position
-        ).all()
-        
-        return random.choice(questions) if questions else None
+        )
+        count = ids.count()
+        if not count:
+            return None
+        # 在覆盖索引上按偏移取一个题目ID，再按主键读取这一行
+        question_id = ids.offset(random.randrange(count)).limit(1).scalar()
+        return db.get(InterviewQuestion, question_id)
     
     @staticmethod
     def search_questions(keyword: str, domain: str = None, position: str = None, 
-                        db: Session = None) -> List[InterviewQuestion]:
-        """搜索题目"""
-        query = db.query(InterviewQuestion)
-        
-        if domain:
-            query = query.filter(InterviewQuestion.domain == domain)
-        if position:
-            query = query.filter(InterviewQuestion.position == position)
-        
-        # 在题目文本中搜索关键词
-        query = query.filter(InterviewQuestion.question_text.contains(keyword))
-        
-        return query.all()
+                        db: Session = None, page: int = 1, page_size: int = 20) -> List[InterviewQuestion]:
+        """搜索题目（全文索引，按相关度排序）"""
+        result = question_search_index.search(db, keyword, domain, position, page, page_size)
+        return [question for question, _ in InterviewQuestionService._load_hits(result, db)]
+
+    @staticmethod
+    def search_questions_page(keyword: str, domain: str = None, position: str = None,
+                              db: Session = None, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+        """搜索题目并返回分页结果（含命中总数和相关度得分）"""
+        result = question_search_index.search(db, keyword, domain, position, page, page_size)
+        return {
+            "total": result.total,
+            "page": page,
+            "page_size": page_size,
+            "items": [
+                {
+                    "id": question.id,
+                    "score": score,
+                    "question": question.question_text,
+                    "domain": question.domain,
+                    "position": question.position,
+                    "type": question.question_type,
+                    "difficulty": question.difficulty_level,
+                    "keywords": question.keywords,
+                    "expected_points": question.expected_points
+                }
+                for question, score in InterviewQuestionService._load_hits(result, db)
+            ]
+        }
+
+    @staticmethod
+    def _load_hits(result: SearchPage, db: Session) -> List[tuple]:
+        """按主键读取本页命中的题目，保持相关度顺序"""
+        ids = [hit.doc_id for hit in result.hits]
+        if not ids:
+            return []
+        rows = {question.id: question for question in
+                db.query(InterviewQuestion).filter(InterviewQuestion.id.in_(ids)).all()}
+        return [(rows[hit.doc_id], hit.score) for hit in result.hits if hit.doc_id in rows]
+
+
+class QuestionSearchIndex:
+    """
+    题库全文索引
+
+    题目文本、关键词和期望要点按权重写入BM25倒排索引；检索前按 (题目数, 最大ID, 最近修改时间) 检查数据库，
+    新增或被编辑（updated_at 变化）的题目增量写入索引，有删除时整体重建（检查最多每 sync_interval 秒一次）。
+    绕过ORM直接改库不会更新 updated_at，此时需调用 invalidate()
+    """
+
+    FIELD_WEIGHTS = {"question": 2.0, "keywords": 1.5, "expected_points": 1.0}
+
+    def __init__(self, sync_interval: float = 5.0):
+        self.index = FullTextIndex(self.FIELD_WEIGHTS, search_tokens)
+        self.sync_interval = sync_interval
+        self._synced_count = 0
+        self._synced_max_id = 0
+        self._synced_updated_at = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """题目被批量改写后调用，下一次检索时重建索引"""
+        with self._lock:
+            self.index.clear()
+            self._synced_count = 0
+            self._synced_max_id = 0
+            self._synced_updated_at = None
+            self._last_check = 0.0
+
+    def sync(self, db: Session, force: bool = False):
+        """把数据库中的题目同步到索引"""
+        now = time.monotonic()
+        if not force and self._last_check and now - self._last_check < self.sync_interval:
+            return
+        with self._lock:
+            count, max_id, updated_at = db.query(
+                func.count(InterviewQuestion.id), func.max(InterviewQuestion.id), func.max(InterviewQuestion.updated_at)
+            ).one()
+            max_id = max_id or 0
+            if (count, max_id, updated_at) != (self._synced_count, self._synced_max_id, self._synced_updated_at):
+                rows = self._load_rows(db, self._synced_max_id, self._synced_updated_at)
+                added = sum(1 for row in rows if row.id > self._synced_max_id)
+                if self._synced_count + added != count:
+                    # 有题目被删除，整体重建
+                    self.index.clear()
+                    rows = self._load_rows(db, 0)
+                for row in rows:
+                    # 已索引的题目重复 add() 即按新内容更新
+                    self.index.add(
+                        row.id,
+                        {"question": row.question_text, "keywords": row.keywords,
+                         "expected_points": row.expected_points},
+                        domain=row.domain,
+                        position=row.position
+                    )
+                self._synced_count = count
+                self._synced_max_id = max_id
+                self._synced_updated_at = updated_at
+            self._last_check = now
+
+    def _load_rows(self, db: Session, after_id: int, updated_after: Optional[datetime] = None):
+        """读取ID大于 after_id 或在 updated_after 之后修改过的题目"""
+        query = db.query(
+            InterviewQuestion.id, InterviewQuestion.question_text, InterviewQuestion.keywords,
+            InterviewQuestion.expected_points, InterviewQuestion.domain, InterviewQuestion.position
+        )
+        if after_id:
+            # 列迁移前的题目没有修改时间，首次出现修改时间时全部重新读取
+            changed = (InterviewQuestion.updated_at > updated_after if updated_after is not None
+                       else InterviewQuestion.updated_at.isnot(None))
+            query = query.filter(or_(InterviewQuestion.id > after_id, changed))
+        return query.order_by(InterviewQuestion.id).all()
+
+    def warm_up(self):
+        """全量建立索引，启动时调用，避免冷启动后的首次检索承担建索引耗时"""
+        db = SessionLocal()
+        try:
+            self.sync(db, force=True)
+            logger.info(f"题库检索索引已建立，共 {len(self.index)} 道题目")
+        except Exception as e:
+            logger.warning(f"题库检索索引预热失败，将在首次检索时建立: {e}")
+        finally:
+            db.close()
+
+    def start_background_warm_up(self) -> threading.Thread:
+        """在后台线程预热索引，不阻塞启动"""
+        thread = threading.Thread(target=self.warm_up, name="question-index-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def search(self, db: Session, keyword: str, domain: str = None, position: str = None,
+               page: int = 1, page_size: int = 20) -> SearchPage:
+        self.sync(db)
+        page = max(1, page)
+        return self.index.search(keyword, {"domain": domain, "position": position},
+                                 offset=(page - 1) * page_size, limit=page_size)
 
 # 全局服务实例
 interview_scenario_service = InterviewScenarioService()
 interview_question_service = InterviewQuestionService()
+question_search_index = QuestionSearchIndex()
@@ -0,0 +1,318 @@
+"""
+面试会话存储
+按会话ID在服务端保存对话历史、对话上下文和评分，客户端每轮只需提交会话ID和新回答：
+- 持久层为本地SQLite（WAL）文件，每个会话一行并带版本号，同一节点的多个worker共用，重启后可恢复
+- 内存层为 LRU + TTL 缓存，保存已解码的会话；读取时先比对持久层的版本号，版本一致才使用内存副本
+- 写入按版本比较后更新（compare-and-set），其他worker已更新同一会话时重新读取最新版本再应用修改，
+  不会覆盖其他worker写入的对话轮次
+"""
+
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..core.cache import LRUCache
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SessionConflictError(Exception):
+    """会话已被其他进程更新（版本号不一致）"""
+
+
+class SQLiteSessionBackend:
+    """
+    会话持久层
+
+    - 每行保存会话JSON、版本号和过期时间，过期的会话按不存在处理
+    - version() 只读取版本号，用于判断内存副本是否仍是最新
+    - compare_and_set() 仅在版本号与预期一致时写入，写入后版本号加一
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = 86400):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS interview_sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " version INTEGER NOT NULL,"
+            " state TEXT NOT NULL,"
+            " expires_at REAL"
+            ") WITHOUT ROWID"
+        )
+
+    def _expires_at(self) -> Optional[float]:
+        return time.time() + self.ttl_seconds if self.ttl_seconds else None
+
+    def version(self, session_id: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, expires_at FROM interview_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def load(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, state, expires_at FROM interview_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        if row is None or (row[2] is not None and row[2] <= time.time()):
+            return None
+        return row[0], json.loads(row[1])
+
+    def compare_and_set(self, session_id: str, state: Dict[str, Any], expected: Optional[int]) -> Optional[int]:
+        """expected 为 None 表示新建；版本不一致（或会话已存在）时返回 None"""
+        # 不可JSON序列化的值直接报错，不静默转换为字符串
+        encoded = json.dumps(state, ensure_ascii=False)
+        with self._lock:
+            if expected is None:
+                self._conn.execute(
+                    "DELETE FROM interview_sessions WHERE session_id = ? AND expires_at IS NOT NULL AND expires_at <= ?",
+                    (session_id, time.time())
+                )
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO interview_sessions (session_id, version, state, expires_at) VALUES (?, 1, ?, ?)",
+                    (session_id, encoded, self._expires_at())
+                )
+                return 1 if cursor.rowcount == 1 else None
+            cursor = self._conn.execute(
+                "UPDATE interview_sessions SET version = version + 1, state = ?, expires_at = ?"
+                " WHERE session_id = ? AND version = ?",
+                (encoded, self._expires_at(), session_id, expected)
+            )
+            return expected + 1 if cursor.rowcount == 1 else None
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM interview_sessions WHERE session_id = ?", (session_id,))
+        return cursor.rowcount > 0
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM interview_sessions WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )
+        return max(cursor.rowcount, 0)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class InterviewSessionStore:
+    """
+    会话存储
+
+    - 会话状态是可JSON序列化的字典：session_id、domain、position、messages、context、scores 等
+    - get() 返回的状态只读；修改通过 update() / append_messages()，在最新版本上应用修改后按版本写回
+    - 未配置持久层时只保存在本进程内存中
+    """
+
+    def __init__(self, backend: Optional[SQLiteSessionBackend] = None, path: Optional[str] = None,
+                 max_sessions: int = 1000, memory_ttl: Optional[float] = 600, ttl: Optional[float] = 86400,
+                 history_limit: int = 100, max_retries: int = 5):
+        self.path = path
+        self.ttl = ttl
+        self.history_limit = history_limit
+        self.max_retries = max_retries
+        self._persistent = backend
+        # session_id -> (版本号, 会话状态)
+        self._memory = LRUCache(max_entries=max_sessions, ttl_seconds=memory_ttl)
+        self._lock = threading.RLock()
+
+        self.stats = {
+            "created": 0,
+            "loads": 0,
+            "writes": 0,
+            "conflicts": 0,
+            "deleted": 0
+        }
+
+    def _backend(self) -> Optional[SQLiteSessionBackend]:
+        """持久层在第一次使用时打开，打开失败则只使用内存"""
+        if self._persistent is None and self.path:
+            try:
+                self._persistent = SQLiteSessionBackend(self.path, ttl_seconds=self.ttl)
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"会话持久化文件不可用，会话只保存在内存中: {e}")
+                self.path = None
+        return self._persistent
+
+    # ==================== 读取 ====================
+
+    def _entry(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """最新版本的 (版本号, 会话状态)：持久层版本与内存副本一致时直接使用内存副本"""
+        with self._lock:
+            entry = self._memory.get(session_id)
+        backend = self._backend()
+        if backend is None:
+            return entry
+
+        version = backend.version(session_id)
+        if version is None:
+            with self._lock:
+                self._memory.delete(session_id)
+            return None
+        if entry is not None and entry[0] == version:
+            return entry
+
+        loaded = backend.load(session_id)
+        if loaded is None:
+            return None
+        with self._lock:
+            self._memory.set(session_id, loaded)
+            self.stats["loads"] += 1
+        return loaded
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entry(session_id)
+        return entry[1] if entry else None
+
+    def get_versioned(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """(版本号, 会话状态)，调用方在读取的版本上修改后可通过 update(expected_version=...) 写回"""
+        return self._entry(session_id)
+
+    def recent_messages(self, state: Dict[str, Any], window: Optional[int] = None) -> List[Dict[str, str]]:
+        """最近 window 条消息，用于构建提示词（长面试的单轮开销不随轮数增长）"""
+        messages = state.get("messages") or []
+        return messages[-window:] if window else list(messages)
+
+    # ==================== 写入 ====================
+
+    def _write(self, state: Dict[str, Any], expected: Optional[int]) -> Dict[str, Any]:
+        """按版本写入，超出 history_limit 的早期消息被丢弃"""
+        state["updated_at"] = time.time()
+        messages = state.get("messages")
+        if messages and self.history_limit and len(messages) > self.history_limit:
+            del messages[:len(messages) - self.history_limit]
+
+        session_id = state["session_id"]
+        backend = self._backend()
+        with self._lock:
+            if backend is not None:
+                version = backend.compare_and_set(session_id, state, expected)
+            else:
+                current = self._memory.get(session_id, record=False)
+                current_version = current[0] if current else None
+                version = (expected or 0) + 1 if current_version == expected else None
+            if version is None:
+                self.stats["conflicts"] += 1
+                raise SessionConflictError(session_id)
+            self._memory.set(session_id, (version, state))
+            self.stats["writes"] += 1
+        return state
+
+    def create(self, domain: Optional[str] = None, position: Optional[str] = None,
+               session_id: Optional[str] = None, **fields) -> Dict[str, Any]:
+        """创建会话并保存，会话ID已存在时抛出 SessionConflictError"""
+        now = time.time()
+        state = {
+            "session_id": session_id or uuid.uuid4().hex,
+            "domain": domain,
+            "position": position,
+            "messages": [],
+            "context": None,
+            "scores": {},
+            "created_at": now,
+            "updated_at": now,
+            **fields
+        }
+        self._write(state, None)
+        self.stats["created"] += 1
+        return state
+
+    def update(self, session_id: str, mutate: Callable[[Dict[str, Any]], None],
+               expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        在最新版本的副本上调用 mutate 并写回；与其他worker的写入冲突时重新读取并重试
+        指定 expected_version 时只尝试一次：最新版本不是调用方读取的版本则抛出 SessionConflictError，
+        由调用方在最新状态上重新计算
+        会话不存在时返回 None
+        """
+        for _ in range(self.max_retries):
+            entry = self._entry(session_id)
+            if entry is None:
+                return None
+            version, state = entry
+            if expected_version is not None and version != expected_version:
+                with self._lock:
+                    self.stats["conflicts"] += 1
+                raise SessionConflictError(session_id)
+            working = copy.deepcopy(state)
+            mutate(working)
+            try:
+                return self._write(working, version)
+            except SessionConflictError:
+                if expected_version is not None:
+                    raise
+        raise SessionConflictError(session_id)
+
+    def append_messages(self, session_id: str, messages: Iterable[Dict[str, str]]) -> Optional[Dict[str, Any]]:
+        """在会话末尾追加对话消息（只保留 user/assistant 角色）"""
+        new_messages = [
+            {"role": message["role"], "content": message.get("content", "")}
+            for message in messages if message.get("role") in ("user", "assistant")
+        ]
+        return self.update(session_id, lambda state: state.setdefault("messages", []).extend(new_messages))
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            removed = self._memory.delete(session_id)
+        backend = self._backend()
+        if backend is not None:
+            removed = backend.delete(session_id) or removed
+        if removed:
+            self.stats["deleted"] += 1
+        return removed
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            self._memory.purge_expired()
+        backend = self._backend()
+        return backend.purge_expired() if backend is not None else 0
+
+    def close(self):
+        if self._persistent is not None:
+            self._persistent.close()
+            self._persistent = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            memory = self._memory.get_stats()
+        return {
+            **self.stats,
+            "memory_sessions": memory["entries"],
+            "memory_evictions": memory["evictions"],
+            "persistent": self.path
+        }
+
+
+interview_session_store = InterviewSessionStore(
+    path=getattr(settings, 'session_store_path', None),
+    max_sessions=getattr(settings, 'session_store_max_sessions', 1000),
+    memory_ttl=getattr(settings, 'session_store_memory_ttl', 600),
+    ttl=getattr(settings, 'session_store_ttl', 86400),
+    history_limit=getattr(settings, 'session_history_limit', 100)
+)
+
+
+def get_interview_session_store() -> InterviewSessionStore:
+    """获取面试会话存储"""
+    return interview_session_store
@@ -0,0 +1,200 @@
+"""
+实时音频分析
+候选人说话时逐帧接收PCM：同时推送给流式语音识别、增量更新VAD和音量指标，
+说完后只需补齐最终结果，无需再从头识别和分析整段音频
+"""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import numpy as np
+
+from ..core.config import settings
+from .asr_stream_service import ASRStreamSession
+from .iflytek_service import MultimodalAnalysisService, multimodal_service
+from .voice_activity_detector import VoiceActivityDetector, count_spoken_words, speech_rate
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2
+
+
+class LiveAudioSession:
+    """
+    单个面试回答的实时音频分析会话
+
+    - push_audio() 接收任意大小的PCM片段（16kHz/16bit/单声道），每满一个指标窗口返回一条实时指标
+    - transcripts() 产出流式识别的部分结果
+    - finish() 结束识别并返回与整段分析一致的最终结果
+    - 识别服务在静音超过 vad_eos（服务端上限10秒）或单次识别达到时长上限后会结束会话，
+      之后到达的音频会重新建立识别会话，转写文本按顺序拼接
+    """
+
+    def __init__(self, session_id: str, service: Optional[MultimodalAnalysisService] = None,
+                 metrics_interval: float = 1.0, max_audio_bytes: Optional[int] = None):
+        self.session_id = session_id
+        self.service = service or multimodal_service
+        self.window_bytes = int(SAMPLE_RATE * metrics_interval) * BYTES_PER_SAMPLE
+        self.max_audio_bytes = max_audio_bytes or getattr(settings, 'asr_max_audio_size', 10 * 1024 * 1024)
+
+        self.audio = bytearray()
+        self.vad = VoiceActivityDetector(SAMPLE_RATE)
+        self.asr: Optional[ASRStreamSession] = None
+        self.asr_error: Optional[str] = None
+        self.asr_restarts = 0
+        self.latest_text = ""
+
+        self._finished_segments: List[Dict[str, Any]] = []   # 已被服务端结束的识别会话的结果
+        self._asr_changed = asyncio.Event()
+        self._finishing = False
+
+        self._analyzed_bytes = 0   # 已送入VAD的字节数（偶数对齐）
+        self._next_window = self.window_bytes
+
+    @property
+    def asr_enabled(self) -> bool:
+        return self.asr is not None
+
+    async def start(self):
+        """建立流式识别连接，识别服务不可用时只做本地指标分析"""
+        asr_service = self.service.asr_service
+        if not (asr_service.app_id and asr_service.api_key and asr_service.api_secret):
+            self.asr_error = "语音识别未配置"
+            return
+        await self._open_asr()
+
+    async def _open_asr(self):
+        try:
+            session = self.service.asr_service.open_stream()
+            await session.start()
+            self.asr = session
+        except Exception as e:
+            self.asr = None
+            self.asr_error = f"语音识别连接失败: {e}"
+            logger.warning(f"实时音频会话 {self.session_id} {self.asr_error}")
+        self._asr_changed.set()
+
+    async def _reopen_asr(self):
+        """服务端结束了识别会话（候选人停顿较久）：保存已识别的文本并重新建立连接"""
+        previous = self.asr
+        segment = await previous.result()
+        await previous.close()
+        if segment.get("error"):
+            self.asr = None
+            self.asr_error = segment["error"]
+            self._asr_changed.set()
+            return
+        self._finished_segments.append(segment)
+        self.asr_restarts += 1
+        await self._open_asr()
+
+    def _joined_text(self, current: str) -> str:
+        return "".join(segment["text"] for segment in self._finished_segments) + current
+
+    async def push_audio(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """追加一段音频，返回本次跨过的各个指标窗口的实时指标"""
+        if len(self.audio) + len(chunk) > self.max_audio_bytes:
+            raise ValueError("音频超过最大长度限制")
+        self.audio.extend(chunk)
+
+        if self.asr is not None and chunk and self.asr.closed_by_server:
+            await self._reopen_asr()
+        if self.asr is not None and chunk:
+            try:
+                await self.asr.send(chunk)
+            except Exception as e:
+                self.asr_error = f"语音识别中断: {e}"
+                logger.warning(f"实时音频会话 {self.session_id} {self.asr_error}")
+                await self.asr.close()
+                self.asr = None
+
+        aligned = len(self.audio) - len(self.audio) % BYTES_PER_SAMPLE
+        if aligned > self._analyzed_bytes:
+            samples = np.frombuffer(bytes(self.audio[self._analyzed_bytes:aligned]), dtype="<i2")
+            self.vad.feed(samples)
+            self._analyzed_bytes = aligned
+
+        metrics = []
+        while self._analyzed_bytes >= self._next_window:
+            metrics.append(self._window_metrics(self._next_window))
+            self._next_window += self.window_bytes
+        return metrics
+
+    def _window_metrics(self, window_end: int) -> Dict[str, Any]:
+        """最近一个窗口的音量和截至当前的VAD统计"""
+        window = np.frombuffer(bytes(self.audio[window_end - self.window_bytes:window_end]), dtype="<i2")
+        rms = float(np.sqrt(np.mean(np.square(window, dtype=np.float64)))) if window.size else 0.0
+        vad = self.vad.result()
+        rate = speech_rate(vad, count_spoken_words(self.latest_text))
+        return {
+            "type": "metrics",
+            "elapsed": round(window_end / (SAMPLE_RATE * BYTES_PER_SAMPLE), 2),
+            "volume_rms": round(rms, 2),
+            "voiced_time": vad["voiced_time"],
+            "pause_count": vad["pause_count"],
+            "pause_frequency": vad["pause_frequency"],
+            "longest_pause": vad["longest_pause"],
+            "speech_rate": rate["speech_rate"],
+            "word_count_source": rate["source"]
+        }
+
+    async def transcripts(self) -> AsyncIterator[Dict[str, Any]]:
+        """产出部分识别结果（text 为整个回答截至当前的文本），识别不可用或回答结束时停止"""
+        while self.asr is not None:
+            asr = self.asr
+            async for partial in asr.partials():
+                self.latest_text = self._joined_text(partial["text"])
+                yield {
+                    "type": "partial_transcript",
+                    "text": self.latest_text,
+                    "is_final": partial["is_final"] and not asr.closed_by_server
+                }
+            # 服务端结束了本次识别：等待下一段音频到达时重新建立连接，或回答结束
+            while self.asr is asr and not self._finishing:
+                self._asr_changed.clear()
+                await self._asr_changed.wait()
+            if self._finishing and self.asr is asr:
+                return
+
+    async def finish(self) -> Dict[str, Any]:
+        """结束识别，汇总最终转写、语音特征和情感分析"""
+        self._finishing = True
+        self._asr_changed.set()
+        segments = list(self._finished_segments)
+        if self.asr is not None:
+            await self.asr.end()
+            segments.append(await self.asr.result())
+        if segments:
+            confidences = [segment["confidence"] for segment in segments if segment.get("confidence")]
+            transcription = {
+                "text": "".join(segment.get("text", "") for segment in segments),
+                "confidence": round(sum(confidences) / len(confidences), 3) if confidences else 0.0
+            }
+            if segments[-1].get("error"):
+                transcription["error"] = segments[-1]["error"]
+            if len(segments) > 1:
+                transcription["segments"] = len(segments)
+        else:
+            transcription = {"text": "", "confidence": 0.0, "error": self.asr_error}
+        text = transcription.get("text", "")
+        self.latest_text = text or self.latest_text
+
+        audio = bytes(self.audio)
+        speech_features = await self.service.speech_analysis_service.analyze_speech_features(audio, text)
+        emotion = await self.service.emotion_service.analyze_emotion(text) if text else {}
+
+        return {
+            "type": "final",
+            "session_id": self.session_id,
+            "duration": round(len(audio) / (SAMPLE_RATE * BYTES_PER_SAMPLE), 2),
+            "transcription": transcription,
+            "speech_features": speech_features,
+            "emotion_analysis": emotion
+        }
+
+    async def close(self):
+        if self.asr is not None:
+            await self.asr.close()
+            self.asr = None
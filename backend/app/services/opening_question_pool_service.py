@@ -0,0 +1,210 @@
+"""
+开场问题预生成池
+为被请求过的 (领域, 岗位) 预先生成若干开场问题，后续请求直接取用，
+后台任务以低优先级调用Spark异步补齐
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from ..data.question_bank import get_all_domains, get_positions_by_domain
+
+logger = logging.getLogger(__name__)
+
+# 生成函数：(domain, position) -> 开场结果，失败返回None
+OpeningGenerator = Callable[[str, str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class OpeningQuestionPool:
+    """
+    开场问题池
+
+    - 每种开场类型（kind）注册一个生成函数，如普通开场和增强版开场
+    - 每个 (kind, domain, position) 保留最多 pool_size 个未使用的结果，取出即消费，保证候选人拿到的问题不重复
+    - 按需补齐：只有被 take() 过的组合才会补齐，首次取用未命中后开始预生成；
+      超过 max_age 没有再被取用的组合停止补齐，不为无人使用的岗位反复调用Spark
+    - 超过 max_age 的结果视为过期并丢弃
+    - 后台任务按缺口从大到小补齐，取用时立即唤醒
+    """
+
+    def __init__(self, pool_size: Optional[int] = None, max_age: Optional[float] = None,
+                 concurrency: Optional[int] = None, refill_interval: float = 60.0):
+        self.pool_size = max(1, pool_size or getattr(settings, 'opening_pool_size', 3))
+        self.max_age = max_age or getattr(settings, 'opening_pool_max_age', 3600)
+        self.concurrency = max(1, concurrency or getattr(settings, 'opening_pool_refill_concurrency', 2))
+        self.refill_interval = refill_interval
+
+        self._generators: Dict[str, OpeningGenerator] = {}
+        self._pools: Dict[Tuple[str, str, str], Deque[Tuple[float, Dict[str, Any]]]] = {}
+        # (kind, domain, position) -> 最近一次取用时间，只补齐其中的组合
+        self._demand: Dict[Tuple[str, str, str], float] = {}
+        self._refilling: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._failures = 0
+
+        self.stats = {
+            "served": 0,
+            "misses": 0,
+            "generated": 0,
+            "failed": 0,
+            "expired": 0,
+            "idle_dropped": 0
+        }
+
+    def register(self, kind: str, generator: OpeningGenerator):
+        """注册一种开场类型的生成函数"""
+        self._generators[kind] = generator
+
+    @staticmethod
+    def pairs() -> List[Tuple[str, str]]:
+        """题库中所有 (领域, 岗位) 组合"""
+        return [(domain, position) for domain in get_all_domains()
+                for position in get_positions_by_domain(domain)]
+
+    def _pool(self, key: Tuple[str, str, str]) -> Deque[Tuple[float, Dict[str, Any]]]:
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = deque()
+        return pool
+
+    def _purge_expired(self, pool: Deque[Tuple[float, Dict[str, Any]]]):
+        cutoff = time.time() - self.max_age
+        while pool and pool[0][0] < cutoff:
+            pool.popleft()
+            self.stats["expired"] += 1
+
+    @staticmethod
+    def is_known_pair(domain: str, position: str) -> bool:
+        return position in get_positions_by_domain(domain)
+
+    def take(self, kind: str, domain: str, position: str) -> Optional[Dict[str, Any]]:
+        """取出一个预生成的开场结果，池为空时返回None；记录该组合的需求并唤醒补齐任务"""
+        key = (kind, domain, position)
+        if kind in self._generators and self.is_known_pair(domain, position):
+            self._demand[key] = time.time()
+        pool = self._pools.get(key)
+        result = None
+        if pool:
+            self._purge_expired(pool)
+            if pool:
+                result = pool.popleft()[1]
+
+        if result is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["served"] += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return result
+
+    def put(self, kind: str, domain: str, position: str, result: Dict[str, Any]):
+        pool = self._pool((kind, domain, position))
+        pool.append((time.time(), result))
+        while len(pool) > self.pool_size:
+            pool.popleft()
+
+    def _deficits(self) -> List[Tuple[int, Tuple[str, str, str]]]:
+        """按缺口从大到小列出有需求的池"""
+        deficits = []
+        idle_cutoff = time.time() - self.max_age
+        for key, last_taken in list(self._demand.items()):
+            if last_taken < idle_cutoff:
+                # 长时间无人取用，停止补齐，池中剩余结果到期后自然丢弃
+                del self._demand[key]
+                self.stats["idle_dropped"] += 1
+                continue
+            pool = self._pool(key)
+            self._purge_expired(pool)
+            missing = self.pool_size - len(pool) - (1 if key in self._refilling else 0)
+            if missing > 0:
+                deficits.append((missing, key))
+        deficits.sort(key=lambda item: -item[0])
+        return deficits
+
+    async def _refill_one(self, key: Tuple[str, str, str]) -> bool:
+        kind, domain, position = key
+        self._refilling.add(key)
+        try:
+            result = await self._generators[kind](domain, position)
+        except Exception as e:
+            logger.warning(f"开场问题预生成失败 {key}: {e}")
+            result = None
+        finally:
+            self._refilling.discard(key)
+
+        if result is None:
+            self.stats["failed"] += 1
+            return False
+        self.put(kind, domain, position, result)
+        self.stats["generated"] += 1
+        return True
+
+    async def refill_once(self) -> int:
+        """补齐一轮（最多 concurrency 个），返回成功生成的数量"""
+        deficits = self._deficits()[:self.concurrency]
+        if not deficits:
+            return 0
+        results = await asyncio.gather(*[self._refill_one(key) for _, key in deficits])
+        return sum(1 for ok in results if ok)
+
+    async def _run(self):
+        while True:
+            deficits = self._deficits()
+            if not deficits:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            generated = await self.refill_once()
+            if generated:
+                self._failures = 0
+            else:
+                # 上游不可用时指数退避，避免空转
+                self._failures += 1
+                await asyncio.sleep(min(60.0, 2 ** self._failures))
+
+    def start(self):
+        """启动后台补齐任务"""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"开场问题池已启动: 按需补齐{len(self.pairs())}个岗位组合, 每组{self.pool_size}个")
+
+    async def stop(self):
+        """停止后台补齐任务"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.stats["served"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "running": self._task is not None and not self._task.done(),
+            "pool_size": self.pool_size,
+            "pooled": sum(len(pool) for pool in self._pools.values()),
+            "active_pairs": len(self._demand),
+            "serve_rate": self.stats["served"] / total * 100 if total else 0.0
+        }
+
+
+# 全局开场问题池
+opening_question_pool = OpeningQuestionPool()
+
+
+def get_opening_question_pool() -> OpeningQuestionPool:
+    """获取开场问题池实例"""
+    return opening_question_pool
@@ -17,6 +17,7 @@ from concurrent.futures import ThreadPoolExecutor
 import weakref
 
 from ..core.config import settings
+from ..core.cache import create_cache
 from ..core.database import SessionLocal, engine
 from sqlalchemy import text
 from sqlalchemy.pool import QueuePool
@@ -70,10 +71,10 @@ class PerformanceOptimizationService:
         self.slow_query_threshold = 1.0        # 1秒以上为慢查询
         
         # 缓存管理
-        self.memory_cache = {}
-        self.cache_timestamps = {}
         self.cache_max_size = 1000
         self.cache_ttl = 3600  # 1小时
+        self.memory_cache = create_cache("performance", max_entries=self.cache_max_size,
+                                         ttl_seconds=self.cache_ttl)
         
         # 连接池优化
         self.connection_pool_stats = {
@@ -253,31 +254,25 @@ class PerformanceOptimizationService:
         """从缓存获取数据"""
         self.cache_stats['total_requests'] += 1
         
-        if key in self.memory_cache:
-            # 检查是否过期
-            if key in self.cache_timestamps:
-                if time.time() - self.cache_timestamps[key] < self.cache_ttl:
-                    self.cache_stats['hits'] += 1
-                    return self.memory_cache[key]
-                else:
-                    # 过期，删除
-                    del self.memory_cache[key]
-                    del self.cache_timestamps[key]
+        value = self.memory_cache.get(key)
+        if value is not None:
+            self.cache_stats['hits'] += 1
+            return value
         
         self.cache_stats['misses'] += 1
         return None
     
-    def cache_set(self, key: str, value: Any):
-        """设置缓存数据"""
-        # 如果缓存已满，删除最旧的条目
-        if len(self.memory_cache) >= self.cache_max_size:
-            oldest_key = min(self.cache_timestamps.keys(), 
-                           key=lambda k: self.cache_timestamps[k])
-            del self.memory_cache[oldest_key]
-            del self.cache_timestamps[oldest_key]
-        
-        self.memory_cache[key] = value
-        self.cache_timestamps[key] = time.time()
+    def cache_set(self, key: str, value: Any) -> bool:
+        """
+        设置缓存数据（超出容量时由缓存后端按LRU淘汰）
+        共享缓存后端只接受可JSON序列化的值，其他值跳过缓存并返回 False，调用方无需关心后端类型
+        """
+        try:
+            self.memory_cache.set(key, value)
+        except TypeError as e:
+            logger.warning(f"跳过不可缓存的值 {key}: {e}")
+            return False
+        return True
     
     async def _get_database_connections(self) -> int:
         """获取数据库连接数"""
@@ -386,19 +381,10 @@ class PerformanceOptimizationService:
     
     def _cleanup_expired_cache(self) -> Dict[str, Any]:
         """清理过期缓存"""
-        current_time = time.time()
-        expired_keys = []
-        
-        for key, timestamp in self.cache_timestamps.items():
-            if current_time - timestamp > self.cache_ttl:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self.memory_cache[key]
-            del self.cache_timestamps[key]
+        removed = self.memory_cache.purge_expired()
         
         return {
-            'expired_entries_removed': len(expired_keys),
+            'expired_entries_removed': removed,
             'current_cache_size': len(self.memory_cache)
         }
     
@@ -410,7 +396,7 @@ class PerformanceOptimizationService:
             'available_memory': memory.available,
             'used_memory': memory.used,
             'memory_percent': memory.percent,
-            'cache_memory_usage': len(self.memory_cache) * 1024  # 估算
+            'cache_memory_usage': self.memory_cache.size_bytes
         }
     
     async def _cleanup_expired_data(self) -> Dict[str, Any]:
@@ -665,7 +651,8 @@ class PerformanceOptimizationService:
             'total_requests': self.cache_stats['total_requests'],
             'hits': self.cache_stats['hits'],
             'misses': self.cache_stats['misses'],
-            'ttl_seconds': self.cache_ttl
+            'ttl_seconds': self.cache_ttl,
+            'backend': self.memory_cache.get_stats()
         }
 
     def _assess_system_health(self) -> Dict[str, Any]:
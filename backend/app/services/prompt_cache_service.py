@@ -0,0 +1,263 @@
+"""
+提示词归一化缓存服务
+按 模板ID + 归一化槽位 生成缓存键，同一键下维护一组预生成的回答池，
+并可通过字符n-gram MinHash查找近似重复的提示词，复用已有回答池
+"""
+
+import hashlib
+import json
+import logging
+import random
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..core.cache import create_cache
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_POSITION_SUFFIXES = ("岗位", "职位")
+
+
+def normalize_text(text: str) -> str:
+    """归一化文本：全半角统一、去除多余空白、大小写折叠"""
+    text = unicodedata.normalize("NFKC", str(text))
+    return _WHITESPACE_RE.sub(" ", text).strip().casefold()
+
+
+def normalize_slot(name: str, value: Any) -> str:
+    """归一化槽位值，岗位名去掉“岗位/职位”等后缀"""
+    text = normalize_text(value)
+    if name == "position":
+        for suffix in _POSITION_SUFFIXES:
+            if text.endswith(suffix) and len(text) > len(suffix):
+                text = text[:-len(suffix)].strip()
+    return text
+
+
+def canonical_key(template_id: str, slots: Dict[str, Any]) -> str:
+    """由模板ID和归一化后的槽位生成缓存键"""
+    normalized = {name: normalize_slot(name, value) for name, value in slots.items()}
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    return f"{template_id}:{hashlib.md5(payload.encode('utf-8')).hexdigest()}"
+
+
+class MinHashIndex:
+    """
+    字符n-gram MinHash + LSH 近似重复索引
+
+    - 签名为 num_perm 个哈希置换下的最小值，签名相同位置的比例即Jaccard相似度的估计
+    - 签名按 bands 分段放入桶中，只与同桶候选比较
+    """
+
+    _PRIME = (1 << 31) - 1
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, ngram: int = 3,
+                 threshold: float = 0.9, seed: int = 7):
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.ngram = ngram
+        self.threshold = threshold
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, self._PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, self._PRIME, size=num_perm).astype(np.uint64)
+
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _shingles(self, text: str) -> Set[str]:
+        text = normalize_text(text)
+        if len(text) <= self.ngram:
+            return {text}
+        return {text[i:i + self.ngram] for i in range(len(text) - self.ngram + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        """计算文本的MinHash签名"""
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) % self._PRIME for s in self._shingles(text)),
+            dtype=np.uint64
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % self._PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(self.bands)]
+
+    def add(self, key: str, text: str):
+        """加入索引，同一key重复加入时覆盖"""
+        if key in self._signatures:
+            self.remove(key)
+        signature = self.signature(text)
+        self._signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets[band_key].add(key)
+
+    def remove(self, key: str):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def query(self, text: str, exclude: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """返回相似度不低于阈值的最相似key及其估计相似度"""
+        signature = self.signature(text)
+        candidates: Set[str] = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        candidates.discard(exclude)
+
+        best = None
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+
+class PromptCacheService:
+    """
+    提示词归一化缓存
+
+    同一规范键下的回答池未满时调用Spark生成并加入池中，池满后直接从池中随机返回，
+    既避免重复调用，也保留一定的问题多样性
+    """
+
+    def __init__(self, pool_size: Optional[int] = None, ttl_seconds: Optional[int] = None,
+                 near_duplicate: Optional[bool] = None, similarity_threshold: Optional[float] = None):
+        self.pool_size = max(1, pool_size or getattr(settings, 'prompt_cache_pool_size', 3))
+        self.ttl_seconds = ttl_seconds or getattr(settings, 'prompt_cache_ttl', 86400)
+        self.near_duplicate = (getattr(settings, 'prompt_cache_near_duplicate', True)
+                               if near_duplicate is None else near_duplicate)
+        threshold = similarity_threshold or getattr(settings, 'prompt_cache_similarity', 0.85)
+
+        self.pools = create_cache("prompt_pool", max_entries=2000, ttl_seconds=self.ttl_seconds)
+        # 每个模板一个近似重复索引，避免跨模板误匹配
+        self._indexes: Dict[str, MinHashIndex] = defaultdict(lambda: MinHashIndex(threshold=threshold))
+
+        self.stats = {
+            "requests": 0,
+            "exact_hits": 0,
+            "near_duplicate_hits": 0,
+            "generated": 0,
+            "rejected": 0
+        }
+
+    def make_key(self, template_id: str, slots: Dict[str, Any]) -> str:
+        return canonical_key(template_id, slots)
+
+    def get_pool(self, key: str) -> List[str]:
+        return self.pools.get(key) or []
+
+    @staticmethod
+    def similarity_text(slots: Dict[str, Any], messages: Optional[List[Dict[str, str]]] = None) -> str:
+        """
+        近似重复比较所用的文本
+
+        有槽位时只比较槽位值：模板正文占提示词的绝大部分，整段比较会让不同岗位的提示词也高度相似
+        """
+        if slots:
+            return " | ".join(normalize_slot(name, slots[name]) for name in sorted(slots))
+        return messages[-1].get("content", "") if messages else ""
+
+    def add_to_pool(self, key: str, answer: str, template_id: Optional[str] = None,
+                    prompt_text: Optional[str] = None) -> int:
+        """向回答池加入一个回答，返回加入后的池大小"""
+        pool = self.get_pool(key)
+        if answer not in pool:
+            pool = (pool + [answer])[-self.pool_size:]
+            self.pools.set(key, pool)
+        if self.near_duplicate and template_id and prompt_text:
+            self._indexes[template_id].add(key, prompt_text)
+        return len(pool)
+
+    def lookup(self, template_id: str, slots: Dict[str, Any],
+               messages: Optional[List[Dict[str, str]]] = None) -> Optional[str]:
+        """从已满的回答池中取一个回答，精确键未命中时尝试近似重复查找"""
+        self.stats["requests"] += 1
+        key = self.make_key(template_id, slots)
+        pool = self.get_pool(key)
+        if len(pool) >= self.pool_size:
+            self.stats["exact_hits"] += 1
+            return random.choice(pool)
+
+        prompt_text = self.similarity_text(slots, messages)
+        if self.near_duplicate and prompt_text and template_id in self._indexes:
+            match = self._indexes[template_id].query(prompt_text, exclude=key)
+            if match is not None:
+                similar_pool = self.get_pool(match[0])
+                if len(similar_pool) >= self.pool_size:
+                    self.stats["near_duplicate_hits"] += 1
+                    logger.debug(f"提示词近似命中: {key} -> {match[0]} ({match[1]:.2f})")
+                    return random.choice(similar_pool)
+        return None
+
+    def remember(self, template_id: str, slots: Dict[str, Any], answer: str,
+                 messages: Optional[List[Dict[str, str]]] = None,
+                 validate: Optional[Callable[[str], bool]] = None) -> bool:
+        """
+        将新生成的回答加入回答池
+
+        validate 返回 False 的回答（如服务不可用的提示语）不会进入回答池
+        """
+        if not answer or (validate is not None and not validate(answer)):
+            self.stats["rejected"] += 1
+            return False
+        self.stats["generated"] += 1
+        self.add_to_pool(self.make_key(template_id, slots), answer, template_id,
+                         self.similarity_text(slots, messages))
+        return True
+
+    async def get_or_generate(self, template_id: str, slots: Dict[str, Any],
+                              messages: List[Dict[str, str]],
+                              generate: Callable[[List[Dict[str, str]]], Awaitable[str]],
+                              validate: Optional[Callable[[str], bool]] = None) -> str:
+        """命中回答池时直接返回，否则调用 generate 生成并加入回答池"""
+        cached = self.lookup(template_id, slots, messages)
+        if cached is not None:
+            return cached
+
+        answer = await generate(messages)
+        self.remember(template_id, slots, answer, messages, validate)
+        return answer
+
+    def clear(self):
+        self.pools.clear()
+        self._indexes.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        served = self.stats["exact_hits"] + self.stats["near_duplicate_hits"]
+        return {
+            **self.stats,
+            "pool_size": self.pool_size,
+            "hit_rate": served / self.stats["requests"] * 100 if self.stats["requests"] else 0.0,
+            "indexed_prompts": sum(len(index) for index in self._indexes.values()),
+            "pools": self.pools.get_stats()
+        }
+
+
+# 全局提示词缓存实例
+prompt_cache_service = PromptCacheService()
+
+
+def get_prompt_cache_service() -> PromptCacheService:
+    """获取提示词缓存服务实例"""
+    return prompt_cache_service
@@ -6,26 +6,33 @@ import json
 import base64
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # 使用非交互式后端
 import numpy as np
 from io import BytesIO
-import seaborn as sns
-from matplotlib import font_manager
-import jieba
 import logging
 from jinja2 import Template
-import pandas as pd
 from dataclasses import dataclass
 from collections import defaultdict
 
-# 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
-plt.rcParams['axes.unicode_minus'] = False
+from ..core.lazy_import import lazy_module
 
 logger = logging.getLogger(__name__)
 
+
+def _load_pyplot():
+    import matplotlib
+    matplotlib.use('Agg')  # 使用非交互式后端
+    import matplotlib.pyplot as pyplot
+
+    # 设置中文字体
+    pyplot.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
+    pyplot.rcParams['axes.unicode_minus'] = False
+    return pyplot
+
+
+# 绘图和表格导出只在生成报告时用到，首次使用时再导入
+plt = lazy_module("matplotlib.pyplot", _load_pyplot)
+pd = lazy_module("pandas")
+
 @dataclass
 class ReportMetrics:
     """报告指标数据类"""
@@ -0,0 +1,55 @@
+"""
+能力评分任务
+分词和正则密集的评分器都是纯函数，这里把它们包装成可在进程池中执行的任务：
+工作进程启动时预加载jieba词典和评估器，调用方通过异步接口提交，不阻塞事件循环
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from ..core.config import settings
+from ..core.cpu_executor import CPUBoundExecutor
+from .enhanced_capability_evaluator import enhanced_capability_evaluator
+from .segmentation_service import segmentation_service
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up_worker():
+    """
+    工作进程初始化：确保分词词典可用，之后的任务不再付出首次分词的开销
+    （工作进程以spawn方式启动，不共享主进程内存；主进程先通过 before_start 生成词典缓存，
+    每个工作进程从缓存文件加载自己的词典）
+    """
+    segmentation_service.ensure_ready()
+
+
+def _evaluate_comprehensive(analysis_results: Dict[str, Any], domain: str, evaluation_style: str) -> Dict[str, Any]:
+    return enhanced_capability_evaluator.evaluate_comprehensive(analysis_results, domain, evaluation_style)
+
+
+scoring_executor = CPUBoundExecutor(
+    max_workers=getattr(settings, 'scoring_max_workers', 0) or None,
+    max_pending=getattr(settings, 'scoring_max_pending', 0) or None,
+    inline_threshold=getattr(settings, 'scoring_inline_threshold', 200),
+    initializer=warm_up_worker,
+    before_start=segmentation_service.ensure_ready,
+    enabled=getattr(settings, 'scoring_process_pool_enabled', True)
+)
+
+
+def get_scoring_executor() -> CPUBoundExecutor:
+    """获取评分任务执行器"""
+    return scoring_executor
+
+
+async def evaluate_comprehensive(analysis_results: Dict[str, Any], domain: str = "人工智能",
+                                 evaluation_style: str = "balanced",
+                                 text_length: Optional[int] = None) -> Dict[str, Any]:
+    """
+    六维能力综合评估（进程池执行）
+    :param text_length: 回答文本长度，用于判断是否值得放到进程池
+    """
+    return await scoring_executor.run(
+        _evaluate_comprehensive, analysis_results, domain, evaluation_style, size=text_length
+    )
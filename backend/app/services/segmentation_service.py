@@ -0,0 +1,195 @@
+"""
+中文分词服务
+进程内共用一个jieba分词器：词典在后台线程中懒加载（启动不再被词典构建阻塞），
+各评估器的领域关键词作为用户词典只加入一次，词典的序列化缓存保存在固定目录，
+重启和新工作进程直接加载缓存
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from ..core.config import settings
+
+if TYPE_CHECKING:
+    import jieba
+
+logger = logging.getLogger(__name__)
+
+
+class SegmentationService:
+    """
+    共享分词服务
+
+    - start_background_load() 在后台线程加载词典和TF-IDF词表，加载完成前的分词调用等待加载结束
+    - 未启动后台加载或后台加载失败时，分词调用在当前线程同步加载，仍然失败则抛出异常
+    - add_words() 注册的词在词典就绪后加入用户词典，重复注册的词只加一次
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, tokenizer: Optional["jieba.Tokenizer"] = None):
+        # 未指定分词器时使用jieba的默认分词器（与jieba.analyse共用），导入同样推迟到加载时
+        self.tokenizer = tokenizer
+        self.cache_dir = cache_dir
+        self._ready = threading.Event()
+        self._load_lock = threading.Lock()
+        self._words_lock = threading.Lock()
+        self._loader: Optional[threading.Thread] = None
+        self._user_words = set()
+        self._pending_words: List[str] = []
+        self._tfidf = None
+
+        self.stats = {
+            "state": "idle",
+            "error": None,
+            "load_seconds": 0.0,
+            "user_words": 0,
+            "waits": 0,
+            "total_wait": 0.0
+        }
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start_background_load(self) -> Optional[threading.Thread]:
+        """在后台线程加载词典（重复调用无副作用）"""
+        if self._ready.is_set():
+            return None
+        with self._load_lock:
+            if self._loader is None:
+                self._loader = threading.Thread(target=self._load, name="segmentation-loader", daemon=True)
+                self.stats["state"] = "loading"
+                self._loader.start()
+        return self._loader
+
+    def ensure_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        确保词典已加载：后台加载中则等待（超时返回 False）；
+        尚未开始或后台加载失败则在当前线程加载，加载失败时抛出异常
+        """
+        if self._ready.is_set():
+            return True
+        loader = self._loader
+        if loader is not None:
+            wait_start = time.perf_counter()
+            loader.join(timeout)
+            self.stats["waits"] += 1
+            self.stats["total_wait"] += time.perf_counter() - wait_start
+            if self._ready.is_set():
+                return True
+            if loader.is_alive():
+                return False
+        self._load(raise_errors=True)
+        return True
+
+    def _load(self, raise_errors: bool = False):
+        try:
+            self._initialize()
+        except Exception as e:
+            self.stats["state"] = "failed"
+            self.stats["error"] = str(e)
+            logger.error(f"分词词典加载失败: {e}")
+            if raise_errors:
+                raise
+
+    def _initialize(self):
+        start = time.perf_counter()
+        with self._load_lock:
+            if self._ready.is_set():
+                return
+            self.stats["state"] = "loading"
+            if self.tokenizer is None:
+                import jieba
+                self.tokenizer = jieba.dt
+            if self.cache_dir:
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    self.tokenizer.tmp_dir = self.cache_dir
+                except OSError as e:
+                    logger.warning(f"分词词典缓存目录不可用，使用系统临时目录: {e}")
+            self.tokenizer.initialize()
+            self._tfidf = self._build_tfidf()
+
+            with self._words_lock:
+                for word in self._pending_words:
+                    self.tokenizer.add_word(word)
+                self._pending_words.clear()
+                self._ready.set()
+
+            self.stats["state"] = "ready"
+            self.stats["error"] = None
+            self.stats["load_seconds"] = round(time.perf_counter() - start, 3)
+            logger.info(f"分词词典加载完成，用时 {self.stats['load_seconds']} 秒，用户词 {self.stats['user_words']} 个")
+
+    def _build_tfidf(self):
+        # jieba.analyse 在导入时读取IDF词表，放到加载线程里延后导入
+        import jieba
+        import jieba.analyse
+        if self.tokenizer is jieba.dt:
+            return jieba.analyse.default_tfidf
+        tfidf = jieba.analyse.TFIDF()
+        tfidf.tokenizer = self.tokenizer
+        tfidf.postokenizer = jieba.posseg.POSTokenizer(self.tokenizer)
+        return tfidf
+
+    def add_words(self, words: Iterable[str]):
+        """注册用户词（领域关键词等），含空白的词组不加入"""
+        with self._words_lock:
+            for word in words:
+                word = (word or "").strip()
+                if not word or word in self._user_words or any(ch.isspace() for ch in word):
+                    continue
+                self._user_words.add(word)
+                if self._ready.is_set():
+                    self.tokenizer.add_word(word)
+                else:
+                    self._pending_words.append(word)
+            self.stats["user_words"] = len(self._user_words)
+
+    def cut(self, text: str) -> Tuple[str, ...]:
+        """精确模式分词"""
+        self.ensure_ready()
+        return tuple(self.tokenizer.cut(text))
+
+    def cut_for_search(self, text: str) -> Tuple[str, ...]:
+        """搜索引擎模式分词：长词再切出其中的短词，用于全文索引"""
+        self.ensure_ready()
+        return tuple(self.tokenizer.cut_for_search(text))
+
+    def extract_tags(self, text: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """TF-IDF关键词及权重"""
+        self.ensure_ready()
+        return self._tfidf.extract_tags(text, topK=top_k, withWeight=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "total_wait": round(self.stats["total_wait"], 3),
+            "ready": self._ready.is_set()
+        }
+
+
+segmentation_service = SegmentationService(cache_dir=getattr(settings, 'segmentation_cache_dir', None))
+
+
+def get_segmentation_service() -> SegmentationService:
+    """获取共享分词服务"""
+    return segmentation_service
+
+
+_WORD_RE = re.compile(r"\w")
+_SEARCH_STOPWORDS = frozenset(
+    "的 了 是 在 和 与 及 或 也 就 都 而 被 把 对 从 中 等 请 你 我 他 它 吗 呢 吧 啊 "
+    "一个 一下 什么 如何 怎么 怎样 哪些 为什么".split()
+)
+
+
+def search_tokens(text: str) -> List[str]:
+    """全文检索用的词条：搜索引擎模式分词并统一小写，去掉标点、空白和常见虚词"""
+    return [
+        token for token in segmentation_service.cut_for_search((text or "").lower())
+        if token not in _SEARCH_STOPWORDS and _WORD_RE.search(token) and not token.isspace()
+    ]
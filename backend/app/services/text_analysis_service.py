@@ -3,20 +3,20 @@
 实现内容相关性分析、逻辑结构分析、关键词匹配、创新性评估等功能
 """
 import re
-import jieba
-import jieba.analyse
+import bisect
 from typing import Dict, Any, List, Set
 from collections import Counter
 import numpy as np
 from datetime import datetime
 
+from ..utils.keyword_matcher import KeywordMatcher, keyword_index
+from .segmentation_service import segmentation_service
+from .text_features import get_text_features
+
 class ContentRelevanceAnalyzer:
     """内容相关性分析器"""
     
     def __init__(self):
-        # 初始化jieba分词
-        jieba.initialize()
-        
         # 技术领域关键词库
         self.domain_keywords = {
             "人工智能": [
@@ -57,6 +57,12 @@ class ContentRelevanceAnalyzer:
                 "数据驱动", "增长", "转化", "留存", "商业模式"
             ]
         }
+
+        # 关键词加入共享分词器的用户词典，保证按词匹配时不被切开（分词对象是小写文本）
+        # 注意：加入后分词结果变化，communication_score 与 text_expression 相比加入前约有 1–3 分的偏移，
+        # 与此前的历史分数对比时需考虑
+        for keywords in list(self.domain_keywords.values()) + list(self.position_keywords.values()):
+            segmentation_service.add_words(keyword.lower() for keyword in keywords)
     
     def analyze_relevance(self, text: str, domain: str, position: str) -> Dict[str, Any]:
         """
@@ -67,7 +73,7 @@ class ContentRelevanceAnalyzer:
         :return: 相关性分析结果
         """
         # 分词
-        words = list(jieba.cut(text.lower()))
+        words = get_text_features(text).lower_tokens
         word_set = set(words)
         
         # 获取领域和岗位关键词
@@ -113,6 +119,9 @@ class LogicalStructureAnalyzer:
             "action": ["行动", "做法", "方法", "实施", "执行", "采用"],
             "result": ["结果", "效果", "成果", "收获", "提升", "改善"]
         }
+
+        # 连接词和STAR关键词编译为一个自动机，命中位置再对应到所在句子
+        self.matcher = KeywordMatcher({"connector": self.logical_connectors, **self.star_keywords})
     
     def analyze_logical_structure(self, text: str) -> Dict[str, Any]:
         """
@@ -120,28 +129,23 @@ class LogicalStructureAnalyzer:
         :param text: 待分析文本
         :return: 逻辑结构分析结果
         """
-        sentences = re.split(r'[。！？；]', text)
-        sentences = [s.strip() for s in sentences if s.strip()]
+        sentences = get_text_features(text).sentences("。！？；")
         
+        # 一次扫描全文，按句子去重统计（同一句中重复出现的连接词只计一次）
+        boundaries = [match.start() for match in re.finditer(r'[。！？；]', text)]
+        sentence_hits = set()
+        for hit in self.matcher.find_all(text):
+            sentence_index = bisect.bisect_right(boundaries, hit.start)
+            for category in hit.categories:
+                sentence_hits.add((sentence_index, category, hit.keyword))
+
         # 检测逻辑连接词
-        connector_count = 0
-        connectors_found = []
-        
-        for sentence in sentences:
-            for connector in self.logical_connectors:
-                if connector in sentence:
-                    connector_count += 1
-                    connectors_found.append(connector)
+        connectors_found = [keyword for _, category, keyword in sentence_hits if category == "connector"]
+        connector_count = len(connectors_found)
         
         # 检测STAR结构
-        star_structure = {}
-        for category, keywords in self.star_keywords.items():
-            matches = []
-            for sentence in sentences:
-                for keyword in keywords:
-                    if keyword in sentence:
-                        matches.append(keyword)
-            star_structure[category] = len(matches) > 0
+        star_categories = {category for _, category, _ in sentence_hits}
+        star_structure = {category: category in star_categories for category in self.star_keywords}
         
         # 计算逻辑结构得分
         connector_score = min(100, (connector_count / len(sentences)) * 100) if sentences else 0
@@ -185,16 +189,14 @@ class KeywordCoverageAnalyzer:
         text_lower = text.lower()
         
         # 检查关键词覆盖
-        covered_keywords = []
-        for keyword in expected_keywords:
-            if keyword.lower() in text_lower:
-                covered_keywords.append(keyword)
+        found = set(keyword_index.found(text_lower, [keyword.lower() for keyword in expected_keywords]))
+        covered_keywords = [keyword for keyword in expected_keywords if keyword.lower() in found]
         
         # 计算覆盖率
         coverage_rate = len(covered_keywords) / len(expected_keywords) if expected_keywords else 0
         
         # 提取文本中的关键词
-        keywords_extracted = jieba.analyse.extract_tags(text, topK=10, withWeight=True)
+        keywords_extracted = get_text_features(text).extract_tags(10)
         
         return {
             "coverage_rate": coverage_rate * 100,
@@ -231,27 +233,17 @@ class InnovationAnalyzer:
         text_lower = text.lower()
         
         # 检测创新性指示词
-        innovation_count = 0
-        innovation_words = []
-        
-        for indicator in self.innovation_indicators:
-            if indicator in text_lower:
-                innovation_count += 1
-                innovation_words.append(indicator)
+        innovation_words = keyword_index.found(text_lower, self.innovation_indicators)
+        innovation_count = len(innovation_words)
         
         # 检测常见词汇
-        common_count = 0
-        common_words = []
-        
-        for phrase in self.common_phrases:
-            if phrase in text_lower:
-                common_count += 1
-                common_words.append(phrase)
+        common_words = keyword_index.found(text_lower, self.common_phrases)
+        common_count = len(common_words)
         
         # 计算词汇多样性
-        words = list(jieba.cut(text))
-        word_count = len(words)
-        unique_words = len(set(words))
+        features = get_text_features(text)
+        word_count = features.word_count
+        unique_words = len(features.unique_tokens)
         diversity_ratio = unique_words / word_count if word_count > 0 else 0
         
         # 计算创新性得分
@@ -314,7 +306,7 @@ class TextAnalysisService:
             innovation_result = self.innovation_analyzer.analyze_innovation(text)
             
             # 基础统计
-            word_count = len(list(jieba.cut(text)))
+            word_count = get_text_features(text).word_count
             char_count = len(text)
             
             return {
@@ -0,0 +1,88 @@
+"""
+回答文本特征
+同一段回答会被多个评估器分析，这里把分词、分句、关键词命中等中间结果集中计算一次，
+按文本内容哈希缓存，各评估器共用
+"""
+
+import hashlib
+import re
+from functools import cached_property
+from typing import Dict, List, Tuple
+
+from ..core.cache import LRUCache
+from ..utils.keyword_matcher import KeywordMatches, keyword_index
+from .segmentation_service import segmentation_service
+
+_features_cache = LRUCache(max_entries=256, ttl_seconds=600)
+
+
+class TextFeatures:
+    """
+    一段回答的文本特征
+
+    各项特征在第一次访问时计算并保存在对象上，之后的访问直接复用
+    """
+
+    def __init__(self, text: str, digest: str):
+        self.text = text
+        self.digest = digest
+        self.char_count = len(text)
+        self._sentences: Dict[str, Tuple[str, ...]] = {}
+        self._tags: Dict[int, List[Tuple[str, float]]] = {}
+
+    @cached_property
+    def tokens(self) -> Tuple[str, ...]:
+        """jieba分词结果"""
+        return segmentation_service.cut(self.text)
+
+    @cached_property
+    def lower_tokens(self) -> Tuple[str, ...]:
+        """小写文本的分词结果（英文关键词匹配用）"""
+        lowered = self.text.lower()
+        return self.tokens if lowered == self.text else segmentation_service.cut(lowered)
+
+    @property
+    def word_count(self) -> int:
+        return len(self.tokens)
+
+    @cached_property
+    def unique_tokens(self) -> frozenset:
+        return frozenset(self.tokens)
+
+    @cached_property
+    def content_words(self) -> Tuple[str, ...]:
+        """去掉单字词后的分词结果"""
+        return tuple(word for word in self.tokens if len(word) > 1)
+
+    def sentences(self, delimiters: str = "。！？；") -> Tuple[str, ...]:
+        """按给定句末标点分句，去掉首尾空白和空句"""
+        sentences = self._sentences.get(delimiters)
+        if sentences is None:
+            pieces = re.split(f"[{re.escape(delimiters)}]", self.text)
+            sentences = tuple(piece.strip() for piece in pieces if piece.strip())
+            self._sentences[delimiters] = sentences
+        return sentences
+
+    def extract_tags(self, top_k: int = 10) -> List[Tuple[str, float]]:
+        """TF-IDF关键词及权重"""
+        tags = self._tags.get(top_k)
+        if tags is None:
+            tags = segmentation_service.extract_tags(self.text, top_k)
+            self._tags[top_k] = tags
+        return tags
+
+    @property
+    def keyword_hits(self) -> KeywordMatches:
+        """全局关键词索引的命中结果（由索引按文本缓存）"""
+        return keyword_index.scan(self.text)
+
+
+def get_text_features(text: str) -> TextFeatures:
+    """获取回答的文本特征，相同内容只计算一次"""
+    text = text or ""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    features = _features_cache.get(digest)
+    if features is None:
+        features = TextFeatures(text, digest)
+        _features_cache.set(digest, features)
+    return features
@@ -0,0 +1,194 @@
+"""
+语音活动检测（VAD）
+基于短时能量和过零率的向量化检测，支持分块流式输入，
+输出停顿次数、停顿时长分布、有声时长和音节数估计
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+FRAME_SECONDS = 0.02          # 20ms一帧
+MIN_PAUSE_SECONDS = 0.3       # 短于此值的静音视为正常换气/音节间隙，不计为停顿
+ENERGY_MARGIN_DB = 12.0       # 高于噪声底噪多少dB视为有声
+UNVOICED_MARGIN_DB = 6.0      # 清辅音能量较低，配合过零率判断
+UNVOICED_ZCR = 0.25           # 清辅音的过零率下限
+ABSOLUTE_FLOOR_DB = 30.0      # int16幅度的绝对静音门限（约32）
+NOISE_FLOOR_RISE_DB = 3.0     # 流式模式下噪声底噪每秒最多上升的dB数
+SYLLABLE_MIN_GAP_FRAMES = 5   # 相邻音节峰值的最小间隔（100ms）
+SYLLABLE_PROMINENCE_DB = 3.0  # 音节峰值相对邻域谷值的最小突出度
+
+PAUSE_BINS = [(0.3, 0.5), (0.5, 1.0), (1.0, 2.0), (2.0, None)]
+
+_CJK_RE = re.compile(r"[一-鿿]")
+_LATIN_WORD_RE = re.compile(r"[A-Za-z0-9]+(?:['\-][A-Za-z0-9]+)*")
+
+
+def count_spoken_words(text: str) -> int:
+    """统计识别文本的字数：汉字按字计，英文和数字按词计"""
+    if not text:
+        return 0
+    return len(_CJK_RE.findall(text)) + len(_LATIN_WORD_RE.findall(text))
+
+
+def pause_histogram(pauses: List[float]) -> Dict[str, int]:
+    """按时长区间统计停顿次数"""
+    histogram = {}
+    values = np.asarray(pauses, dtype=float)
+    for low, high in PAUSE_BINS:
+        label = f"{low}-{high}s" if high is not None else f">{low}s"
+        mask = values >= low if high is None else (values >= low) & (values < high)
+        histogram[label] = int(np.count_nonzero(mask))
+    return histogram
+
+
+class VoiceActivityDetector:
+    """
+    流式语音活动检测器
+
+    - feed() 接收任意长度的int16采样块，内部按20ms分帧，不足一帧的尾部留到下一块
+    - 噪声底噪取块内能量的10%分位数，并限制上升速度，避免连续说话时门限被抬高
+    - 静音段只有出现在两段语音之间且不短于 MIN_PAUSE_SECONDS 时才计为停顿
+    - result() 可随时调用，返回截至当前的统计
+    """
+
+    def __init__(self, sample_rate: int = 16000, min_pause_seconds: float = MIN_PAUSE_SECONDS):
+        self.sample_rate = sample_rate
+        self.frame_size = max(1, int(sample_rate * FRAME_SECONDS))
+        self.frame_seconds = self.frame_size / sample_rate
+        self.min_pause_frames = max(1, int(round(min_pause_seconds / self.frame_seconds)))
+
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self._noise_floor_db: Optional[float] = None
+
+        self.total_frames = 0
+        self.voiced_frames = 0
+        self.speech_segments = 0
+        self.syllables = 0
+        self.pauses: List[float] = []
+        self._in_speech = False
+        self._speech_seen = False
+        self._silence_frames = 0
+        self._envelope_tail = np.zeros(0)
+        self._voiced_tail = np.zeros(0, dtype=bool)
+
+    def feed(self, samples: np.ndarray):
+        """输入一块int16采样"""
+        if self._remainder.size:
+            samples = np.concatenate((self._remainder, samples))
+        n_frames = samples.size // self.frame_size
+        self._remainder = samples[n_frames * self.frame_size:].copy()
+        if n_frames == 0:
+            return
+
+        frames = samples[:n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+        energy_db = 10 * np.log10(np.mean(np.square(frames, dtype=np.float64), axis=1) + 1.0)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_size - 1)
+
+        self._update_noise_floor(energy_db, n_frames)
+        floor = max(self._noise_floor_db, ABSOLUTE_FLOOR_DB)
+        speech = (energy_db > floor + ENERGY_MARGIN_DB) | (
+            (energy_db > floor + UNVOICED_MARGIN_DB) & (zcr > UNVOICED_ZCR))
+
+        self.total_frames += n_frames
+        self.voiced_frames += int(np.count_nonzero(speech))
+        self._count_syllables(energy_db, speech, floor)
+        self._consume_runs(speech)
+
+    def _update_noise_floor(self, energy_db: np.ndarray, n_frames: int):
+        estimate = float(np.percentile(energy_db, 10))
+        if self._noise_floor_db is None:
+            self._noise_floor_db = estimate
+        else:
+            max_rise = NOISE_FLOOR_RISE_DB * n_frames * self.frame_seconds
+            self._noise_floor_db = min(estimate, self._noise_floor_db + max_rise)
+
+    def _count_syllables(self, energy_db: np.ndarray, speech: np.ndarray, floor: float):
+        """
+        以能量包络在有声帧上的显著局部极大值估计音节数
+
+        保留上一块末尾的帧作为上下文，使每一帧恰好被判断一次
+        """
+        context = SYLLABLE_MIN_GAP_FRAMES // 2 + 1
+        envelope = np.concatenate((self._envelope_tail, energy_db))
+        voiced = np.concatenate((self._voiced_tail, speech))
+        self._envelope_tail = envelope[-2 * context:]
+        self._voiced_tail = voiced[-2 * context:]
+        if envelope.size <= 2 * context:
+            return
+
+        half = context - 1
+        smoothed = np.convolve(envelope, np.ones(3) / 3, mode="valid")  # smoothed[k] 对应 envelope[k + 1]
+        windows = np.lib.stride_tricks.sliding_window_view(smoothed, 2 * half + 1)
+        centers = windows[:, half]
+        peaks = ((centers == windows.max(axis=1))
+                 & (centers > windows[:, half - 1])
+                 & (centers - windows.min(axis=1) >= SYLLABLE_PROMINENCE_DB)
+                 & (centers > floor + ENERGY_MARGIN_DB)
+                 & voiced[context:envelope.size - context])
+        self.syllables += int(np.count_nonzero(peaks))
+
+    def _consume_runs(self, speech: np.ndarray):
+        """按连续段更新停顿状态，段数远少于帧数，循环开销可以忽略"""
+        edges = np.flatnonzero(np.diff(speech.astype(np.int8))) + 1
+        starts = np.concatenate(([0], edges))
+        lengths = np.diff(np.concatenate((starts, [speech.size])))
+        for start, length in zip(starts, lengths):
+            if speech[start]:
+                if not self._in_speech:
+                    if self._speech_seen and self._silence_frames >= self.min_pause_frames:
+                        self.pauses.append(round(self._silence_frames * self.frame_seconds, 2))
+                    if not self._speech_seen or self._silence_frames >= self.min_pause_frames:
+                        self.speech_segments += 1
+                self._in_speech = True
+                self._speech_seen = True
+                self._silence_frames = 0
+            else:
+                self._in_speech = False
+                self._silence_frames += int(length)
+
+    def result(self) -> Dict[str, Any]:
+        """当前统计结果（末尾静音不计为停顿）"""
+        total_time = self.total_frames * self.frame_seconds
+        pauses = self.pauses
+        return {
+            "total_time": round(total_time, 2),
+            "voiced_time": round(self.voiced_frames * self.frame_seconds, 2),
+            "voiced_ratio": round(self.voiced_frames / self.total_frames, 3) if self.total_frames else 0.0,
+            "speech_segments": self.speech_segments,
+            "pause_count": len(pauses),
+            "pause_frequency": round(len(pauses) / total_time, 3) if total_time > 0 else 0.0,
+            "mean_pause": round(float(np.mean(pauses)), 2) if pauses else 0.0,
+            "longest_pause": max(pauses) if pauses else 0.0,
+            "total_pause_time": round(float(np.sum(pauses)), 2) if pauses else 0.0,
+            "pause_histogram": pause_histogram(pauses),
+            "estimated_syllables": self.syllables
+        }
+
+
+def detect_voice_activity(samples: np.ndarray, sample_rate: int = 16000) -> Dict[str, Any]:
+    """对完整音频执行VAD（一次性输入整段采样）"""
+    detector = VoiceActivityDetector(sample_rate)
+    detector.feed(samples)
+    return detector.result()
+
+
+def speech_rate(vad_result: Dict[str, Any], word_count: Optional[int] = None) -> Dict[str, Any]:
+    """
+    计算语速（字/分钟）
+
+    有识别文本字数时使用字数，否则用音节数估计（汉语一字一音节）；
+    articulation_rate 只按有声时长计算，不受停顿影响
+    """
+    source = "asr" if word_count else "syllables"
+    words = word_count if word_count else vad_result.get("estimated_syllables", 0)
+    total_minutes = vad_result.get("total_time", 0) / 60
+    voiced_minutes = vad_result.get("voiced_time", 0) / 60
+    return {
+        "words": int(words),
+        "source": source,
+        "speech_rate": round(words / total_minutes, 1) if total_minutes > 0 else 0.0,
+        "articulation_rate": round(words / voiced_minutes, 1) if voiced_minutes > 0 else 0.0
+    }
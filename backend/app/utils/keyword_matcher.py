@@ -0,0 +1,199 @@
+"""
+多模式关键词匹配
+Aho–Corasick 自动机：词表编译一次，对文本扫描一遍即可得到所有命中的关键词、位置和类别，
+匹配代价与文本长度成正比，不再随词表大小成倍增加
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+
+class KeywordHit(NamedTuple):
+    """一次命中：关键词、所属类别、在文本中的起止位置"""
+    keyword: str
+    categories: Tuple[str, ...]
+    start: int
+    end: int
+
+
+class AhoCorasick:
+    """Aho–Corasick 自动机（区分大小写，允许关键词相互重叠）"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        index: Dict[str, int] = {}
+        outputs: List[List[int]] = [[]]
+        for keyword in keywords:
+            if not keyword or keyword in index:
+                continue
+            index[keyword] = len(self.keywords)
+            self.keywords.append(keyword)
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append([])
+                node = next_node
+            outputs[node].append(index[keyword])
+
+        # 按层次遍历建立失败指针，并把失败链上的输出合并到当前节点
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                outputs[child].extend(outputs[self._fail[child]])
+                queue.append(child)
+        self._output = [tuple(ids) for ids in outputs]
+
+    def iter_matches(self, text: str):
+        """逐个产出 (关键词序号, 结束位置)，结束位置为命中末字符的下一个位置"""
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for keyword_id in output[node]:
+                yield keyword_id, position + 1
+
+
+class KeywordMatcher:
+    """
+    分类词表匹配器
+
+    vocabulary 为 {类别: 关键词列表}，同一关键词可属于多个类别；
+    find_all() 一次扫描返回全部命中
+    """
+
+    def __init__(self, vocabulary: Dict[str, Iterable[str]]):
+        self.vocabulary = {category: list(keywords) for category, keywords in vocabulary.items()}
+        categories: Dict[str, List[str]] = {}
+        for category, keywords in self.vocabulary.items():
+            for keyword in keywords:
+                if category not in categories.setdefault(keyword, []):
+                    categories[keyword].append(category)
+        self._automaton = AhoCorasick(categories)
+        self._categories = [tuple(categories[keyword]) for keyword in self._automaton.keywords]
+
+    def find_all(self, text: str) -> List[KeywordHit]:
+        keywords = self._automaton.keywords
+        return [
+            KeywordHit(keywords[keyword_id], self._categories[keyword_id], end - len(keywords[keyword_id]), end)
+            for keyword_id, end in self._automaton.iter_matches(text or "")
+        ]
+
+    def match(self, text: str) -> "KeywordMatches":
+        return KeywordMatches(self.find_all(text))
+
+    def found_by_category(self, text: str) -> Dict[str, List[str]]:
+        """各类别中出现在文本里的关键词（保持词表顺序）"""
+        found = self.match(text).keywords
+        return {
+            category: [keyword for keyword in keywords if keyword in found]
+            for category, keywords in self.vocabulary.items()
+        }
+
+
+class KeywordMatches:
+    """一段文本的匹配结果"""
+
+    def __init__(self, hits: List[KeywordHit]):
+        self.hits = hits
+        self.keywords: Set[str] = {hit.keyword for hit in hits}
+
+    def count(self, keywords: Iterable[str]) -> int:
+        """词表中出现在文本里的关键词个数（与逐个 `keyword in text` 计数一致）"""
+        found = self.keywords
+        return sum(1 for keyword in keywords if keyword in found)
+
+    def found(self, keywords: Iterable[str]) -> List[str]:
+        found = self.keywords
+        return [keyword for keyword in keywords if keyword in found]
+
+    def positions(self, keyword: str) -> List[int]:
+        return [hit.start for hit in self.hits if hit.keyword == keyword]
+
+
+class KeywordIndex:
+    """
+    全局共享的关键词索引
+
+    各评估器的词表首次使用时注册进同一个自动机，之后每段文本只扫描一遍，
+    扫描结果按文本缓存，同一回答的几十个评分函数共用
+    """
+
+    def __init__(self, max_cached_texts: int = 64):
+        self.max_cached_texts = max_cached_texts
+        self._vocabularies: Set[Tuple[str, ...]] = set()
+        self._keywords: Dict[str, None] = {}
+        self._matcher: Optional[KeywordMatcher] = None
+        self._scans: "OrderedDict[str, KeywordMatches]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, keywords: Sequence[str]):
+        """注册词表；新词表会触发自动机重建（通常只在启动后第一次评分时发生）"""
+        vocabulary = tuple(keywords)
+        if vocabulary in self._vocabularies:
+            return
+        with self._lock:
+            if vocabulary in self._vocabularies:
+                return
+            new_keywords = [keyword for keyword in vocabulary if keyword not in self._keywords]
+            if new_keywords:
+                self._keywords.update(dict.fromkeys(new_keywords))
+                self._matcher = None
+                self._scans.clear()
+            self._vocabularies.add(vocabulary)
+
+    def scan(self, text: str) -> KeywordMatches:
+        text = text or ""
+        with self._lock:
+            matches = self._scans.get(text)
+            if matches is not None:
+                self._scans.move_to_end(text)
+                return matches
+            if self._matcher is None:
+                self._matcher = KeywordMatcher({"": list(self._keywords)})
+            matcher = self._matcher
+
+        matches = matcher.match(text)
+        with self._lock:
+            if self._matcher is matcher:
+                self._scans[text] = matches
+                while len(self._scans) > self.max_cached_texts:
+                    self._scans.popitem(last=False)
+        return matches
+
+    def count(self, text: str, keywords: Sequence[str]) -> int:
+        """词表中出现在文本里的关键词个数"""
+        self.register(keywords)
+        return self.scan(text).count(keywords)
+
+    def found(self, text: str, keywords: Sequence[str]) -> List[str]:
+        """词表中出现在文本里的关键词（保持词表顺序）"""
+        self.register(keywords)
+        return self.scan(text).found(keywords)
+
+    def contains_any(self, text: str, keywords: Sequence[str]) -> bool:
+        return self.count(text, keywords) > 0
+
+
+keyword_index = KeywordIndex()
+
+
+def get_keyword_index() -> KeywordIndex:
+    """获取全局关键词索引"""
+    return keyword_index
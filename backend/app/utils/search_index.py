@@ -0,0 +1,216 @@
+"""
+全文检索索引
+内存倒排索引 + BM25 排序：文档按字段加权分词后写入倒排表，查询只访问命中词的倒排列表；
+倒排列表按词编译为 numpy 数组，打分、过滤和取前K条都是向量运算，数万文档下单次检索在毫秒级
+"""
+
+import math
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+class SearchHit(NamedTuple):
+    """一条检索结果：文档ID和BM25得分"""
+    doc_id: Hashable
+    score: float
+
+
+class SearchPage(NamedTuple):
+    """一页检索结果：命中总数和本页结果（按得分降序）"""
+    total: int
+    hits: List[SearchHit]
+
+
+class FullTextIndex:
+    """
+    BM25 倒排索引
+
+    - field_weights 指定参与索引的字段及权重，词频按字段权重累加（标题命中比正文命中更重要）
+    - add() 时可附带属性（如领域、岗位），检索时按属性等值过滤
+    - 同一文档重复 add() 视为更新；删除的文档槽位会被复用
+    """
+
+    def __init__(self, field_weights: Dict[str, float], tokenizer: Callable[[str], Iterable[str]],
+                 k1: float = 1.2, b: float = 0.75):
+        self.field_weights = field_weights
+        self.tokenizer = tokenizer
+        self.k1 = k1
+        self.b = b
+
+        # 文档ID映射为连续槽位，数组按槽位下标存放
+        self._slots: Dict[Hashable, int] = {}
+        self._slot_docs: List[Optional[Hashable]] = []
+        self._free_slots: List[int] = []
+        self._lengths: List[float] = []
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._attributes: Dict[int, Dict[str, Any]] = {}
+        self._total_length = 0.0
+
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._compiled: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._norms: Optional[np.ndarray] = None
+        self._masks: Dict[Tuple[str, Any], np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._slots
+
+    def _field_text(self, value: Any) -> str:
+        if isinstance(value, (list, tuple, set)):
+            return " ".join(str(item) for item in value if item)
+        return str(value)
+
+    def add(self, doc_id: Hashable, fields: Dict[str, Any], **attributes):
+        """索引一个文档，fields 的值可以是字符串或字符串列表"""
+        weighted = Counter()
+        for field, weight in self.field_weights.items():
+            value = fields.get(field)
+            if not value:
+                continue
+            for token in self.tokenizer(self._field_text(value)):
+                weighted[token] += weight
+
+        with self._lock:
+            self._remove(doc_id)
+            if self._free_slots:
+                slot = self._free_slots.pop()
+                self._slot_docs[slot] = doc_id
+            else:
+                slot = len(self._slot_docs)
+                self._slot_docs.append(doc_id)
+                self._lengths.append(0.0)
+            length = float(sum(weighted.values()))
+            self._slots[doc_id] = slot
+            self._lengths[slot] = length
+            self._doc_terms[slot] = tuple(weighted)
+            self._attributes[slot] = attributes
+            self._total_length += length
+            for term, frequency in weighted.items():
+                self._postings[term][slot] = frequency
+                self._compiled.pop(term, None)
+            self._invalidate()
+
+    def remove(self, doc_id: Hashable) -> bool:
+        with self._lock:
+            return self._remove(doc_id)
+
+    def _remove(self, doc_id: Hashable) -> bool:
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return False
+        for term in self._doc_terms.pop(slot):
+            postings = self._postings[term]
+            postings.pop(slot, None)
+            if not postings:
+                del self._postings[term]
+            self._compiled.pop(term, None)
+        self._total_length -= self._lengths[slot]
+        self._lengths[slot] = 0.0
+        self._slot_docs[slot] = None
+        self._attributes.pop(slot, None)
+        self._free_slots.append(slot)
+        self._invalidate()
+        return True
+
+    def _invalidate(self):
+        self._norms = None
+        self._masks.clear()
+
+    def clear(self):
+        with self._lock:
+            self._slots.clear()
+            self._slot_docs.clear()
+            self._free_slots.clear()
+            self._lengths.clear()
+            self._doc_terms.clear()
+            self._attributes.clear()
+            self._total_length = 0.0
+            self._postings.clear()
+            self._compiled.clear()
+            self._invalidate()
+
+    def _length_norms(self) -> np.ndarray:
+        """每个槽位的长度归一化项 k1*(1-b+b*dl/avgdl)，索引变化后在下一次检索时重算"""
+        if self._norms is None:
+            average = self._total_length / len(self._slots) if self._slots else 1.0
+            lengths = np.asarray(self._lengths, dtype=np.float64)
+            self._norms = self.k1 * (1 - self.b + self.b * lengths / (average or 1.0))
+        return self._norms
+
+    def _term_arrays(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        compiled = self._compiled.get(term)
+        if compiled is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return None
+            compiled = (np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                        np.fromiter(postings.values(), dtype=np.float64, count=len(postings)))
+            self._compiled[term] = compiled
+        return compiled
+
+    def _filter_mask(self, key: str, value: Any) -> np.ndarray:
+        mask = self._masks.get((key, value))
+        if mask is None:
+            mask = np.zeros(len(self._slot_docs), dtype=bool)
+            for slot, attributes in self._attributes.items():
+                if attributes.get(key) == value:
+                    mask[slot] = True
+            self._masks[(key, value)] = mask
+        return mask
+
+    def search(self, query: str, filters: Optional[Dict[str, Any]] = None,
+               offset: int = 0, limit: int = 20) -> SearchPage:
+        """
+        检索并按BM25得分排序
+        :param filters: 属性过滤条件，值为 None 的条件忽略
+        :param offset: 跳过的结果数（分页）
+        :param limit: 返回的结果数
+        """
+        terms = set(self.tokenizer(query))
+        with self._lock:
+            total_docs = len(self._slots)
+            if not terms or not total_docs:
+                return SearchPage(0, [])
+            norms = self._length_norms()
+            scores = np.zeros(len(self._slot_docs), dtype=np.float64)
+            for term in terms:
+                arrays = self._term_arrays(term)
+                if arrays is None:
+                    continue
+                slots, frequencies = arrays
+                df = len(slots)
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                scores[slots] += idf * frequencies * (self.k1 + 1) / (frequencies + norms[slots])
+
+            matched = scores > 0
+            for key, value in (filters or {}).items():
+                if value is not None:
+                    matched &= self._filter_mask(key, value)
+            candidates = np.flatnonzero(matched)
+            total = len(candidates)
+
+            wanted = min(offset + limit, total)
+            if wanted <= 0:
+                return SearchPage(total, [])
+            candidate_scores = scores[candidates]
+            if wanted < total:
+                top = np.argpartition(-candidate_scores, wanted - 1)[:wanted]
+            else:
+                top = np.arange(total)
+            # 得分降序，同分按槽位（先入库的文档）在前
+            order = top[np.lexsort((candidates[top], -candidate_scores[top]))][offset:]
+            hits = [SearchHit(self._slot_docs[candidates[i]], round(float(candidate_scores[i]), 4)) for i in order]
+        return SearchPage(total, hits)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self._slots),
+            "terms": len(self._postings),
+            "average_length": round(self._total_length / len(self._slots), 2) if self._slots else 0.0
+        }
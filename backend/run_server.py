@@ -17,6 +17,11 @@ sys.path.insert(0, project_root)
 os.environ["PYTHONPATH"] = f"{current_dir}{os.pathsep}{project_root}"
 
 if __name__ == "__main__":
+    # 只输出启动耗时分析，不启动服务
+    if "--profile-startup" in sys.argv:
+        from app.core.startup_profiler import main as profile_main
+        sys.exit(profile_main([arg for arg in sys.argv[1:] if arg != "--profile-startup"]))
+
     print("🚀 启动多模态面试评估系统后端服务器...")
     print(f"📁 项目目录: {current_dir}")
     print(f"🐍 Python路径: {sys.path[0]}")
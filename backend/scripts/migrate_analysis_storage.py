@@ -0,0 +1,35 @@
+"""
+旧评测报告迁移脚本
+把 evaluation_reports.report_data 中内嵌的base64图表移到按内容寻址的blob存储，
+并为旧报告补写 analysis_metrics 指标行（可重复执行，已迁移的报告跳过）
+
+用法：
+    python scripts/migrate_analysis_storage.py --batch-size 200
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import SessionLocal, create_tables
+from app.services.analysis_storage_service import analysis_storage_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="迁移旧评测报告的图表和指标")
+    parser.add_argument("--batch-size", type=int, default=200, help="每批读取并提交的报告数")
+    args = parser.parse_args()
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        stats = analysis_storage_service.migrate_legacy_reports(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"✅ 迁移完成: 扫描 {stats['scanned']} 份报告，迁移 {stats['migrated']} 份，"
+          f"移出图表 {stats['charts']} 张（{stats['bytes_moved']} 字节），写入指标 {stats['metrics']} 条")
+
+
+if __name__ == "__main__":
+    main()
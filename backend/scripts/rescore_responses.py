@@ -0,0 +1,49 @@
+"""
+批量重新评分脚本
+调整评分权重后，对数据库中的历史回答重新计算文本维度得分并写回 multimodal_analysis 表，
+再重新计算这些会话最新评估报告的六项能力得分
+
+用法：
+    python scripts/rescore_responses.py --workers 8 --page-size 1000
+    python scripts/rescore_responses.py --session-id 12 --session-id 13 --dry-run
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.batch_rescoring_service import DEFAULT_CHUNK_SIZE, DEFAULT_PAGE_SIZE, batch_rescoring_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量重新评分历史回答")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数（默认按CPU核数，0 表示单进程）")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="每页读取并提交的回答数")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="每个进程任务包含的回答数")
+    parser.add_argument("--session-id", type=int, action="append", dest="session_ids", help="只处理指定会话，可重复")
+    parser.add_argument("--limit", type=int, default=None, help="最多处理的回答数")
+    parser.add_argument("--dry-run", action="store_true", help="只评分不写库")
+    parser.add_argument("--skip-reports", action="store_true", help="只重新评分回答，不重新计算能力评估报告")
+    args = parser.parse_args()
+
+    def report(stats):
+        print(f"已处理 {stats['rows_read']} 条，评分 {stats['scored']} 条，"
+              f"更新 {stats['updated']} 条，新建 {stats['inserted']} 条，{stats['rows_per_second']} 条/秒")
+
+    stats = batch_rescoring_service.rescore(
+        page_size=args.page_size,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        session_ids=args.session_ids,
+        limit=args.limit,
+        dry_run=args.dry_run,
+        reports=not args.skip_reports,
+        progress=report
+    )
+    print(f"✅ 重新评分完成: 共 {stats['rows_read']} 条，跳过 {stats['skipped']} 条，"
+          f"更新报告 {stats['reports_updated']} 份，耗时 {stats['elapsed']} 秒，平均 {stats['rows_per_second']} 条/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+测试分析流水线：阶段并发、依赖顺序、基于部分识别结果提前执行
+"""
+
+import asyncio
+import sys
+import os
+
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analysis_pipeline import PartialInputStage, StageGraph, complete_sentences
+
+
+def _sleeper(value, delay):
+    async def stage(results):
+        await asyncio.sleep(delay)
+        return value
+    return stage
+
+
+class TestStageGraph:
+    def test_independent_stages_run_concurrently(self):
+        async def combine(results):
+            return results["a"] + results["b"]
+
+        graph = StageGraph()
+        graph.add_stage("a", _sleeper(1, 0.1))
+        graph.add_stage("b", _sleeper(2, 0.1))
+        graph.add_stage("sum", combine, depends_on=["a", "b"])
+        pipeline = asyncio.run(graph.run())
+
+        assert pipeline.results["sum"] == 3
+        assert pipeline.total_time < 0.18
+        assert pipeline.timings["sum"]["start"] >= pipeline.timings["a"]["end"]
+        assert pipeline.metadata()["serial_time"] >= 0.2
+
+    def test_unknown_dependency_rejected(self):
+        with pytest.raises(ValueError):
+            StageGraph().add_stage("fusion", _sleeper(None, 0), depends_on=["text"])
+
+    def test_failure_propagates(self):
+        async def fail(results):
+            raise RuntimeError("boom")
+
+        graph = StageGraph()
+        graph.add_stage("slow", _sleeper(1, 5))
+        graph.add_stage("fail", fail)
+        with pytest.raises(RuntimeError):
+            asyncio.run(graph.run())
+
+
+class TestPartialInputStage:
+    def test_complete_sentences(self):
+        assert complete_sentences("我做过推荐系统。主要负责") == "我做过推荐系统。"
+        assert complete_sentences("还没说完") == ""
+
+    def test_reuses_speculative_result(self):
+        calls = []
+
+        async def analyze(text):
+            calls.append(text)
+            await asyncio.sleep(0.01)
+            return {"text": text}
+
+        async def scenario():
+            stage = PartialInputStage(analyze)
+            for partial in ["我做过", "我做过推荐系统。", "我做过推荐系统。主要", "我做过推荐系统。主要负责召回。"]:
+                stage.offer(partial)
+                await asyncio.sleep(0)
+            return stage, await stage.resolve("我做过推荐系统。主要负责召回。")
+
+        stage, result = asyncio.run(scenario())
+        assert result == {"text": "我做过推荐系统。主要负责召回。"}
+        assert stage.reused and stage.started == 2
+        assert calls == ["我做过推荐系统。", "我做过推荐系统。主要负责召回。"]
+
+    def test_recomputes_when_final_differs(self):
+        async def analyze(text):
+            return text
+
+        async def scenario():
+            stage = PartialInputStage(analyze)
+            stage.offer("第一句。第二")
+            return stage, await stage.resolve("第一句。第二句")
+
+        stage, result = asyncio.run(scenario())
+        assert result == "第一句。第二句"
+        assert not stage.reused
@@ -0,0 +1,148 @@
+"""
+测试分析指标表和按内容寻址的大对象存储
+"""
+
+import base64
+import sys
+import os
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.blob_store import ContentStore
+from app.models.database import (
+    AnalysisMetric,
+    Base,
+    EvaluationReport,
+    InterviewResponse,
+    InterviewSession,
+    MultimodalAnalysis,
+    StoredArtifact,
+    create_db_engine
+)
+from app.services.analysis_storage_service import AnalysisStorageService, analysis_from_record
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"chart" * 200
+
+
+def make_report(overall, chart=PNG):
+    return {
+        "overall_score": overall,
+        "capability_scores": {"专业技能": overall + 5, "沟通表达": overall - 5},
+        "detailed_analysis": {"text_analysis": {"average_relevance": 70.0}, "total_responses": 3},
+        "visualizations": {
+            "radar_chart": base64.b64encode(chart).decode(),
+            "radar_chart_data": {"categories": ["专业技能"], "values": [overall], "max_value": 100}
+        }
+    }
+
+
+class TestAnalysisStorage:
+    def make_service(self, tmp_path):
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'interview.db'}")
+        Base.metadata.create_all(engine)
+        service = AnalysisStorageService(ContentStore(str(tmp_path / "blobs")))
+        return engine, sessionmaker(bind=engine), service
+
+    def test_report_charts_move_to_blob_store_and_metrics_to_rows(self, tmp_path):
+        engine, factory, service = self.make_service(tmp_path)
+        with factory() as db:
+            session = InterviewSession(domain="人工智能", position="技术岗")
+            db.add(session)
+            db.commit()
+            first = service.save_report(db, session.id, make_report(80.0), overall_score=80.0)
+            second = service.save_report(db, session.id, make_report(60.0), overall_score=60.0)
+
+            content_hash = first.report_data["artifacts"]["radar_chart"]
+            assert "radar_chart" not in first.report_data["visualizations"]
+            assert first.report_data["visualizations"]["radar_chart_data"]["values"] == [80.0]
+            # 相同图表只存一份
+            assert second.report_data["artifacts"]["radar_chart"] == content_hash
+            assert service.store.stats["writes"] == 1
+            assert service.load_artifact(content_hash) == PNG
+            assert db.scalar(select(func.count(StoredArtifact.id))) == 2
+
+            restored = service.load_report_data(first)
+            assert base64.b64decode(restored["visualizations"]["radar_chart"]) == PNG
+
+            metrics = dict(db.execute(
+                select(AnalysisMetric.name, AnalysisMetric.value).where(AnalysisMetric.report_id == first.id)
+            ).all())
+            assert metrics == {
+                "overall_score": 80.0,
+                "capability.专业技能": 85.0,
+                "capability.沟通表达": 75.0,
+                "detail.text_analysis.average_relevance": 70.0,
+                "detail.total_responses": 3.0
+            }
+
+            stats = service.aggregate_metrics(db, ["overall_score"], domain="人工智能")
+            assert stats == {"overall_score": {"count": 2, "avg": 70.0, "min": 60.0, "max": 80.0}}
+            assert service.aggregate_metrics(db, ["overall_score"], domain="物联网") == {}
+        engine.dispose()
+
+    def test_answer_scores_aggregate_typed_columns(self, tmp_path):
+        engine, factory, service = self.make_service(tmp_path)
+        with factory() as db:
+            session = InterviewSession(domain="大数据", position="技术岗")
+            db.add(session)
+            db.flush()
+            for relevance in (60.0, 80.0):
+                response = InterviewResponse(session_id=session.id, question_text="问题", response_text="回答")
+                db.add(response)
+                db.flush()
+                db.add(MultimodalAnalysis(response_id=response.id, content_relevance=relevance, speech_clarity=90.0))
+            db.commit()
+
+            scores = service.aggregate_answer_scores(db, ["content_relevance", "posture_score", "unknown"], domain="大数据")
+            assert scores == {"count": 2, "averages": {"content_relevance": 70.0, "posture_score": None}}
+
+            analysis = analysis_from_record(db.scalars(select(MultimodalAnalysis)).first())
+            assert analysis["text_analysis"] == {"content_relevance": {"overall_relevance": 60.0}}
+            assert analysis["audio_analysis"] == {"speech_clarity": 90.0}
+            assert analysis["video_analysis"] == {}
+        engine.dispose()
+
+    def test_legacy_reports_are_migrated_once(self, tmp_path):
+        engine, factory, service = self.make_service(tmp_path)
+        with factory() as db:
+            db.add(EvaluationReport(session_id=1, overall_score=75.0, report_data=make_report(75.0)))
+            db.commit()
+
+            stats = service.migrate_legacy_reports(db)
+            assert stats["migrated"] == 1 and stats["charts"] == 1 and stats["bytes_moved"] == len(PNG)
+            assert service.migrate_legacy_reports(db)["migrated"] == 0
+
+            report = db.scalars(select(EvaluationReport)).first()
+            assert service.load_artifact(report.report_data["artifacts"]["radar_chart"]) == PNG
+            assert db.scalar(select(func.count(AnalysisMetric.id))) == 5
+        engine.dispose()
+
+    def test_rescored_report_reuses_unchanged_chart_and_sweeps_replaced_one(self, tmp_path):
+        engine, factory, service = self.make_service(tmp_path)
+        with factory() as db:
+            report = service.save_report(db, 1, make_report(80.0), overall_score=80.0)
+            old_hash = report.report_data["artifacts"]["radar_chart"]
+            artifact_id = db.scalars(select(StoredArtifact.id)).one()
+
+            # 图表未变：沿用原引用行，不新增对象
+            service.update_report(db, report, make_report(80.0), overall_score=80.0)
+            db.commit()
+            assert db.scalars(select(StoredArtifact.id)).all() == [artifact_id]
+
+            new_chart = PNG + b"rescored"
+            service.update_report(db, report, make_report(70.0, new_chart), overall_score=70.0)
+            db.commit()
+            new_hash = report.report_data["artifacts"]["radar_chart"]
+            assert db.scalars(select(StoredArtifact.content_hash)).all() == [new_hash]
+
+            # 刚写入的对象在宽限期内不清理
+            assert service.sweep_orphans(db) == {"scanned": 2, "removed": 0}
+            stats = service.sweep_orphans(db, min_age_seconds=0)
+            assert stats == {"scanned": 2, "removed": 1}
+            assert not service.store.exists(old_hash)
+            assert service.load_artifact(new_hash) == new_chart
+        engine.dispose()
@@ -0,0 +1,123 @@
+"""
+测试原生asyncio流式语音识别会话
+使用本地WebSocket服务模拟讯飞听写接口
+"""
+
+import asyncio
+import base64
+import json
+import sys
+import os
+
+import websockets
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.services.iflytek_service as iflytek_module
+from app.core.config import Settings
+from app.services.asr_stream_service import ASRStreamSession, TranscriptAssembler
+from app.services.iflytek_service import IFlytekASRService
+
+
+def _result(sn, words, status=1, pgs=None, rg=None):
+    result = {"sn": sn, "ws": [{"cw": [{"w": w}]} for w in words]}
+    if pgs:
+        result["pgs"] = pgs
+        result["rg"] = rg
+    return json.dumps({"code": 0, "data": {"status": status, "result": result}})
+
+
+async def _fake_iat(websocket):
+    """每收到一帧音频返回一个片段，结束帧后用rpl修正第二个片段并结束"""
+    received = 0
+    async for message in websocket:
+        frame = json.loads(message)
+        status = frame["data"]["status"]
+        if status == 0:
+            assert frame["common"]["app_id"] == "test-app"
+        received += len(base64.b64decode(frame["data"]["audio"]))
+        if status == 2:
+            await websocket.send(_result(3, ["面试"], status=2, pgs="rpl", rg=[2, 2]))
+            await websocket.send(json.dumps({"code": 0, "data": {"status": 2, "received": received}}))
+            return
+        await websocket.send(_result(status + 1, ["你好"] if status == 0 else ["面"]))
+
+
+class TestASRStream:
+    """测试流式识别会话"""
+
+    def test_transcript_assembler_replaces_ranges(self):
+        """动态修正结果替换 rg 范围内的片段"""
+        assembler = TranscriptAssembler()
+        assembler.apply({"sn": 1, "ws": [{"cw": [{"w": "我"}]}]})
+        assembler.apply({"sn": 2, "ws": [{"cw": [{"w": "做过"}]}]})
+        text = assembler.apply({"sn": 3, "pgs": "rpl", "rg": [2, 2], "ws": [{"cw": [{"w": "做过项目"}]}]})
+        assert text == "我做过项目"
+
+    def test_streaming_session_yields_partials(self):
+        """边发送边返回部分结果，结束后得到修正后的完整文本"""
+        async def scenario():
+            async with websockets.serve(_fake_iat, "127.0.0.1", 0) as server:
+                port = server.sockets[0].getsockname()[1]
+                async with ASRStreamSession(f"ws://127.0.0.1:{port}", "test-app", frame_bytes=4) as session:
+                    partials = []
+
+                    async def collect():
+                        async for partial in session.partials():
+                            partials.append(partial)
+
+                    collector = asyncio.create_task(collect())
+                    await session.send(b"\x00" * 6)  # 切分为两帧
+                    await session.end()
+                    result = await session.result(timeout=5)
+                    await collector
+                    return partials, result, session.bytes_sent
+
+        partials, result, sent = asyncio.run(scenario())
+        assert [p["text"] for p in partials] == ["你好", "你好面", "你好面试"]
+        assert partials[-1]["is_final"]
+        assert result == {"text": "你好面试", "confidence": 0.0}
+        assert sent == 6
+
+    def _recognize_recorded(self, monkeypatch, interval):
+        """识别2秒录音（8帧），返回识别结果和上传过程中的短暂等待"""
+        async def fake_iat(websocket):
+            async for message in websocket:
+                if json.loads(message)["data"]["status"] == 2:
+                    await websocket.send(_result(1, ["你好"], status=2))
+                    return
+
+        async def scenario():
+            async with websockets.serve(fake_iat, "127.0.0.1", 0) as server:
+                url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+                service = IFlytekASRService()
+                monkeypatch.setattr(service, "open_stream", lambda: ASRStreamSession(url, "test-app", frame_bytes=8000))
+                monkeypatch.setattr(iflytek_module.settings, "asr_upload_interval", interval)
+                sleeps = []
+                real_sleep = asyncio.sleep
+
+                async def counting_sleep(delay, *args):
+                    # websockets 的心跳等长时间等待不计入
+                    if 0 < delay < 1:
+                        sleeps.append(delay)
+                    return await real_sleep(delay, *args)
+
+                monkeypatch.setattr(iflytek_module.asyncio, "sleep", counting_sleep)
+                result = await service._websocket_recognize(b"\x00" * 64000)
+                return result, sleeps
+
+        return asyncio.run(scenario())
+
+    def test_recorded_audio_upload_is_paced_per_frame(self, monkeypatch):
+        """整段音频默认每帧间隔40毫秒上传，避免服务端判定发送过快"""
+        assert Settings.model_fields["asr_upload_interval"].default == 0.04
+        result, sleeps = self._recognize_recorded(monkeypatch, 0.04)
+        assert result["text"] == "你好"
+        assert sleeps == [0.04] * 8
+
+    def test_recorded_audio_upload_pacing_can_be_disabled(self, monkeypatch):
+        """ASR_UPLOAD_INTERVAL=0 时连续上传，不额外等待"""
+        result, sleeps = self._recognize_recorded(monkeypatch, 0.0)
+        assert result["text"] == "你好"
+        assert sleeps == []
@@ -0,0 +1,62 @@
+"""
+测试异步数据库层和数据访问函数
+"""
+
+import asyncio
+import sys
+import os
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import repositories
+from app.models.database import (
+    Base, EvaluationReport, InterviewResponse, create_async_db_engine, to_async_url
+)
+
+
+class TestAsyncDatabase:
+    def test_async_url_driver_mapping(self):
+        assert to_async_url("sqlite:///./interview_system.db") == "sqlite+aiosqlite:///./interview_system.db"
+        assert to_async_url("postgresql://app:secret@db:5432/interview") == \
+            "postgresql+asyncpg://app:secret@db:5432/interview"
+        assert to_async_url("postgresql+asyncpg://app@db/interview") == "postgresql+asyncpg://app@db/interview"
+
+    def test_repositories_round_trip_on_wal_sqlite(self, tmp_path):
+        async def scenario():
+            engine = create_async_db_engine(f"sqlite:///{tmp_path / 'interview.db'}")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+            factory = async_sessionmaker(engine, expire_on_commit=False)
+
+            async with factory() as db:
+                session = await repositories.create_session(db, "人工智能", "技术岗", {"candidate_name": "张三"})
+                await asyncio.gather(*[
+                    add_answer(factory, session.id, index) for index in range(3)
+                ])
+                responses = await repositories.list_responses(db, session.id)
+                db.add_all([EvaluationReport(session_id=session.id, overall_score=score) for score in (70.0, 82.5)])
+                await db.commit()
+                report = await repositories.get_latest_report(db, session.id)
+                loaded = await repositories.get_session(db, session.id)
+            await engine.dispose()
+            return journal_mode, session, responses, report, loaded
+
+        async def add_answer(factory, session_id, index):
+            # 每个并发写入使用独立会话
+            async with factory() as db:
+                db.add(InterviewResponse(session_id=session_id, question_text=f"问题{index}",
+                                         response_text=f"回答{index}"))
+                await db.commit()
+
+        journal_mode, session, responses, report, loaded = asyncio.run(scenario())
+
+        assert journal_mode == "wal"
+        assert session.session_data == {"candidate_name": "张三"}
+        assert sorted(r.response_text for r in responses) == ["回答0", "回答1", "回答2"]
+        assert report.overall_score == 82.5
+        assert loaded.status == "active"
@@ -0,0 +1,98 @@
+"""
+测试向量化音频特征提取和语音活动检测
+"""
+
+import io
+import sys
+import os
+import wave
+
+import numpy as np
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.audio_feature_extractor import decode_pcm, extract_audio_features
+from app.services.voice_activity_detector import VoiceActivityDetector, count_spoken_words, speech_rate
+
+
+def _tone(frequency, seconds, sample_rate=16000, amplitude=6000):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (np.sin(2 * np.pi * frequency * t) * amplitude).astype("<i2")
+
+
+def _utterance(phrases=4, syllables=6, pause=0.8, sample_rate=16000):
+    """模拟语音：每个音节200ms的包络调制音，短语之间插入低噪声停顿"""
+    rng = np.random.RandomState(0)
+    t = np.arange(int(0.2 * sample_rate)) / sample_rate
+    syllable = np.sin(2 * np.pi * 160 * t) * np.sin(np.pi * t / 0.2) ** 2 * 8000
+    silence = lambda seconds: rng.randn(int(seconds * sample_rate)) * 20
+    parts = [silence(0.5)]
+    for _ in range(phrases):
+        parts.extend([syllable] * syllables)
+        parts.append(silence(pause))
+    return np.concatenate(parts).astype("<i2")
+
+
+class TestAudioFeatures:
+    """测试音频特征提取"""
+
+    def test_volume_matches_reference_loop(self):
+        """分帧RMS统计与逐帧Python循环结果一致"""
+        samples = (np.random.RandomState(0).randn(16000 * 2 + 500) * 3000).astype("<i2")
+        features = extract_audio_features(samples.tobytes())
+
+        values = samples.astype(float)
+        rms = [np.sqrt(np.mean(values[i:i + 1600] ** 2)) for i in range(0, len(values), 1600)]
+        assert features["volume"]["average"] == round(float(np.mean(rms)), 2)
+        assert features["volume"]["variance"] == round(float(np.var(rms)), 2)
+        assert abs(features["duration"] - len(samples) / 16000) < 1e-9
+
+    def test_pitch_estimate(self):
+        """自相关基频估计接近真实频率"""
+        features = extract_audio_features(_tone(220, 2).tobytes())
+        assert abs(features["pitch"]["average"] - 220) < 3
+        assert features["pitch"]["voiced_ratio"] > 0.9
+
+    def test_wav_header_and_stereo(self):
+        """WAV按头部采样率解码并取第一声道"""
+        mono = _tone(150, 1, sample_rate=8000)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(8000)
+            wav.writeframes(np.repeat(mono, 2).tobytes())
+
+        samples, sample_rate = decode_pcm(buffer.getvalue())
+        assert sample_rate == 8000
+        assert np.array_equal(samples, mono)
+
+
+class TestVoiceActivityDetector:
+    """测试VAD停顿检测和语速估计"""
+
+    def test_pauses_between_phrases(self):
+        """只统计语音段之间的停顿，首尾静音不计"""
+        features = extract_audio_features(_utterance().tobytes())
+        vad = features["vad"]
+        assert vad["pause_count"] == 3
+        assert vad["speech_segments"] == 4
+        assert vad["pause_histogram"]["0.5-1.0s"] == 3
+        assert abs(vad["voiced_time"] - 4.8) < 0.2
+        assert vad["estimated_syllables"] == 24
+
+    def test_streaming_matches_batch(self):
+        """分块输入与整段输入结果一致"""
+        samples = _utterance()
+        detector = VoiceActivityDetector()
+        for start in range(0, samples.size, 1234):
+            detector.feed(samples[start:start + 1234])
+        assert detector.result() == extract_audio_features(samples.tobytes())["vad"]
+
+    def test_speech_rate_prefers_asr_word_count(self):
+        """有识别文本时按实际字数计算语速"""
+        vad = {"total_time": 30.0, "voiced_time": 20.0, "estimated_syllables": 90}
+        assert count_spoken_words("我用Python做过3个项目") == 9
+        assert speech_rate(vad, 100) == {"words": 100, "source": "asr", "speech_rate": 200.0, "articulation_rate": 300.0}
+        assert speech_rate(vad)["source"] == "syllables"
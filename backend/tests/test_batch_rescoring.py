@@ -0,0 +1,202 @@
+"""
+测试批量重新评分服务
+"""
+
+import base64
+import sys
+import os
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.blob_store import ContentStore
+from app.models.database import (
+    AnalysisMetric,
+    Base,
+    EvaluationReport,
+    InterviewQuestion,
+    InterviewResponse,
+    InterviewSession,
+    MultimodalAnalysis,
+    StoredArtifact
+)
+import app.main as main_module
+from app.services import batch_rescoring_service as rescoring
+from app.services.analysis_storage_service import analysis_storage_service
+from app.services.batch_rescoring_service import BatchRescoringService, RescoreJobRunningError, iter_response_pages
+
+
+def make_session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rescore.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+
+    db = factory()
+    db.add(InterviewSession(id=1, domain="人工智能", position="技术岗"))
+    db.add(InterviewQuestion(id=1, domain="人工智能", question_text="介绍一个项目", keywords=["深度学习", "模型"]))
+    texts = [
+        "我负责深度学习模型的训练，首先分析数据，然后优化算法，因此准确率提升了。",
+        "",
+        "我使用TensorFlow搭建了推荐系统。",
+        "项目中创新地设计了分布式训练框架，最后总结了经验。",
+        "模型部署后通过监控持续改进。"
+    ]
+    for index, text in enumerate(texts, start=1):
+        db.add(InterviewResponse(id=index, session_id=1, question_id=1, response_text=text))
+    db.add(MultimodalAnalysis(response_id=1, speech_clarity=80.0, content_relevance=0.0))
+    db.add(EvaluationReport(id=1, session_id=1, overall_score=10.0, professional_knowledge=0.0,
+                            report_data={"overall_score": 10.0, "capability_scores": {"专业技能": 0.0},
+                                         "session_info": {"session_id": 1}}))
+    db.commit()
+    db.close()
+    return factory
+
+
+class TestBatchRescoring:
+    def test_keyset_pages_respect_limit(self, tmp_path):
+        factory = make_session_factory(tmp_path)
+        db = factory()
+        pages = list(iter_response_pages(db, page_size=2, limit=3))
+        db.close()
+
+        assert [[row["response_id"] for row in page] for page in pages] == [[1, 2], [3]]
+        assert pages[0][0]["keywords"] == ["深度学习", "模型"]
+
+    def test_rescore_updates_existing_and_inserts_missing(self, tmp_path):
+        factory = make_session_factory(tmp_path)
+        service = BatchRescoringService(session_factory=factory)
+        progress = []
+
+        stats = service.rescore(page_size=2, workers=0, chunk_size=1, reports=False, progress=progress.append)
+
+        assert stats["rows_read"] == 5
+        assert stats["skipped"] == 1
+        assert stats["updated"] == 1
+        assert stats["inserted"] == 3
+        assert stats["reports_updated"] == 0
+        assert len(progress) == stats["pages"] == 3
+
+        db = factory()
+        first = db.query(MultimodalAnalysis).filter(MultimodalAnalysis.response_id == 1).one()
+        assert first.content_relevance > 0
+        assert first.speech_clarity == 80.0
+        db.close()
+
+        # 再次运行时全部走更新，不会重复插入
+        stats = service.rescore(page_size=2, workers=0, reports=False)
+        assert stats["updated"] == 4
+        assert stats["inserted"] == 0
+
+    def test_reports_are_rescored_with_capability_evaluator(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(analysis_storage_service, "store", ContentStore(str(tmp_path / "blobs")))
+        factory = make_session_factory(tmp_path)
+
+        # workers=1：真实的（spawn）工作进程
+        stats = BatchRescoringService(session_factory=factory).rescore(page_size=2, workers=1, chunk_size=2)
+
+        assert stats["rows_read"] == 5
+        assert stats["reports_read"] == stats["reports_updated"] == 1
+
+        db = factory()
+        report = db.query(EvaluationReport).one()
+        capability_scores = report.report_data["capability_scores"]
+        assert set(capability_scores) == {"专业技能", "沟通表达", "逻辑思维", "学习能力", "抗压能力", "团队协作"}
+        assert report.professional_knowledge == capability_scores["专业技能"] > 0
+        assert report.overall_score == report.report_data["overall_score"] != 10.0
+        assert report.report_data["session_info"] == {"session_id": 1}
+        assert analysis_storage_service.load_artifact(report.report_data["artifacts"]["radar_chart"])
+        metric_names = {name for (name,) in db.query(AnalysisMetric.name).filter(AnalysisMetric.report_id == 1)}
+        assert "capability.专业技能" in metric_names and "overall_score" in metric_names
+        db.close()
+
+    def test_rescored_reports_replace_detailed_analysis_metrics(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(analysis_storage_service, "store", ContentStore(str(tmp_path / "blobs")))
+        factory = make_session_factory(tmp_path)
+        db = factory()
+        report = db.query(EvaluationReport).one()
+        stale = {**report.report_data, "detailed_analysis": {"text_analysis": {"average_relevance": 1.0}}}
+        analysis_storage_service.update_report(db, report, stale)
+        db.commit()
+        db.close()
+
+        BatchRescoringService(session_factory=factory).rescore(page_size=2, workers=0)
+
+        db = factory()
+        report = db.query(EvaluationReport).one()
+        detailed = report.report_data["detailed_analysis"]
+        assert detailed["total_responses"] == 5
+        metrics = {name: value for name, value in db.query(AnalysisMetric.name, AnalysisMetric.value).filter(
+            AnalysisMetric.report_id == 1, AnalysisMetric.name.like("detail.%")
+        )}
+        assert metrics["detail.text_analysis.average_relevance"] == detailed["text_analysis"]["average_relevance"] != 1.0
+        assert metrics["detail.total_responses"] == 5
+        assert report.strengths == [] and report.weaknesses == []
+        db.close()
+
+    def test_rescore_removes_replaced_chart_objects(self, tmp_path, monkeypatch):
+        store = ContentStore(str(tmp_path / "blobs"))
+        monkeypatch.setattr(analysis_storage_service, "store", store)
+        factory = make_session_factory(tmp_path)
+        db = factory()
+        report = db.query(EvaluationReport).one()
+        old_chart = base64.b64encode(b"old radar chart").decode()
+        analysis_storage_service.update_report(db, report, {**report.report_data, "visualizations": {"radar_chart": old_chart}})
+        db.commit()
+        old_hash = report.report_data["artifacts"]["radar_chart"]
+        db.close()
+        written_at = time.time() - 7200
+        os.utime(store._path(old_hash), (written_at, written_at))
+
+        stats = BatchRescoringService(session_factory=factory).rescore(page_size=2, workers=0)
+
+        db = factory()
+        new_hash = db.query(EvaluationReport).one().report_data["artifacts"]["radar_chart"]
+        assert db.query(StoredArtifact.content_hash).all() == [(new_hash,)]
+        db.close()
+        assert stats["orphans_removed"] == 1
+        assert not store.exists(old_hash) and store.exists(new_hash)
+
+    def test_rescore_endpoint_rejects_non_positive_page_size(self):
+        client = TestClient(main_module.app)
+        assert client.post("/api/v1/admin/rescore", json={"page_size": 0}).status_code == 422
+        assert client.post("/api/v1/admin/rescore", json={"page_size": 10, "workers": -1}).status_code == 422
+
+    def test_workers_are_capped_and_concurrent_jobs_rejected(self, tmp_path, monkeypatch):
+        factory = make_session_factory(tmp_path)
+        service = BatchRescoringService(session_factory=factory)
+        release = threading.Event()
+        seen = {}
+
+        def slow_rescore(**options):
+            release.wait(5)
+            return {}
+
+        monkeypatch.setattr(service, "rescore", slow_rescore)
+        service.start_job(workers=1)
+        with pytest.raises(RescoreJobRunningError):
+            service.start_job(workers=1)
+        release.set()
+
+        def fake_run_pages(pool, workers, pages, task, chunk_size, finish):
+            seen["workers"] = workers
+            return iter(())
+
+        monkeypatch.setattr(os, "cpu_count", lambda: 2)
+        monkeypatch.setattr(BatchRescoringService, "_run_pages", staticmethod(fake_run_pages))
+        monkeypatch.setattr(rescoring, "ProcessPoolExecutor", lambda **kwargs: seen.update(pool=kwargs) or _NoPool())
+        BatchRescoringService(session_factory=factory).rescore(workers=64)
+        assert seen["workers"] == 2
+        assert seen["pool"]["max_workers"] == 2
+        assert seen["pool"]["mp_context"].get_start_method() == "spawn"
+
+
+class _NoPool:
+    def shutdown(self, **kwargs):
+        pass
@@ -0,0 +1,57 @@
+"""
+测试CPU密集任务进程池执行器
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cpu_executor import CPUBoundExecutor
+
+
+def _worker_pid(delay: float = 0.0) -> int:
+    time.sleep(delay)
+    return os.getpid()
+
+
+class TestCPUBoundExecutor:
+    def test_small_input_runs_inline(self):
+        executor = CPUBoundExecutor(max_workers=1, inline_threshold=100)
+        assert asyncio.run(executor.run(_worker_pid, size=10)) == os.getpid()
+        assert executor.get_stats()["inline"] == 1
+        assert not executor.get_stats()["pool_started"]
+
+    def test_large_input_offloaded_with_bounded_pending(self):
+        executor = CPUBoundExecutor(max_workers=2, max_pending=2, inline_threshold=100)
+
+        async def scenario():
+            return await asyncio.gather(*(executor.run(_worker_pid, 0.05, size=1000) for _ in range(6)))
+
+        try:
+            pids = asyncio.run(scenario())
+        finally:
+            executor.shutdown()
+
+        assert os.getpid() not in pids
+        stats = executor.get_stats()
+        assert stats["offloaded"] == 6
+        assert stats["max_pending"] == 2
+        assert stats["pending"] == 0
+
+    def test_disabled_executor_runs_inline(self):
+        executor = CPUBoundExecutor(enabled=False)
+        assert asyncio.run(executor.run(_worker_pid, size=10_000)) == os.getpid()
+
+    def test_workers_are_spawned_not_forked(self):
+        executor = CPUBoundExecutor(max_workers=1, inline_threshold=0)
+        try:
+            pool = executor._get_pool()
+            assert pool._mp_context.get_start_method() == "spawn"
+            assert asyncio.run(executor.run(_worker_pid, size=10)) != os.getpid()
+        finally:
+            executor.shutdown()
+        assert executor.get_stats()["start_method"] == "spawn"
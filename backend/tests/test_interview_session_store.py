@@ -0,0 +1,157 @@
+"""
+测试服务端面试会话存储
+"""
+
+import asyncio
+import sys
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.main as main_module
+from app.services.intelligent_conversation_manager import IntelligentConversationManager
+from app.services.interview_session_store import InterviewSessionStore, SessionConflictError
+
+
+class TestInterviewSessionStore:
+    def test_evicted_sessions_reload_from_kv_file_and_survive_restart(self, tmp_path):
+        path = str(tmp_path / "sessions.db")
+        store = InterviewSessionStore(path=path, max_sessions=2, history_limit=4)
+        ids = [store.create("人工智能", "技术岗")["session_id"] for _ in range(3)]
+        store.append_messages(ids[0], [{"role": "user", "content": f"回答{i}"} for i in range(6)]
+                              + [{"role": "system", "content": "忽略"}])
+
+        # 内存只保留2个会话：追加消息时 ids[0] 从持久层重新读取，ids[1] 随之被淘汰，再读取时同样回源
+        assert store.get_stats()["memory_sessions"] == 2
+        state = store.get(ids[1])
+        assert state["domain"] == "人工智能"
+        assert store.get_stats()["loads"] == 2
+        assert [m["content"] for m in store.get(ids[0])["messages"]] == ["回答2", "回答3", "回答4", "回答5"]
+        assert store.recent_messages(store.get(ids[0]), 2) == [
+            {"role": "user", "content": "回答4"}, {"role": "user", "content": "回答5"}
+        ]
+
+        restarted = InterviewSessionStore(path=path)
+        assert all(restarted.get(session_id) is not None for session_id in ids)
+        assert restarted.delete(ids[2]) is True
+        assert InterviewSessionStore(path=path).get(ids[2]) is None
+
+    def test_workers_sharing_the_file_do_not_overwrite_each_others_turns(self, tmp_path):
+        path = str(tmp_path / "sessions.db")
+        worker_a = InterviewSessionStore(path=path)
+        worker_b = InterviewSessionStore(path=path)
+
+        session_id = worker_a.create("人工智能", "技术岗")["session_id"]
+        worker_b.append_messages(session_id, [{"role": "user", "content": "A1"}])
+        # worker_a 内存中仍是创建时的副本，追加前必须读到 worker_b 写入的版本
+        worker_a.append_messages(session_id, [{"role": "user", "content": "A2"}])
+
+        reader = InterviewSessionStore(path=path)
+        assert [m["content"] for m in reader.get(session_id)["messages"]] == ["A1", "A2"]
+        assert [m["content"] for m in worker_b.get(session_id)["messages"]] == ["A1", "A2"]
+
+    def test_stale_version_is_rejected_and_update_retries_on_latest(self, tmp_path):
+        path = str(tmp_path / "sessions.db")
+        store = InterviewSessionStore(path=path)
+        other = InterviewSessionStore(path=path)
+        session_id = store.create("大数据", "产品岗")["session_id"]
+
+        def append_concurrently(state):
+            # 第一次修改期间另一个worker抢先写入
+            if not state["messages"]:
+                other.append_messages(session_id, [{"role": "user", "content": "并发"}])
+            state["messages"].append({"role": "user", "content": "本地"})
+
+        store.update(session_id, append_concurrently)
+        assert [m["content"] for m in other.get(session_id)["messages"]] == ["并发", "本地"]
+        assert store.get_stats()["conflicts"] == 1
+        with pytest.raises(SessionConflictError):
+            store.create(session_id=session_id)
+
+    def test_conversation_context_is_shared_between_managers(self, tmp_path):
+        path = str(tmp_path / "sessions.db")
+        first = IntelligentConversationManager(InterviewSessionStore(path=path))
+        second = IntelligentConversationManager(InterviewSessionStore(path=path))
+
+        async def scenario():
+            await first.start_conversation_session("s1", "人工智能", "技术岗")
+            await first.process_user_response("s1", "我用PyTorch训练过Transformer模型，做过分布式训练和模型压缩")
+            # 另一个worker（或重启后的进程）继续同一会话
+            result = await second.process_user_response("s1", "不太清楚")
+            ended = await second.end_conversation_session("s1")
+            return result, ended
+
+        result, ended = asyncio.run(scenario())
+
+        assert result["status"] == "success"
+        assert result["interaction_count"] == 2
+        assert ended["status"] == "success"
+        assert ended["final_report"]["total_interactions"] == 2
+        assert InterviewSessionStore(path=path).get("s1") is None
+
+    def test_concurrent_turns_from_two_workers_are_both_kept(self, tmp_path):
+        path = str(tmp_path / "sessions.db")
+        worker_a = IntelligentConversationManager(InterviewSessionStore(path=path))
+        worker_b = IntelligentConversationManager(InterviewSessionStore(path=path))
+        generate = worker_a._generate_intelligent_response
+        interleaved = []
+
+        async def generate_while_b_answers(*args):
+            # worker_a 读取上下文之后、写回之前，worker_b 处理并写回了另一轮回答
+            if not interleaved:
+                interleaved.append(await worker_b.process_user_response("s1", "B"))
+            return await generate(*args)
+
+        worker_a._generate_intelligent_response = generate_while_b_answers
+
+        async def scenario():
+            await worker_a.start_conversation_session("s1", "人工智能", "技术岗")
+            return await worker_a.process_user_response("s1", "A")
+
+        result = asyncio.run(scenario())
+
+        assert interleaved[0]["interaction_count"] == 1
+        assert result["status"] == "success" and result["interaction_count"] == 2
+        context = InterviewSessionStore(path=path).get("s1")["context"]
+        assert context["total_interaction_count"] == 2
+        assert [entry["user_response"] for entry in context["conversation_history"]] == ["B", "A"]
+        assert worker_a.session_store.get_stats()["conflicts"] == 1
+
+
+class TestInterviewSessionEndpoints:
+    def test_next_question_uses_store_off_the_event_loop(self, tmp_path, monkeypatch):
+        store = InterviewSessionStore(path=str(tmp_path / "sessions.db"))
+        session_id = store.create("人工智能", "技术岗", messages=[{"role": "assistant", "content": "Q1"}])["session_id"]
+        store_threads = []
+        for name in ("get", "append_messages"):
+            method = getattr(store, name)
+
+            def recorded(*args, _method=method, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    store_threads.append("event_loop")
+                except RuntimeError:
+                    store_threads.append("worker_thread")
+                return _method(*args, **kwargs)
+
+            monkeypatch.setattr(store, name, recorded)
+
+        async def fake_spark(messages):
+            assert [m["content"] for m in messages[1:]] == ["Q1", "A1"]
+            return f"思考{main_module.DELIMITER}Q2"
+
+        monkeypatch.setattr(main_module, "interview_session_store", store)
+        monkeypatch.setattr(main_module, "get_spark_response", fake_spark)
+
+        response = TestClient(main_module.app).post("/api/v1/interview/next", json={
+            "session_id": session_id, "messages": [{"role": "user", "content": "A1"}]
+        })
+
+        assert response.status_code == 200 and response.json()["question"] == "Q2"
+        assert [m["content"] for m in store.get(session_id)["messages"]] == ["Q1", "A1", "Q2"]
+        # 接口里的读写都在线程中执行（最后一次 get 是上面的断言）
+        assert store_threads == ["worker_thread", "worker_thread", "worker_thread"]
@@ -0,0 +1,110 @@
+"""
+测试流式面试接口（SSE）及思考/问题拆分器
+"""
+
+import json
+import sys
+import os
+
+from fastapi.testclient import TestClient
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.main as main_module
+from app.main import DELIMITER, DelimiterStreamSplitter
+from app.services.interview_session_store import InterviewSessionStore
+
+
+def _split(chunks):
+    splitter = DelimiterStreamSplitter()
+    events = []
+    for chunk in chunks:
+        events.extend(splitter.feed(chunk))
+    events.extend(splitter.flush())
+    return splitter, events
+
+
+def _joined(events, section):
+    return "".join(delta for name, delta in events if name == section)
+
+
+def _sse(response):
+    """解析SSE响应为 (事件名, 数据) 列表"""
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _fake_stream(chunks, error=None):
+    async def chat_with_spark_stream(messages, **kwargs):
+        for chunk in chunks:
+            yield chunk
+        if error is not None:
+            raise error
+    return chat_with_spark_stream
+
+
+class TestDelimiterStreamSplitter:
+    def test_delimiter_split_across_chunks(self):
+        half = len(DELIMITER) // 2
+        splitter, events = _split(["先分析岗位", DELIMITER[:half], DELIMITER[half:] + "请介绍", "一个项目"])
+
+        assert _joined(events, "thinking") == "先分析岗位"
+        assert _joined(events, "question") == "请介绍一个项目"
+        assert DELIMITER not in "".join(delta for _, delta in events)
+        assert splitter.text == "先分析岗位" + DELIMITER + "请介绍一个项目"
+
+    def test_text_without_delimiter_stays_thinking(self):
+        splitter, events = _split(["只有", "一段文本", ""])
+
+        assert _joined(events, "thinking") == "只有一段文本"
+        assert _joined(events, "question") == ""
+        assert splitter.section == "thinking"
+
+
+class TestInterviewStreamEndpoints:
+    def test_next_stream_emits_sections_and_records_turn(self, tmp_path, monkeypatch):
+        store = InterviewSessionStore(path=str(tmp_path / "sessions.db"))
+        session_id = store.create("人工智能", "技术岗", messages=[{"role": "assistant", "content": "Q1"}])["session_id"]
+        monkeypatch.setattr(main_module, "interview_session_store", store)
+        monkeypatch.setattr(main_module.enhanced_iflytek_service, "chat_with_spark_stream",
+                            _fake_stream(["评估回答", DELIMITER[:4], DELIMITER[4:] + "Q2"]))
+
+        response = TestClient(main_module.app).post("/api/v1/interview/next/stream", json={
+            "session_id": session_id, "messages": [{"role": "user", "content": "A1"}]
+        })
+
+        events = _sse(response)
+        assert [name for name, _ in events] == ["thinking", "question", "done"]
+        assert events[-1][1] == {"thinking": "评估回答", "question": "Q2", "session_id": session_id}
+        assert [m["content"] for m in store.get(session_id)["messages"]] == ["Q1", "A1", "Q2"]
+
+    def test_interrupted_stream_emits_error_without_done_or_hooks(self, tmp_path, monkeypatch):
+        store = InterviewSessionStore(path=str(tmp_path / "sessions.db"))
+        create = store.create
+        created = []
+        monkeypatch.setattr(store, "create", lambda *args, **kwargs: created.append(create(*args, **kwargs)) or created[-1])
+        remembered = []
+        monkeypatch.setattr(main_module, "interview_session_store", store)
+        monkeypatch.setattr(main_module.opening_question_pool, "take", lambda *args: None)
+        monkeypatch.setattr(main_module.prompt_cache_service, "lookup", lambda *args, **kwargs: None)
+        monkeypatch.setattr(main_module.prompt_cache_service, "remember",
+                            lambda *args, **kwargs: remembered.append(args))
+        monkeypatch.setattr(main_module.enhanced_iflytek_service, "chat_with_spark_stream",
+                            _fake_stream(["分析到一半", DELIMITER + "问题的前"], RuntimeError("连接中断")))
+
+        response = TestClient(main_module.app).post("/api/v1/interview/start/stream", json={
+            "domain": "人工智能", "position": "技术岗"
+        })
+
+        events = _sse(response)
+        assert [name for name, _ in events] == ["thinking", "question", "error"]
+        assert "连接中断" in events[-1][1]["message"]
+        assert all("暂时不可用" not in json.dumps(data, ensure_ascii=False) for _, data in events[:-1])
+        assert remembered == []
+        # 会话已创建，但中断的回复不会作为面试官问题记录
+        assert len(created) == 1
+        assert store.get(created[0]["session_id"])["messages"] == []
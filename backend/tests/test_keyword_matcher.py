@@ -0,0 +1,50 @@
+"""
+测试Aho–Corasick关键词匹配器
+"""
+
+import random
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.keyword_matcher import KeywordIndex, KeywordMatcher
+
+
+class TestKeywordMatcher:
+    def test_overlapping_hits_with_positions_and_categories(self):
+        matcher = KeywordMatcher({
+            "核心技术": ["学习", "深度学习", "机器学习"],
+            "高级概念": ["强化学习", "深度学习"]
+        })
+        hits = matcher.find_all("深度学习和强化学习")
+
+        assert [(hit.keyword, hit.start, hit.end) for hit in hits] == [
+            ("深度学习", 0, 4), ("学习", 2, 4), ("强化学习", 5, 9), ("学习", 7, 9)]
+        assert hits[0].categories == ("核心技术", "高级概念")
+        assert matcher.found_by_category("深度学习和强化学习") == {
+            "核心技术": ["学习", "深度学习"], "高级概念": ["强化学习", "深度学习"]}
+
+    def test_counts_match_substring_search(self):
+        random.seed(7)
+        alphabet = "数据模型学习算法优化ab"
+        vocabulary = ["".join(random.choice(alphabet) for _ in range(random.randint(1, 4))) for _ in range(60)]
+        matcher = KeywordMatcher({"all": vocabulary})
+        for _ in range(50):
+            text = "".join(random.choice(alphabet) for _ in range(random.randint(0, 80)))
+            assert matcher.match(text).count(vocabulary) == sum(1 for keyword in vocabulary if keyword in text)
+
+
+class TestKeywordIndex:
+    def test_shared_index_registers_vocabularies_and_caches_scans(self):
+        index = KeywordIndex(max_cached_texts=2)
+        text = "首先分析原因，因此采用了新的架构"
+
+        assert index.count(text, ["首先", "其次", "因此"]) == 2
+        assert index.found(text, ["架构", "原理"]) == ["架构"]
+        assert index.contains_any(text, ["原理", "机制"]) is False
+        assert index.scan(text) is index.scan(text)
+
+        # 新词表注册后重建自动机，之前的扫描缓存失效
+        assert index.count(text, ["分析", "采用"]) == 2
@@ -0,0 +1,72 @@
+"""
+测试延迟导入和启动耗时分析
+"""
+
+import json
+import subprocess
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.lazy_import import LazyProxy, get_lazy_stats, lazy_attribute, resolve
+from app.core.startup_profiler import parse_importtime
+
+
+class TestLazyImport:
+    def test_loader_runs_once_on_first_use(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return {"name": "报告服务"}
+
+        proxy = LazyProxy("test.report_service", loader)
+        assert calls == []
+        assert get_lazy_stats()["test.report_service"]["loaded"] is False
+
+        assert proxy.get("name") == "报告服务"
+        assert proxy.keys() and resolve(proxy) is resolve(proxy)
+        assert calls == [1]
+        assert get_lazy_stats()["test.report_service"]["loaded"] is True
+
+    def test_same_attribute_shares_one_proxy(self):
+        first = lazy_attribute(".lazy_import", "get_lazy_stats", "app.core")
+        second = lazy_attribute("app.core.lazy_import", "get_lazy_stats")
+
+        assert first is second
+        assert resolve(first) is get_lazy_stats
+        assert get_lazy_stats()["app.core.lazy_import.get_lazy_stats"]["loaded"] is True
+
+    def test_pending_services_are_not_imported_by_app_main(self):
+        """启动后报告为未加载的服务，其模块确实没有被其他模块提前导入"""
+        script = (
+            "import json, sys\n"
+            "import app.main\n"
+            "from app.core.lazy_import import get_lazy_stats\n"
+            "pending = [name.rsplit('.', 1)[0] for name, state in get_lazy_stats().items()\n"
+            "           if not state['loaded'] and name.startswith('app.services.')]\n"
+            "print(json.dumps({'pending': pending, 'imported': [m for m in pending if m in sys.modules]}))\n"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = {**os.environ, "LAZY_IMPORTS": "true"}
+        output = subprocess.run([sys.executable, "-c", script], cwd=root, env=env, capture_output=True,
+                                text=True, timeout=120, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        assert "app.services.evaluation_service" in result["pending"]
+        assert "app.services.report_generation_service" in result["pending"]
+        assert result["imported"] == []
+
+    def test_parse_importtime_output(self):
+        output = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     json.decoder",
+            "import time:       300 |        420 |   json",
+            "import time:      1000 |       1420 | app.main",
+        ])
+        entries = parse_importtime(output)
+
+        assert [entry["module"] for entry in entries] == ["json.decoder", "json", "app.main"]
+        assert entries[1] == {"module": "json", "self_ms": 0.3, "cumulative_ms": 0.42, "depth": 1}
@@ -0,0 +1,181 @@
+"""
+测试实时音频分析会话和 /ws/interview/{session_id}/audio 接口
+"""
+
+import asyncio
+import json
+import sys
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import websockets
+from fastapi.testclient import TestClient
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.main as main_module
+from app.services import asr_stream_service as asr_stream_module
+from app.services.asr_stream_service import ASRStreamSession
+from app.services.iflytek_service import multimodal_service
+from app.services.live_audio_service import LiveAudioSession
+
+
+def _service(asr_service=None):
+    """识别服务可替换、语音特征和情感分析使用真实实现的分析服务"""
+    return SimpleNamespace(
+        asr_service=asr_service or SimpleNamespace(app_id="", api_key="", api_secret=""),
+        speech_analysis_service=multimodal_service.speech_analysis_service,
+        emotion_service=multimodal_service.emotion_service
+    )
+
+
+def _pcm(seconds, amplitude=3000):
+    t = np.arange(int(16000 * seconds)) / 16000
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype("<i2").tobytes()
+
+
+def _result(sn, text, status=1):
+    return json.dumps({"code": 0, "data": {"status": status, "result": {"sn": sn, "ws": [{"cw": [{"w": text}]}]}}})
+
+
+class TestLiveAudioSession:
+    def test_push_audio_emits_one_metric_per_window(self):
+        async def scenario():
+            live = LiveAudioSession("s1", service=_service(), metrics_interval=0.5)
+            await live.start()
+            audio = _pcm(1.2)
+            # 奇数字节的分片：不完整的采样留到下一片再分析
+            first = await live.push_audio(audio[:10001])
+            second = await live.push_audio(audio[10001:])
+            return live, first, second
+
+        live, first, second = asyncio.run(scenario())
+        assert live.asr_error == "语音识别未配置"
+        assert first == []
+        assert [metrics["elapsed"] for metrics in second] == [0.5, 1.0]
+        assert all(metrics["type"] == "metrics" and metrics["volume_rms"] > 1000 for metrics in second)
+
+    def test_finish_without_asr_returns_local_analysis(self):
+        async def scenario():
+            live = LiveAudioSession("s2", service=_service())
+            await live.start()
+            await live.push_audio(_pcm(1.0))
+            partials = [partial async for partial in live.transcripts()]
+            return partials, await live.finish()
+
+        partials, result = asyncio.run(scenario())
+        assert partials == []
+        assert result["type"] == "final"
+        assert result["duration"] == 1.0
+        assert result["transcription"] == {"text": "", "confidence": 0.0, "error": "语音识别未配置"}
+        assert result["speech_features"]
+        assert result["emotion_analysis"] == {}
+
+    def test_asr_session_reopens_after_server_side_end_of_speech(self):
+        connections = []
+
+        async def fake_iat(websocket):
+            index = len(connections)
+            connections.append(websocket)
+            async for message in websocket:
+                status = json.loads(message)["data"]["status"]
+                if index == 0:
+                    # 第一次识别：模拟静音超过 vad_eos 后服务端结束会话
+                    await websocket.send(_result(1, "我做过推荐系统", status=2))
+                    return
+                if status == 2:
+                    await websocket.send(_result(2, "的召回模块", status=2))
+                    return
+                await websocket.send(_result(1, "后来负责"))
+
+        async def scenario():
+            async with websockets.serve(fake_iat, "127.0.0.1", 0) as server:
+                url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+                asr_service = SimpleNamespace(app_id="a", api_key="k", api_secret="s",
+                                              open_stream=lambda: ASRStreamSession(url, "test-app"))
+                live = LiveAudioSession("s3", service=_service(asr_service))
+                await live.start()
+                partials = []
+
+                async def collect():
+                    async for partial in live.transcripts():
+                        partials.append(partial)
+
+                collector = asyncio.create_task(collect())
+                await live.push_audio(_pcm(0.2))
+                for _ in range(100):
+                    if live.asr.closed_by_server:
+                        break
+                    await asyncio.sleep(0.01)
+                await live.push_audio(_pcm(0.2))
+                result = await live.finish()
+                await asyncio.wait_for(collector, 5)
+                await live.close()
+                return live, partials, result
+
+        live, partials, result = asyncio.run(scenario())
+        assert len(connections) == 2 and live.asr_restarts == 1
+        assert result["transcription"]["text"] == "我做过推荐系统后来负责的召回模块"
+        assert result["transcription"]["segments"] == 2
+        assert [(p["text"], p["is_final"]) for p in partials] == [
+            ("我做过推荐系统", False),
+            ("我做过推荐系统后来负责", False),
+            ("我做过推荐系统后来负责的召回模块", True)
+        ]
+
+    def test_finish_returns_when_asr_result_times_out(self, monkeypatch):
+        monkeypatch.setattr(asr_stream_module.settings, "asr_result_timeout", 0.2)
+
+        async def stalled_iat(websocket):
+            # 接收音频和结束帧，但始终不返回识别结果
+            async for _ in websocket:
+                pass
+
+        async def scenario():
+            async with websockets.serve(stalled_iat, "127.0.0.1", 0) as server:
+                url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+                asr_service = SimpleNamespace(app_id="a", api_key="k", api_secret="s",
+                                              open_stream=lambda: ASRStreamSession(url, "test-app"))
+                live = LiveAudioSession("s4", service=_service(asr_service))
+                await live.start()
+                partials = []
+
+                async def collect():
+                    async for partial in live.transcripts():
+                        partials.append(partial)
+
+                collector = asyncio.create_task(collect())
+                await live.push_audio(_pcm(0.2))
+                result = await asyncio.wait_for(live.finish(), 5)
+                # 识别超时后部分结果的转发也随之结束，不会一直等待服务端关闭连接
+                await asyncio.wait_for(collector, 1)
+                await live.close()
+                return partials, result
+
+        partials, result = asyncio.run(scenario())
+        assert partials == []
+        assert result["transcription"]["error"] == "语音识别超时"
+        assert result["duration"] == 0.2
+
+
+class TestLiveAudioWebSocket:
+    def test_ready_metrics_and_final_messages(self, monkeypatch):
+        monkeypatch.setattr(main_module, "LiveAudioSession",
+                            lambda session_id: LiveAudioSession(session_id, service=_service()))
+        client = TestClient(main_module.app)
+
+        with client.websocket_connect("/ws/interview/ws-1/audio") as websocket:
+            ready = websocket.receive_json()
+            websocket.send_bytes(_pcm(2.0))
+            metrics = [websocket.receive_json(), websocket.receive_json()]
+            websocket.send_text(json.dumps({"type": "end"}))
+            final = websocket.receive_json()
+
+        assert ready == {"type": "ready", "session_id": "ws-1", "asr_enabled": False,
+                         "asr_error": "语音识别未配置", "sample_rate": 16000}
+        assert [m["type"] for m in metrics] == ["metrics", "metrics"]
+        assert [m["elapsed"] for m in metrics] == [1.0, 2.0]
+        assert final["type"] == "final" and final["session_id"] == "ws-1"
+        assert final["duration"] == 2.0
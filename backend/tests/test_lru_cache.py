@@ -0,0 +1,154 @@
+"""
+测试通用LRU + TTL缓存及SQLite共享缓存后端
+"""
+
+import asyncio
+import sys
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import LRUCache, SQLiteCache, estimate_size
+
+
+class TestLRUCache:
+    """测试LRU缓存淘汰、过期和统计"""
+
+    def test_evicts_least_recently_used(self):
+        """超出条目数时淘汰最久未使用的条目"""
+        cache = LRUCache(max_entries=2, ttl_seconds=None)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # a 变为最近使用
+        cache.set("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_byte_budget(self):
+        """超出字节预算时淘汰，单个超大值不缓存"""
+        value = "x" * 100
+        size = estimate_size(value)
+        cache = LRUCache(max_entries=100, ttl_seconds=None, max_bytes=size * 2)
+        cache.set("a", value)
+        cache.set("b", value)
+        cache.set("c", value)
+
+        assert len(cache) == 2
+        assert cache.size_bytes <= size * 2
+        assert "a" not in cache
+
+        cache.set("huge", "y" * (size * 3))
+        assert "huge" not in cache
+
+    def test_ttl_expiration(self):
+        """过期条目视为未命中"""
+        cache = LRUCache(max_entries=10, ttl_seconds=0.01)
+        cache.set("a", {"content": "回答"})
+        assert cache.get("a") == {"content": "回答"}
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["expirations"] == 1
+        assert stats["entries"] == 0
+
+
+class TestSQLiteCache:
+    """测试跨进程共享的SQLite缓存后端"""
+
+    def test_instances_share_entries(self, tmp_path):
+        """同一数据库文件的两个实例（模拟两个worker）共享缓存"""
+        path = str(tmp_path / "shared.db")
+        worker_a = SQLiteCache(path, namespace="spark", ttl_seconds=None)
+        worker_b = SQLiteCache(path, namespace="spark", ttl_seconds=None)
+        other = SQLiteCache(path, namespace="http", ttl_seconds=None)
+
+        worker_a.set("k", {"content": "回答", "body": b"\x00raw"})
+        assert worker_b.get("k") == {"content": "回答", "body": b"\x00raw"}
+        assert "k" not in other
+
+        worker_b.delete("k")
+        assert worker_a.get("k") is None
+
+    def test_trims_to_entry_budget(self, tmp_path):
+        """写入后按最久未访问淘汰超出的条目"""
+        cache = SQLiteCache(str(tmp_path / "trim.db"), max_entries=2, ttl_seconds=None, trim_interval=1)
+        cache.set("a", 1)
+        time.sleep(0.01)
+        cache.set("b", 2)
+        time.sleep(0.01)
+        assert cache.get("a") == 1  # a 变为最近访问
+        time.sleep(0.01)
+        cache.set("c", 3)
+
+        assert len(cache) == 2
+        assert "b" not in cache
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_hits_batch_last_access_and_still_drive_eviction(self, tmp_path):
+        """命中不逐次写库，淘汰前批量写回 last_access"""
+        path = str(tmp_path / "access.db")
+        cache = SQLiteCache(path, max_entries=3, ttl_seconds=None, trim_interval=4)
+        cache.set("a", 1)
+        time.sleep(0.01)
+        cache.set("b", 2)
+        written = cache._conn.execute("SELECT last_access FROM cache_entries WHERE key = 'a'").fetchone()[0]
+
+        time.sleep(0.01)
+        assert cache.get("a") == 1
+        assert cache._conn.execute("SELECT last_access FROM cache_entries WHERE key = 'a'").fetchone()[0] == written
+
+        cache.set("c", 3)
+        cache.set("d", 4)  # 第4次写入触发淘汰，此前 a 的命中已写回，最久未访问的是 b
+        assert len(cache) == 3
+        assert "b" not in cache and "a" in cache
+
+    def test_rejects_values_that_are_not_json(self, tmp_path):
+        """datetime 等值不再静默转换为字符串"""
+        cache = SQLiteCache(str(tmp_path / "strict.db"), ttl_seconds=None)
+        with pytest.raises(TypeError):
+            cache.set("when", {"at": datetime(2024, 1, 1)})
+        assert "when" not in cache
+
+    def test_async_access_runs_off_event_loop(self, tmp_path):
+        """aget/aset 在线程池中读写数据库，不阻塞事件循环"""
+        cache = SQLiteCache(str(tmp_path / "async.db"), ttl_seconds=None)
+        calls = []
+
+        def on_loop():
+            try:
+                asyncio.get_running_loop()
+                return True
+            except RuntimeError:
+                return False
+
+        get, set_ = cache.get, cache.set
+        cache.get = lambda *args, **kwargs: calls.append(("get", on_loop())) or get(*args, **kwargs)
+        cache.set = lambda *args, **kwargs: calls.append(("set", on_loop())) or set_(*args, **kwargs)
+
+        async def scenario():
+            await cache.aset("a", {"n": 1})
+            return await cache.aget("a")
+
+        assert asyncio.run(scenario()) == {"n": 1}
+        assert calls == [("set", False), ("get", False)]
+
+    def test_memory_backend_async_access_stays_inline(self):
+        """进程内缓存无阻塞I/O，aget/aset 直接在事件循环中执行"""
+        cache = LRUCache(ttl_seconds=None)
+
+        async def scenario():
+            await cache.aset("a", 1)
+            return await cache.aget("a"), await cache.aget("missing", "default")
+
+        assert asyncio.run(scenario()) == (1, "default")
@@ -0,0 +1,88 @@
+"""
+测试开场问题预生成池
+"""
+
+import asyncio
+import sys
+import os
+import time
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.opening_question_pool_service import OpeningQuestionPool
+
+
+class TestOpeningQuestionPool:
+    """测试开场问题池的取用和后台补齐"""
+
+    def setup_method(self):
+        """使用计数的生成函数代替Spark调用"""
+        self.pool = OpeningQuestionPool(pool_size=2, max_age=60, concurrency=4)
+        self.generated = 0
+
+        async def generate(domain, position):
+            self.generated += 1
+            return {"thinking": "思考", "question": f"{domain}/{position}#{self.generated}"}
+
+        self.pool.register("start", generate)
+        self.domain, self.position = self.pool.pairs()[0]
+
+    def test_refill_only_fills_requested_pairs(self):
+        """没有取用过的组合不预生成，首次取用未命中后补齐该组合"""
+        async def refill_all():
+            while await self.pool.refill_once():
+                pass
+
+        asyncio.run(refill_all())
+        assert self.generated == 0
+
+        assert self.pool.take("start", self.domain, self.position) is None
+        assert self.pool.take("start", "不存在的领域", "技术岗") is None
+        asyncio.run(refill_all())
+        assert self.generated == 2
+        stats = self.pool.get_stats()
+        assert stats["pooled"] == 2 and stats["active_pairs"] == 1
+
+    def test_idle_pairs_stop_refilling(self):
+        """超过 max_age 没有再取用的组合不再补齐"""
+        self.pool.max_age = 0.05
+        self.pool.take("start", self.domain, self.position)
+        assert [key for _, key in self.pool._deficits()] == [("start", self.domain, self.position)]
+
+        time.sleep(0.1)
+        assert self.pool._deficits() == []
+        assert self.pool.get_stats()["idle_dropped"] == 1
+
+    def test_take_consumes_results(self):
+        """取出即消费，池空时返回None"""
+        self.pool.put("start", self.domain, self.position, {"question": "Q1"})
+        assert self.pool.take("start", self.domain, self.position) == {"question": "Q1"}
+        assert self.pool.take("start", self.domain, self.position) is None
+
+        stats = self.pool.get_stats()
+        assert stats["served"] == 1
+        assert stats["misses"] == 1
+
+    def test_background_worker_refills_after_take(self):
+        """首次取用未命中后后台补齐，之后的取用直接命中并再次补齐"""
+        async def wait_pooled(count):
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if self.pool.get_stats()["pooled"] == count:
+                    return
+
+        async def scenario():
+            self.pool.start()
+            first = self.pool.take("start", self.domain, self.position)
+            await wait_pooled(2)
+            second = self.pool.take("start", self.domain, self.position)
+            await wait_pooled(2)
+            stats = self.pool.get_stats()
+            await self.pool.stop()
+            return first, second, stats
+
+        first, second, stats = asyncio.run(scenario())
+        assert first is None and second is not None
+        assert stats["pooled"] == 2
+        assert self.generated == 3
@@ -0,0 +1,66 @@
+"""
+测试提示词归一化缓存
+验证规范键、回答池复用和MinHash近似重复查找
+"""
+
+import asyncio
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.prompt_cache_service import MinHashIndex, PromptCacheService, canonical_key
+
+
+class TestPromptCache:
+    """测试提示词缓存"""
+
+    def setup_method(self):
+        """每个测试使用独立的缓存实例和计数的生成函数"""
+        self.service = PromptCacheService(pool_size=2, ttl_seconds=60)
+        self.generated = 0
+
+        async def generate(messages):
+            self.generated += 1
+            return f"思考{self.generated}|||问题{self.generated}"
+
+        self.generate = generate
+
+    def test_canonical_key_ignores_formatting(self):
+        """空白、全角和“岗位”后缀不影响缓存键"""
+        a = canonical_key("interview_start", {"domain": "人工智能", "position": "AI工程师"})
+        b = canonical_key("interview_start", {"domain": " 人工智能 ", "position": "ＡＩ工程师岗位"})
+        c = canonical_key("interview_start", {"domain": "人工智能", "position": "数据分析师"})
+        assert a == b
+        assert a != c
+
+    def test_pool_fills_then_serves_without_generating(self):
+        """回答池满之前调用生成函数，满后直接从池中返回"""
+        slots = {"domain": "人工智能", "position": "AI工程师"}
+        messages = [{"role": "user", "content": "开场"}]
+
+        async def scenario():
+            return [await self.service.get_or_generate("interview_start", slots, messages, self.generate)
+                    for _ in range(5)]
+
+        answers = asyncio.run(scenario())
+        assert self.generated == 2
+        assert set(answers[2:]) <= {"思考1|||问题1", "思考2|||问题2"}
+        assert self.service.get_stats()["exact_hits"] == 3
+
+    def test_invalid_answers_not_pooled(self):
+        """未通过校验的回答不进入回答池"""
+        slots = {"domain": "大数据", "position": "数据工程师"}
+        assert not self.service.remember("interview_start", slots, "AI服务暂时不可用", validate=lambda t: "|||" in t)
+        assert self.service.get_pool(self.service.make_key("interview_start", slots)) == []
+
+    def test_near_duplicate_lookup(self):
+        """槽位措辞略有差异时复用相似提示词的回答池"""
+        index = MinHashIndex(threshold=0.6)
+        index.add("a", "人工智能 | 机器学习算法工程师")
+        index.add("b", "物联网 | 嵌入式开发工程师")
+
+        match = index.query("人工智能 | 机器学习算法工程师（初级）")
+        assert match is not None and match[0] == "a"
+        assert index.query("大数据 | 数据仓库分析师") is None
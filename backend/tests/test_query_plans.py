@@ -0,0 +1,146 @@
+"""
+测试热点查询的执行计划：会话、回答、报告、题目的常用查询都必须走索引，不能退化为全表扫描
+"""
+
+import asyncio
+import re
+import sys
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import repositories
+from app.models.database import (
+    Base, EvaluationReport, InterviewQuestion, InterviewResponse, InterviewSession, MultimodalAnalysis,
+    create_async_db_engine, upgrade_columns, upgrade_indexes
+)
+from app.services.batch_rescoring_service import iter_response_pages, write_scores
+from app.services.interview_service import InterviewQuestionService, interview_scenario_service
+
+FULL_SCAN = re.compile(r"^SCAN \w+$")
+
+
+@contextmanager
+def record_selects(engine):
+    """记录执行过的SELECT语句及参数"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def full_scans(engine, statements):
+    """返回执行计划中出现全表扫描的语句"""
+    offenders = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            details = [row[-1] for row in plan]
+            if any(FULL_SCAN.match(detail) for detail in details):
+                offenders.append((statement, details))
+    return offenders
+
+
+def seed(engine):
+    db = sessionmaker(bind=engine)()
+    for index in range(40):
+        db.add(InterviewQuestion(domain="人工智能" if index % 2 else "大数据", position="技术岗",
+                                 question_text=f"题目{index}", question_type="technical",
+                                 difficulty_level=["easy", "medium", "hard"][index % 3]))
+    for session_id in range(1, 6):
+        db.add(InterviewSession(id=session_id, user_id=session_id % 2, domain="人工智能", position="技术岗"))
+        for question_id in range(1, 4):
+            db.add(InterviewResponse(session_id=session_id, question_id=question_id, response_text="回答"))
+        db.add(EvaluationReport(session_id=session_id, overall_score=80.0))
+    db.commit()
+    for response_id in range(1, 16):
+        db.add(MultimodalAnalysis(response_id=response_id, content_relevance=50.0))
+    db.commit()
+    db.close()
+
+
+class TestQueryPlans:
+    def test_hot_queries_use_indexes(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'plans.db'}"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        upgrade_indexes(engine)
+        seed(engine)
+
+        db = sessionmaker(bind=engine)()
+        with record_selects(engine) as statements:
+            assert InterviewQuestionService.get_question_by_criteria("人工智能", "技术岗", "technical", "hard", db)
+            assert InterviewQuestionService.get_random_question("人工智能", "技术岗", db).domain == "人工智能"
+            interview_scenario_service.select_questions("人工智能", "技术岗", db)
+            pages = list(iter_response_pages(db, page_size=4, session_ids=[1, 2]))
+            write_scores(db, [{"response_id": row["response_id"], "content_relevance": 60.0}
+                              for page in pages for row in page])
+        db.close()
+
+        async def run_repositories():
+            async_engine = create_async_db_engine(url)
+            factory = async_sessionmaker(async_engine, expire_on_commit=False)
+            with record_selects(async_engine.sync_engine) as async_statements:
+                async with factory() as async_db:
+                    await repositories.get_session(async_db, 1)
+                    await repositories.list_responses(async_db, 1)
+                    await repositories.get_latest_report(async_db, 1)
+            await async_engine.dispose()
+            return async_statements
+
+        statements += asyncio.run(run_repositories())
+
+        assert len(statements) >= 8
+        assert full_scans(engine, statements) == []
+
+    def test_upgrade_indexes_migrates_existing_database(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE interview_responses (id INTEGER PRIMARY KEY, session_id INTEGER, "
+                                 "question_id INTEGER, question_text TEXT, response_text TEXT, response_time FLOAT, "
+                                 "audio_file_path VARCHAR(255), video_file_path VARCHAR(255), created_at DATETIME)")
+            conn.exec_driver_sql("CREATE INDEX ix_interview_responses_session_id ON interview_responses (session_id)")
+        Base.metadata.create_all(bind=engine)
+
+        upgrade_indexes(engine)
+        upgrade_indexes(engine)
+
+        with engine.connect() as conn:
+            names = {row[0] for row in conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='interview_responses'")}
+        assert "ix_interview_responses_session_question" in names
+        assert "ix_interview_responses_session_id" not in names
+
+    def test_upgrade_columns_adds_question_updated_at(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'legacy_questions.db'}")
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE interview_questions (id INTEGER PRIMARY KEY, domain VARCHAR(50), "
+                                 "position VARCHAR(50), question_text TEXT, difficulty_level VARCHAR(20), "
+                                 "question_type VARCHAR(30), keywords JSON, expected_points JSON)")
+            conn.exec_driver_sql("INSERT INTO interview_questions (domain, question_text) VALUES ('大数据', '旧题目')")
+        Base.metadata.create_all(bind=engine)
+
+        upgrade_columns(engine)
+        upgrade_columns(engine)
+        upgrade_indexes(engine)
+
+        db = sessionmaker(bind=engine)()
+        question = db.query(InterviewQuestion).one()
+        assert question.updated_at is None
+        question.question_text = "改写后的题目"
+        db.commit()
+        assert db.query(InterviewQuestion).one().updated_at is not None
+        db.close()
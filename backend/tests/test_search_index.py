@@ -0,0 +1,127 @@
+"""
+测试全文检索索引（BM25）及题库、案例库检索
+"""
+
+import sys
+import os
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.main as main_module
+from app.models.database import Base, InterviewQuestion
+from app.services.enhanced_case_library_service import enhanced_case_library_service
+from app.services import interview_service as interview_service_module
+from app.services.interview_service import InterviewQuestionService, QuestionSearchIndex
+from app.utils.search_index import FullTextIndex
+
+
+class TestFullTextIndex:
+    def test_bm25_ranking_filters_and_pagination(self):
+        index = FullTextIndex({"title": 2.0, "body": 1.0}, str.split)
+        index.add(1, {"title": "kafka 消息队列", "body": "分区 副本"}, domain="大数据")
+        index.add(2, {"title": "flink 流处理", "body": "kafka 数据源 kafka 消费"}, domain="大数据")
+        index.add(3, {"title": "mqtt 协议", "body": "kafka 桥接"}, domain="物联网")
+
+        page = index.search("kafka")
+        assert page.total == 3
+        assert page.hits[0].doc_id == 1  # 标题命中权重更高
+
+        assert [hit.doc_id for hit in index.search("kafka", {"domain": "物联网"}).hits] == [3]
+        assert [hit.doc_id for hit in index.search("kafka", offset=1, limit=1).hits] == [page.hits[1].doc_id]
+
+        index.add(1, {"title": "hbase 存储"}, domain="大数据")
+        index.remove(3)
+        assert [hit.doc_id for hit in index.search("kafka").hits] == [2]
+        assert index.search("不存在的词").total == 0
+
+
+class TestQuestionAndCaseSearch:
+    def test_question_index_syncs_incrementally(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'questions.db'}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        db.add_all([
+            InterviewQuestion(domain="人工智能", position="技术岗", question_text="解释梯度消失问题及解决方法",
+                              keywords=["梯度消失", "反向传播"], expected_points=["ReLU激活函数", "残差连接"]),
+            InterviewQuestion(domain="大数据", position="技术岗", question_text="介绍Kafka的分区机制",
+                              keywords=["Kafka", "分区"], expected_points=["副本同步"]),
+        ])
+        db.commit()
+
+        index = QuestionSearchIndex(sync_interval=0)
+        assert [hit.doc_id for hit in index.search(db, "残差连接").hits] == [1]
+
+        db.add(InterviewQuestion(domain="人工智能", position="技术岗", question_text="残差网络为什么容易训练"))
+        db.commit()
+        assert index.search(db, "残差").total == 2
+        assert index.search(db, "残差", domain="大数据").total == 0
+
+        db.query(InterviewQuestion).filter(InterviewQuestion.id == 1).delete()
+        db.commit()
+        assert [hit.doc_id for hit in index.search(db, "残差").hits] == [3]
+        assert len(index.index) == 2
+
+        result = InterviewQuestionService.search_questions_page("kafka", db=db)
+        assert result["total"] == 1 and result["items"][0]["question"] == "介绍Kafka的分区机制"
+        db.close()
+
+    def test_question_index_reindexes_edited_questions(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'edited.db'}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        db.add_all([
+            InterviewQuestion(domain="大数据", position="技术岗", question_text="介绍Kafka的分区机制"),
+            InterviewQuestion(domain="大数据", position="技术岗", question_text="HDFS的副本放置策略"),
+        ])
+        db.commit()
+
+        index = QuestionSearchIndex(sync_interval=0)
+        assert index.search(db, "kafka").total == 1
+
+        question = db.get(InterviewQuestion, 1)
+        question.question_text = "介绍Flink的窗口机制"
+        db.commit()
+
+        assert index.search(db, "kafka").total == 0
+        assert [hit.doc_id for hit in index.search(db, "flink").hits] == [1]
+        assert len(index.index) == 2
+        db.close()
+
+    def test_warm_up_builds_index_before_first_search(self, tmp_path, monkeypatch):
+        engine = create_engine(f"sqlite:///{tmp_path / 'warm.db'}")
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine)
+        db = factory()
+        db.add(InterviewQuestion(domain="大数据", position="技术岗", question_text="介绍Kafka的分区机制"))
+        db.commit()
+        db.close()
+        monkeypatch.setattr(interview_service_module, "SessionLocal", factory)
+
+        index = QuestionSearchIndex()
+        index.start_background_warm_up().join(timeout=30)
+
+        assert len(index.index) == 1
+        # 预热后首次检索在同步间隔内，直接查内存索引
+        assert index.search(None, "kafka").total == 1
+
+    def test_case_search_ranks_title_matches_first(self):
+        cases = enhanced_case_library_service.search_cases("Transformer")
+        assert cases and cases[0].id == "ai_transformer_architecture"
+
+        page = enhanced_case_library_service.search_cases_page("实时", domain="物联网", page_size=1)
+        assert page["total"] >= 1 and all(item["domain"] == "物联网" for item in page["items"])
+
+    def test_case_search_endpoint_pages_results(self):
+        client = TestClient(main_module.app)
+        response = client.get("/api/v1/cases/search", params={"q": "Transformer", "page_size": 1})
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["page"] == 1 and data["page_size"] == 1
+        assert data["total"] >= 1 and len(data["items"]) == 1
+        assert data["items"][0]["id"] == "ai_transformer_architecture"
@@ -0,0 +1,71 @@
+"""
+测试共享分词服务
+"""
+
+import sys
+import os
+
+import jieba
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.segmentation_service import SegmentationService
+
+
+class TestSegmentationService:
+    def test_background_load_applies_user_words_once(self, tmp_path):
+        service = SegmentationService(cache_dir=str(tmp_path), tokenizer=jieba.Tokenizer())
+        service.add_words(["梯度裁剪器", "梯度裁剪器", "Hugging Face"])
+        assert not service.is_ready
+
+        service.start_background_load()
+        tokens = service.cut("我们加了梯度裁剪器")
+
+        assert service.is_ready
+        assert "梯度裁剪器" in tokens
+        assert service.get_stats()["user_words"] == 1
+        assert os.listdir(tmp_path)
+
+        # 就绪后注册的词立即生效
+        service.add_words(["混合专家路由"])
+        assert "混合专家路由" in service.cut("模型使用混合专家路由")
+        assert service.extract_tags("模型使用混合专家路由", top_k=3)
+
+    def test_first_cut_loads_synchronously_without_background_thread(self):
+        service = SegmentationService(tokenizer=jieba.Tokenizer())
+        assert service.cut("深度学习") and service.is_ready
+        assert service.start_background_load() is None
+
+    def test_failed_background_load_retries_synchronously(self):
+        class FlakyTokenizer(jieba.Tokenizer):
+            attempts = 0
+
+            def initialize(self, dictionary=None):
+                FlakyTokenizer.attempts += 1
+                if FlakyTokenizer.attempts == 1:
+                    raise OSError("词典文件不可读")
+                return super().initialize(dictionary)
+
+        service = SegmentationService(tokenizer=FlakyTokenizer())
+        service.start_background_load().join()
+        assert service.get_stats()["state"] == "failed"
+        assert not service.is_ready
+
+        # 后台加载失败后，分词调用在当前线程重新加载而不是一直等待
+        assert "框架" in service.cut("深度学习框架")
+        assert service.get_stats()["state"] == "ready"
+        assert service.get_stats()["error"] is None
+        assert FlakyTokenizer.attempts == 2
+
+    def test_ensure_ready_raises_when_dictionary_cannot_load(self):
+        class BrokenTokenizer(jieba.Tokenizer):
+            def initialize(self, dictionary=None):
+                raise OSError("词典文件不可读")
+
+        service = SegmentationService(tokenizer=BrokenTokenizer())
+        service.start_background_load()
+        with pytest.raises(OSError):
+            service.ensure_ready(timeout=5)
+        assert service.get_stats()["error"] == "词典文件不可读"
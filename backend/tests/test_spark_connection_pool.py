@@ -0,0 +1,161 @@
+"""
+测试Spark WebSocket连接池（使用模拟WebSocket，不连接真实服务）
+"""
+
+import asyncio
+import itertools
+import sys
+import os
+
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import iflytek_manager
+from app.core.iflytek_manager import SparkConnectionPool
+
+
+class FakeWebSocket:
+    def __init__(self, url):
+        self.url = url
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+    async def ping(self):
+        waiter = asyncio.get_running_loop().create_future()
+        waiter.set_result(None)
+        return waiter
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """记录连接池建立的所有模拟连接"""
+    sockets = []
+
+    async def connect(url, **kwargs):
+        sockets.append(FakeWebSocket(url))
+        return sockets[-1]
+
+    monkeypatch.setattr(iflytek_manager.websockets, "connect", connect)
+    return sockets
+
+
+def _pool(**kwargs):
+    counter = itertools.count(1)
+    return SparkConnectionPool(lambda: f"wss://spark/?date={next(counter)}", probe_interval=3600, **kwargs)
+
+
+async def _settle(pool):
+    """等待后台补足连接完成"""
+    if pool._refill_task is not None:
+        await pool._refill_task
+
+
+class TestSparkConnectionPool:
+    def test_warm_connection_serves_one_request_then_pool_refills(self, opened):
+        async def scenario():
+            pool = _pool(max_size=3, min_idle=2)
+            await pool.start()
+            async with pool.acquire() as websocket:
+                assert websocket is opened[-1]
+                assert pool.get_stats()["in_use"] == 1
+            await _settle(pool)
+            stats = pool.get_stats()
+            closed = [websocket.closed for websocket in opened]
+            await pool.close()
+            return stats, closed
+
+        stats, closed = asyncio.run(scenario())
+        # 预热2个；用过的连接归还时关闭，后台补足到2个空闲
+        assert closed == [False, True, False]
+        assert stats["warm_hits"] == 1 and stats["reused"] == 0
+        assert stats["idle"] == 2 and stats["in_use"] == 0
+
+    def test_open_connection_is_reused_when_unlimited(self, opened):
+        async def scenario():
+            pool = _pool(max_size=1, min_idle=1, requests_per_connection=None)
+            await pool.start()
+            used = []
+            for _ in range(3):
+                async with pool.acquire() as websocket:
+                    used.append(websocket)
+            stats = pool.get_stats()
+            await pool.close()
+            return used, stats
+
+        used, stats = asyncio.run(scenario())
+        assert len(opened) == 1 and all(websocket is opened[0] for websocket in used)
+        assert stats["warm_hits"] == 3 and stats["reused"] == 2
+        assert stats["reuse_rate"] == pytest.approx(200 / 3)
+
+    def test_server_closed_connection_is_dropped_not_reused(self, opened):
+        async def scenario():
+            pool = _pool(max_size=1, min_idle=1, requests_per_connection=None)
+            await pool.start()
+            async with pool.acquire() as websocket:
+                # 服务端发送最后一帧后关闭连接
+                websocket.closed = True
+            async with pool.acquire() as websocket:
+                second = websocket
+            stats = pool.get_stats()
+            await pool.close()
+            return second, stats
+
+        second, stats = asyncio.run(scenario())
+        assert second is opened[1]
+        assert stats["server_closed"] == 1
+        assert stats["reused"] == 0
+
+    def test_connection_is_discarded_when_request_fails(self, opened):
+        async def scenario():
+            pool = _pool(max_size=2, min_idle=0, requests_per_connection=None)
+            with pytest.raises(RuntimeError):
+                async with pool.acquire():
+                    raise RuntimeError("接收中断")
+            stats = pool.get_stats()
+            async with pool.acquire() as websocket:
+                after = websocket
+            await pool.close()
+            return stats, after
+
+        stats, after = asyncio.run(scenario())
+        assert opened[0].closed
+        assert stats["idle"] == 0 and stats["in_use"] == 0 and stats["connections_closed"] == 1
+        assert after is opened[1]
+
+    def test_expired_connection_reconnects_with_fresh_signature(self, opened):
+        async def scenario():
+            pool = _pool(max_size=1, min_idle=1, max_age=0.05, requests_per_connection=None)
+            await pool.start()
+            await asyncio.sleep(0.1)
+            async with pool.acquire() as websocket:
+                url = websocket.url
+            stats = pool.get_stats()
+            await pool.close()
+            return url, stats
+
+        url, stats = asyncio.run(scenario())
+        assert opened[0].url == "wss://spark/?date=1" and opened[0].closed
+        assert url == "wss://spark/?date=2"
+        assert stats["recycled"] == 1 and stats["warm_hits"] == 0
+
+    def test_acquire_waits_when_pool_is_full(self, opened):
+        async def scenario():
+            pool = _pool(max_size=1, min_idle=0)
+            order = []
+
+            async def request(name, hold):
+                async with pool.acquire():
+                    order.append(f"{name}-start")
+                    await asyncio.sleep(hold)
+                    order.append(f"{name}-end")
+
+            await asyncio.gather(request("a", 0.05), request("b", 0))
+            await pool.close()
+            return order
+
+        assert asyncio.run(scenario()) == ["a-start", "a-end", "b-start", "b-end"]
+        assert len(opened) == 2
@@ -0,0 +1,145 @@
+"""
+测试Spark调用限流器
+验证令牌桶放行、并发上限、优先级通道和429退避
+"""
+
+import asyncio
+import sys
+import os
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import Settings
+from app.core.rate_limiter import SparkRateLimiter, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+from app.services.enhanced_iflytek_service import EnhancedIFlytekService
+
+
+class TestSparkRateLimiter:
+    """测试Spark限流器"""
+
+    def test_burst_admitted_immediately(self):
+        """突发额度内的请求无需等待"""
+        async def scenario():
+            limiter = SparkRateLimiter(rate=1, burst=3, max_concurrent=10)
+            for _ in range(3):
+                await limiter.acquire()
+            return limiter.get_stats()
+
+        stats = asyncio.run(scenario())
+        assert stats["active"] == 3
+        assert stats["lanes"][PRIORITY_INTERACTIVE]["admitted"] == 3
+        assert stats["lanes"][PRIORITY_INTERACTIVE]["max_wait_time"] < 0.05
+
+    def test_concurrency_cap(self):
+        """同时进行中的请求不超过并发上限"""
+        async def scenario():
+            limiter = SparkRateLimiter(rate=1000, burst=100, max_concurrent=2)
+            running = 0
+            peak = 0
+
+            async def call():
+                nonlocal running, peak
+                async with limiter.slot():
+                    running += 1
+                    peak = max(peak, running)
+                    await asyncio.sleep(0.01)
+                    running -= 1
+
+            await asyncio.gather(*[call() for _ in range(8)])
+            return peak, limiter.get_stats()
+
+        peak, stats = asyncio.run(scenario())
+        assert peak == 2
+        assert stats["active"] == 0
+        assert stats["queue_depth"] == 0
+
+    def test_interactive_lane_served_first(self):
+        """令牌不足时交互式请求先于批处理请求放行"""
+        async def scenario():
+            limiter = SparkRateLimiter(rate=50, burst=1, max_concurrent=10)
+            await limiter.acquire()  # 耗尽令牌
+            order = []
+
+            async def call(name, priority):
+                await limiter.acquire(priority)
+                order.append(name)
+
+            batch = [asyncio.create_task(call(f"batch-{i}", PRIORITY_BATCH)) for i in range(2)]
+            await asyncio.sleep(0)
+            interactive = asyncio.create_task(call("interactive", PRIORITY_INTERACTIVE))
+            await asyncio.gather(*batch, interactive)
+            return order
+
+        order = asyncio.run(scenario())
+        assert order[0] == "interactive"
+
+    def test_backoff_pauses_admission(self):
+        """429退避期间暂停放行"""
+        async def scenario():
+            limiter = SparkRateLimiter(rate=1000, burst=5, max_concurrent=10)
+            limiter.backoff(0.1)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await limiter.acquire()
+            return loop.time() - started, limiter.get_stats()
+
+        waited, stats = asyncio.run(scenario())
+        assert waited >= 0.09
+        assert stats["backoff_count"] == 1
+
+    def test_queue_timeout(self):
+        """排队超时抛出TimeoutError且不占用名额"""
+        async def scenario():
+            limiter = SparkRateLimiter(rate=1000, burst=5, max_concurrent=1, queue_timeout=0.05)
+            await limiter.acquire()
+            with pytest.raises(asyncio.TimeoutError):
+                await limiter.acquire(PRIORITY_BATCH)
+            return limiter.get_stats()
+
+        stats = asyncio.run(scenario())
+        assert stats["active"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["lanes"][PRIORITY_BATCH]["timeouts"] == 1
+
+    def test_http_429_triggers_limiter_backoff(self):
+        """HTTP接口返回429时不在传输层重试，由限流器统一退避"""
+        async def scenario():
+            posts = 0
+
+            async def too_many_requests(request):
+                nonlocal posts
+                posts += 1
+                return web.json_response({"error": "rate limited"}, status=429)
+
+            app = web.Application()
+            app.router.add_post("/chat", too_many_requests)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+
+            service = EnhancedIFlytekService(Settings(iflytek_spark_http_url=f"http://127.0.0.1:{port}/chat"))
+            messages = [{"role": "user", "content": "你好"}]
+            try:
+                with pytest.raises(aiohttp.ClientResponseError) as error:
+                    await service._call_http_api(messages, max_retries=3, retry_delay=0)
+                transport_posts = posts
+                response = await service.chat_with_spark(messages, use_cache=False, max_retries=1)
+            finally:
+                await service.close()
+                await runner.cleanup()
+            return error.value.status, transport_posts, posts, response, service
+
+        status, transport_posts, posts, response, service = asyncio.run(scenario())
+        assert status == 429
+        assert transport_posts == 1
+        assert posts == 2
+        assert response["error_type"] == "rate_limit_error"
+        assert service.stats["rate_limit_errors"] == 1
+        assert service.rate_limiter.get_stats()["backoff_count"] >= 1
@@ -0,0 +1,81 @@
+"""
+测试Spark在途请求合并（single-flight）
+相同消息的并发请求只触发一次上游调用
+"""
+
+import asyncio
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import Settings
+from app.services.enhanced_iflytek_service import EnhancedIFlytekService
+
+
+class TestSparkRequestCoalescing:
+    """测试在途请求合并"""
+
+    def setup_method(self):
+        """每个测试使用独立的服务实例和计数的上游桩"""
+        self.service = EnhancedIFlytekService(Settings())
+        self.upstream_calls = 0
+
+        async def fake_http_api(messages, **kwargs):
+            self.upstream_calls += 1
+            await asyncio.sleep(0.05)
+            return {"content": f"回答:{messages[-1]['content']}", "status": "success"}
+
+        async def fake_stream_api(messages, **kwargs):
+            self.upstream_calls += 1
+            for chunk in ["思考", "|||", "问题"]:
+                await asyncio.sleep(0.01)
+                yield chunk
+
+        self.service._call_http_api = fake_http_api
+        self.service._stream_http_api = fake_stream_api
+
+    def test_identical_calls_share_one_upstream_request(self):
+        """相同消息的并发调用共享结果"""
+        messages = [{"role": "user", "content": "开场问题"}]
+
+        async def scenario():
+            return await asyncio.gather(*[
+                self.service.chat_with_spark(messages, use_cache=False) for _ in range(5)
+            ])
+
+        responses = asyncio.run(scenario())
+        assert self.upstream_calls == 1
+        assert all(r["content"] == "回答:开场问题" for r in responses)
+        assert sum(1 for r in responses if r.get("coalesced")) == 4
+        assert self.service.stats["coalesced_requests"] == 4
+
+    def test_different_messages_are_not_coalesced(self):
+        """不同消息分别调用上游"""
+        async def scenario():
+            return await asyncio.gather(
+                self.service.chat_with_spark([{"role": "user", "content": "A"}], use_cache=False),
+                self.service.chat_with_spark([{"role": "user", "content": "B"}], use_cache=False)
+            )
+
+        asyncio.run(scenario())
+        assert self.upstream_calls == 2
+
+    def test_concurrent_streams_share_one_upstream_stream(self):
+        """并发流式请求共享同一上游流，后加入者补齐已到达片段"""
+        messages = [{"role": "user", "content": "流式开场"}]
+
+        async def consume():
+            return "".join([chunk async for chunk in self.service.chat_with_spark_stream(messages, use_cache=False)])
+
+        async def scenario():
+            first = asyncio.create_task(consume())
+            await asyncio.sleep(0.015)
+            second = asyncio.create_task(consume())
+            return await asyncio.gather(first, second)
+
+        results = asyncio.run(scenario())
+        assert self.upstream_calls == 1
+        assert results == ["思考|||问题", "思考|||问题"]
+        assert not self.service._inflight_streams
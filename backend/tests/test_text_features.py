@@ -0,0 +1,41 @@
+"""
+测试回答文本特征的共享计算
+"""
+
+import sys
+import os
+
+import jieba
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.text_features import get_text_features
+from app.services.text_analysis_service import TextAnalysisService
+
+
+class TestTextFeatures:
+    def test_features_memoized_by_content(self):
+        text = "首先我们分析了需求。然后使用Spark处理数据！最后总结经验"
+        features = get_text_features(text)
+
+        assert get_text_features(text) is features
+        assert features.sentences("。！？") == ("首先我们分析了需求", "然后使用Spark处理数据", "最后总结经验")
+        assert features.sentences("。") == ("首先我们分析了需求", "然后使用Spark处理数据！最后总结经验")
+        assert "spark" in features.lower_tokens
+        assert features.tokens is features.tokens
+
+    def test_answer_segmented_once_across_analyzers(self, monkeypatch):
+        calls = []
+        original_cut = jieba.dt.cut
+
+        def counting_cut(text, *args, **kwargs):
+            calls.append(text)
+            return original_cut(text, *args, **kwargs)
+
+        monkeypatch.setattr(jieba.dt, "cut", counting_cut)
+        text = "我负责推荐系统的深度学习模型训练，因此对特征工程比较熟悉。"
+        result = TextAnalysisService().analyze_response(text, "人工智能", "技术岗")
+
+        assert "error" not in result
+        assert calls.count(text) == 1
@@ -0,0 +1,90 @@
+"""
+测试按句流式语音合成和句级磁盘缓存
+"""
+
+import asyncio
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.cache import DiskBlobCache
+from app.services.iflytek_service import IFlytekTTSService, split_sentences
+
+
+class _StubTTS(IFlytekTTSService):
+    """用文本本身代替合成音频，记录实际调用合成接口的句子"""
+
+    def __init__(self, cache_dir):
+        super().__init__()
+        self.audio_cache = DiskBlobCache(cache_dir, max_bytes=1024 * 1024)
+        self.calls = []
+
+    async def _websocket_synthesize(self, text, voice_name):
+        self.calls.append(text)
+        await asyncio.sleep(0.01 if len(self.calls) == 1 else 0)
+        return text.encode("utf-8")
+
+
+class TestSplitSentences:
+    def test_split_on_punctuation(self):
+        assert split_sentences("你好，欢迎参加面试。请做自我介绍！准备好了吗?") == [
+            "你好，欢迎参加面试。", "请做自我介绍！", "准备好了吗?"]
+
+    def test_short_pieces_merged(self):
+        assert split_sentences("好。那我们开始吧。") == ["好。那我们开始吧。"]
+        assert split_sentences("开始吧。好") == ["开始吧。好"]
+        assert split_sentences("  ") == []
+
+
+class TestTTSStream:
+    def test_stream_keeps_order_and_caches(self, tmp_path):
+        service = _StubTTS(str(tmp_path))
+        text = "第一句话比较长。第二句。第三句结束！"
+
+        async def collect():
+            return [chunk async for chunk in service.synthesize_speech_stream(text)]
+
+        chunks = asyncio.run(collect())
+        assert b"".join(chunks).decode("utf-8") == text
+        assert len(service.calls) == 3
+
+        # 再次合成全部命中缓存，换发音人则重新合成
+        assert asyncio.run(service.synthesize_speech(text)).decode("utf-8") == text
+        assert len(service.calls) == 3
+        asyncio.run(service.synthesize_speech("第二句。", voice_name="aisjiuxu"))
+        assert len(service.calls) == 4
+        assert service.audio_cache.get_stats()["hits"] == 3
+
+    def test_only_prefetch_sentences_are_synthesized_ahead(self, tmp_path):
+        service = _StubTTS(str(tmp_path))
+        service.prefetch = 1
+        text = "".join(f"这是第{i}句话。" for i in range(20))
+
+        async def first_chunk():
+            stream = service.synthesize_speech_stream(text)
+            chunk = await stream.__anext__()
+            await asyncio.sleep(0.05)
+            started = len(service.calls)
+            await stream.aclose()
+            return chunk, started
+
+        chunk, started = asyncio.run(first_chunk())
+        assert chunk.decode("utf-8") == "这是第0句话。"
+        # 播放第一句期间只提前合成下一句，其余句子没有创建任务
+        assert started == 2
+
+
+class TestDiskBlobCache:
+    def test_evict_skips_files_removed_by_other_processes(self, tmp_path):
+        cache = DiskBlobCache(str(tmp_path), max_bytes=1000)
+        for i in range(4):
+            cache.set(f"k{i}", b"x" * 200)
+        entries = list(cache._files())
+        os.remove(entries[0].path)
+
+        # 模拟另一进程在列目录之后删除文件
+        cache._files = lambda: iter(entries)
+        cache._evict()
+        assert cache.size_bytes == 600